@@ -1,19 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.controllers import auth_controller, usuario_controller, partida_controller, convite_controller
+from app.controllers import auth_controller, usuario_controller, partida_controller, convite_controller, lobby_controller, equipe_controller, avaliacao_controller, candidatura_controller
 from app.middlewares.security import (
     SecurityHeadersMiddleware,
     RateLimitMiddleware,
     InputValidationMiddleware,
     RequestSizeLimitMiddleware
 )
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.clock import RelogioMiddleware
+from app.middlewares.idempotencia import IdempotenciaMiddleware
+from app.middlewares.compressao import CompressaoMiddleware
+from app.middlewares.unidade_trabalho import UnidadeTrabalhoMiddleware
+from app.core.estaticos import ArquivosEstaticos
+from app.core.metrics import registry
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicialização e encerramento de cada worker. Importar este módulo não toca
+    o banco: o schema é responsabilidade da migração (update_db.py).
+    """
+    if settings.CRIAR_TABELAS_NA_INICIALIZACAO:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    yield
+    engine.dispose()
 
-# Criar tabelas do banco de dados
-Base.metadata.create_all(bind=engine)
 
 # Inicializar aplicação
 app = FastAPI(
@@ -21,12 +40,21 @@ app = FastAPI(
     version=settings.VERSION,
     description=settings.DESCRIPTION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Unidade de trabalho: o mais interno, grava a requisição antes que qualquer outro middleware veja a resposta
+app.add_middleware(UnidadeTrabalhoMiddleware)
+
 # Configurar middlewares de segurança (ordem importa: primeiro é executado por último)
 app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RateLimitMiddleware, max_requests=100, window_seconds=60)  # 100 req/min por IP
+app.add_middleware(IdempotenciaMiddleware)  # Dentro do rate limit e da validação: requisições rejeitadas não gravam chaves
+app.add_middleware(
+    RateLimitMiddleware,
+    max_requests=settings.RATE_LIMIT_MAX_REQUESTS,
+    window_seconds=settings.RATE_LIMIT_WINDOW_SECONDS
+)  # Padrão: 100 req/min por IP
 app.add_middleware(InputValidationMiddleware)
 app.add_middleware(RequestSizeLimitMiddleware, max_size_mb=10)  # Máximo 10MB por requisição
 
@@ -40,8 +68,22 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Configurar arquivos estáticos
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Compressão do JSON (negociada por Accept-Encoding); estáticos já saem pré-comprimidos
+app.add_middleware(
+    CompressaoMiddleware,
+    minimo_bytes=settings.COMPRESSAO_MINIMO_BYTES,
+    nivel_gzip=settings.COMPRESSAO_NIVEL_GZIP,
+    nivel_brotli=settings.COMPRESSAO_NIVEL_BROTLI
+)
+
+# "Agora" fixo por requisição, visível para toda a pilha interna
+app.add_middleware(RelogioMiddleware)
+
+# Métricas por último: é o middleware mais externo e mede toda a pilha
+app.add_middleware(MetricsMiddleware)
+
+# Configurar arquivos estáticos (pré-comprimidos por comprimir_estaticos.py, com ETag e cache imutável)
+app.mount("/static", ArquivosEstaticos(directory="static"), name="static")
 
 @app.get("/")
 def home():
@@ -57,8 +99,20 @@ def health_check():
         "version": settings.VERSION
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Métricas no formato de exposição do Prometheus"""
+    return PlainTextResponse(
+        registry.expor(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # Incluir routers
 app.include_router(auth_controller.router, prefix=settings.API_V1_STR)
 app.include_router(usuario_controller.router, prefix=settings.API_V1_STR)
 app.include_router(partida_controller.router, prefix=settings.API_V1_STR)
+app.include_router(equipe_controller.router, prefix=settings.API_V1_STR)
+app.include_router(avaliacao_controller.router, prefix=settings.API_V1_STR)
+app.include_router(candidatura_controller.router, prefix=settings.API_V1_STR)
 app.include_router(convite_controller.router, prefix=f"{settings.API_V1_STR}/convites", tags=["convites"])
+app.include_router(lobby_controller.router)
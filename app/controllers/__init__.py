@@ -1,8 +1,12 @@
-from app.controllers import auth_controller, usuario_controller, partida_controller, convite_controller
+from app.controllers import auth_controller, usuario_controller, partida_controller, convite_controller, lobby_controller, equipe_controller, avaliacao_controller, candidatura_controller
 
 __all__ = [
     "auth_controller",
     "usuario_controller", 
     "partida_controller",
-    "convite_controller"
+    "convite_controller",
+    "lobby_controller",
+    "equipe_controller",
+    "avaliacao_controller",
+    "candidatura_controller"
 ]
\ No newline at end of file
@@ -0,0 +1,65 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, Path, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas import AvaliacaoCreate, AvaliacaoInDB, ResumoAvaliacoesPartida, ResumoAvaliacoesUsuario
+from app.services import AvaliacaoService
+from app.middlewares import get_current_active_user
+from app.models import Usuario
+from app.utils.serializacao import resposta_lista
+
+router = APIRouter(prefix="/avaliacoes", tags=["Avaliações"])
+
+
+@router.post("/", response_model=AvaliacaoInDB, status_code=status.HTTP_201_CREATED)
+def avaliar(
+    avaliacao_data: AvaliacaoCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Avaliar uma partida finalizada, o organizador dela ou outro participante (nota de 1 a 5)
+    """
+    avaliacao_service = AvaliacaoService(db)
+    return avaliacao_service.avaliar(avaliacao_data, current_user)
+
+
+@router.get("/partidas/{partida_id}", response_model=List[AvaliacaoInDB])
+def listar_avaliacoes_partida(
+    partida_id: int = Path(..., description="ID da partida"),
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Listar avaliações de uma partida
+    """
+    avaliacao_service = AvaliacaoService(db)
+    return resposta_lista(AvaliacaoInDB, avaliacao_service.get_avaliacoes_partida(partida_id, skip=skip, limit=limit))
+
+
+@router.get("/partidas/{partida_id}/resumo", response_model=ResumoAvaliacoesPartida)
+def obter_resumo_partida(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Média e quantidade de avaliações da partida
+    """
+    avaliacao_service = AvaliacaoService(db)
+    return avaliacao_service.get_resumo_partida(partida_id)
+
+
+@router.get("/usuarios/{usuario_id}/resumo", response_model=ResumoAvaliacoesUsuario)
+def obter_resumo_usuario(
+    usuario_id: int = Path(..., description="ID do usuário"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Médias das avaliações recebidas pelo usuário como organizador e como jogador
+    """
+    avaliacao_service = AvaliacaoService(db)
+    return avaliacao_service.get_resumo_usuario(usuario_id)
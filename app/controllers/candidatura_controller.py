@@ -0,0 +1,87 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, Path, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas import (
+    CandidaturaCreate, CandidaturaInDB, CandidaturaFilaResponse, DecisaoCandidaturas, ResultadoDecisaoCandidaturas
+)
+from app.services import CandidaturaService
+from app.middlewares import get_current_active_user
+from app.models import Usuario
+from app.models.enums import StatusCandidatura
+from app.utils.serializacao import resposta_lista
+
+router = APIRouter(prefix="/candidaturas", tags=["Candidaturas"])
+
+
+@router.post("/", response_model=CandidaturaInDB, status_code=status.HTTP_201_CREATED)
+def candidatar(
+    candidatura_data: CandidaturaCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Candidatar-se a uma partida privada (o organizador aprova ou rejeita)
+    """
+    candidatura_service = CandidaturaService(db)
+    return candidatura_service.candidatar(candidatura_data, current_user)
+
+
+@router.get("/minhas", response_model=List[CandidaturaInDB])
+def listar_minhas_candidaturas(
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Listar candidaturas do usuário atual
+    """
+    candidatura_service = CandidaturaService(db)
+    return resposta_lista(CandidaturaInDB, candidatura_service.get_minhas(current_user, skip=skip, limit=limit))
+
+
+@router.delete("/{candidatura_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancelar_candidatura(
+    candidatura_id: int = Path(..., description="ID da candidatura"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Cancelar a própria candidatura pendente
+    """
+    candidatura_service = CandidaturaService(db)
+    candidatura_service.cancelar(candidatura_id, current_user)
+
+
+@router.get("/partidas/{partida_id}", response_model=List[CandidaturaFilaResponse])
+def obter_fila_candidaturas(
+    partida_id: int = Path(..., description="ID da partida"),
+    status_candidatura: StatusCandidatura = Query(StatusCandidatura.PENDENTE, alias="status", description="Filtrar por status"),
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Fila de candidaturas da partida em ordem de chegada (apenas organizador)
+    """
+    candidatura_service = CandidaturaService(db)
+    return resposta_lista(CandidaturaFilaResponse, candidatura_service.get_fila(
+        partida_id, current_user, status_candidatura=status_candidatura, skip=skip, limit=limit
+    ))
+
+
+@router.post("/partidas/{partida_id}/decisao", response_model=ResultadoDecisaoCandidaturas)
+def decidir_candidaturas(
+    decisao: DecisaoCandidaturas,
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Aprovar e rejeitar candidaturas em lote (apenas organizador). Os aprovados entram
+    na partida juntos, em uma transação, se houver vagas para todos
+    """
+    candidatura_service = CandidaturaService(db)
+    return candidatura_service.decidir(partida_id, decisao, current_user)
@@ -0,0 +1,145 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, Path, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas import EquipeCreate, EquipeUpdate, EquipeInDB, EquipeResponse
+from app.services import EquipeService
+from app.middlewares import get_current_active_user
+from app.models import Usuario
+from app.utils.serializacao import resposta_lista
+
+router = APIRouter(prefix="/equipes", tags=["Equipes"])
+
+
+@router.post("/", response_model=EquipeResponse, status_code=status.HTTP_201_CREATED)
+def criar_equipe(
+    equipe_data: EquipeCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Criar uma nova equipe (o usuário atual será o líder)
+    """
+    equipe_service = EquipeService(db)
+    return equipe_service.create_equipe(equipe_data, current_user)
+
+
+@router.get("/", response_model=List[EquipeInDB])
+def listar_equipes(
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Listar equipes (paginado)
+    """
+    equipe_service = EquipeService(db)
+    return resposta_lista(EquipeInDB, equipe_service.get_equipes(skip=skip, limit=limit))
+
+
+@router.get("/ranking", response_model=List[EquipeInDB])
+def obter_ranking_equipes(
+    limit: int = Query(10, ge=1, le=50, description="Limite de equipes no ranking"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Obter ranking de equipes por pontuação acumulada
+    """
+    equipe_service = EquipeService(db)
+    return resposta_lista(EquipeInDB, equipe_service.get_ranking(limit=limit))
+
+
+@router.get("/melhores", response_model=List[EquipeInDB])
+def obter_melhores_equipes(
+    limit: int = Query(10, ge=1, le=50, description="Limite de equipes"),
+    min_partidas: int = Query(1, ge=1, description="Mínimo de partidas jogadas para entrar na lista"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Obter melhores equipes por taxa de vitória
+    """
+    equipe_service = EquipeService(db)
+    return resposta_lista(EquipeInDB, equipe_service.get_melhores_equipes(limit=limit, min_partidas=min_partidas))
+
+
+@router.get("/minhas", response_model=List[EquipeInDB])
+def listar_minhas_equipes(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Listar equipes lideradas pelo usuário atual
+    """
+    equipe_service = EquipeService(db)
+    return resposta_lista(EquipeInDB, equipe_service.get_minhas_equipes(current_user))
+
+
+@router.get("/{equipe_id}", response_model=EquipeResponse)
+def obter_equipe(
+    equipe_id: int = Path(..., description="ID da equipe"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Obter equipe com líder e membros
+    """
+    equipe_service = EquipeService(db)
+    return equipe_service.get_equipe(equipe_id)
+
+
+@router.put("/{equipe_id}", response_model=EquipeResponse)
+def atualizar_equipe(
+    equipe_data: EquipeUpdate,
+    equipe_id: int = Path(..., description="ID da equipe"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Atualizar nome e descrição da equipe (apenas líder)
+    """
+    equipe_service = EquipeService(db)
+    return equipe_service.update_equipe(equipe_id, equipe_data, current_user)
+
+
+@router.delete("/{equipe_id}", status_code=status.HTTP_204_NO_CONTENT)
+def excluir_equipe(
+    equipe_id: int = Path(..., description="ID da equipe"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Excluir equipe (apenas líder)
+    """
+    equipe_service = EquipeService(db)
+    equipe_service.delete_equipe(equipe_id, current_user)
+
+
+@router.post("/{equipe_id}/membros/{usuario_id}", response_model=EquipeResponse)
+def adicionar_membro(
+    equipe_id: int = Path(..., description="ID da equipe"),
+    usuario_id: int = Path(..., description="ID do usuário a ser adicionado"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Adicionar membro à equipe (apenas líder)
+    """
+    equipe_service = EquipeService(db)
+    return equipe_service.adicionar_membro(equipe_id, usuario_id, current_user)
+
+
+@router.delete("/{equipe_id}/membros/{usuario_id}", response_model=EquipeResponse)
+def remover_membro(
+    equipe_id: int = Path(..., description="ID da equipe"),
+    usuario_id: int = Path(..., description="ID do membro a ser removido"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Remover membro da equipe (líder) ou sair da equipe (o próprio membro)
+    """
+    equipe_service = EquipeService(db)
+    return equipe_service.remover_membro(equipe_id, usuario_id, current_user)
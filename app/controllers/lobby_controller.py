@@ -0,0 +1,131 @@
+import asyncio
+import json
+from time import monotonic
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.eventos import Assinatura, hub
+from app.core.lobby import presenca
+from app.middlewares import autorizar_acesso_partida
+
+router = APIRouter(prefix="/ws/partidas", tags=["Lobby"])
+
+# Códigos de fechamento (4000-4999 são livres para a aplicação)
+FECHAMENTO_NAO_AUTORIZADO = 4401
+FECHAMENTO_PROIBIDO = 4403
+FECHAMENTO_PARTIDA_NAO_ENCONTRADA = 4404
+FECHAMENTO_CONSUMIDOR_LENTO = 4408
+FECHAMENTO_SEM_RESPOSTA = 4410
+
+TAMANHO_MAXIMO_MENSAGEM = 500
+PONG = json.dumps({"tipo": "pong"})
+
+
+def _token_da_conexao(websocket: WebSocket, token: Optional[str]) -> Optional[str]:
+    """Token via query string (navegadores) ou cabeçalho Authorization (clientes nativos)"""
+    if token:
+        return token
+    autorizacao = websocket.headers.get("authorization", "")
+    if autorizacao.lower().startswith("bearer "):
+        return autorizacao[7:]
+    return None
+
+
+async def _enviar(websocket: WebSocket, assinatura: Assinatura, ultima_atividade: list) -> None:
+    """Drenar a fila da conexão para o socket, com heartbeat e corte de consumidores lentos"""
+    intervalo = settings.LOBBY_HEARTBEAT_SECONDS
+    while True:
+        try:
+            evento = await assinatura.proximo(timeout=intervalo)
+        except asyncio.TimeoutError:
+            if monotonic() - ultima_atividade[0] > 2 * intervalo:
+                await websocket.close(code=FECHAMENTO_SEM_RESPOSTA)
+                return
+            evento = None
+            texto = json.dumps({"tipo": "ping"})
+        else:
+            if evento is None:
+                # Fila cheia: o cliente não acompanha o ritmo dos eventos
+                await websocket.close(code=FECHAMENTO_CONSUMIDOR_LENTO)
+                return
+            # Respostas da própria conexão (pong) já vêm serializadas
+            texto = evento if isinstance(evento, str) else evento.json()
+
+        try:
+            await asyncio.wait_for(websocket.send_text(texto), settings.LOBBY_ENVIO_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            await websocket.close(code=FECHAMENTO_CONSUMIDOR_LENTO)
+            return
+
+
+async def _receber(
+    websocket: WebSocket, assinatura: Assinatura, partida_id: int, usuario_id: int, nome: str, ultima_atividade: list
+) -> None:
+    """Processar mensagens do cliente: ping/pong e mensagens para o lobby (só _enviar escreve no socket)"""
+    while True:
+        texto = await websocket.receive_text()
+        ultima_atividade[0] = monotonic()
+        try:
+            mensagem = json.loads(texto)
+        except ValueError:
+            continue
+        tipo = mensagem.get("tipo") if isinstance(mensagem, dict) else None
+
+        if tipo == "ping":
+            assinatura.responder(PONG)
+        elif tipo == "mensagem":
+            conteudo = str(mensagem.get("texto", "")).strip()[:TAMANHO_MAXIMO_MENSAGEM]
+            if conteudo:
+                hub.publicar(partida_id, "mensagem", usuario_id=usuario_id, nome=nome, texto=conteudo)
+
+
+@router.websocket("/{partida_id}")
+async def lobby_partida(
+    websocket: WebSocket,
+    partida_id: int,
+    token: Optional[str] = Query(None, description="Token JWT")
+):
+    """
+    Lobby em tempo real da partida: presença, entradas, confirmações, status e mensagens
+    """
+    # Aceitar antes de validar para que o cliente receba o código de fechamento
+    await websocket.accept()
+    try:
+        usuario = await run_in_threadpool(autorizar_acesso_partida, partida_id, _token_da_conexao(websocket, token))
+    except HTTPException as exc:
+        codigo = {
+            status.HTTP_404_NOT_FOUND: FECHAMENTO_PARTIDA_NAO_ENCONTRADA,
+            status.HTTP_403_FORBIDDEN: FECHAMENTO_PROIBIDO,
+        }.get(exc.status_code, FECHAMENTO_NAO_AUTORIZADO)
+        await websocket.close(code=codigo)
+        return
+
+    usuario_id, nome = usuario.id, usuario.nome
+
+    assinatura = hub.assinar(partida_id, tamanho=settings.LOBBY_FILA_MAX)
+    if presenca.entrar(partida_id, usuario_id, nome):
+        hub.publicar(partida_id, "lobby_entrou", usuario_id=usuario_id, nome=nome)
+
+    ultima_atividade = [monotonic()]
+    tarefas = []
+    try:
+        await websocket.send_json({
+            "tipo": "lobby",
+            "partida_id": partida_id,
+            "presentes": presenca.presentes(partida_id)
+        })
+        tarefas = [
+            asyncio.create_task(_enviar(websocket, assinatura, ultima_atividade)),
+            asyncio.create_task(_receber(websocket, assinatura, partida_id, usuario_id, nome, ultima_atividade)),
+        ]
+        await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        assinatura.cancelar()
+        if presenca.sair(partida_id, usuario_id):
+            hub.publicar(partida_id, "lobby_saiu", usuario_id=usuario_id, nome=nome)
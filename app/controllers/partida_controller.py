@@ -1,16 +1,53 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, Path, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.coalescencia import Coalescedor
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.eventos import hub, fluxo_sse
 from app.schemas import (
-    PartidaCreate, PartidaUpdate, PartidaResponse, StatusResponse
+    PartidaCreate, PartidaUpdate, PartidaResponse, PartidaProximaResponse, StatusResponse, EquipesPartidaResponse,
+    ListaEsperaResponse
 )
 from app.services import PartidaService
-from app.middlewares import get_current_active_user, require_intermediate_or_above
+from app.middlewares import get_current_active_user, require_intermediate_or_above, autorizar_acesso_partida
 from app.models import Usuario
-from app.models.enums import TipoPartida, CategoriaPartida
+from app.models.enums import TipoPartida, CategoriaPartida, StatusPartida
+from app.utils.lotes import LIMITE_IDS, interpretar_ids, resposta_lote
+from app.utils.serializacao import lista_json, objeto_json, resposta_lista
 
 router = APIRouter(prefix="/partidas", tags=["Partidas"])
+bearer_opcional = HTTPBearer(auto_error=False)
+
+# Páginas muito acessadas ao mesmo tempo (link compartilhado): requisições idênticas
+# simultâneas compartilham um único cálculo. Estas respostas não dependem de quem
+# pede, só de estar autenticado, por isso a visibilidade na chave é "autenticado".
+coalescer_partida = Coalescedor("/api/v1/partidas/{partida_id}")
+coalescer_proximas = Coalescedor("/api/v1/partidas/proximas")
+VISIBILIDADE_AUTENTICADO = "autenticado"
+
+
+def _partida_json(partida_id: int) -> bytes:
+    """Buscar e serializar a partida em uma sessão própria (compartilhada entre requisições)"""
+    db = SessionLocal()
+    try:
+        partida = PartidaService(db).get_partida_ou_arquivada(partida_id)
+        return objeto_json(PartidaResponse, partida)
+    finally:
+        db.close()
+
+
+def _proximas_json(skip: int, limit: int) -> bytes:
+    """Buscar e serializar as próximas partidas em uma sessão própria"""
+    db = SessionLocal()
+    try:
+        partidas = PartidaService(db).get_proximas_partidas(skip=skip, limit=limit)
+        return lista_json(PartidaResponse, partidas)
+    finally:
+        db.close()
 
 
 @router.post("/", response_model=PartidaResponse, status_code=status.HTTP_201_CREATED)
@@ -32,19 +69,28 @@ def listar_partidas_ativas(
     limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
     categoria: Optional[str] = Query(None, description="Filtrar por categoria"),
     apenas_acessiveis: bool = Query(False, description="Mostrar apenas partidas que o usuário pode participar"),
+    ids: Optional[List[str]] = Query(None, description=f"Buscar estas partidas (ids separados por vírgula, até {LIMITE_IDS})"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Listar partidas ativas com filtros opcionais por categoria
+    Listar partidas ativas com filtros opcionais por categoria.
+    Com ids, devolve essas partidas na ordem pedida (inclusive arquivadas) e os
+    ids inexistentes no cabeçalho X-Ids-Nao-Encontrados; dos demais filtros só
+    apenas_acessiveis vale
     """
     partida_service = PartidaService(db)
-    return partida_service.get_partidas_ativas(
+    if ids is not None:
+        partidas, nao_encontrados = partida_service.get_partidas_por_ids(
+            interpretar_ids(ids), usuario=current_user if apenas_acessiveis else None
+        )
+        return resposta_lote(PartidaResponse, partidas, nao_encontrados)
+    return resposta_lista(PartidaResponse, partida_service.get_partidas_ativas(
         skip=skip, 
         limit=limit, 
         categoria=categoria,
         usuario=current_user if apenas_acessiveis else None
-    )
+    ))
 
 
 @router.get("/tipo/{tipo}", response_model=List[PartidaResponse])
@@ -59,21 +105,21 @@ def listar_partidas_por_tipo(
     Listar partidas por tipo
     """
     partida_service = PartidaService(db)
-    return partida_service.get_partidas_by_tipo(tipo, skip=skip, limit=limit)
+    return resposta_lista(PartidaResponse, partida_service.get_partidas_by_tipo(tipo, skip=skip, limit=limit))
 
 
 @router.get("/proximas", response_model=List[PartidaResponse])
-def listar_proximas_partidas(
+async def listar_proximas_partidas(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
-    db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
     Listar próximas partidas
     """
-    partida_service = PartidaService(db)
-    return partida_service.get_proximas_partidas(skip=skip, limit=limit)
+    chave = (skip, limit, VISIBILIDADE_AUTENTICADO)
+    corpo = await coalescer_proximas.executar(chave, _proximas_json, skip, limit)
+    return Response(content=corpo, media_type="application/json")
 
 
 @router.get("/minhas", response_model=List[PartidaResponse])
@@ -87,7 +133,7 @@ def listar_minhas_partidas(
     Listar partidas organizadas pelo usuário logado
     """
     partida_service = PartidaService(db)
-    return partida_service.get_minhas_partidas(current_user.id, skip=skip, limit=limit)
+    return resposta_lista(PartidaResponse, partida_service.get_minhas_partidas(current_user.id, skip=skip, limit=limit))
 
 
 @router.get("/participando", response_model=List[PartidaResponse])
@@ -101,20 +147,87 @@ def listar_partidas_participando(
     Listar partidas onde usuário está participando
     """
     partida_service = PartidaService(db)
-    return partida_service.get_partidas_participando(current_user.id, skip=skip, limit=limit)
+    return resposta_lista(PartidaResponse, partida_service.get_partidas_participando(current_user.id, skip=skip, limit=limit))
+
+
+@router.get("/busca", response_model=List[PartidaResponse])
+def buscar_partidas(
+    q: str = Query(..., min_length=2, max_length=100, description="Termos de busca (título, descrição, local)"),
+    status_partida: Optional[StatusPartida] = Query(None, alias="status", description="Filtrar por status"),
+    categoria: Optional[str] = Query(None, description="Filtrar por categoria"),
+    apenas_acessiveis: bool = Query(False, description="Mostrar apenas partidas que o usuário pode participar"),
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(20, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Buscar partidas por texto, ordenadas por relevância.
+    Ignora acentos e maiúsculas; um dia da semana nos termos ("vôlei praia sábado")
+    filtra pela data da partida.
+    """
+    partida_service = PartidaService(db)
+    return resposta_lista(PartidaResponse, partida_service.buscar_partidas(
+        q,
+        status_partida=status_partida,
+        categoria=categoria,
+        usuario=current_user if apenas_acessiveis else None,
+        skip=skip,
+        limit=limit
+    ))
+
+
+@router.get("/proximas-de-mim", response_model=List[PartidaProximaResponse])
+def listar_partidas_proximas_de_mim(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude do usuário"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude do usuário"),
+    raio_km: float = Query(10, gt=0, le=50, description="Raio de busca em km"),
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(20, ge=1, le=100, description="Limite de registros"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Listar próximas partidas ativas dentro do raio, da mais perto para a mais longe
+    (empate pelo horário de início). Apenas partidas com coordenadas.
+    """
+    partida_service = PartidaService(db)
+    return resposta_lista(
+        PartidaProximaResponse,
+        partida_service.get_partidas_proximas_de(lat, lon, raio_km, skip=skip, limit=limit)
+    )
 
 
 @router.get("/{partida_id}", response_model=PartidaResponse)
-def obter_partida(
+async def obter_partida(
     partida_id: int = Path(..., description="ID da partida"),
-    db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
     Obter detalhes de uma partida
     """
-    partida_service = PartidaService(db)
-    return partida_service.get_partida(partida_id)
+    chave = (partida_id, VISIBILIDADE_AUTENTICADO)
+    corpo = await coalescer_partida.executar(chave, _partida_json, partida_id)
+    return Response(content=corpo, media_type="application/json")
+
+
+@router.get("/{partida_id}/eventos", response_class=StreamingResponse)
+async def eventos_partida(
+    partida_id: int = Path(..., description="ID da partida"),
+    token: Optional[str] = Query(None, description="Token JWT (o EventSource do navegador não envia cabeçalhos)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_opcional)
+):
+    """
+    Stream Server-Sent Events com entradas, saídas, confirmações e mudanças de status da partida
+    """
+    await run_in_threadpool(autorizar_acesso_partida, partida_id, credentials.credentials if credentials else token)
+    
+    assinatura = hub.assinar(partida_id, tamanho=settings.EVENTOS_FILA_MAX)
+    return StreamingResponse(
+        fluxo_sse(assinatura, settings.EVENTOS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.put("/{partida_id}", response_model=PartidaResponse)
@@ -191,6 +304,46 @@ def sair_partida(
     return partida_service.sair_partida(partida_id, current_user)
 
 
+@router.get("/{partida_id}/espera", response_model=ListaEsperaResponse)
+def obter_lista_espera(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Lista de espera da partida e a posição do usuário atual nela
+    """
+    partida_service = PartidaService(db)
+    return partida_service.get_lista_espera(partida_id, current_user)
+
+
+@router.post("/{partida_id}/espera", response_model=ListaEsperaResponse)
+def entrar_lista_espera(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Entrar na lista de espera de uma partida lotada. Quando uma vaga abre, o primeiro
+    da fila vira participante automaticamente (evento "participante_promovido")
+    """
+    partida_service = PartidaService(db)
+    return partida_service.entrar_lista_espera(partida_id, current_user)
+
+
+@router.delete("/{partida_id}/espera", response_model=ListaEsperaResponse)
+def sair_lista_espera(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Sair da lista de espera
+    """
+    partida_service = PartidaService(db)
+    return partida_service.sair_lista_espera(partida_id, current_user)
+
+
 @router.delete("/{partida_id}/participantes/{usuario_id}", response_model=PartidaResponse)
 def remover_participante(
     partida_id: int = Path(..., description="ID da partida"),
@@ -243,4 +396,31 @@ def finalizar_partida(
     Finalizar partida com pontuação (apenas organizador)
     """
     partida_service = PartidaService(db)
-    return partida_service.finalizar_partida(partida_id, pontos_a, pontos_b, current_user)
\ No newline at end of file
+    return partida_service.finalizar_partida(partida_id, pontos_a, pontos_b, current_user)
+
+
+@router.get("/{partida_id}/equipes", response_model=EquipesPartidaResponse)
+def obter_equipes(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Equipes A e B da partida com o rating médio de cada uma
+    """
+    partida_service = PartidaService(db)
+    return partida_service.get_equipes_partida(partida_id)
+
+
+@router.post("/{partida_id}/equipes", response_model=EquipesPartidaResponse)
+def dividir_equipes(
+    partida_id: int = Path(..., description="ID da partida"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Dividir os participantes em equipes equilibradas pelo rating (apenas organizador).
+    Ao finalizar, vitórias e derrotas seguem essa divisão (feita automaticamente se faltar)
+    """
+    partida_service = PartidaService(db)
+    return partida_service.dividir_equipes_partida(partida_id, current_user)
\ No newline at end of file
@@ -1,14 +1,17 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, Path
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.schemas import (
-    UsuarioResponse, UsuarioUpdate, UsuarioRanking
+    UsuarioResponse, UsuarioUpdate, UsuarioRanking, AgendaItemResponse
 )
-from app.services import UsuarioService
+from app.services import UsuarioService, PartidaService
 from app.middlewares import get_current_active_user, require_admin
 from app.models import Usuario
-from app.models.enums import TipoUsuario
+from app.models.enums import CriterioRanking, TipoUsuario
+from app.utils.lotes import LIMITE_IDS, interpretar_ids, resposta_lote
+from app.utils.serializacao import resposta_lista
 
 router = APIRouter(prefix="/usuarios", tags=["Usuários"])
 
@@ -17,14 +20,20 @@ router = APIRouter(prefix="/usuarios", tags=["Usuários"])
 def listar_usuarios(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=100, description="Limite de registros"),
+    ids: Optional[List[str]] = Query(None, description=f"Buscar estes usuários (ids separados por vírgula, até {LIMITE_IDS})"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Listar todos os usuários (paginado)
+    Listar todos os usuários (paginado).
+    Com ids, devolve esses usuários na ordem pedida e os ids inexistentes no
+    cabeçalho X-Ids-Nao-Encontrados
     """
     usuario_service = UsuarioService(db)
-    return usuario_service.get_usuarios(skip=skip, limit=limit)
+    if ids is not None:
+        usuarios, nao_encontrados = usuario_service.get_usuarios_por_ids(interpretar_ids(ids))
+        return resposta_lote(UsuarioResponse, usuarios, nao_encontrados)
+    return resposta_lista(UsuarioResponse, usuario_service.get_usuarios(skip=skip, limit=limit))
 
 
 @router.get("/tipo/{tipo}", response_model=List[UsuarioResponse])
@@ -39,20 +48,21 @@ def listar_usuarios_por_tipo(
     Listar usuários por tipo
     """
     usuario_service = UsuarioService(db)
-    return usuario_service.get_usuarios_by_tipo(tipo, skip=skip, limit=limit)
+    return resposta_lista(UsuarioResponse, usuario_service.get_usuarios_by_tipo(tipo, skip=skip, limit=limit))
 
 
 @router.get("/ranking", response_model=List[UsuarioRanking])
 def obter_ranking(
     limit: int = Query(10, ge=1, le=50, description="Limite de usuários no ranking"),
+    criterio: CriterioRanking = Query(CriterioRanking.PONTUACAO, description="Ordenar por pontuação acumulada ou por rating de habilidade"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Obter ranking de usuários por pontuação
+    Obter ranking de usuários por pontuação ou por rating
     """
     usuario_service = UsuarioService(db)
-    return usuario_service.get_ranking(limit=limit)
+    return resposta_lista(UsuarioRanking, usuario_service.get_ranking(limit=limit, criterio=criterio))
 
 
 @router.get("/melhores-atletas", response_model=List[UsuarioRanking])
@@ -65,7 +75,22 @@ def obter_melhores_atletas(
     Obter melhores atletas por taxa de vitória
     """
     usuario_service = UsuarioService(db)
-    return usuario_service.get_melhores_atletas(limit=limit)
+    return resposta_lista(UsuarioRanking, usuario_service.get_melhores_atletas(limit=limit))
+
+
+@router.get("/me/agenda", response_model=List[AgendaItemResponse])
+def obter_minha_agenda(
+    desde: Optional[datetime] = Query(None, description="Início do período (padrão: agora; sem fuso = horário de Brasília)"),
+    ate: Optional[datetime] = Query(None, description="Fim do período (padrão: 30 dias após o início)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Agenda do usuário logado: partidas que participa ou organiza, em ordem de
+    início, com sobreposições marcadas
+    """
+    partida_service = PartidaService(db)
+    return resposta_lista(AgendaItemResponse, partida_service.get_agenda(current_user.id, desde=desde, ate=ate))
 
 
 @router.get("/{user_id}", response_model=UsuarioResponse)
@@ -0,0 +1,110 @@
+"""
+Relógio da aplicação
+
+- O fuso do Brasil é resolvido uma única vez (zoneinfo) e usado apenas para exibição
+  e para interpretar datas sem fuso enviadas pelos clientes.
+- Todos os instantes são tratados e gravados em UTC.
+- Durante uma requisição, "agora" é lido uma vez e reaproveitado por todas as
+  camadas (ver RelogioMiddleware), sem retroceder entre leituras.
+- O relógio é injetável: testes e benchmarks do motor de status usam RelogioFixo.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone, tzinfo
+from threading import Lock
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
+
+UTC = timezone.utc
+FUSO_BRASIL = ZoneInfo("America/Sao_Paulo")
+
+
+class Relogio:
+    """Relógio de parede em UTC que nunca retrocede dentro do processo"""
+
+    def __init__(self):
+        self._ultimo = datetime.min.replace(tzinfo=UTC)
+        self._lock = Lock()
+
+    def agora(self) -> datetime:
+        instante = datetime.now(UTC)
+        with self._lock:
+            # Ajustes do relógio do sistema (NTP) não fazem o tempo andar para trás
+            if instante < self._ultimo:
+                return self._ultimo
+            self._ultimo = instante
+        return instante
+
+
+class RelogioFixo(Relogio):
+    """Relógio controlado manualmente, para testes e benchmarks"""
+
+    def __init__(self, instante: datetime):
+        super().__init__()
+        self.instante = para_utc(instante)
+
+    def agora(self) -> datetime:
+        return self.instante
+
+    def avancar(self, **delta) -> datetime:
+        """Avançar o relógio (argumentos de timedelta: minutes=5, hours=1...)"""
+        self.instante += timedelta(**delta)
+        return self.instante
+
+
+_relogio: Relogio = Relogio()
+_agora_da_requisicao: ContextVar[Optional[datetime]] = ContextVar("agora_da_requisicao", default=None)
+
+
+def definir_relogio(relogio: Relogio) -> Relogio:
+    """Substituir o relógio global, retornando o anterior"""
+    global _relogio
+    anterior, _relogio = _relogio, relogio
+    return anterior
+
+
+@contextmanager
+def usar_relogio(relogio: Relogio) -> Iterator[Relogio]:
+    """Usar um relógio (ex: RelogioFixo) apenas dentro do bloco"""
+    anterior = definir_relogio(relogio)
+    token = _agora_da_requisicao.set(None)
+    try:
+        yield relogio
+    finally:
+        _agora_da_requisicao.reset(token)
+        definir_relogio(anterior)
+
+
+@contextmanager
+def instante_da_requisicao() -> Iterator[datetime]:
+    """Fixar "agora" para todo o processamento de uma requisição"""
+    instante = _relogio.agora()
+    token = _agora_da_requisicao.set(instante)
+    try:
+        yield instante
+    finally:
+        _agora_da_requisicao.reset(token)
+
+
+def agora() -> datetime:
+    """Instante atual em UTC (o mesmo durante toda a requisição)"""
+    instante = _agora_da_requisicao.get()
+    return instante if instante is not None else _relogio.agora()
+
+
+def agora_brasil() -> datetime:
+    """Instante atual no horário de Brasília (para mensagens e exibição)"""
+    return agora().astimezone(FUSO_BRASIL)
+
+
+def para_utc(valor: Optional[datetime], fuso_se_ingenuo: tzinfo = UTC) -> Optional[datetime]:
+    """
+    Normalizar um datetime para UTC.
+    Datas sem fuso são interpretadas em `fuso_se_ingenuo` (UTC por padrão, que é
+    como o banco as devolve; use FUSO_BRASIL para datas digitadas pelo usuário).
+    """
+    if valor is None:
+        return None
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=fuso_se_ingenuo)
+    return valor.astimezone(UTC)
@@ -0,0 +1,47 @@
+"""
+Coalescência de requisições idênticas simultâneas (single-flight)
+
+Quando uma partida é compartilhada em um grupo, centenas de clientes pedem a
+mesma página no mesmo instante. Em vez de cada requisição repetir as mesmas
+consultas e a mesma serialização, a primeira (líder) calcula a resposta e as
+demais requisições idênticas que chegam enquanto ela está em andamento
+aguardam o mesmo resultado (inclusive o mesmo erro, ex: 404).
+
+Nada é guardado depois que o cálculo termina: não é um cache, apenas evita
+trabalho duplicado concorrente. A chave deve conter tudo que muda a resposta
+(rota, parâmetros e a visibilidade de quem pede).
+"""
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import COALESCENCIA_REQUISICOES
+
+
+class Coalescedor:
+    """
+    Agrupa chamadas concorrentes por chave. O cálculo roda no threadpool em uma
+    tarefa própria: se o cliente líder desconectar, os demais continuam
+    recebendo o resultado.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._em_andamento: Dict[Hashable, asyncio.Future] = {}
+
+    async def executar(self, chave: Hashable, funcao: Callable[..., Any], *args) -> Any:
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(run_in_threadpool(funcao, *args))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+            COALESCENCIA_REQUISICOES.inc(self.nome, "executada")
+        else:
+            COALESCENCIA_REQUISICOES.inc(self.nome, "agregada")
+        # shield: o cancelamento de um cliente não cancela o cálculo compartilhado
+        return await asyncio.shield(tarefa)
+
+    def em_andamento(self) -> int:
+        """Quantidade de cálculos em andamento"""
+        return len(self._em_andamento)
@@ -16,12 +16,45 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./galera_volei.db"
+    # O schema é criado/atualizado pela migração (update_db.py, fase release do Procfile).
+    # True: criar tabelas faltantes ao iniciar cada worker (conveniência para banco local novo)
+    CRIAR_TABELAS_NA_INICIALIZACAO: bool = False
+    
+    # Arquivamento (arquivar_partidas.py): partidas encerradas há mais de N dias saem das tabelas quentes
+    ARQUIVO_IDADE_DIAS: int = 180
+    ARQUIVO_LOTE: int = 1000  # Partidas por transação
+    # True nos testes: relação não declarada nas opções de carga de uma listagem
+    # levanta erro em vez de virar um SELECT por linha (raiseload)
+    PROIBIR_CARGA_PREGUICOSA: bool = False
     
     # Security
     SECRET_KEY: str = "sua-chave-secreta-super-forte-aqui"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Rate limiting
+    RATE_LIMIT_MAX_REQUESTS: int = 100
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    
+    # Eventos em tempo real (SSE)
+    EVENTOS_HEARTBEAT_SECONDS: int = 15
+    EVENTOS_FILA_MAX: int = 32  # Eventos pendentes por cliente antes de desconectá-lo
+    
+    # Lobby da partida (WebSocket)
+    LOBBY_HEARTBEAT_SECONDS: int = 20  # Sem resposta em 2 intervalos, a conexão é encerrada
+    LOBBY_FILA_MAX: int = 64  # Mensagens pendentes por conexão antes de desconectá-la
+    LOBBY_ENVIO_TIMEOUT_SECONDS: float = 5.0
+    
+    # Idempotency-Key (POST/PUT): por quanto tempo e quantas respostas guardar
+    IDEMPOTENCIA_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCIA_MAX_CHAVES: int = 100_000
+    IDEMPOTENCIA_MAX_CORPO_KB: int = 256  # Respostas maiores não são guardadas
+    
+    # Compressão das respostas JSON (br se o pacote brotli estiver instalado, senão gzip)
+    COMPRESSAO_MINIMO_BYTES: int = 1024  # Abaixo disso o ganho não compensa o custo
+    COMPRESSAO_NIVEL_GZIP: int = 6
+    COMPRESSAO_NIVEL_BROTLI: int = 5  # Níveis altos de brotli são lentos demais por requisição
+    
     # Password settings
     PWD_CONTEXT_SCHEMES: List[str] = Field(default=["bcrypt"])
     PWD_CONTEXT_DEPRECATED: str = "auto"
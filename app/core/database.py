@@ -1,12 +1,16 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.requests import HTTPConnection
 from app.core.config import settings
+from app.core.eventos import EVENTOS_PENDENTES, hub
+from app.core.metrics import instrumentar_pool
 
 # Database engine
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
+instrumentar_pool(engine.pool)
 
 # SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -14,11 +18,59 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
+# Chave no scope ASGI com as sessões abertas pela requisição (preenchida pelo UnidadeTrabalhoMiddleware)
+SESSOES_DA_REQUISICAO = "galera_volei.sessoes"
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
+
+class SessaoRequisicao(Session):
+    """
+    Sessão de uma requisição HTTP como unidade de trabalho. Enquanto a unidade
+    está aberta, commit() só envia as alterações ao banco (flush) e expira os
+    objetos, como um commit faria; a transação é gravada uma única vez em
+    concluir(), chamado pelo UnidadeTrabalhoMiddleware antes de a resposta sair,
+    ou desfeita em descartar() se a resposta for de erro. Os eventos publicados
+    com publicar_apos_commit só saem depois da gravação.
+    """
+
+    def iniciar_unidade(self):
+        self.info[EVENTOS_PENDENTES] = []
+
+    def commit(self):
+        if EVENTOS_PENDENTES in self.info:
+            self.flush()
+            self.expire_all()
+            return
+        super().commit()
+
+    def rollback(self):
+        super().rollback()
+        if EVENTOS_PENDENTES in self.info:
+            self.info[EVENTOS_PENDENTES].clear()
+
+    def concluir(self):
+        """Gravar a unidade de trabalho (um único commit) e publicar os eventos"""
+        eventos = self.info.pop(EVENTOS_PENDENTES, [])
+        super().commit()
+        for canal, tipo, dados in eventos:
+            hub.publicar(canal, tipo, **dados)
+
+    def descartar(self):
+        """Desfazer a unidade de trabalho e seus eventos"""
+        self.info.pop(EVENTOS_PENDENTES, None)
+        super().rollback()
+
+
+SessaoRequisicaoLocal = sessionmaker(class_=SessaoRequisicao, autocommit=False, autoflush=False, bind=engine)
+
+
+def get_db(conexao: HTTPConnection):
+    """Dependency to get database session (unidade de trabalho da requisição)"""
+    db = SessaoRequisicaoLocal()
+    sessoes = conexao.scope.get(SESSOES_DA_REQUISICAO)
+    if sessoes is not None:
+        db.iniciar_unidade()
+        sessoes.append(db)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
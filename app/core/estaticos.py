@@ -0,0 +1,139 @@
+"""
+Arquivos estáticos pré-comprimidos, servidos da memória
+
+Substitui o StaticFiles do Starlette para /static:
+
+- Variantes .br/.gz geradas no build (comprimir_estaticos.py) são servidas
+  conforme o Accept-Encoding, sem comprimir nada por requisição. Se o build não
+  gerou alguma variante, ela é comprimida uma única vez, ao indexar.
+- ETag = hash do conteúdo original (não depende de mtime/inode, então é igual
+  em todas as instâncias); If-None-Match responde 304.
+- Cache: URLs versionadas (?v=<hash> igual ao ETag, ver comprimir_estaticos.py)
+  são imutáveis por um ano; as demais (index.html, links sem versão) são
+  revalidadas a cada uso (no-cache + ETag).
+
+Os arquivos são lidos uma vez, na primeira requisição, e cada resposta envia
+os bytes já prontos em memória. O diretório é pequeno (páginas e logos); novos
+arquivos são publicados com um novo deploy/reinício.
+"""
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.utils.compressao import CODIFICACOES, EXTENSOES, comprimir, escolher_codificacao
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+
+@dataclass
+class ArquivoEstatico:
+    conteudo: bytes
+    versao: str  # Hash do conteúdo (ETag e parâmetro ?v=)
+    media_type: str
+    variantes: Dict[str, bytes] = field(default_factory=dict)  # codificação -> bytes comprimidos
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.versao}"'
+
+
+def versao_do_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()[:16]
+
+
+def carregar_arquivo(caminho: str) -> ArquivoEstatico:
+    """Ler o arquivo e suas variantes pré-comprimidas (comprimindo as que faltarem)"""
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    media_type, _ = mimetypes.guess_type(caminho)
+    if media_type is None:
+        media_type = "application/octet-stream"
+    elif media_type.startswith("text/") or media_type in ("image/svg+xml", "application/javascript"):
+        media_type += "; charset=utf-8"
+
+    arquivo = ArquivoEstatico(conteudo=conteudo, versao=versao_do_conteudo(conteudo), media_type=media_type)
+    mtime = os.path.getmtime(caminho)
+    for codificacao in CODIFICACOES:
+        variante = caminho + EXTENSOES[codificacao]
+        # Variante mais antiga que o original é de um build anterior: ignorar
+        if os.path.isfile(variante) and os.path.getmtime(variante) >= mtime:
+            with open(variante, "rb") as f:
+                arquivo.variantes[codificacao] = f.read()
+        else:
+            arquivo.variantes[codificacao] = comprimir(conteudo, codificacao)
+        if len(arquivo.variantes[codificacao]) >= len(conteudo):
+            del arquivo.variantes[codificacao]  # Não compensa
+    return arquivo
+
+
+class ArquivosEstaticos:
+    """Aplicação ASGI montada em /static"""
+
+    def __init__(self, directory: str):
+        self.directory = os.path.realpath(directory)
+        self._arquivos: Optional[Dict[str, ArquivoEstatico]] = None
+        self._lock = Lock()
+
+    def _indexar(self) -> Dict[str, ArquivoEstatico]:
+        with self._lock:
+            if self._arquivos is None:
+                arquivos = {}
+                for raiz, _, nomes in os.walk(self.directory):
+                    for nome in nomes:
+                        if nome.endswith(tuple(EXTENSOES.values())):
+                            continue
+                        caminho = os.path.join(raiz, nome)
+                        relativo = os.path.relpath(caminho, self.directory).replace(os.sep, "/")
+                        arquivos[relativo] = carregar_arquivo(caminho)
+                self._arquivos = arquivos
+        return self._arquivos
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        arquivos = self._arquivos
+        if arquivos is None:
+            arquivos = await run_in_threadpool(self._indexar)
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._enviar(send, scope, 405, [(b"allow", b"GET, HEAD")], b"Method Not Allowed")
+            return
+
+        arquivo = arquivos.get(scope["path"].lstrip("/"))  # Caminho relativo ao ponto de montagem
+        if arquivo is None:
+            await self._enviar(send, scope, 404, [(b"content-type", b"text/plain; charset=utf-8")], b"Not Found")
+            return
+
+        cabecalhos_requisicao = Headers(scope=scope)
+        versao = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        cabecalhos = [
+            (b"etag", arquivo.etag.encode()),
+            (b"cache-control", (CACHE_IMUTAVEL if versao == arquivo.versao else CACHE_REVALIDAR).encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+
+        if arquivo.etag in [v.strip() for v in cabecalhos_requisicao.get("if-none-match", "").split(",")]:
+            await self._enviar(send, scope, 304, cabecalhos, b"")
+            return
+
+        corpo = arquivo.conteudo
+        codificacao = escolher_codificacao(cabecalhos_requisicao.get("accept-encoding"), tuple(arquivo.variantes))
+        if codificacao is not None:
+            corpo = arquivo.variantes[codificacao]
+            cabecalhos.append((b"content-encoding", codificacao.encode()))
+        cabecalhos.append((b"content-type", arquivo.media_type.encode()))
+        await self._enviar(send, scope, 200, cabecalhos, corpo)
+
+    @staticmethod
+    async def _enviar(send, scope, status_code: int, cabecalhos, corpo: bytes) -> None:
+        if status_code != 304:
+            cabecalhos = [*cabecalhos, (b"content-length", str(len(corpo)).encode())]
+        await send({"type": "http.response.start", "status": status_code, "headers": cabecalhos})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" or status_code == 304 else corpo})
@@ -0,0 +1,186 @@
+"""
+Hub de eventos em memória (publish/subscribe) por partida
+
+Os services publicam mudanças de elenco e de status depois do commit
+(publicar_apos_commit); cada cliente conectado (SSE) assina o canal da partida
+e recebe os eventos em uma fila própria e limitada. Um cliente lento que enche
+a fila é desconectado (recebe um aviso para recarregar) em vez de acumular
+memória ou atrasar os demais.
+
+Os services rodam no threadpool, então a entrega para o event loop é feita com
+call_soon_threadsafe, com uma única chamada por loop a cada publicação
+(independente do número de assinantes).
+"""
+import asyncio
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+
+from app.core.clock import agora
+
+TAMANHO_FILA_PADRAO = 32
+
+
+@dataclass(frozen=True)
+class Evento:
+    """Evento publicado em um canal"""
+    id: int
+    tipo: str
+    canal: int
+    dados: Dict[str, Any] = field(default_factory=dict)
+
+    def json(self) -> str:
+        return json.dumps({"tipo": self.tipo, "partida_id": self.canal, **self.dados}, default=str)
+
+    def sse(self) -> str:
+        """Formato text/event-stream"""
+        return f"id: {self.id}\nevent: {self.tipo}\ndata: {self.json()}\n\n"
+
+
+class Assinatura:
+    """Fila limitada de um cliente em um canal"""
+
+    def __init__(self, hub: "HubEventos", canal: int, loop: asyncio.AbstractEventLoop, tamanho: int):
+        self.hub = hub
+        self.canal = canal
+        self.loop = loop
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=tamanho)
+        self.transbordou = False
+
+    def _entregar(self, evento: Union[Evento, str]) -> None:
+        """Executado no event loop do assinante"""
+        if self.transbordou:
+            return
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: descartar a fila e sinalizar o fim da assinatura
+            self.transbordou = True
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(None)
+            self.hub.cancelar(self)
+
+    def responder(self, texto: str) -> None:
+        """
+        Pôr uma resposta só desta conexão (ex: pong) na mesma fila dos eventos:
+        um único escritor por socket, com o mesmo limite de fila (executado no event loop)
+        """
+        self._entregar(texto)
+
+    async def proximo(self, timeout: Optional[float] = None) -> Optional[Union[Evento, str]]:
+        """
+        Aguardar o próximo evento.
+        Retorna None se a assinatura foi encerrada por transbordo e lança
+        asyncio.TimeoutError se nada chegar dentro do timeout (hora do heartbeat).
+        """
+        if timeout is None:
+            return await self.fila.get()
+        return await asyncio.wait_for(self.fila.get(), timeout)
+
+    def cancelar(self) -> None:
+        self.hub.cancelar(self)
+
+
+class HubEventos:
+    """Registro de assinaturas por canal (id da partida)"""
+
+    def __init__(self):
+        self._canais: Dict[int, Set[Assinatura]] = defaultdict(set)
+        self._lock = Lock()
+        self._sequencia = count(1)
+
+    def assinar(self, canal: int, tamanho: int = TAMANHO_FILA_PADRAO) -> Assinatura:
+        """Criar uma assinatura (deve ser chamado dentro do event loop)"""
+        assinatura = Assinatura(self, canal, asyncio.get_running_loop(), tamanho)
+        with self._lock:
+            self._canais[canal].add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinantes = self._canais.get(assinatura.canal)
+            if assinantes is not None:
+                assinantes.discard(assinatura)
+                if not assinantes:
+                    del self._canais[assinatura.canal]
+
+    def assinantes(self, canal: Optional[int] = None) -> int:
+        with self._lock:
+            if canal is not None:
+                return len(self._canais.get(canal, ()))
+            return sum(len(assinantes) for assinantes in self._canais.values())
+
+    def publicar(self, canal: int, tipo: str, **dados) -> Evento:
+        """Publicar um evento para todos os assinantes do canal (seguro a partir de qualquer thread)"""
+        evento = Evento(next(self._sequencia), tipo, canal, {"instante": agora().isoformat(), **dados})
+        with self._lock:
+            assinantes = list(self._canais.get(canal, ()))
+        if not assinantes:
+            return evento
+
+        por_loop: Dict[asyncio.AbstractEventLoop, List[Assinatura]] = defaultdict(list)
+        for assinatura in assinantes:
+            por_loop[assinatura.loop].append(assinatura)
+
+        for loop, grupo in por_loop.items():
+            try:
+                loop.call_soon_threadsafe(_entregar_grupo, grupo, evento)
+            except RuntimeError:
+                # Loop encerrado: assinaturas órfãs
+                for assinatura in grupo:
+                    self.cancelar(assinatura)
+        return evento
+
+
+def _entregar_grupo(grupo: List[Assinatura], evento: Evento) -> None:
+    for assinatura in grupo:
+        assinatura._entregar(evento)
+
+
+async def fluxo_sse(assinatura: Assinatura, heartbeat: float) -> AsyncIterator[str]:
+    """
+    Gerar o corpo text/event-stream de uma assinatura.
+    Envia um comentário a cada `heartbeat` segundos sem eventos (mantém proxies
+    e o EventSource vivos) e encerra com "reiniciar" se o cliente transbordar.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                evento = await assinatura.proximo(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if evento is None:
+                # O cliente deve recarregar a partida antes de reconectar
+                yield "event: reiniciar\ndata: {}\n\n"
+                return
+            yield evento.sse()
+    finally:
+        assinatura.cancelar()
+
+
+# Instância única do processo (um hub por worker)
+hub = HubEventos()
+
+
+# Chave em Session.info com os eventos que aguardam o commit da unidade de trabalho
+EVENTOS_PENDENTES = "eventos_pendentes"
+
+
+def publicar_apos_commit(db, canal: int, tipo: str, **dados) -> None:
+    """
+    Publicar um evento sobre alterações feitas na sessão. Na unidade de trabalho
+    da requisição (SessaoRequisicao) ele espera o commit único do fim da
+    requisição e é descartado no rollback; nas demais sessões o commit já
+    aconteceu e o evento sai na hora
+    """
+    pendentes = db.info.get(EVENTOS_PENDENTES)
+    if pendentes is None:
+        hub.publicar(canal, tipo, **dados)
+    else:
+        pendentes.append((canal, tipo, dados))
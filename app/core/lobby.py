@@ -0,0 +1,51 @@
+"""
+Presença no lobby (WebSocket) de cada partida
+
+Guarda quem está com o lobby aberto, contando conexões por usuário para que
+várias abas do mesmo jogador gerem apenas um "entrou" e um "saiu".
+"""
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List
+
+
+class PresencaLobby:
+    """Usuários conectados por partida"""
+
+    def __init__(self):
+        self._conexoes: Dict[int, Dict[int, int]] = defaultdict(dict)
+        self._nomes: Dict[int, str] = {}
+        self._lock = Lock()
+
+    def entrar(self, partida_id: int, usuario_id: int, nome: str) -> bool:
+        """Registrar uma conexão; retorna True se é a primeira do usuário nesta partida"""
+        with self._lock:
+            conexoes = self._conexoes[partida_id]
+            conexoes[usuario_id] = conexoes.get(usuario_id, 0) + 1
+            self._nomes[usuario_id] = nome
+            return conexoes[usuario_id] == 1
+
+    def sair(self, partida_id: int, usuario_id: int) -> bool:
+        """Remover uma conexão; retorna True se era a última do usuário nesta partida"""
+        with self._lock:
+            conexoes = self._conexoes.get(partida_id)
+            if not conexoes or usuario_id not in conexoes:
+                return False
+            conexoes[usuario_id] -= 1
+            if conexoes[usuario_id] > 0:
+                return False
+            del conexoes[usuario_id]
+            if not conexoes:
+                del self._conexoes[partida_id]
+            return True
+
+    def presentes(self, partida_id: int) -> List[dict]:
+        with self._lock:
+            return [
+                {"usuario_id": usuario_id, "nome": self._nomes.get(usuario_id)}
+                for usuario_id in self._conexoes.get(partida_id, {})
+            ]
+
+
+# Instância única do processo (um registro por worker)
+presenca = PresencaLobby()
@@ -0,0 +1,353 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus
+
+Os contadores são mantidos em memória, por worker. Cada métrica guarda seus
+valores em estruturas pré-alocadas e protege a escrita com um único lock sem
+disputa (as observações vêm tanto do event loop quanto do threadpool dos
+endpoints síncronos), o que mantém o custo por observação na casa de poucas
+centenas de nanossegundos.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+# Buckets de latência (segundos), cobrindo de 1 ms a 10 s
+LATENCIA_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Buckets para espera por conexão no pool (segundos)
+POOL_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0
+)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_labels(nomes: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    """Montar o bloco {label="valor"} de uma amostra"""
+    partes = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, int) or float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, labels e lock de escrita"""
+
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, labels: Iterable[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+    def amostras(self) -> List[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metrica):
+    """Contador monotônico com labels opcionais"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, labels: Iterable[str] = ()):
+        super().__init__(nome, ajuda, labels)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *valores_labels: str, valor: float = 1) -> None:
+        with self._lock:
+            self._valores[valores_labels] = self._valores.get(valores_labels, 0) + valor
+
+    def valor(self, *valores_labels: str) -> float:
+        return self._valores.get(valores_labels, 0)
+
+    def series(self) -> List[Tuple[str, ...]]:
+        with self._lock:
+            return list(self._valores)
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = list(self._valores.items())
+        return [
+            f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}"
+            for chave, valor in sorted(itens)
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._valores.clear()
+
+
+class Gauge(_Metrica):
+    """Valor instantâneo que pode subir e descer"""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, labels: Iterable[str] = ()):
+        super().__init__(nome, ajuda, labels)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *valores_labels: str, valor: float = 1) -> None:
+        with self._lock:
+            self._valores[valores_labels] = self._valores.get(valores_labels, 0) + valor
+
+    def dec(self, *valores_labels: str, valor: float = 1) -> None:
+        self.inc(*valores_labels, valor=-valor)
+
+    def set(self, *valores_labels: str, valor: float) -> None:
+        with self._lock:
+            self._valores[valores_labels] = valor
+
+    def valor(self, *valores_labels: str) -> float:
+        return self._valores.get(valores_labels, 0)
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = list(self._valores.items())
+        return [
+            f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}"
+            for chave, valor in sorted(itens)
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._valores.clear()
+
+
+class Histogram(_Metrica):
+    """Histograma com buckets fixos; cada série é uma lista pré-alocada"""
+
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        labels: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCIA_BUCKETS
+    ):
+        super().__init__(nome, ajuda, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por série: [contagem por bucket..., contagem +Inf, soma]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, *valores_labels: str, valor: float) -> None:
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores_labels)
+            if serie is None:
+                serie = self._series[valores_labels] = [0] * (len(self.buckets) + 2)
+            serie[indice] += 1
+            serie[-1] += valor
+
+    def contagem(self, *valores_labels: str) -> int:
+        serie = self._series.get(valores_labels)
+        return int(sum(serie[:-1])) if serie else 0
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = [(chave, list(serie)) for chave, serie in self._series.items()]
+
+        linhas = []
+        for chave, serie in sorted(itens):
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets + (float("inf"),), serie[:-1]):
+                acumulado += quantidade
+                le = f'le="{_formatar_numero(limite)}"'
+                linhas.append(
+                    f"{self.nome}_bucket{_formatar_labels(self.labels, chave, le)} {int(acumulado)}"
+                )
+            rotulos = _formatar_labels(self.labels, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(serie[-1])}")
+            linhas.append(f"{self.nome}_count{rotulos} {int(acumulado)}")
+        return linhas
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Registry:
+    """Conjunto de métricas expostas em /metrics"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._coletores = []
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def coletor(self, funcao):
+        """Registrar função chamada antes de cada exposição (para gauges derivados)"""
+        self._coletores.append(funcao)
+        return funcao
+
+    def expor(self) -> str:
+        for coletor in self._coletores:
+            try:
+                coletor()
+            except Exception:
+                # Um coletor com problema não pode derrubar o endpoint de métricas
+                pass
+
+        linhas: List[str] = []
+        for metrica in self._metricas.values():
+            linhas.extend(metrica.cabecalho())
+            linhas.extend(metrica.amostras())
+        return "\n".join(linhas) + "\n"
+
+    def reset(self) -> None:
+        for metrica in self._metricas.values():
+            metrica.reset()
+
+
+registry = Registry()
+
+# ========== MÉTRICAS HTTP ==========
+HTTP_REQUESTS = registry.registrar(Counter(
+    "galera_http_requests_total",
+    "Total de requisições HTTP por rota, método e status",
+    ("method", "route", "status")
+))
+HTTP_LATENCIA = registry.registrar(Histogram(
+    "galera_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ("method", "route")
+))
+HTTP_EM_ANDAMENTO = registry.registrar(Gauge(
+    "galera_http_requests_in_flight",
+    "Requisições HTTP em processamento"
+))
+
+# ========== BANCO DE DADOS ==========
+DB_POOL_ESPERA = registry.registrar(Histogram(
+    "galera_db_pool_checkout_wait_seconds",
+    "Tempo de espera para obter uma conexão do pool",
+    buckets=POOL_BUCKETS
+))
+DB_POOL_EM_USO = registry.registrar(Gauge(
+    "galera_db_pool_checked_out",
+    "Conexões do pool atualmente em uso"
+))
+
+# ========== SEGURANÇA ==========
+RATE_LIMIT_REJEICOES = registry.registrar(Counter(
+    "galera_rate_limit_rejections_total",
+    "Requisições rejeitadas pelo rate limiter"
+))
+BCRYPT_FILA = registry.registrar(Gauge(
+    "galera_bcrypt_queue_depth",
+    "Operações bcrypt (hash/verificação) em execução ou aguardando CPU"
+))
+BCRYPT_DURACAO = registry.registrar(Histogram(
+    "galera_bcrypt_duration_seconds",
+    "Duração das operações bcrypt",
+    ("operation",)
+))
+IDEMPOTENCIA_RESULTADOS = registry.registrar(Counter(
+    "galera_idempotency_requests_total",
+    "Requisições com Idempotency-Key por resultado (gravada, reproduzida, em_andamento, divergente)",
+    ("resultado",)
+))
+
+# ========== COALESCÊNCIA ==========
+COALESCENCIA_REQUISICOES = registry.registrar(Counter(
+    "galera_coalesced_requests_total",
+    "Requisições idênticas simultâneas: executadas (líder) ou agregadas ao cálculo de outra",
+    ("rota", "resultado")
+))
+
+# ========== CACHES ==========
+CACHE_HITS = registry.registrar(Counter(
+    "galera_cache_hits_total",
+    "Acertos de cache por cache",
+    ("cache",)
+))
+CACHE_MISSES = registry.registrar(Counter(
+    "galera_cache_misses_total",
+    "Faltas de cache por cache",
+    ("cache",)
+))
+CACHE_HIT_RATIO = registry.registrar(Gauge(
+    "galera_cache_hit_ratio",
+    "Proporção de acertos por cache (hits / (hits + misses))",
+    ("cache",)
+))
+
+
+# Funções com lru_cache observadas: nome -> [função, hits já contados, misses já contados]
+_CACHES_LRU: Dict[str, list] = {}
+
+
+def observar_lru(cache: str, funcao) -> None:
+    """Expor acertos e faltas de uma função com lru_cache (lidos de cache_info() a cada coleta)"""
+    _CACHES_LRU[cache] = [funcao, 0, 0]
+
+
+def _sincronizar_lru() -> None:
+    for cache, observado in _CACHES_LRU.items():
+        funcao, hits_vistos, misses_vistos = observado
+        info = funcao.cache_info()
+        # cache_clear() zera o cache_info: o contador segue a partir do novo valor
+        CACHE_HITS.inc(cache, valor=info.hits - hits_vistos if info.hits >= hits_vistos else info.hits)
+        CACHE_MISSES.inc(cache, valor=info.misses - misses_vistos if info.misses >= misses_vistos else info.misses)
+        observado[1:] = [info.hits, info.misses]
+
+
+@registry.coletor
+def _calcular_hit_ratio():
+    """Derivar a proporção de acertos a partir dos contadores de cache"""
+    _sincronizar_lru()
+    caches = {chave[0] for chave in CACHE_HITS.series() + CACHE_MISSES.series()}
+    for cache in caches:
+        hits = CACHE_HITS.valor(cache)
+        total = hits + CACHE_MISSES.valor(cache)
+        CACHE_HIT_RATIO.set(cache, valor=(hits / total) if total else 0.0)
+
+
+def instrumentar_pool(pool) -> None:
+    """
+    Medir a espera por conexão do pool do SQLAlchemy.
+
+    Todo checkout passa por `_do_get`; envolvemos o método da instância para
+    cronometrar a espera e mantemos um gauge de conexões em uso.
+    """
+    original = getattr(pool, "_do_get", None)
+    if original is None or getattr(original, "_instrumentado", False):
+        return
+
+    def _do_get():
+        inicio = perf_counter()
+        try:
+            return original()
+        finally:
+            DB_POOL_ESPERA.observe(valor=perf_counter() - inicio)
+
+    _do_get._instrumentado = True
+    pool._do_get = _do_get
+
+    checkedout = getattr(pool, "checkedout", None)
+    if checkedout is not None:
+        @registry.coletor
+        def _coletar_pool():
+            DB_POOL_EM_USO.set(valor=checkedout())
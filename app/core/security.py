@@ -1,16 +1,35 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+from time import perf_counter
 from typing import Optional, Union, Any
-from jose import jwt
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import BCRYPT_FILA, BCRYPT_DURACAO
 
-# Password context with explicit configuration for compatibility
-pwd_context = CryptContext(
-    schemes=["bcrypt"], 
-    deprecated="auto",
-    bcrypt__rounds=12,
-    bcrypt__default_rounds=12
-)
+# jose e passlib/bcrypt são importados no primeiro uso: scripts, testes e o boot
+# do worker não pagam esse custo (ver benchmarks/bench_inicializacao.py)
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """Password context with explicit configuration for compatibility (criado no primeiro uso)"""
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"], 
+        deprecated="auto",
+        bcrypt__rounds=12,
+        bcrypt__default_rounds=12
+    )
+
+
+def _medir_bcrypt(operacao: str, funcao, *args):
+    """Executar operação bcrypt registrando profundidade da fila e duração"""
+    BCRYPT_FILA.inc()
+    inicio = perf_counter()
+    try:
+        return funcao(*args)
+    finally:
+        BCRYPT_DURACAO.observe(operacao, valor=perf_counter() - inicio)
+        BCRYPT_FILA.dec()
 
 
 class Security:
@@ -26,6 +45,8 @@ class Security:
                 minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
             )
         
+        from jose import jwt
+        
         to_encode = {"exp": expire, "sub": str(subject)}
         encoded_jwt = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -35,6 +56,8 @@ class Security:
     @staticmethod
     def verify_token(token: str) -> Optional[str]:
         """Verify and decode token"""
+        from jose import jwt
+        
         try:
             payload = jwt.decode(
                 token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -50,7 +73,7 @@ class Security:
         # Bcrypt has a 72-byte limit, so we truncate longer passwords
         if len(plain_password.encode('utf-8')) > 72:
             plain_password = plain_password[:72]
-        return pwd_context.verify(plain_password, hashed_password)
+        return _medir_bcrypt("verify", pwd_context().verify, plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
@@ -58,7 +81,7 @@ class Security:
         # Bcrypt has a 72-byte limit, so we truncate longer passwords
         if len(password.encode('utf-8')) > 72:
             password = password[:72]
-        return pwd_context.hash(password)
+        return _medir_bcrypt("hash", pwd_context().hash, password)
 
 
 security = Security()
\ No newline at end of file
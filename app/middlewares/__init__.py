@@ -1,5 +1,7 @@
 from app.middlewares.auth import (
     get_current_user,
+    usuario_do_token,
+    autorizar_acesso_partida,
     get_current_active_user, 
     require_user_type,
     require_admin,
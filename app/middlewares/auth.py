@@ -2,21 +2,20 @@ from typing import Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.security import security
-from app.models import Usuario
+from app.models import Usuario, Partida
+from app.models.models import partida_participantes
 from app.schemas import TokenData
 
 # HTTP Bearer token scheme
 security_scheme = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: Session = Depends(get_db)
-) -> Usuario:
+def usuario_do_token(token: str, db: Session) -> Usuario:
     """
-    Middleware para autenticação - verifica token JWT e retorna usuário atual
+    Verifica o token JWT e retorna o usuário ativo correspondente
+    (usado também por conexões de streaming, que não passam pelo Depends)
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,7 +25,7 @@ def get_current_user(
     
     try:
         # Verificar token
-        user_id = security.verify_token(credentials.credentials)
+        user_id = security.verify_token(token)
         if user_id is None:
             raise credentials_exception
             
@@ -48,6 +47,54 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: Session = Depends(get_db)
+) -> Usuario:
+    """
+    Middleware para autenticação - verifica token JWT e retorna usuário atual
+    """
+    return usuario_do_token(credentials.credentials, db)
+
+
+def autorizar_acesso_partida(partida_id: int, token: Optional[str]) -> Usuario:
+    """
+    Autenticar conexões de longa duração (SSE/WebSocket) de uma partida.
+    Partidas públicas: qualquer usuário autenticado; privadas: só o organizador
+    e os participantes (403 para os demais). Usa uma sessão curta: a conexão
+    aberta não segura uma conexão do pool.
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciais inválidas",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db = SessionLocal()
+    try:
+        usuario = usuario_do_token(token, db)
+        partida = db.query(Partida.organizador_id, Partida.publica).filter(Partida.id == partida_id).first()
+        if partida is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partida não encontrada"
+            )
+        if partida.publica or partida.organizador_id == usuario.id:
+            return usuario
+        participa = db.query(partida_participantes.c.usuario_id).filter(
+            partida_participantes.c.partida_id == partida_id,
+            partida_participantes.c.usuario_id == usuario.id
+        ).first()
+        if participa is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas o organizador e os participantes acompanham esta partida"
+            )
+        return usuario
+    finally:
+        db.close()
+
+
 def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -> Usuario:
     """
     Dependência que garante que o usuário está ativo
@@ -0,0 +1,25 @@
+"""
+Middleware que fixa o instante "agora" de cada requisição
+"""
+from app.core.clock import instante_da_requisicao
+
+
+class RelogioMiddleware:
+    """
+    Middleware ASGI puro: lê o relógio uma vez no início da requisição e o
+    publica em um ContextVar, de modo que validações, motor de status e
+    gravações usem exatamente o mesmo instante.
+    
+    Conexões de longa duração (WebSocket) não são fixadas: leem o relógio a cada uso.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with instante_da_requisicao():
+            await self.app(scope, receive, send)
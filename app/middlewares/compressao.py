@@ -0,0 +1,83 @@
+"""
+Middleware de compressão das respostas JSON da API
+"""
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils.compressao import comprimir, escolher_codificacao
+
+# Acima disso a compressão sai do event loop (threadpool)
+LIMITE_COMPRESSAO_NO_LOOP = 64 * 1024
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI puro que comprime (brotli ou gzip, conforme Accept-Encoding)
+    respostas application/json a partir de `minimo_bytes`.
+
+    Diferente do GZipMiddleware do Starlette, só atua em JSON: streams (SSE),
+    arquivos estáticos (já pré-comprimidos) e respostas que já têm
+    Content-Encoding passam intactos. O corpo JSON é acumulado (os middlewares
+    BaseHTTPMiddleware internos o entregam em partes) e comprimido de uma vez.
+    """
+
+    def __init__(self, app, minimo_bytes: int = 1024, nivel_gzip: int = 6, nivel_brotli: int = 5):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.niveis = {"gzip": nivel_gzip, "br": nivel_brotli}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        repassar = False
+        partes = []
+
+        async def send_wrapper(mensagem):
+            nonlocal inicio, repassar
+            if repassar:
+                await send(mensagem)
+                return
+
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = MutableHeaders(scope=mensagem)
+                tipo = cabecalhos.get("content-type", "")
+                if not tipo.startswith("application/json") or "content-encoding" in cabecalhos:
+                    repassar = True
+                    await send(mensagem)
+                    return
+                cabecalhos.add_vary_header("Accept-Encoding")
+                inicio = mensagem  # Aguarda o corpo para decidir
+                return
+
+            partes.append(mensagem.get("body", b""))
+            if mensagem.get("more_body", False):
+                return
+            corpo = b"".join(partes)
+            if len(corpo) < self.minimo_bytes:
+                repassar = True
+                await send(inicio)
+                await send({"type": "http.response.body", "body": corpo})
+                return
+
+            nivel = self.niveis[codificacao]
+            if len(corpo) > LIMITE_COMPRESSAO_NO_LOOP:
+                comprimido = await run_in_threadpool(comprimir, corpo, codificacao, nivel)
+            else:
+                comprimido = comprimir(corpo, codificacao, nivel)
+
+            cabecalhos = MutableHeaders(scope=inicio)
+            cabecalhos["content-encoding"] = codificacao
+            cabecalhos["content-length"] = str(len(comprimido))
+            repassar = True
+            await send(inicio)
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,229 @@
+"""
+Middleware de chaves de idempotência (cabeçalho Idempotency-Key)
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from time import monotonic
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.clock import agora
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import IDEMPOTENCIA_RESULTADOS
+from app.repositories.idempotencia_repository import IdempotenciaRepository
+
+logger = logging.getLogger(__name__)
+
+CABECALHO = b"idempotency-key"
+CABECALHO_REPRODUZIDA = b"idempotent-replayed"
+METODOS = {"POST", "PUT"}
+# Login/registro não criam recursos repetíveis e não devem guardar tokens
+PREFIXOS_IGNORADOS = ("/api/v1/auth",)
+TAMANHO_MAXIMO_CHAVE = 255
+INTERVALO_LIMPEZA_SECONDS = 60
+# Cabeçalhos recalculados a cada envio (não são gravados com a resposta)
+CABECALHOS_NAO_GRAVADOS = {b"content-length", b"date", b"server", b"x-process-time"}
+# Respostas transitórias (timeout, conflito, bloqueio, rate limit): a repetição deve ser processada de novo
+STATUS_TRANSITORIOS = {408, 409, 423, 425, 429}
+
+
+def _resumo(*partes: bytes) -> str:
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(len(parte).to_bytes(8, "big"))
+        h.update(parte)
+    return h.hexdigest()
+
+
+async def _responder_json(send, status_code: int, detail: str, extras=()) -> None:
+    corpo = json.dumps({"detail": detail}, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(corpo)).encode()),
+            *extras,
+        ],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+class IdempotenciaMiddleware:
+    """
+    Middleware ASGI puro que torna seguras as repetições de POST/PUT que
+    enviam Idempotency-Key.
+
+    - Só requisições autenticadas: a chave é única por credencial (sem
+      Authorization o cabeçalho é ignorado).
+    - A primeira requisição reserva a chave e, ao
+      terminar, grava status, cabeçalhos e corpo da resposta.
+    - Repetições com a mesma chave recebem a resposta gravada sem passar pelos
+      serviços (cabeçalho idempotent-replayed: true).
+    - Repetição enquanto a primeira ainda está em processamento: 409.
+    - Mesma chave com outra requisição (método, caminho ou corpo): 422.
+    - Erros 5xx, respostas transitórias (408, 409, 423, 425, 429) e respostas
+      grandes demais não são gravados: a chave é liberada e a próxima
+      tentativa é processada normalmente.
+
+    As chaves expiram após IDEMPOTENCIA_TTL_SECONDS e a tabela é limitada a
+    IDEMPOTENCIA_MAX_CHAVES registros (limpeza periódica).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._ultima_limpeza = 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in METODOS or scope["path"].startswith(PREFIXOS_IGNORADOS):
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope["headers"])
+        chave_bruta = cabecalhos.get(CABECALHO)
+        # Sem credencial não há escopo próprio: clientes anônimos colidiriam na mesma chave
+        if chave_bruta is None or b"authorization" not in cabecalhos:
+            await self.app(scope, receive, send)
+            return
+
+        chave = chave_bruta.decode("latin-1").strip()
+        if not chave or len(chave) > TAMANHO_MAXIMO_CHAVE:
+            await _responder_json(send, 400, f"Idempotency-Key deve ter entre 1 e {TAMANHO_MAXIMO_CHAVE} caracteres")
+            return
+
+        # Corpo inteiro em memória: entra na impressão digital e é reentregue à aplicação
+        partes = []
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "http.disconnect":
+                return
+            partes.append(mensagem.get("body", b""))
+            if not mensagem.get("more_body", False):
+                break
+        corpo_requisicao = b"".join(partes)
+
+        escopo = _resumo(cabecalhos[b"authorization"])
+        impressao = _resumo(
+            scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), corpo_requisicao
+        )
+
+        existente = await run_in_threadpool(self._reservar, escopo, chave, impressao)
+        if existente is not None:
+            await self._responder_existente(send, existente, impressao)
+            return
+
+        corpo_entregue = False
+
+        async def receive_wrapper():
+            nonlocal corpo_entregue
+            if not corpo_entregue:
+                corpo_entregue = True
+                return {"type": "http.request", "body": corpo_requisicao, "more_body": False}
+            return await receive()
+
+        status_code = None
+        cabecalhos_resposta = []
+        corpo_resposta = []
+        tamanho = 0
+        limite = settings.IDEMPOTENCIA_MAX_CORPO_KB * 1024
+
+        async def send_wrapper(mensagem):
+            nonlocal status_code, cabecalhos_resposta, tamanho
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+                cabecalhos_resposta = [
+                    [nome.decode("latin-1"), valor.decode("latin-1")]
+                    for nome, valor in mensagem.get("headers", [])
+                    if nome.lower() not in CABECALHOS_NAO_GRAVADOS
+                ]
+            elif mensagem["type"] == "http.response.body" and tamanho <= limite:
+                parte = mensagem.get("body", b"")
+                tamanho += len(parte)
+                corpo_resposta.append(parte)
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except BaseException:
+            await run_in_threadpool(self._liberar, escopo, chave)
+            raise
+
+        if status_code is not None and status_code < 500 and status_code not in STATUS_TRANSITORIOS and tamanho <= limite:
+            await run_in_threadpool(
+                self._concluir, escopo, chave, status_code, json.dumps(cabecalhos_resposta), b"".join(corpo_resposta)
+            )
+            IDEMPOTENCIA_RESULTADOS.inc("gravada")
+        else:
+            await run_in_threadpool(self._liberar, escopo, chave)
+            IDEMPOTENCIA_RESULTADOS.inc("nao_gravada")
+
+    async def _responder_existente(self, send, registro, impressao: str) -> None:
+        if registro.impressao != impressao:
+            IDEMPOTENCIA_RESULTADOS.inc("divergente")
+            await _responder_json(send, 422, "Idempotency-Key já utilizada com outra requisição")
+            return
+        if registro.status_code is None:
+            IDEMPOTENCIA_RESULTADOS.inc("em_andamento")
+            await _responder_json(
+                send, 409, "Requisição com esta Idempotency-Key ainda em processamento",
+                extras=[(b"retry-after", b"1")]
+            )
+            return
+
+        IDEMPOTENCIA_RESULTADOS.inc("reproduzida")
+        corpo = registro.corpo or b""
+        cabecalhos = [(nome.encode("latin-1"), valor.encode("latin-1")) for nome, valor in json.loads(registro.cabecalhos or "[]")]
+        cabecalhos.append((b"content-length", str(len(corpo)).encode()))
+        cabecalhos.append((CABECALHO_REPRODUZIDA, b"true"))
+        await send({"type": "http.response.start", "status": registro.status_code, "headers": cabecalhos})
+        await send({"type": "http.response.body", "body": corpo})
+
+    # ========== ACESSO AO BANCO (executado no threadpool) ==========
+
+    def _reservar(self, escopo: str, chave: str, impressao: str):
+        instante = agora()
+        db = SessionLocal()
+        try:
+            registro = IdempotenciaRepository(db).reservar(
+                escopo, chave, impressao, instante,
+                instante + timedelta(seconds=settings.IDEMPOTENCIA_TTL_SECONDS)
+            )
+            if registro is not None:
+                db.expunge(registro)
+            return registro
+        finally:
+            db.close()
+            self._limpar_se_preciso()
+
+    def _concluir(self, escopo: str, chave: str, status_code: int, cabecalhos: str, corpo: bytes) -> None:
+        db = SessionLocal()
+        try:
+            IdempotenciaRepository(db).concluir(escopo, chave, status_code, cabecalhos, corpo)
+        finally:
+            db.close()
+
+    def _liberar(self, escopo: str, chave: str) -> None:
+        db = SessionLocal()
+        try:
+            IdempotenciaRepository(db).liberar(escopo, chave)
+        finally:
+            db.close()
+
+    def _limpar_se_preciso(self) -> None:
+        """Limpeza de chaves expiradas/excedentes no máximo a cada INTERVALO_LIMPEZA_SECONDS"""
+        if monotonic() - self._ultima_limpeza < INTERVALO_LIMPEZA_SECONDS:
+            return
+        self._ultima_limpeza = monotonic()
+        db = SessionLocal()
+        try:
+            removidas = IdempotenciaRepository(db).limpar(agora(), settings.IDEMPOTENCIA_MAX_CHAVES)
+            if removidas:
+                logger.info(f"Idempotência: {removidas} chaves removidas na limpeza")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erro na limpeza de chaves de idempotência: {e}")
+        finally:
+            db.close()
@@ -0,0 +1,66 @@
+"""
+Middleware de coleta de métricas HTTP
+"""
+from time import perf_counter
+from typing import Dict
+from app.core.metrics import HTTP_REQUESTS, HTTP_LATENCIA, HTTP_EM_ANDAMENTO
+
+# Rótulo usado quando nenhuma rota casou (evita explosão de cardinalidade com paths livres)
+ROTA_DESCONHECIDA = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware) que mede contagem, latência e
+    requisições em andamento por rota.
+
+    A rota é identificada pelo template (ex: /api/v1/partidas/{partida_id}) a
+    partir do endpoint que o router grava no scope, usando um índice
+    endpoint -> path montado uma única vez.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rotas: Dict[int, str] = {}
+
+    def _indexar_rotas(self, aplicacao) -> None:
+        for rota in getattr(aplicacao, "routes", []):
+            endpoint = getattr(rota, "endpoint", None) or getattr(rota, "app", None)
+            path = getattr(rota, "path", None)
+            if endpoint is not None and path is not None:
+                self._rotas[id(endpoint)] = path
+
+    def _rota(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return ROTA_DESCONHECIDA
+        rota = self._rotas.get(id(endpoint))
+        if rota is None:
+            self._indexar_rotas(scope.get("app"))
+            rota = self._rotas.get(id(endpoint), ROTA_DESCONHECIDA)
+        return rota
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_EM_ANDAMENTO.inc()
+        inicio = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracao = perf_counter() - inicio
+            HTTP_EM_ANDAMENTO.dec()
+            metodo = scope["method"]
+            rota = self._rota(scope)
+            HTTP_REQUESTS.inc(metodo, rota, str(status_code))
+            HTTP_LATENCIA.observe(metodo, rota, valor=duracao)
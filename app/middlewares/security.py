@@ -9,6 +9,7 @@ import re
 from typing import Dict
 from collections import defaultdict
 import logging
+from app.core.metrics import RATE_LIMIT_REJEICOES
 
 logger = logging.getLogger(__name__)
 
@@ -81,7 +82,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = request.client.host if request.client else "unknown"
         
         # Endpoints excluídos do rate limiting
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
+        if request.url.path in ["/health", "/metrics", "/docs", "/redoc", "/openapi.json"]:
             return await call_next(request)
         
         # Limpar requisições antigas
@@ -94,6 +95,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Verificar limite
         if len(request_counts[client_ip]) >= self.max_requests:
             logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+            RATE_LIMIT_REJEICOES.inc()
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
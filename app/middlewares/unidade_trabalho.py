@@ -0,0 +1,72 @@
+"""
+Middleware da unidade de trabalho: um commit por requisição
+"""
+import json
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.database import SESSOES_DA_REQUISICAO
+
+logger = logging.getLogger(__name__)
+
+
+class UnidadeTrabalhoMiddleware:
+    """
+    Middleware ASGI puro que grava as sessões da requisição (get_db) uma única
+    vez, no início da resposta: antes de qualquer byte chegar ao cliente, para
+    que ele nunca veja uma resposta de sucesso de algo que não foi gravado.
+
+    Respostas 2xx/3xx fazem o commit; 4xx/5xx desfazem tudo o que a requisição
+    alterou (não sobra escrita parcial de quem falhou no meio). Se o próprio
+    commit falhar, o cliente recebe 500 no lugar da resposta original.
+    Exceções não tratadas nem chegam aqui: get_db fecha a sessão sem gravar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessoes = scope[SESSOES_DA_REQUISICAO] = []
+        falhou = False
+
+        async def send_wrapper(mensagem):
+            nonlocal falhou
+            if falhou:
+                return
+            if mensagem["type"] == "http.response.start" and sessoes:
+                try:
+                    await run_in_threadpool(self._finalizar, sessoes, mensagem["status"] < 400)
+                except Exception as e:
+                    logger.error(f"Erro ao gravar a unidade de trabalho de {scope.get('path')}: {e}")
+                    falhou = True
+                    corpo = json.dumps({"detail": "Erro ao gravar as alterações"}, ensure_ascii=False).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode())],
+                    })
+                    await send({"type": "http.response.body", "body": corpo})
+                    return
+            await send(mensagem)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _finalizar(sessoes, sucesso: bool) -> None:
+        pendentes = list(sessoes)
+        sessoes.clear()
+        try:
+            for db in pendentes:
+                if sucesso:
+                    db.concluir()
+                else:
+                    db.descartar()
+        except Exception:
+            for db in pendentes:
+                db.descartar()
+            raise
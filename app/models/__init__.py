@@ -1,5 +1,7 @@
-from app.models.models import Usuario, Partida, Equipe, Candidatura, Avaliacao, Convite
-from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite
+from app.models.models import Usuario, Partida, Equipe, Candidatura, Avaliacao, Convite, ChaveIdempotencia
+from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite, TipoAvaliacao
+from app.models import busca  # noqa: F401 - registra a criação do índice de busca junto com a tabela partidas
+from app.models.arquivo import PartidaArquivada
 
 __all__ = [
     "Usuario",
@@ -8,6 +10,8 @@ __all__ = [
     "Candidatura",
     "Avaliacao",
     "Convite",
+    "ChaveIdempotencia",
+    "PartidaArquivada",
     "TipoUsuario",
     "TipoPartida", 
     "StatusPartida",
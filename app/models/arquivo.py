@@ -0,0 +1,87 @@
+"""
+Tabelas de arquivo das partidas encerradas (finalizadas/canceladas) antigas
+
+O job arquivar_partidas.py move para cá, em lotes, as partidas encerradas há
+mais de ARQUIVO_IDADE_DIAS junto com as linhas que apontam para elas
+(participantes, convites, candidaturas e avaliações). As tabelas quentes
+ficam só com o que ainda é consultado no dia a dia, e seus índices continuam
+cabendo em cache.
+
+Cada tabela de arquivo espelha as colunas da tabela quente (mesmos nomes e
+tipos, sem chaves estrangeiras nem defaults): o arquivamento é um
+INSERT ... SELECT seguido de DELETE, e uma coluna nova na tabela quente
+(update_db.py) também deve ser adicionada ao espelho.
+
+Leitura: PartidaArquivada é mapeada no ORM com organizador e participantes,
+então serializa no mesmo PartidaResponse das partidas quentes.
+"""
+from typing import Sequence
+
+from sqlalchemy import Column, Index, Table
+from sqlalchemy.types import SchemaType
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+from app.models.models import Avaliacao, Candidatura, Convite, Partida, Usuario, partida_participantes
+
+
+def _espelhar(tabela: Table, nome: str, indices: Sequence[Sequence[str]] = ()) -> Table:
+    """Tabela com as mesmas colunas de `tabela`, sem FKs/defaults e com índices próprios"""
+    colunas = [
+        Column(
+            coluna.name,
+            coluna.type.copy() if isinstance(coluna.type, SchemaType) else coluna.type,  # Enum: um tipo por tabela
+            primary_key=coluna.primary_key,
+            nullable=coluna.nullable,
+            autoincrement=False
+        )
+        for coluna in tabela.columns
+    ]
+    return Table(
+        nome,
+        Base.metadata,
+        *colunas,
+        *(Index(f"ix_{nome}_{'_'.join(colunas_indice)}", *colunas_indice) for colunas_indice in indices)
+    )
+
+
+partidas_arquivo = _espelhar(
+    Partida.__table__, "partidas_arquivo",
+    indices=[("organizador_id", "created_at")]
+)
+partida_participantes_arquivo = _espelhar(
+    partida_participantes, "partida_participantes_arquivo",
+    indices=[("usuario_id", "partida_id")]
+)
+convites_arquivo = _espelhar(Convite.__table__, "convites_arquivo", indices=[("partida_id",)])
+candidaturas_arquivo = _espelhar(Candidatura.__table__, "candidaturas_arquivo", indices=[("partida_id",)])
+avaliacoes_arquivo = _espelhar(Avaliacao.__table__, "avaliacoes_arquivo", indices=[("partida_id",)])
+
+# (tabela quente, tabela de arquivo, coluna com o id da partida), dependentes antes das partidas
+TABELAS_ARQUIVADAS = (
+    (partida_participantes, partida_participantes_arquivo, "partida_id"),
+    (Convite.__table__, convites_arquivo, "partida_id"),
+    (Candidatura.__table__, candidaturas_arquivo, "partida_id"),
+    (Avaliacao.__table__, avaliacoes_arquivo, "partida_id"),
+    (Partida.__table__, partidas_arquivo, "id"),
+)
+
+
+class PartidaArquivada(Base):
+    """Partida encerrada movida para o arquivo (somente leitura)"""
+    __table__ = partidas_arquivo
+
+    organizador = relationship(
+        Usuario,
+        primaryjoin=lambda: PartidaArquivada.organizador_id == Usuario.id,
+        foreign_keys=lambda: [PartidaArquivada.organizador_id],
+        viewonly=True
+    )
+    participantes = relationship(
+        Usuario,
+        secondary=partida_participantes_arquivo,
+        primaryjoin=lambda: PartidaArquivada.id == partida_participantes_arquivo.c.partida_id,
+        secondaryjoin=lambda: Usuario.id == partida_participantes_arquivo.c.usuario_id,
+        foreign_keys=lambda: [partida_participantes_arquivo.c.partida_id, partida_participantes_arquivo.c.usuario_id],
+        viewonly=True
+    )
@@ -0,0 +1,97 @@
+"""
+Índice de busca textual das partidas (titulo, descricao, local)
+
+- SQLite: tabela virtual FTS5 de conteúdo externo (partidas_busca), com
+  tokenizador unicode61 sem acentos, mantida em sincronia por triggers — vale
+  para gravações do ORM e para inserções em massa do Core (seed).
+- PostgreSQL: índice GIN de expressão sobre to_tsvector('portuguese', ...)
+  com unaccent; o próprio banco mantém o índice a cada gravação.
+
+A estrutura é criada junto com a tabela partidas (evento after_create) e,
+em bancos já existentes, pelo update_db.py.
+"""
+from sqlalchemy import event, text
+from app.models.models import Partida
+
+TABELA_FTS = "partidas_busca"
+
+# Tamanhos de prefixo com índice próprio no FTS5: "vol*" lê uma única lista em vez
+# de fundir as listas de todos os termos que começam com "vol"
+PREFIXOS_INDEXADOS = (2, 3, 4)
+
+# Mesma expressão no índice e nas consultas (o planner só usa o índice se forem idênticas)
+DOCUMENTO_POSTGRES = (
+    "to_tsvector('portuguese', f_unaccent("
+    "coalesce(partidas.titulo, '') || ' ' || coalesce(partidas.descricao, '') || ' ' || coalesce(partidas.local, '')"
+    "))"
+)
+
+_DDL_SQLITE = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        titulo, descricao, local,
+        content='partidas', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='{" ".join(map(str, PREFIXOS_INDEXADOS))}'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON partidas BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, titulo, descricao, local)
+        VALUES (new.id, new.titulo, new.descricao, new.local);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON partidas BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, titulo, descricao, local)
+        VALUES ('delete', old.id, old.titulo, old.descricao, old.local);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF titulo, descricao, local ON partidas BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, titulo, descricao, local)
+        VALUES ('delete', old.id, old.titulo, old.descricao, old.local);
+        INSERT INTO {TABELA_FTS}(rowid, titulo, descricao, local)
+        VALUES (new.id, new.titulo, new.descricao, new.local);
+    END""",
+]
+
+_DDL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$""",
+    f"CREATE INDEX IF NOT EXISTS ix_partidas_busca ON partidas USING gin ({DOCUMENTO_POSTGRES.replace('partidas.', '')})",
+]
+
+
+def instalar_busca(connection, reconstruir: bool = False) -> None:
+    """Criar (idempotente) a estrutura de busca para o dialeto da conexão"""
+    dialeto = connection.dialect.name
+    if dialeto == "sqlite":
+        for ddl in _DDL_SQLITE:
+            connection.execute(text(ddl))
+        if reconstruir:
+            # Indexar as partidas que já existiam antes da tabela FTS
+            connection.execute(text(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')"))
+    elif dialeto == "postgresql":
+        for ddl in _DDL_POSTGRES:
+            connection.execute(text(ddl))
+
+
+def busca_instalada(connection) -> bool:
+    dialeto = connection.dialect.name
+    if dialeto == "sqlite":
+        consulta = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"
+        return connection.execute(text(consulta), {"nome": TABELA_FTS}).first() is not None
+    if dialeto == "postgresql":
+        consulta = "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_partidas_busca'"
+        return connection.execute(text(consulta)).first() is not None
+    return False
+
+
+@event.listens_for(Partida.__table__, "after_create")
+def _criar_busca(target, connection, **kw):
+    instalar_busca(connection)
+
+
+@event.listens_for(Partida.__table__, "before_drop")
+def _remover_busca(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai"))
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad"))
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {TABELA_FTS}"))
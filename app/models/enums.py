@@ -13,6 +13,17 @@ class TipoPartida(PyEnum):
     COMPETITIVA = "competitiva"  # Partida ranqueada, conta pontos
 
 
+class LadoEquipe(PyEnum):
+    """Equipe do participante na partida (partida_participantes.equipe)"""
+    A = "a"
+    B = "b"
+
+
+class CriterioRanking(PyEnum):
+    PONTUACAO = "pontuacao"  # Pontos acumulados (10/5 por partida)
+    RATING = "rating"        # Rating de habilidade (Elo por equipes)
+
+
 class CategoriaPartida(PyEnum):
     """Categoria que define o nível mínimo dos jogadores"""
     INICIANTE = "iniciante"          # Apenas para jogadores iniciantes
@@ -41,4 +52,10 @@ class StatusConvite(PyEnum):
     PENDENTE = "pendente"
     ACEITO = "aceito"
     RECUSADO = "recusado"
-    EXPIRADO = "expirado"
\ No newline at end of file
+    EXPIRADO = "expirado"
+
+class TipoAvaliacao(PyEnum):
+    """O que está sendo avaliado (avaliacoes.tipo_avaliacao, gravado pelo valor)"""
+    PARTIDA = "partida"          # A partida em si (sem avaliado)
+    ORGANIZADOR = "organizador"  # O organizador da partida
+    JOGADOR = "jogador"          # Outro participante
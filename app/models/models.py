@@ -1,8 +1,27 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Table, Float, Index, LargeBinary, UniqueConstraint
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.core.database import Base
-from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite, CategoriaPartida
+from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite, CategoriaPartida, LadoEquipe
+from app.core.clock import para_utc
+from app.utils.rating import RATING_INICIAL
+
+
+class DataHoraUTC(TypeDecorator):
+    """
+    DateTime gravado sempre em UTC e lido sempre com fuso (UTC).
+    O SQLite descarta o fuso ao gravar, então datas sem fuso lidas do banco são UTC.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return para_utc(value)
+    
+    def process_result_value(self, value, dialect):
+        return para_utc(value)
+
 
 # Tabela de associação many-to-many para participantes da partida
 # Agora com rastreamento de quem convidou e confirmação de presença
@@ -12,9 +31,25 @@ partida_participantes = Table(
     Column('partida_id', Integer, ForeignKey('partidas.id'), primary_key=True),
     Column('usuario_id', Integer, ForeignKey('usuarios.id'), primary_key=True),
     Column('convidado_por_id', Integer, ForeignKey('usuarios.id'), nullable=True),  # Quem convidou (null se entrou direto)
-    Column('data_entrada', DateTime(timezone=True), server_default=func.now()),
+    Column('data_entrada', DataHoraUTC, server_default=func.now()),
     Column('confirmado', Boolean, default=False),  # Se o participante confirmou presença
-    Column('data_confirmacao', DateTime(timezone=True), nullable=True)  # Quando confirmou
+    Column('data_confirmacao', DataHoraUTC, nullable=True),  # Quando confirmou
+    Column('equipe', Enum(LadoEquipe), nullable=True),  # A/B definida na divisão equilibrada (null até dividir)
+    # Partidas de um usuário sem varrer a tabela (a PK começa por partida_id)
+    Index('ix_partida_participantes_usuario', 'usuario_id', 'partida_id')
+)
+
+# Lista de espera das partidas lotadas: a ordem de chegada é o id (FIFO)
+partida_lista_espera = Table(
+    'partida_lista_espera',
+    Base.metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('partida_id', Integer, ForeignKey('partidas.id'), nullable=False),
+    Column('usuario_id', Integer, ForeignKey('usuarios.id'), nullable=False),
+    Column('data_entrada', DataHoraUTC, server_default=func.now()),
+    UniqueConstraint('partida_id', 'usuario_id', name='uq_partida_lista_espera_partida_usuario'),
+    # Primeiros da fila de uma partida lidos em ordem direto do índice
+    Index('ix_partida_lista_espera_fila', 'partida_id', 'id')
 )
 
 # Tabela de associação many-to-many para membros da equipe
@@ -22,10 +57,25 @@ equipe_membros = Table(
     'equipe_membros',
     Base.metadata,
     Column('equipe_id', Integer, ForeignKey('equipes.id'), primary_key=True),
-    Column('usuario_id', Integer, ForeignKey('usuarios.id'), primary_key=True)
+    Column('usuario_id', Integer, ForeignKey('usuarios.id'), primary_key=True),
+    # Equipes dos participantes ao finalizar uma partida (a PK começa por equipe_id)
+    Index('ix_equipe_membros_usuario', 'usuario_id', 'equipe_id')
 )
 
 
+def _nivel_padrao(context) -> int:
+    """Default de usuarios.nivel calculado a partir do tipo informado no INSERT"""
+    from app.utils.categoria_utils import NIVEL_USUARIO
+    tipo = context.get_current_parameters().get("tipo") or TipoUsuario.INICIANTE
+    return NIVEL_USUARIO[TipoUsuario(tipo) if isinstance(tipo, str) else tipo]
+
+
+def _mascara_padrao(context) -> int:
+    """Default de partidas.categoria_mascara calculado a partir da categoria do INSERT"""
+    from app.utils.categoria_utils import mascara_categoria
+    return mascara_categoria(context.get_current_parameters().get("categoria"))
+
+
 class Usuario(Base):
     __tablename__ = "usuarios"
     
@@ -34,14 +84,27 @@ class Usuario(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     senha_hash = Column(String(255), nullable=False)
     tipo = Column(Enum(TipoUsuario), nullable=False, default=TipoUsuario.INICIANTE)
+    nivel = Column(Integer, nullable=False, default=_nivel_padrao)  # Nível numérico do tipo (ver categoria_utils)
     ativo = Column(Boolean, default=True)
     pontuacao_total = Column(Integer, default=0)
     partidas_jogadas = Column(Integer, default=0)
     vitorias = Column(Integer, default=0)
     derrotas = Column(Integer, default=0)
+    rating = Column(Float, nullable=False, default=RATING_INICIAL)  # Elo por equipes (ver app/utils/rating.py)
+    partidas_ranqueadas = Column(Integer, nullable=False, default=0)  # Partidas que já entraram no rating
+    # Agregados das avaliações recebidas, mantidos a cada avaliação (média = soma / quantidade)
+    soma_notas_organizador = Column(Integer, nullable=False, default=0)
+    avaliacoes_organizador = Column(Integer, nullable=False, default=0)
+    soma_notas_jogador = Column(Integer, nullable=False, default=0)
+    avaliacoes_jogador = Column(Integer, nullable=False, default=0)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    updated_at = Column(DataHoraUTC, onupdate=func.now())
+    
+    __table_args__ = (
+        # Ranking por rating (apenas ativos) lido direto do índice
+        Index("ix_usuarios_ativo_rating", "ativo", "rating"),
+    )
     
     # Relacionamentos
     partidas_organizadas = relationship("Partida", back_populates="organizador")
@@ -80,6 +143,14 @@ class Usuario(Base):
         foreign_keys="Convite.convidado_id", 
         back_populates="convidado"
     )
+    
+    @validates("tipo")
+    def _sincronizar_nivel(self, key, tipo):
+        """Manter o nível numérico sincronizado com o tipo"""
+        from app.utils.categoria_utils import NIVEL_USUARIO
+        if tipo is not None:
+            self.nivel = NIVEL_USUARIO[TipoUsuario(tipo) if isinstance(tipo, str) else tipo]
+        return tipo
 
 
 class Partida(Base):
@@ -90,20 +161,38 @@ class Partida(Base):
     descricao = Column(Text)
     tipo = Column(Enum(TipoPartida), nullable=False)
     categoria = Column(String(20), nullable=False, default="livre")
+    # Níveis aceitos pela categoria (bit N = nível N); elegibilidade vira um AND em SQL
+    categoria_mascara = Column(Integer, nullable=False, default=_mascara_padrao)
     status = Column(Enum(StatusPartida), default=StatusPartida.ATIVA)
-    data_partida = Column(DateTime(timezone=True), nullable=False)  # Data/hora de início
-    data_fim = Column(DateTime(timezone=True), nullable=True)  # Data/hora de término (opcional)
+    data_partida = Column(DataHoraUTC, nullable=False)  # Data/hora de início
+    data_fim = Column(DataHoraUTC, nullable=True)  # Data/hora de término (opcional)
     duracao_estimada = Column(Integer, default=120)  # Duração em minutos (padrão: 2 horas)
+    # Fim do intervalo ocupado (data_fim ou início + duração), mantido pelos validators; usado na checagem de conflito
+    data_termino = Column(DataHoraUTC, nullable=True)
     local = Column(String(255))
+    # Coordenadas opcionais do local; geo_celula é a célula da grade (app.utils.geo) usada no pré-filtro
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_celula = Column(Integer, nullable=True)
     max_participantes = Column(Integer, default=12)
     publica = Column(Boolean, default=True)  # True = pública, False = privada
     pontuacao_equipe_a = Column(Integer, default=0)
     pontuacao_equipe_b = Column(Integer, default=0)
+    # Agregados das avaliações da partida, mantidos a cada avaliação (média = soma / quantidade)
+    soma_notas = Column(Integer, nullable=False, default=0)
+    total_avaliacoes = Column(Integer, nullable=False, default=0)
     
     organizador_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    updated_at = Column(DataHoraUTC, onupdate=func.now())
+    
+    __table_args__ = (
+        # Faixas de células + partidas futuras resolvidas no índice
+        Index("ix_partidas_geo_celula_data", "geo_celula", "data_partida"),
+        # Agenda de quem organiza, em ordem de início
+        Index("ix_partidas_organizador_data", "organizador_id", "data_partida"),
+    )
     
     # Relacionamentos
     organizador = relationship("Usuario", back_populates="partidas_organizadas")
@@ -117,6 +206,35 @@ class Partida(Base):
     candidaturas = relationship("Candidatura", back_populates="partida")
     avaliacoes = relationship("Avaliacao", back_populates="partida")
     convites = relationship("Convite", back_populates="partida")
+    
+    @validates("categoria")
+    def _sincronizar_mascara(self, key, categoria):
+        """Manter a máscara de níveis sincronizada com a categoria"""
+        from app.utils.categoria_utils import mascara_categoria
+        self.categoria_mascara = mascara_categoria(categoria)
+        return categoria
+    
+    @validates("latitude", "longitude")
+    def _sincronizar_celula(self, key, valor):
+        """Manter a célula da grade sincronizada com as coordenadas"""
+        from app.utils.geo import celula
+        latitude = valor if key == "latitude" else self.latitude
+        longitude = valor if key == "longitude" else self.longitude
+        self.geo_celula = celula(latitude, longitude)
+        return valor
+    
+    @validates("data_partida", "data_fim", "duracao_estimada")
+    def _sincronizar_termino(self, key, valor):
+        """Manter o fim do intervalo ocupado sincronizado com início, fim e duração"""
+        from app.utils.agenda import calcular_termino
+        campos = {
+            "data_partida": self.data_partida,
+            "data_fim": self.data_fim,
+            "duracao_estimada": self.duracao_estimada,
+            key: valor,
+        }
+        self.data_termino = calcular_termino(**campos)
+        return valor
 
 
 class Equipe(Base):
@@ -129,11 +247,18 @@ class Equipe(Base):
     partidas_jogadas = Column(Integer, default=0)
     vitorias = Column(Integer, default=0)
     derrotas = Column(Integer, default=0)
+    taxa_vitoria = Column(Float, nullable=False, default=0.0)  # % de vitórias, sincronizada com vitorias/partidas_jogadas
     
     lider_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    updated_at = Column(DataHoraUTC, onupdate=func.now())
+    
+    __table_args__ = (
+        # Top-N dos rankings lido direto do índice (sem ordenar a tabela inteira)
+        Index("ix_equipes_pontuacao_total", "pontuacao_total"),
+        Index("ix_equipes_taxa_vitoria", "taxa_vitoria", "partidas_jogadas"),
+    )
     
     # Relacionamentos
     lider = relationship("Usuario", back_populates="equipes_lideradas")
@@ -142,6 +267,14 @@ class Equipe(Base):
         secondary=equipe_membros, 
         back_populates="equipes"
     )
+    
+    @validates("vitorias", "partidas_jogadas")
+    def _sincronizar_taxa_vitoria(self, key, valor):
+        """Manter a taxa de vitória sincronizada com vitórias e partidas jogadas"""
+        vitorias = valor if key == "vitorias" else self.vitorias
+        partidas_jogadas = valor if key == "partidas_jogadas" else self.partidas_jogadas
+        self.taxa_vitoria = 100.0 * (vitorias or 0) / partidas_jogadas if partidas_jogadas else 0.0
+        return valor
 
 
 class Candidatura(Base):
@@ -154,8 +287,15 @@ class Candidatura(Base):
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     partida_id = Column(Integer, ForeignKey("partidas.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    updated_at = Column(DataHoraUTC, onupdate=func.now())
+    
+    __table_args__ = (
+        # Fila do organizador (candidaturas da partida por status, em ordem de chegada) lida do índice
+        Index("ix_candidaturas_partida_status_data", "partida_id", "status", "created_at"),
+        # Candidaturas do usuário, das mais recentes para as mais antigas
+        Index("ix_candidaturas_usuario_data", "usuario_id", "created_at"),
+    )
     
     # Relacionamentos
     usuario = relationship("Usuario", back_populates="candidaturas")
@@ -174,7 +314,18 @@ class Avaliacao(Base):
     avaliado_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)  # null se for avaliação de partida
     partida_id = Column(Integer, ForeignKey("partidas.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    
+    __table_args__ = (
+        # Avaliações da partida e verificação de avaliação repetida pelo mesmo avaliador
+        Index("ix_avaliacoes_partida_avaliador", "partida_id", "avaliador_id"),
+        # Uma avaliação por alvo: avaliações simultâneas não passam juntas pela verificação.
+        # COALESCE porque NULL (avaliação da partida) não colide em índice único
+        Index(
+            "ux_avaliacoes_unica", "partida_id", "avaliador_id", "tipo_avaliacao", func.coalesce(avaliado_id, 0),
+            unique=True
+        ),
+    )
     
     # Relacionamentos
     avaliador = relationship("Usuario", foreign_keys=[avaliador_id], back_populates="avaliacoes_feitas")
@@ -188,7 +339,7 @@ class Convite(Base):
     id = Column(Integer, primary_key=True, index=True)
     mensagem = Column(Text)  # Mensagem opcional do convite
     status = Column(Enum(StatusConvite), default=StatusConvite.PENDENTE)
-    data_expiracao = Column(DateTime(timezone=True))  # Opcional, convite pode expirar
+    data_expiracao = Column(DataHoraUTC)  # Opcional, convite pode expirar
     
     # Quem envia o convite (mandante)
     mandante_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
@@ -197,10 +348,29 @@ class Convite(Base):
     # Para qual partida é o convite
     partida_id = Column(Integer, ForeignKey("partidas.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DataHoraUTC, server_default=func.now())
+    updated_at = Column(DataHoraUTC, onupdate=func.now())
     
     # Relacionamentos
     mandante = relationship("Usuario", foreign_keys=[mandante_id], back_populates="convites_enviados")
     convidado = relationship("Usuario", foreign_keys=[convidado_id], back_populates="convites_recebidos")
-    partida = relationship("Partida", back_populates="convites")
\ No newline at end of file
+    partida = relationship("Partida", back_populates="convites")
+
+
+class ChaveIdempotencia(Base):
+    """Primeira resposta de um POST/PUT com Idempotency-Key, reproduzida nas repetições"""
+    __tablename__ = "chaves_idempotencia"
+    
+    id = Column(Integer, primary_key=True)
+    escopo = Column(String(64), nullable=False)  # sha256 da credencial (chaves não colidem entre clientes)
+    chave = Column(String(255), nullable=False)  # Valor do cabeçalho Idempotency-Key
+    impressao = Column(String(64), nullable=False)  # sha256 de método, caminho e corpo da requisição
+    status_code = Column(Integer, nullable=True)  # Nulo enquanto a primeira requisição está em processamento
+    cabecalhos = Column(Text, nullable=True)  # Cabeçalhos da resposta (JSON)
+    corpo = Column(LargeBinary, nullable=True)
+    created_at = Column(DataHoraUTC, nullable=False)
+    expira_em = Column(DataHoraUTC, nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("escopo", "chave", name="uq_chaves_idempotencia_escopo_chave"),
+    )
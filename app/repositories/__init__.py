@@ -1,4 +1,6 @@
 from app.repositories.base import BaseRepository
 from app.repositories.usuario_repository import UsuarioRepository
 from app.repositories.partida_repository import PartidaRepository
-from app.repositories.equipe_repository import EquipeRepository
\ No newline at end of file
+from app.repositories.equipe_repository import EquipeRepository
+from app.repositories.avaliacao_repository import AvaliacaoRepository
+from app.repositories.candidatura_repository import CandidaturaRepository
\ No newline at end of file
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, desc, func, insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models import Partida, PartidaArquivada
+from app.models.arquivo import TABELAS_ARQUIVADAS, partida_participantes_arquivo
+from app.models.enums import StatusPartida
+from app.models.models import partida_lista_espera
+from app.repositories.base import opcoes_carga
+
+# Só partidas encerradas vão para o arquivo (INATIVA pode ser reativada)
+STATUS_ARQUIVAVEIS = (StatusPartida.FINALIZADA, StatusPartida.CANCELADA)
+
+# Organizador e participantes, como em PartidaResponse (coleção via selectinload)
+CARGA_ARQUIVADA = (joinedload(PartidaArquivada.organizador), selectinload(PartidaArquivada.participantes))
+
+
+class ArquivoRepository:
+    """Movimentação das partidas encerradas para as tabelas de arquivo e leitura delas"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _arquivaveis(self, antes_de: datetime):
+        """Partidas encerradas que começaram antes de `antes_de`"""
+        # No SQLite (INTEGER PRIMARY KEY sem AUTOINCREMENT) o próximo id é max(id) + 1:
+        # arquivar a partida de maior id faria uma partida nova reutilizar o id arquivado
+        maior_id = self.db.query(func.max(Partida.id)).scalar_subquery()
+        return (
+            self.db.query(Partida.id)
+            .filter(Partida.status.in_(STATUS_ARQUIVAVEIS))
+            .filter(Partida.data_partida < antes_de)
+            .filter(Partida.id < maior_id)
+        )
+
+    def get_ids_arquivaveis(self, antes_de: datetime, limite: int) -> List[int]:
+        """Próximo lote de partidas a arquivar, em ordem de id"""
+        return [partida_id for (partida_id,) in self._arquivaveis(antes_de).order_by(Partida.id).limit(limite).all()]
+
+    def contar_arquivaveis(self, antes_de: datetime) -> int:
+        """Quantas partidas seriam arquivadas"""
+        return self._arquivaveis(antes_de).count()
+
+    def arquivar(self, partida_ids: List[int]) -> int:
+        """
+        Mover as partidas e tudo que aponta para elas em uma única transação:
+        copiar para o arquivo e remover das tabelas quentes (dependentes primeiro)
+        """
+        if not partida_ids:
+            return 0
+        try:
+            # A lista de espera de uma partida encerrada não tem mais uso: é descartada, não arquivada
+            self.db.execute(delete(partida_lista_espera).where(partida_lista_espera.c.partida_id.in_(partida_ids)))
+            for quente, arquivo, coluna in TABELAS_ARQUIVADAS:
+                colunas = [c.name for c in arquivo.columns]
+                self.db.execute(
+                    insert(arquivo).from_select(
+                        colunas,
+                        select(*(quente.c[nome] for nome in colunas)).where(quente.c[coluna].in_(partida_ids))
+                    )
+                )
+                self.db.execute(delete(quente).where(quente.c[coluna].in_(partida_ids)))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(partida_ids)
+
+    def get_partida(self, partida_id: int) -> Optional[PartidaArquivada]:
+        """Partida arquivada com organizador e participantes"""
+        return (
+            self.db.query(PartidaArquivada)
+            .options(*CARGA_ARQUIVADA)
+            .filter(PartidaArquivada.id == partida_id)
+            .first()
+        )
+
+    def get_partidas_por_ids(self, ids: List[int]) -> List[PartidaArquivada]:
+        """Partidas arquivadas entre os ids (um IN), com organizador e participantes"""
+        if not ids:
+            return []
+        return (
+            self.db.query(PartidaArquivada)
+            .options(*opcoes_carga(*CARGA_ARQUIVADA))
+            .filter(PartidaArquivada.id.in_(ids))
+            .all()
+        )
+
+    def get_by_organizador(self, organizador_id: int, limit: int) -> List[PartidaArquivada]:
+        """Partidas arquivadas do organizador, mais recentes (created_at) primeiro"""
+        return (
+            self.db.query(PartidaArquivada)
+            .options(*opcoes_carga(*CARGA_ARQUIVADA))
+            .filter(PartidaArquivada.organizador_id == organizador_id)
+            .order_by(desc(PartidaArquivada.created_at), desc(PartidaArquivada.id))
+            .limit(limit)
+            .all()
+        )
+
+    def get_participando(self, usuario_id: int, limit: int) -> List[PartidaArquivada]:
+        """Partidas arquivadas em que o usuário participou, mais recentes (data_partida) primeiro"""
+        return (
+            self.db.query(PartidaArquivada)
+            .join(partida_participantes_arquivo, partida_participantes_arquivo.c.partida_id == PartidaArquivada.id)
+            .options(*opcoes_carga(*CARGA_ARQUIVADA))
+            .filter(partida_participantes_arquivo.c.usuario_id == usuario_id)
+            .order_by(desc(PartidaArquivada.data_partida), desc(PartidaArquivada.id))
+            .limit(limit)
+            .all()
+        )
@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, desc, func, select, union_all, update
+from sqlalchemy.orm import Session
+from app.models import Avaliacao, Partida, Usuario
+from app.models.arquivo import avaliacoes_arquivo, partidas_arquivo
+from app.models.enums import TipoAvaliacao
+from app.repositories.base import BaseRepository, opcoes_carga
+
+# Colunas (soma, quantidade) de usuarios que acumulam cada tipo de avaliação recebida
+COLUNAS_USUARIO = {
+    TipoAvaliacao.ORGANIZADOR: ("soma_notas_organizador", "avaliacoes_organizador"),
+    TipoAvaliacao.JOGADOR: ("soma_notas_jogador", "avaliacoes_jogador"),
+}
+
+
+class AvaliacaoRepository(BaseRepository[Avaliacao]):
+    """
+    Repository das avaliações e dos agregados (soma e quantidade de notas)
+    mantidos em usuarios e partidas a cada avaliação registrada
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db, Avaliacao)
+
+    def existe(self, partida_id: int, avaliador_id: int, tipo: TipoAvaliacao, avaliado_id: Optional[int]) -> bool:
+        """Verificar se o avaliador já fez esta avaliação (ux_avaliacoes_unica)"""
+        return self.db.query(
+            self.db.query(Avaliacao.id)
+            .filter(
+                Avaliacao.partida_id == partida_id,
+                Avaliacao.avaliador_id == avaliador_id,
+                Avaliacao.tipo_avaliacao == tipo.value,
+                Avaliacao.avaliado_id.is_(None) if avaliado_id is None else Avaliacao.avaliado_id == avaliado_id
+            )
+            .exists()
+        ).scalar()
+
+    def get_by_partida(self, partida_id: int, skip: int = 0, limit: int = 100) -> List[Avaliacao]:
+        """Avaliações de uma partida, das mais recentes para as mais antigas"""
+        return (
+            self.db.query(Avaliacao)
+            .options(*opcoes_carga())
+            .filter(Avaliacao.partida_id == partida_id)
+            .order_by(desc(Avaliacao.created_at), desc(Avaliacao.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def registrar(self, dados: dict) -> Avaliacao:
+        """
+        Gravar a avaliação e somar a nota ao agregado do alvo na mesma transação.
+        O incremento é feito no próprio UPDATE (soma = soma + nota), sem ler antes,
+        então avaliações simultâneas do mesmo alvo não se perdem
+        """
+        tipo = TipoAvaliacao(dados["tipo_avaliacao"])
+        avaliacao = Avaliacao(**{**dados, "tipo_avaliacao": tipo.value})
+        try:
+            self.db.add(avaliacao)
+            if tipo == TipoAvaliacao.PARTIDA:
+                self.db.execute(
+                    update(Partida)
+                    .where(Partida.id == avaliacao.partida_id)
+                    .values(soma_notas=Partida.soma_notas + avaliacao.nota, total_avaliacoes=Partida.total_avaliacoes + 1)
+                )
+            else:
+                soma, quantidade = COLUNAS_USUARIO[tipo]
+                self.db.execute(
+                    update(Usuario)
+                    .where(Usuario.id == avaliacao.avaliado_id)
+                    .values({
+                        soma: getattr(Usuario, soma) + avaliacao.nota,
+                        quantidade: getattr(Usuario, quantidade) + 1,
+                    })
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.refresh(avaliacao)
+        return avaliacao
+
+    def get_totais(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """
+        Somas e quantidades a partir de todas as avaliações (quentes e arquivadas):
+        ([(avaliado_id, tipo, soma, quantidade)], [(partida_id, soma, quantidade)])
+        """
+        avaliacoes = union_all(*(
+            select(tabela.c.partida_id, tabela.c.avaliado_id, tabela.c.tipo_avaliacao, tabela.c.nota)
+            for tabela in (Avaliacao.__table__, avaliacoes_arquivo)
+        )).subquery()
+        por_usuario = self.db.execute(
+            select(avaliacoes.c.avaliado_id, avaliacoes.c.tipo_avaliacao, func.sum(avaliacoes.c.nota), func.count())
+            .where(avaliacoes.c.tipo_avaliacao.in_([tipo.value for tipo in COLUNAS_USUARIO]))
+            .where(avaliacoes.c.avaliado_id.is_not(None))
+            .group_by(avaliacoes.c.avaliado_id, avaliacoes.c.tipo_avaliacao)
+        ).all()
+        por_partida = self.db.execute(
+            select(avaliacoes.c.partida_id, func.sum(avaliacoes.c.nota), func.count())
+            .where(avaliacoes.c.tipo_avaliacao == TipoAvaliacao.PARTIDA.value)
+            .group_by(avaliacoes.c.partida_id)
+        ).all()
+        return por_usuario, por_partida
+
+    def salvar_totais(self, por_usuario: List[Tuple], por_partida: List[Tuple]) -> Tuple[int, int]:
+        """Substituir todos os agregados (quem não tem avaliações volta a zero). Retorna (usuários, partidas) gravados"""
+        usuarios: Dict[int, dict] = {}
+        for avaliado_id, tipo, soma, quantidade in por_usuario:
+            coluna_soma, coluna_quantidade = COLUNAS_USUARIO[TipoAvaliacao(tipo)]
+            valores = usuarios.setdefault(avaliado_id, {
+                "b_id": avaliado_id, "b_soma_notas_organizador": 0, "b_avaliacoes_organizador": 0,
+                "b_soma_notas_jogador": 0, "b_avaliacoes_jogador": 0,
+            })
+            valores[f"b_{coluna_soma}"], valores[f"b_{coluna_quantidade}"] = int(soma), int(quantidade)
+        partidas = [
+            {"b_id": partida_id, "b_soma": int(soma), "b_total": int(quantidade)}
+            for partida_id, soma, quantidade in por_partida
+        ]
+        try:
+            zerados = {coluna: 0 for colunas in COLUNAS_USUARIO.values() for coluna in colunas}
+            self.db.execute(update(Usuario.__table__).values(**zerados))
+            if usuarios:
+                self.db.execute(
+                    update(Usuario.__table__)
+                    .where(Usuario.__table__.c.id == bindparam("b_id"))
+                    .values(**{coluna: bindparam(f"b_{coluna}") for coluna in zerados}),
+                    list(usuarios.values())
+                )
+            # A partida pode estar na tabela quente ou no arquivo: o UPDATE na outra não encontra a linha
+            for tabela in (Partida.__table__, partidas_arquivo):
+                self.db.execute(update(tabela).values(soma_notas=0, total_avaliacoes=0))
+                if partidas:
+                    self.db.execute(
+                        update(tabela)
+                        .where(tabela.c.id == bindparam("b_id"))
+                        .values(soma_notas=bindparam("b_soma"), total_avaliacoes=bindparam("b_total")),
+                        partidas
+                    )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(usuarios), len(partidas)
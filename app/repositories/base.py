@@ -1,10 +1,22 @@
 from abc import ABC, abstractmethod
 from typing import Generic, TypeVar, List, Optional, Any, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
+from app.core.config import settings
 
 T = TypeVar('T')
 
 
+def opcoes_carga(*opcoes) -> tuple:
+    """
+    Opções de carga de uma consulta de leitura: as relações que a resposta usa.
+    Com PROIBIR_CARGA_PREGUICOSA, acessar outra relação que precise ir ao banco
+    levanta erro (raiseload) em vez de disparar um SELECT por objeto
+    """
+    if settings.PROIBIR_CARGA_PREGUICOSA:
+        return opcoes + (raiseload("*", sql_only=True),)
+    return opcoes
+
+
 class BaseRepository(Generic[T], ABC):
     """
     Repository base abstrato seguindo o padrão Repository
@@ -0,0 +1,101 @@
+from typing import List, Optional
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.core.clock import agora
+from app.models import Candidatura
+from app.models.enums import StatusCandidatura
+from app.models.models import partida_participantes
+from app.repositories.base import BaseRepository, opcoes_carga
+
+
+class CandidaturaRepository(BaseRepository[Candidatura]):
+    """Repository das candidaturas a partidas privadas"""
+
+    def __init__(self, db: Session):
+        super().__init__(db, Candidatura)
+
+    def get_pendente(self, partida_id: int, usuario_id: int) -> Optional[Candidatura]:
+        """Candidatura pendente do usuário para a partida"""
+        return (
+            self.db.query(Candidatura)
+            .filter(
+                Candidatura.partida_id == partida_id,
+                Candidatura.status == StatusCandidatura.PENDENTE,
+                Candidatura.usuario_id == usuario_id
+            )
+            .first()
+        )
+
+    def get_fila(
+        self, partida_id: int, status: StatusCandidatura = StatusCandidatura.PENDENTE, skip: int = 0, limit: int = 100
+    ) -> List[Candidatura]:
+        """Candidaturas da partida com o status, em ordem de chegada (ix_candidaturas_partida_status_data)"""
+        return (
+            self.db.query(Candidatura)
+            .options(*opcoes_carga(joinedload(Candidatura.usuario)))
+            .filter(Candidatura.partida_id == partida_id, Candidatura.status == status)
+            .order_by(Candidatura.created_at, Candidatura.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_by_usuario(self, usuario_id: int, skip: int = 0, limit: int = 100) -> List[Candidatura]:
+        """Candidaturas do usuário, das mais recentes para as mais antigas"""
+        return (
+            self.db.query(Candidatura)
+            .options(*opcoes_carga())
+            .filter(Candidatura.usuario_id == usuario_id)
+            .order_by(desc(Candidatura.created_at), desc(Candidatura.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_pendentes_por_ids(self, partida_id: int, candidatura_ids: List[int]) -> List[Candidatura]:
+        """
+        Candidaturas pendentes da partida entre os ids, bloqueadas até o fim da
+        transação (Postgres), com os usuários (selectin: fora do FOR UPDATE)
+        """
+        if not candidatura_ids:
+            return []
+        return (
+            self.db.query(Candidatura)
+            .options(*opcoes_carga(selectinload(Candidatura.usuario)))
+            .filter(
+                Candidatura.partida_id == partida_id,
+                Candidatura.status == StatusCandidatura.PENDENTE,
+                Candidatura.id.in_(candidatura_ids)
+            )
+            .with_for_update()
+            .all()
+        )
+
+    def contar_participantes(self, partida_id: int) -> int:
+        """Participantes da partida contados no banco (não na coleção carregada)"""
+        return self.db.execute(
+            select(func.count()).select_from(partida_participantes).where(partida_participantes.c.partida_id == partida_id)
+        ).scalar()
+
+    def decidir(self, aprovadas: List[Candidatura], rejeitadas: List[Candidatura]):
+        """Marcar as candidaturas como aprovadas/rejeitadas (sem commit)"""
+        for candidatura in aprovadas:
+            candidatura.status = StatusCandidatura.APROVADA
+        for candidatura in rejeitadas:
+            candidatura.status = StatusCandidatura.REJEITADA
+
+    def adicionar_participantes(self, partida_id: int, usuario_ids: List[int]):
+        """
+        Pôr os aprovados em partida_participantes, já confirmados, com um único
+        INSERT em lote (sem commit: a decisão inteira é uma transação)
+        """
+        if not usuario_ids:
+            return
+        momento = agora()
+        self.db.execute(insert(partida_participantes), [
+            {
+                "partida_id": partida_id, "usuario_id": usuario_id, "convidado_por_id": None,
+                "confirmado": True, "data_confirmacao": momento,
+            }
+            for usuario_id in usuario_ids
+        ])
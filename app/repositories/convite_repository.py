@@ -1,12 +1,20 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
-from datetime import datetime
-from app.repositories.base import BaseRepository
-from app.models.models import Convite
+from app.core.clock import agora
+from app.repositories.base import BaseRepository, opcoes_carga
+from app.models.models import Convite, Partida
 from app.models.enums import StatusConvite
 from app.schemas.schemas import ConviteCreate, ConviteUpdate
 
+# ConviteResponse: mandante, convidado e a partida completa (organizador + participantes)
+CARGA_CONVITE = (
+    joinedload(Convite.mandante),
+    joinedload(Convite.convidado),
+    joinedload(Convite.partida).joinedload(Partida.organizador),
+    joinedload(Convite.partida).selectinload(Partida.participantes),
+)
+
 
 class ConviteRepository(BaseRepository[Convite]):
     def __init__(self, db: Session):
@@ -16,11 +24,7 @@ class ConviteRepository(BaseRepository[Convite]):
         """Buscar convite por ID incluindo relacionamentos"""
         return (
             self.db.query(Convite)
-            .options(
-                joinedload(Convite.mandante),
-                joinedload(Convite.convidado),
-                joinedload(Convite.partida)
-            )
+            .options(*CARGA_CONVITE)
             .filter(Convite.id == id)
             .first()
         )
@@ -41,6 +45,7 @@ class ConviteRepository(BaseRepository[Convite]):
         """Buscar convites enviados por um usuário"""
         return (
             self.db.query(Convite)
+            .options(*opcoes_carga(*CARGA_CONVITE))
             .filter(Convite.mandante_id == mandante_id)
             .order_by(Convite.created_at.desc())
             .offset(skip)
@@ -52,6 +57,7 @@ class ConviteRepository(BaseRepository[Convite]):
         """Buscar convites recebidos por um usuário"""
         return (
             self.db.query(Convite)
+            .options(*opcoes_carga(*CARGA_CONVITE))
             .filter(Convite.convidado_id == convidado_id)
             .order_by(Convite.created_at.desc())
             .offset(skip)
@@ -63,6 +69,7 @@ class ConviteRepository(BaseRepository[Convite]):
         """Buscar convites pendentes de um usuário"""
         return (
             self.db.query(Convite)
+            .options(*opcoes_carga(*CARGA_CONVITE))
             .filter(
                 and_(
                     Convite.convidado_id == convidado_id,
@@ -77,6 +84,7 @@ class ConviteRepository(BaseRepository[Convite]):
         """Buscar todos os convites de uma partida específica"""
         return (
             self.db.query(Convite)
+            .options(*opcoes_carga(*CARGA_CONVITE))
             .filter(Convite.partida_id == partida_id)
             .order_by(Convite.created_at.desc())
             .all()
@@ -114,7 +122,7 @@ class ConviteRepository(BaseRepository[Convite]):
         
         if convite:
             convite.status = StatusConvite.ACEITO
-            convite.updated_at = datetime.utcnow()
+            convite.updated_at = agora()
             self.db.commit()
             self.db.refresh(convite)
         
@@ -136,7 +144,7 @@ class ConviteRepository(BaseRepository[Convite]):
         
         if convite:
             convite.status = StatusConvite.RECUSADO
-            convite.updated_at = datetime.utcnow()
+            convite.updated_at = agora()
             self.db.commit()
             self.db.refresh(convite)
         
@@ -144,7 +152,7 @@ class ConviteRepository(BaseRepository[Convite]):
     
     def expirar_convites_antigos(self) -> int:
         """Marcar como expirados os convites que passaram da data de expiração"""
-        now = datetime.utcnow()
+        now = agora()
         count = (
             self.db.query(Convite)
             .filter(
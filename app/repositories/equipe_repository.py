@@ -1,8 +1,10 @@
-from typing import List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import desc, select
 from app.models import Equipe, Usuario
-from app.repositories.base import BaseRepository
+from app.models.models import equipe_membros
+from app.repositories.base import BaseRepository, opcoes_carga
 
 
 class EquipeRepository(BaseRepository[Equipe]):
@@ -17,7 +19,7 @@ class EquipeRepository(BaseRepository[Equipe]):
             self.db.query(Equipe)
             .options(
                 joinedload(Equipe.lider),
-                joinedload(Equipe.membros)
+                selectinload(Equipe.membros)
             )
             .filter(Equipe.id == equipe_id)
             .first()
@@ -27,29 +29,29 @@ class EquipeRepository(BaseRepository[Equipe]):
         """Buscar equipes lideradas por um usuário"""
         return (
             self.db.query(Equipe)
-            .options(joinedload(Equipe.membros))
+            .options(*opcoes_carga())  # EquipeInDB: sem membros
             .filter(Equipe.lider_id == lider_id)
             .order_by(desc(Equipe.created_at))
             .all()
         )
     
     def get_ranking(self, limit: int = 10) -> List[Equipe]:
-        """Buscar ranking de equipes por pontuação"""
+        """Buscar ranking de equipes por pontuação (ix_equipes_pontuacao_total)"""
         return (
             self.db.query(Equipe)
-            .options(joinedload(Equipe.lider))
+            .options(*opcoes_carga())
             .order_by(desc(Equipe.pontuacao_total))
             .limit(limit)
             .all()
         )
     
-    def get_melhores_equipes(self, limit: int = 10) -> List[Equipe]:
-        """Buscar melhores equipes por taxa de vitória"""
+    def get_melhores_equipes(self, limit: int = 10, min_partidas: int = 1) -> List[Equipe]:
+        """Buscar melhores equipes por taxa de vitória (ix_equipes_taxa_vitoria, desempate por experiência)"""
         return (
             self.db.query(Equipe)
-            .options(joinedload(Equipe.lider))
-            .filter(Equipe.partidas_jogadas > 0)
-            .order_by(desc(Equipe.vitorias / Equipe.partidas_jogadas))
+            .options(*opcoes_carga())
+            .filter(Equipe.partidas_jogadas >= min_partidas)
+            .order_by(desc(Equipe.taxa_vitoria), desc(Equipe.partidas_jogadas))
             .limit(limit)
             .all()
         )
@@ -86,4 +88,41 @@ class EquipeRepository(BaseRepository[Equipe]):
             equipe.pontuacao_total += pontos
             self.db.commit()
             self.db.refresh(equipe)
-        return equipe
\ No newline at end of file
+        return equipe
+    
+    def registrar_resultados(self, resultados: Dict[int, Tuple[bool, int]]) -> int:
+        """
+        Somar às equipes dos participantes o resultado de uma partida
+        ({usuario_id: (venceu, pontos)}): cada equipe conta a partida uma vez, com
+        o resultado do lado em que os membros dela jogaram. Se os membros jogaram
+        em lados opostos, a partida não conta para a equipe. Retorna quantas
+        equipes foram atualizadas
+        """
+        if not resultados:
+            return 0
+        lados = defaultdict(set)  # equipe_id -> {(venceu, pontos)} dos membros que jogaram
+        membros = self.db.execute(
+            select(equipe_membros.c.equipe_id, equipe_membros.c.usuario_id)
+            .where(equipe_membros.c.usuario_id.in_(list(resultados)))
+        )
+        for equipe_id, usuario_id in membros:
+            lados[equipe_id].add(resultados[usuario_id])
+        totais = {}  # equipe_id -> (partidas, vitórias, pontos)
+        for equipe_id, resultado in lados.items():
+            if len(resultado) > 1:
+                continue  # Membros em lados opostos
+            venceu, pontos = resultado.pop()
+            totais[equipe_id] = (1, 1 if venceu else 0, pontos)
+        if not totais:
+            return 0
+        
+        # Bloqueia as linhas (Postgres) para que finalizações simultâneas não percam incrementos
+        equipes = self.db.query(Equipe).filter(Equipe.id.in_(list(totais))).with_for_update().all()
+        for equipe in equipes:
+            partidas, vitorias, pontos = totais[equipe.id]
+            equipe.partidas_jogadas = (equipe.partidas_jogadas or 0) + partidas
+            equipe.vitorias = (equipe.vitorias or 0) + vitorias
+            equipe.derrotas = equipe.partidas_jogadas - equipe.vitorias
+            equipe.pontuacao_total = (equipe.pontuacao_total or 0) + pontos
+        self.db.commit()
+        return len(equipes)
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.models import ChaveIdempotencia
+
+
+class IdempotenciaRepository:
+    """
+    Acesso à tabela chaves_idempotencia. A unicidade (escopo, chave) no banco
+    é o que garante que só uma requisição "ganha" a chave, mesmo com várias
+    instâncias da API atendendo repetições simultâneas.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reservar(
+        self,
+        escopo: str,
+        chave: str,
+        impressao: str,
+        agora: datetime,
+        expira_em: datetime
+    ) -> Optional[ChaveIdempotencia]:
+        """
+        Reservar a chave para a requisição atual. Retorna None se a reserva foi
+        feita (a requisição deve ser processada) ou o registro já existente
+        (resposta gravada ou requisição ainda em andamento)
+        """
+        existente = self._get(escopo, chave)
+        if existente is not None:
+            if existente.expira_em > agora:
+                return existente
+            # Chave expirada ainda não limpa: pode ser reutilizada
+            self.db.delete(existente)
+            self.db.flush()
+
+        self.db.add(ChaveIdempotencia(
+            escopo=escopo,
+            chave=chave,
+            impressao=impressao,
+            created_at=agora,
+            expira_em=expira_em
+        ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Outra requisição reservou a mesma chave entre a leitura e a escrita
+            self.db.rollback()
+            return self._get(escopo, chave)
+        return None
+
+    def concluir(self, escopo: str, chave: str, status_code: int, cabecalhos: str, corpo: bytes) -> None:
+        """Gravar a resposta da requisição que reservou a chave"""
+        self.db.query(ChaveIdempotencia).filter(
+            ChaveIdempotencia.escopo == escopo,
+            ChaveIdempotencia.chave == chave
+        ).update(
+            {"status_code": status_code, "cabecalhos": cabecalhos, "corpo": corpo},
+            synchronize_session=False
+        )
+        self.db.commit()
+
+    def liberar(self, escopo: str, chave: str) -> None:
+        """Desfazer a reserva (resposta não reproduzível): a próxima tentativa processa de novo"""
+        self.db.query(ChaveIdempotencia).filter(
+            ChaveIdempotencia.escopo == escopo,
+            ChaveIdempotencia.chave == chave,
+            ChaveIdempotencia.status_code.is_(None)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+    def limpar(self, agora: datetime, max_chaves: int) -> int:
+        """Remover chaves expiradas e, acima do limite, as mais antigas. Retorna quantas foram removidas"""
+        removidas = self.db.query(ChaveIdempotencia).filter(
+            ChaveIdempotencia.expira_em <= agora
+        ).delete(synchronize_session=False)
+
+        maior_id = self.db.query(func.max(ChaveIdempotencia.id)).scalar()
+        if maior_id is not None and maior_id > max_chaves:
+            removidas += self.db.query(ChaveIdempotencia).filter(
+                ChaveIdempotencia.id <= maior_id - max_chaves
+            ).delete(synchronize_session=False)
+
+        self.db.commit()
+        return removidas
+
+    def _get(self, escopo: str, chave: str) -> Optional[ChaveIdempotencia]:
+        return self.db.query(ChaveIdempotencia).filter(
+            ChaveIdempotencia.escopo == escopo,
+            ChaveIdempotencia.chave == chave
+        ).first()
@@ -1,10 +1,21 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Set, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import bindparam, delete, desc, func, insert, or_, select, text, update
 from app.models import Partida, Usuario
-from app.models.enums import StatusPartida, TipoPartida, CategoriaPartida
-from app.repositories.base import BaseRepository
+from app.models.models import partida_lista_espera, partida_participantes
+from app.core.clock import agora, agora_brasil, FUSO_BRASIL
+from app.models.busca import TABELA_FTS, DOCUMENTO_POSTGRES, PREFIXOS_INDEXADOS
+from app.models.enums import StatusPartida, TipoPartida, CategoriaPartida, LadoEquipe
+from app.repositories.base import BaseRepository, opcoes_carga
+from app.utils.agenda import STATUS_EM_AGENDA
+from app.utils.busca import ConsultaBusca
+
+# Opções de carga por forma de resposta. Coleções via selectinload (um SELECT ... IN
+# para a página inteira, sem multiplicar linhas nem atrapalhar o LIMIT);
+# muitos-para-um via joinedload, no mesmo SELECT
+CARGA_RESPOSTA = (joinedload(Partida.organizador), selectinload(Partida.participantes))  # PartidaResponse
+CARGA_AGENDA = ()  # AgendaItemResponse: só colunas da partida
 
 
 class PartidaRepository(BaseRepository[Partida]):
@@ -17,10 +28,7 @@ class PartidaRepository(BaseRepository[Partida]):
         """Buscar partida com organizador e participantes"""
         return (
             self.db.query(Partida)
-            .options(
-                joinedload(Partida.organizador),
-                joinedload(Partida.participantes)
-            )
+            .options(*CARGA_RESPOSTA)
             .filter(Partida.id == partida_id)
             .first()
         )
@@ -29,7 +37,7 @@ class PartidaRepository(BaseRepository[Partida]):
         """Buscar partidas por status"""
         return (
             self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.status == status)
             .order_by(desc(Partida.data_partida))
             .offset(skip)
@@ -37,34 +45,236 @@ class PartidaRepository(BaseRepository[Partida]):
             .all()
         )
     
-    def get_todas(self, skip: int = 0, limit: int = 100) -> List[Partida]:
-        """Buscar TODAS as partidas (independente do status)"""
+    def _filtrar_nivel(self, query, nivel: Optional[int]):
+        """Restringir às partidas cuja categoria aceita o nível (um AND bit a bit em SQL)"""
+        if nivel is None:
+            return query
+        return query.filter(Partida.categoria_mascara.op("&")(1 << nivel) != 0)
+    
+    def get_todas(self, skip: int = 0, limit: int = 100, nivel: Optional[int] = None) -> List[Partida]:
+        """Buscar TODAS as partidas (independente do status), opcionalmente acessíveis ao nível"""
+        query = self.db.query(Partida).options(*opcoes_carga(*CARGA_RESPOSTA))
         return (
-            self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            self._filtrar_nivel(query, nivel)
             .order_by(desc(Partida.data_partida))
             .offset(skip)
             .limit(limit)
             .all()
         )
     
-    def get_by_categoria_todas(self, categoria: str, skip: int = 0, limit: int = 100) -> List[Partida]:
-        """Buscar TODAS as partidas por categoria (independente do status)"""
-        return (
+    def get_by_categoria_todas(
+        self, categoria: str, skip: int = 0, limit: int = 100, nivel: Optional[int] = None
+    ) -> List[Partida]:
+        """Buscar TODAS as partidas por categoria (independente do status), opcionalmente acessíveis ao nível"""
+        query = (
             self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.categoria == categoria)
+        )
+        return (
+            self._filtrar_nivel(query, nivel)
             .order_by(desc(Partida.data_partida))
             .offset(skip)
             .limit(limit)
             .all()
         )
     
+    def buscar_candidatos(
+        self,
+        consulta: ConsultaBusca,
+        janela: int,
+        status: Optional[StatusPartida] = None,
+        categoria: Optional[str] = None,
+        nivel: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Partidas que casam com a busca textual: (id, titulo, descricao, local)
+        das `janela` mais recentes, já com os filtros aplicados no banco.
+
+        O ranqueamento fica para o chamador: ordenar por relevância no banco
+        (bm25/ts_rank) exige pontuar todas as correspondências, enquanto a
+        ordem por id percorre o índice e para na janela.
+        O dia da semana é o do horário de Brasília.
+        """
+        filtros = []
+        parametros = {"janela": janela}
+        dia_semana = consulta.dia_semana
+        if status is not None:
+            filtros.append("p.status = :status")
+            parametros["status"] = status.name  # Enum gravado pelo nome
+        if categoria:
+            filtros.append("p.categoria = :categoria")
+            parametros["categoria"] = categoria
+        if nivel is not None:
+            filtros.append("(p.categoria_mascara & :bit_nivel) != 0")
+            parametros["bit_nivel"] = 1 << nivel
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            if dia_semana is not None:
+                filtros.append("extract(dow from p.data_partida at time zone :fuso) = :dia")
+                parametros.update(dia=dia_semana, fuso=FUSO_BRASIL.key)
+            sql = (
+                f"SELECT p.id, p.titulo, p.descricao, p.local FROM partidas p "
+                f"WHERE {DOCUMENTO_POSTGRES.replace('partidas.', 'p.')} @@ to_tsquery('portuguese', f_unaccent(:consulta))"
+            )
+            sql += "".join(f" AND {filtro}" for filtro in filtros) + " ORDER BY p.id DESC LIMIT :janela"
+            return self._executar_busca(sql, {**parametros, "consulta": consulta.tsquery()})
+
+        if dia_semana is not None:
+            # SQLite não conhece fusos: deslocamento atual de Brasília (sem horário de verão desde 2019)
+            horas = int(agora_brasil().utcoffset().total_seconds() // 3600)
+            filtros.append("CAST(strftime('%w', p.data_partida, :deslocamento) AS INTEGER) = :dia")
+            parametros.update(dia=dia_semana, deslocamento=f"{horas:+d} hours")
+        sql = (
+            f"SELECT p.id, p.titulo, p.descricao, p.local FROM {TABELA_FTS} "
+            f"JOIN partidas p ON p.id = {TABELA_FTS}.rowid "
+            f"WHERE {TABELA_FTS} MATCH :consulta"
+        )
+        sql += "".join(f" AND {filtro}" for filtro in filtros) + f" ORDER BY {TABELA_FTS}.rowid DESC LIMIT :janela"
+
+        if len(consulta.termos[-1]) > max(PREFIXOS_INDEXADOS):
+            # Prefixo longo não tem índice próprio: tentar a palavra exata primeiro;
+            # só se ela não encher a janela vale fundir as listas do prefixo
+            # (o resultado do prefixo contém o da palavra exata)
+            exatos = self._executar_busca(sql, {**parametros, "consulta": consulta.fts5(prefixo=False)})
+            if len(exatos) >= janela:
+                return exatos
+        return self._executar_busca(sql, {**parametros, "consulta": consulta.fts5()})
+
+    def _executar_busca(self, sql: str, parametros: dict) -> List[tuple]:
+        return [tuple(linha) for linha in self.db.execute(text(sql), parametros)]
+
+    def get_coordenadas_nas_celulas(self, faixas: List[Tuple[int, int]], desde: datetime) -> List[tuple]:
+        """
+        (id, latitude, longitude, data_partida) das partidas ativas a partir de `desde`
+        nas faixas de células da grade (uma faixa BETWEEN por linha, via índice)
+        """
+        return (
+            self.db.query(Partida.id, Partida.latitude, Partida.longitude, Partida.data_partida)
+            .filter(or_(*(Partida.geo_celula.between(inicio, fim) for inicio, fim in faixas)))
+            .filter(Partida.data_partida >= desde)
+            .filter(Partida.status == StatusPartida.ATIVA)
+            .all()
+        )
+
+    def get_conflito_agenda(
+        self, usuario_id: int, inicio: datetime, termino: datetime, excluir_partida_id: Optional[int] = None
+    ) -> Optional[Partida]:
+        """
+        Primeira partida em andamento/futura do usuário cujo intervalo sobrepõe
+        [inicio, termino). Parte do índice de participações do usuário e compara
+        os intervalos pelas colunas data_partida/data_termino.
+        """
+        query = (
+            self.db.query(Partida)
+            .join(partida_participantes, partida_participantes.c.partida_id == Partida.id)
+            .filter(partida_participantes.c.usuario_id == usuario_id)
+            .filter(Partida.data_partida < termino)
+            .filter(Partida.data_termino > inicio)
+            .filter(Partida.status.in_(STATUS_EM_AGENDA))
+        )
+        if excluir_partida_id is not None:
+            query = query.filter(Partida.id != excluir_partida_id)
+        return query.order_by(Partida.data_partida).first()
+
+    def get_usuarios_em_conflito(
+        self, usuario_ids: List[int], inicio: datetime, termino: datetime, excluir_partida_id: Optional[int] = None
+    ) -> Set[int]:
+        """Entre os usuários, os que já participam de alguma partida sobreposta a [inicio, termino), em uma consulta"""
+        if not usuario_ids:
+            return set()
+        query = (
+            select(partida_participantes.c.usuario_id)
+            .join(Partida, partida_participantes.c.partida_id == Partida.id)
+            .where(partida_participantes.c.usuario_id.in_(usuario_ids))
+            .where(Partida.data_partida < termino)
+            .where(Partida.data_termino > inicio)
+            .where(Partida.status.in_(STATUS_EM_AGENDA))
+            .distinct()
+        )
+        if excluir_partida_id is not None:
+            query = query.where(Partida.id != excluir_partida_id)
+        return set(self.db.execute(query).scalars())
+
+    def sair_listas_espera_sobrepostas(self, usuario_ids: List[int], inicio: datetime, termino: datetime) -> int:
+        """
+        Tirar os usuários das listas de espera de partidas sobrepostas a [inicio, termino)
+        (inclusive a da própria partida em que entraram). Sem commit: entra na
+        transação da entrada. Retorna quantas posições foram liberadas
+        """
+        if not usuario_ids:
+            return 0
+        sobrepostas = (
+            select(Partida.id)
+            .where(Partida.data_partida < termino)
+            .where(Partida.data_termino > inicio)
+            .where(Partida.status.in_(STATUS_EM_AGENDA))
+        )
+        return self.db.execute(
+            delete(partida_lista_espera)
+            .where(partida_lista_espera.c.usuario_id.in_(usuario_ids))
+            .where(partida_lista_espera.c.partida_id.in_(sobrepostas))
+        ).rowcount
+
+    def get_agenda_participante(self, usuario_id: int, desde: datetime, ate: datetime) -> List[Partida]:
+        """Partidas do usuário (como participante) que terminam depois de `desde` e começam antes de `ate`"""
+        return (
+            self.db.query(Partida)
+            .options(*opcoes_carga(*CARGA_AGENDA))
+            .join(partida_participantes, partida_participantes.c.partida_id == Partida.id)
+            .filter(partida_participantes.c.usuario_id == usuario_id)
+            .filter(Partida.data_termino > desde)
+            .filter(Partida.data_partida < ate)
+            .filter(Partida.status.in_(STATUS_EM_AGENDA))
+            .order_by(Partida.data_partida, Partida.id)
+            .all()
+        )
+
+    def get_agenda_organizador(self, usuario_id: int, desde: datetime, ate: datetime) -> List[Partida]:
+        """Partidas organizadas pelo usuário no período, em ordem de início (índice organizador_id, data_partida)"""
+        return (
+            self.db.query(Partida)
+            .options(*opcoes_carga(*CARGA_AGENDA))
+            .filter(Partida.organizador_id == usuario_id)
+            .filter(Partida.data_termino > desde)
+            .filter(Partida.data_partida < ate)
+            .filter(Partida.status.in_(STATUS_EM_AGENDA))
+            .order_by(Partida.data_partida, Partida.id)
+            .all()
+        )
+
+    def get_por_ids(self, ids: List[int]) -> List[Partida]:
+        """
+        Carregar partidas preservando a ordem dos ids: um único IN, o organizador
+        no mesmo SELECT e os participantes do lote todo em um segundo SELECT ... IN
+        """
+        if not ids:
+            return []
+        partidas = (
+            self.db.query(Partida)
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
+            .filter(Partida.id.in_(ids))
+            .all()
+        )
+        por_id = {partida.id: partida for partida in partidas}
+        return [por_id[partida_id] for partida_id in ids if partida_id in por_id]
+    
+    def contar_confirmados(self, ids: List[int]) -> Dict[int, int]:
+        """Participantes confirmados por partida, para o lote inteiro em um GROUP BY"""
+        if not ids:
+            return {}
+        linhas = self.db.execute(
+            select(partida_participantes.c.partida_id, func.count())
+            .where(partida_participantes.c.partida_id.in_(ids), partida_participantes.c.confirmado == True)
+            .group_by(partida_participantes.c.partida_id)
+        )
+        return {partida_id: total for partida_id, total in linhas}
+    
     def get_by_tipo(self, tipo: TipoPartida, skip: int = 0, limit: int = 100) -> List[Partida]:
         """Buscar partidas por tipo"""
         return (
             self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.tipo == tipo)
             .filter(Partida.status == StatusPartida.ATIVA)
             .order_by(Partida.data_partida)
@@ -77,7 +287,7 @@ class PartidaRepository(BaseRepository[Partida]):
         """Buscar partidas por categoria"""
         return (
             self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.categoria == categoria)
             .filter(Partida.status == StatusPartida.ATIVA)
             .order_by(Partida.data_partida)
@@ -90,9 +300,9 @@ class PartidaRepository(BaseRepository[Partida]):
         """Buscar partidas por organizador"""
         return (
             self.db.query(Partida)
-            .options(joinedload(Partida.participantes))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.organizador_id == organizador_id)
-            .order_by(desc(Partida.created_at))
+            .order_by(desc(Partida.created_at), desc(Partida.id))
             .offset(skip)
             .limit(limit)
             .all()
@@ -103,9 +313,9 @@ class PartidaRepository(BaseRepository[Partida]):
         return (
             self.db.query(Partida)
             .join(Partida.participantes)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Usuario.id == usuario_id)
-            .order_by(desc(Partida.data_partida))
+            .order_by(desc(Partida.data_partida), desc(Partida.id))
             .offset(skip)
             .limit(limit)
             .all()
@@ -115,7 +325,7 @@ class PartidaRepository(BaseRepository[Partida]):
         """Buscar próximas partidas ativas"""
         return (
             self.db.query(Partida)
-            .options(joinedload(Partida.organizador))
+            .options(*opcoes_carga(*CARGA_RESPOSTA))
             .filter(Partida.status == StatusPartida.ATIVA)
             .filter(Partida.data_partida >= limite_data)
             .order_by(Partida.data_partida)
@@ -124,6 +334,13 @@ class PartidaRepository(BaseRepository[Partida]):
             .all()
         )
     
+    def bloquear(self, partida_id: int):
+        """
+        SELECT ... FOR UPDATE na linha da partida (Postgres): quem decide sobre
+        as vagas dela espera a transação concorrente terminar antes de contar
+        """
+        self.db.execute(select(Partida.id).where(Partida.id == partida_id).with_for_update())
+
     def adicionar_participante(self, partida_id: int, usuario_id: int) -> bool:
         """Adicionar participante à partida"""
         partida = self.get_with_details(partida_id)
@@ -157,4 +374,93 @@ class PartidaRepository(BaseRepository[Partida]):
             self.db.commit()
             self.db.refresh(partida)
             return True
-        return False
\ No newline at end of file
+        return False
+    
+    def get_equipes(self, partida_id: int) -> Dict[int, Optional[LadoEquipe]]:
+        """Equipe de cada participante (None se ainda não dividida)"""
+        linhas = self.db.execute(
+            partida_participantes.select()
+            .with_only_columns(partida_participantes.c.usuario_id, partida_participantes.c.equipe)
+            .where(partida_participantes.c.partida_id == partida_id)
+        )
+        return {usuario_id: equipe for usuario_id, equipe in linhas}
+    
+    def salvar_equipes(self, partida_id: int, equipes: Dict[LadoEquipe, List[int]]):
+        """Gravar a divisão em partida_participantes (um UPDATE em lote)"""
+        valores = [
+            {"b_usuario_id": usuario_id, "b_equipe": lado}
+            for lado, usuario_ids in equipes.items()
+            for usuario_id in usuario_ids
+        ]
+        if valores:
+            self.db.execute(
+                update(partida_participantes)
+                .where(partida_participantes.c.partida_id == partida_id)
+                .where(partida_participantes.c.usuario_id == bindparam("b_usuario_id"))
+                .values(equipe=bindparam("b_equipe")),
+                valores
+            )
+        self.db.commit()
+    
+    def get_lista_espera(self, partida_id: int) -> List[Usuario]:
+        """Usuários na lista de espera da partida, na ordem de chegada"""
+        return (
+            self.db.query(Usuario)
+            .join(partida_lista_espera, partida_lista_espera.c.usuario_id == Usuario.id)
+            .filter(partida_lista_espera.c.partida_id == partida_id)
+            .order_by(partida_lista_espera.c.id)
+            .all()
+        )
+    
+    def entrar_lista_espera(self, partida_id: int, usuario_id: int):
+        """Pôr o usuário no fim da lista de espera (sem commit)"""
+        self.db.execute(insert(partida_lista_espera).values(partida_id=partida_id, usuario_id=usuario_id))
+    
+    def sair_lista_espera(self, partida_id: int, usuario_id: int) -> bool:
+        """Tirar o usuário da lista de espera (sem commit). Retorna se ele estava nela"""
+        resultado = self.db.execute(
+            delete(partida_lista_espera)
+            .where(partida_lista_espera.c.partida_id == partida_id)
+            .where(partida_lista_espera.c.usuario_id == usuario_id)
+        )
+        return resultado.rowcount > 0
+    
+    def promover_lista_espera(self, partida_id: int, vagas: int, inicio: datetime, termino: datetime) -> List[int]:
+        """
+        Passar os primeiros da lista de espera para participantes confirmados, até
+        `vagas`. Sem commit: entra na transação da saída que abriu a vaga. As linhas
+        da fila ficam bloqueadas (Postgres) e saídas simultâneas pulam as já tomadas.
+        Quem entrou em outra partida no mesmo horário enquanto esperava sai da fila
+        e a vaga passa ao seguinte; os promovidos saem das filas sobrepostas.
+        Retorna os ids promovidos, na ordem da fila
+        """
+        promovidos: List[int] = []
+        while len(promovidos) < vagas:
+            candidatos = list(self.db.execute(
+                select(partida_lista_espera.c.usuario_id)
+                .where(partida_lista_espera.c.partida_id == partida_id)
+                .order_by(partida_lista_espera.c.id)
+                .limit(vagas - len(promovidos))
+                .with_for_update(skip_locked=True)
+            ).scalars())
+            if not candidatos:
+                break
+            em_conflito = self.get_usuarios_em_conflito(candidatos, inicio, termino, excluir_partida_id=partida_id)
+            aceitos = [usuario_id for usuario_id in candidatos if usuario_id not in em_conflito]
+            if aceitos:
+                momento = agora()
+                self.db.execute(insert(partida_participantes), [
+                    {
+                        "partida_id": partida_id, "usuario_id": usuario_id, "convidado_por_id": None,
+                        "confirmado": True, "data_confirmacao": momento,
+                    }
+                    for usuario_id in aceitos
+                ])
+            self.db.execute(
+                delete(partida_lista_espera)
+                .where(partida_lista_espera.c.partida_id == partida_id)
+                .where(partida_lista_espera.c.usuario_id.in_(candidatos))
+            )
+            promovidos.extend(aceitos)
+        self.sair_listas_espera_sobrepostas(promovidos, inicio, termino)
+        return promovidos
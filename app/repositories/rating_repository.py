@@ -0,0 +1,82 @@
+from typing import List, Sequence, Tuple
+from sqlalchemy import case, select, union_all, update
+from sqlalchemy.orm import Session
+from app.models import Partida, Usuario
+from app.models.arquivo import partida_participantes_arquivo, partidas_arquivo
+from app.models.enums import LadoEquipe, StatusPartida
+from app.models.models import partida_participantes
+from app.utils.rating import RATING_INICIAL
+
+
+def _ranqueadas(partidas) -> tuple:
+    """
+    Partidas que entram no rating: finalizadas com placar (finalizar_partida só
+    finaliza com placar diferente). As que o motor de status finaliza sozinho ficam
+    com o placar padrão 0 x 0 e não contam, como na atualização incremental; as sem
+    adversário são descartadas em recalcular()
+    """
+    return (
+        partidas.c.status == StatusPartida.FINALIZADA,
+        partidas.c.pontuacao_equipe_a.isnot(None),
+        partidas.c.pontuacao_equipe_b.isnot(None),
+        partidas.c.pontuacao_equipe_a != partidas.c.pontuacao_equipe_b,
+    )
+
+
+class RatingRepository:
+    """Leitura do histórico de partidas finalizadas (quentes e arquivadas) e gravação dos ratings recalculados"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_partidas_finalizadas(self) -> List[Tuple]:
+        """(id, data_partida, pontos_a, pontos_b, tipo) das partidas ranqueadas, em ordem cronológica"""
+        historico = union_all(*(
+            select(
+                tabela.c.id, tabela.c.data_partida, tabela.c.pontuacao_equipe_a,
+                tabela.c.pontuacao_equipe_b, tabela.c.tipo
+            ).where(*_ranqueadas(tabela))
+            for tabela in (Partida.__table__, partidas_arquivo)
+        )).subquery()
+        return self.db.execute(select(historico).order_by(historico.c.data_partida, historico.c.id)).all()
+
+    def get_participacoes_finalizadas(self) -> List[Tuple]:
+        """(partida_id, usuario_id, lado) das partidas ranqueadas: lado 0 = A, 1 = B, -1 = sem divisão"""
+        consulta = union_all(*(
+            select(
+                participantes.c.partida_id, participantes.c.usuario_id,
+                case(
+                    (participantes.c.equipe == LadoEquipe.A, 0),
+                    (participantes.c.equipe == LadoEquipe.B, 1),
+                    else_=-1
+                )
+            )
+            .join(partidas, partidas.c.id == participantes.c.partida_id)
+            .where(*_ranqueadas(partidas))
+            for participantes, partidas in (
+                (partida_participantes, Partida.__table__),
+                (partida_participantes_arquivo, partidas_arquivo),
+            )
+        ))
+        return self.db.execute(consulta).all()
+
+    def get_usuario_ids(self) -> List[int]:
+        """Ids de todos os usuários, em ordem crescente"""
+        return list(self.db.execute(select(Usuario.id).order_by(Usuario.id)).scalars())
+
+    def salvar(self, usuario_ids: Sequence[int], ratings: Sequence[float], partidas_ranqueadas: Sequence[int]) -> int:
+        """Substituir os ratings de todos os usuários (quem não jogou volta ao inicial). Retorna quantos jogaram"""
+        valores = [
+            {"id": int(usuario_id), "rating": float(rating), "partidas_ranqueadas": int(jogos)}
+            for usuario_id, rating, jogos in zip(usuario_ids, ratings, partidas_ranqueadas)
+            if jogos
+        ]
+        try:
+            self.db.execute(update(Usuario).values(rating=RATING_INICIAL, partidas_ranqueadas=0))
+            if valores:
+                self.db.execute(update(Usuario), valores)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(valores)
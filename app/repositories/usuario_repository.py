@@ -2,7 +2,7 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from app.models import Usuario
-from app.models.enums import TipoUsuario
+from app.models.enums import CriterioRanking, TipoUsuario
 from app.repositories.base import BaseRepository
 
 
@@ -16,6 +16,13 @@ class UsuarioRepository(BaseRepository[Usuario]):
         """Buscar usuário por email"""
         return self.db.query(Usuario).filter(Usuario.email == email).first()
     
+    def get_por_ids(self, ids: List[int]) -> List[Usuario]:
+        """Carregar usuários com um único IN, preservando a ordem dos ids"""
+        if not ids:
+            return []
+        por_id = {usuario.id: usuario for usuario in self.db.query(Usuario).filter(Usuario.id.in_(ids)).all()}
+        return [por_id[usuario_id] for usuario_id in ids if usuario_id in por_id]
+    
     def get_by_tipo(self, tipo: TipoUsuario, skip: int = 0, limit: int = 100) -> List[Usuario]:
         """Buscar usuários por tipo"""
         return (
@@ -26,12 +33,13 @@ class UsuarioRepository(BaseRepository[Usuario]):
             .all()
         )
     
-    def get_ranking(self, limit: int = 10) -> List[Usuario]:
-        """Buscar ranking de usuários por pontuação"""
+    def get_ranking(self, limit: int = 10, criterio: CriterioRanking = CriterioRanking.PONTUACAO) -> List[Usuario]:
+        """Buscar ranking de usuários por pontuação ou por rating"""
+        coluna = Usuario.rating if criterio == CriterioRanking.RATING else Usuario.pontuacao_total
         return (
             self.db.query(Usuario)
             .filter(Usuario.ativo == True)
-            .order_by(desc(Usuario.pontuacao_total))
+            .order_by(desc(coluna))
             .limit(limit)
             .all()
         )
@@ -54,14 +62,20 @@ class UsuarioRepository(BaseRepository[Usuario]):
             query = query.filter(Usuario.id != exclude_id)
         return query.first() is not None
     
-    def update_stats(self, user_id: int, partidas_jogadas: int = 1, vitorias: int = 0, pontos: int = 0):
-        """Atualizar estatísticas do usuário"""
+    def update_stats(
+        self, user_id: int, partidas_jogadas: int = 1, vitorias: int = 0, pontos: int = 0,
+        variacao_rating: Optional[float] = None
+    ):
+        """Atualizar estatísticas do usuário (variacao_rating: partida ranqueada, ver app/utils/rating.py)"""
         user = self.get(user_id)
         if user:
             user.partidas_jogadas += partidas_jogadas
             user.vitorias += vitorias
             user.derrotas = user.partidas_jogadas - user.vitorias
             user.pontuacao_total += pontos
+            if variacao_rating is not None:
+                user.rating += variacao_rating
+                user.partidas_ranqueadas += 1
             self.db.commit()
             self.db.refresh(user)
         return user
\ No newline at end of file
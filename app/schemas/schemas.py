@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, ConfigDict
-from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite, CategoriaPartida
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusCandidatura, StatusConvite, CategoriaPartida, TipoAvaliacao
 
 # ========== USUARIO SCHEMAS ==========
 class UsuarioBase(BaseModel):
@@ -20,11 +20,14 @@ class UsuarioUpdate(BaseModel):
 
 class UsuarioInDB(UsuarioBase):
     id: int
+    email: str  # Já validado na entrada (UsuarioCreate/UsuarioUpdate): revalidar cada e-mail ao serializar respostas é caro
     ativo: bool
     pontuacao_total: int
     partidas_jogadas: int
     vitorias: int
     derrotas: int
+    rating: float
+    partidas_ranqueadas: int
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -42,6 +45,8 @@ class UsuarioRanking(BaseModel):
     vitorias: int
     derrotas: int
     taxa_vitoria: float
+    rating: float
+    partidas_ranqueadas: int
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -55,6 +60,8 @@ class PartidaBase(BaseModel):
     data_fim: Optional[datetime] = None  # Hora de término (opcional)
     duracao_estimada: int = 120  # Duração em minutos (padrão: 2 horas)
     local: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # Coordenadas do local (opcionais, informadas juntas)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     max_participantes: int = 12
     publica: bool = True  # True = pública, False = privada
 
@@ -70,6 +77,8 @@ class PartidaUpdate(BaseModel):
     data_fim: Optional[datetime] = None
     duracao_estimada: Optional[int] = None
     local: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     max_participantes: Optional[int] = None
     status: Optional[StatusPartida] = None
     pontuacao_equipe_a: Optional[int] = None
@@ -93,6 +102,45 @@ class PartidaResponse(PartidaInDB):
     participantes_confirmados: int = 0  # Quantos confirmaram presença
     todos_confirmaram: bool = False  # Se todos os participantes confirmaram
 
+class PartidaProximaResponse(PartidaResponse):
+    distancia_km: float  # Distância até o ponto consultado
+
+class AgendaItemResponse(BaseModel):
+    partida_id: int
+    titulo: str
+    local: Optional[str] = None
+    inicio: datetime
+    fim: datetime  # data_fim ou início + duração estimada
+    status: StatusPartida
+    papel: str  # "organizador" ou "participante"
+    conflito: bool = False  # Começa antes do fim de um item anterior da agenda
+
+class JogadorEquipe(BaseModel):
+    id: int
+    nome: str
+    rating: float
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class EquipesPartidaResponse(BaseModel):
+    partida_id: int
+    equipe_a: List[JogadorEquipe] = []
+    equipe_b: List[JogadorEquipe] = []
+    sem_equipe: List[JogadorEquipe] = []  # Entraram depois da última divisão
+    rating_medio_a: Optional[float] = None
+    rating_medio_b: Optional[float] = None
+
+class ItemListaEspera(BaseModel):
+    usuario_id: int
+    nome: str
+    posicao: int  # 1 = próximo a entrar
+
+class ListaEsperaResponse(BaseModel):
+    partida_id: int
+    total: int
+    posicao: Optional[int] = None  # Posição de quem consulta (null se não estiver na fila)
+    fila: List[ItemListaEspera] = []
+
 # ========== EQUIPE SCHEMAS ==========
 class EquipeBase(BaseModel):
     nome: str
@@ -111,6 +159,7 @@ class EquipeInDB(EquipeBase):
     partidas_jogadas: int
     vitorias: int
     derrotas: int
+    taxa_vitoria: float = 0.0  # % de vitórias
     lider_id: int
     created_at: datetime
     updated_at: Optional[datetime]
@@ -120,7 +169,6 @@ class EquipeInDB(EquipeBase):
 class EquipeResponse(EquipeInDB):
     lider: UsuarioResponse
     membros: List[UsuarioResponse] = []
-    taxa_vitoria: float = 0.0
 
 # ========== CANDIDATURA SCHEMAS ==========
 class CandidaturaBase(BaseModel):
@@ -147,11 +195,24 @@ class CandidaturaResponse(CandidaturaInDB):
     usuario: UsuarioResponse
     partida: PartidaResponse
 
+class CandidaturaFilaResponse(CandidaturaInDB):
+    usuario: UsuarioResponse
+
+class DecisaoCandidaturas(BaseModel):
+    aprovar: List[int] = Field(default_factory=list, max_length=200)  # IDs de candidaturas
+    rejeitar: List[int] = Field(default_factory=list, max_length=200)
+
+class ResultadoDecisaoCandidaturas(BaseModel):
+    partida_id: int
+    aprovadas: List[int]
+    rejeitadas: List[int]
+    total_participantes: int
+
 # ========== AVALIACAO SCHEMAS ==========
 class AvaliacaoBase(BaseModel):
-    nota: int  # 1-5
+    nota: int = Field(..., ge=1, le=5)
     comentario: Optional[str] = None
-    tipo_avaliacao: str  # "partida", "organizador", "jogador"
+    tipo_avaliacao: TipoAvaliacao
 
 class AvaliacaoCreate(AvaliacaoBase):
     partida_id: int
@@ -171,6 +232,18 @@ class AvaliacaoResponse(AvaliacaoInDB):
     avaliado: Optional[UsuarioResponse] = None
     partida: PartidaResponse
 
+class ResumoAvaliacoes(BaseModel):
+    total: int
+    media: Optional[float] = None  # null sem avaliações
+
+class ResumoAvaliacoesPartida(ResumoAvaliacoes):
+    partida_id: int
+
+class ResumoAvaliacoesUsuario(BaseModel):
+    usuario_id: int
+    organizador: ResumoAvaliacoes  # Como organizador de partidas
+    jogador: ResumoAvaliacoes      # Como participante
+
 # ========== AUTH SCHEMAS ==========
 class Token(BaseModel):
     access_token: str
@@ -1,3 +1,6 @@
 from app.services.usuario_service import UsuarioService
 from app.services.auth_service import AuthService
-from app.services.partida_service import PartidaService
\ No newline at end of file
+from app.services.partida_service import PartidaService
+from app.services.equipe_service import EquipeService
+from app.services.avaliacao_service import AvaliacaoService
+from app.services.candidatura_service import CandidaturaService
\ No newline at end of file
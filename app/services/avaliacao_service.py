@@ -0,0 +1,123 @@
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import Avaliacao, Partida, PartidaArquivada, Usuario
+from app.models.enums import StatusPartida, TipoAvaliacao
+from app.repositories import AvaliacaoRepository, PartidaRepository
+from app.schemas import AvaliacaoCreate
+
+
+def _resumo(soma: int, total: int) -> dict:
+    """Média a partir do agregado (soma e quantidade de notas)"""
+    return {"total": total, "media": round(soma / total, 2) if total else None}
+
+
+class AvaliacaoService:
+    """
+    Service das avaliações pós-jogo. As médias vêm dos agregados mantidos a
+    cada avaliação (usuarios/partidas), sem ler as avaliações de novo
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = AvaliacaoRepository(db)
+
+    def avaliar(self, avaliacao_data: AvaliacaoCreate, avaliador: Usuario) -> Avaliacao:
+        """Registrar a avaliação de quem participou (ou organizou) de uma partida finalizada"""
+        partida = PartidaRepository(self.db).get_with_details(avaliacao_data.partida_id)
+        if not partida:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partida não encontrada"
+            )
+        if partida.status != StatusPartida.FINALIZADA:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Apenas partidas finalizadas podem ser avaliadas"
+            )
+        participantes = {participante.id for participante in partida.participantes}
+        if avaliador.id != partida.organizador_id and avaliador.id not in participantes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas quem participou da partida pode avaliá-la"
+            )
+
+        avaliado_id = self._validar_avaliado(avaliacao_data, partida, participantes, avaliador)
+        tipo = avaliacao_data.tipo_avaliacao
+        if self.repository.existe(partida.id, avaliador.id, tipo, avaliado_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Avaliação já registrada"
+            )
+        try:
+            return self.repository.registrar({
+                **avaliacao_data.model_dump(),
+                "avaliado_id": avaliado_id,
+                "avaliador_id": avaliador.id,
+            })
+        except IntegrityError:
+            # Avaliação idêntica gravada entre a verificação e a escrita (ux_avaliacoes_unica)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Avaliação já registrada"
+            )
+
+    def _validar_avaliado(
+        self, avaliacao_data: AvaliacaoCreate, partida: Partida, participantes: set, avaliador: Usuario
+    ) -> Optional[int]:
+        """Avaliado de acordo com o tipo: nenhum (partida), o organizador ou outro participante"""
+        tipo, avaliado_id = avaliacao_data.tipo_avaliacao, avaliacao_data.avaliado_id
+        if tipo == TipoAvaliacao.PARTIDA:
+            if avaliado_id is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Avaliação da partida não tem avaliado"
+                )
+            return None
+        if tipo == TipoAvaliacao.ORGANIZADOR:
+            if avaliado_id not in (None, partida.organizador_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="O avaliado deve ser o organizador da partida"
+                )
+            avaliado_id = partida.organizador_id
+        elif avaliado_id not in participantes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O avaliado deve ser um participante da partida"
+            )
+        if avaliado_id == avaliador.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Não é possível avaliar a si mesmo"
+            )
+        return avaliado_id
+
+    def get_avaliacoes_partida(self, partida_id: int, skip: int = 0, limit: int = 100) -> List[Avaliacao]:
+        """Avaliações de uma partida (paginado)"""
+        return self.repository.get_by_partida(partida_id, skip=skip, limit=limit)
+
+    def get_resumo_partida(self, partida_id: int) -> dict:
+        """Média das avaliações da partida (também de partidas arquivadas)"""
+        partida = self.db.get(Partida, partida_id) or self.db.get(PartidaArquivada, partida_id)
+        if not partida:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partida não encontrada"
+            )
+        return {"partida_id": partida.id, **_resumo(partida.soma_notas, partida.total_avaliacoes)}
+
+    def get_resumo_usuario(self, usuario_id: int) -> dict:
+        """Médias das avaliações recebidas como organizador e como jogador"""
+        usuario = self.db.get(Usuario, usuario_id)
+        if not usuario:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        return {
+            "usuario_id": usuario.id,
+            "organizador": _resumo(usuario.soma_notas_organizador, usuario.avaliacoes_organizador),
+            "jogador": _resumo(usuario.soma_notas_jogador, usuario.avaliacoes_jogador),
+        }
@@ -0,0 +1,195 @@
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.clock import FUSO_BRASIL
+from app.core.eventos import publicar_apos_commit
+from app.models import Candidatura, Partida, Usuario
+from app.models.enums import StatusCandidatura, StatusPartida
+from app.repositories import CandidaturaRepository, PartidaRepository
+from app.schemas import CandidaturaCreate, DecisaoCandidaturas
+from app.utils.agenda import calcular_termino
+from app.utils.categoria_utils import usuario_pode_participar, get_descricao_categoria, parse_categoria
+
+# Status em que a partida ainda aceita novos participantes
+STATUS_ABERTOS = (StatusPartida.ATIVA, StatusPartida.MARCADA)
+
+
+class CandidaturaService:
+    """
+    Service das candidaturas a partidas privadas: o usuário se candidata e o
+    organizador aprova ou rejeita em lote a partir da fila de pendentes
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = CandidaturaRepository(db)
+        self.partida_repo = PartidaRepository(db)
+
+    def candidatar(self, candidatura_data: CandidaturaCreate, usuario: Usuario) -> Candidatura:
+        """Candidatar-se a uma partida privada"""
+        partida = self._get_partida(candidatura_data.partida_id)
+        if partida.status not in STATUS_ABERTOS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Não é possível se candidatar a uma partida {partida.status.value}"
+            )
+        if partida.publica:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Esta partida é pública. Participe diretamente."
+            )
+        if partida.organizador_id == usuario.id or usuario in partida.participantes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Você já está participando desta partida"
+            )
+        categoria_enum = parse_categoria(partida.categoria)
+        if not usuario_pode_participar(usuario.tipo, categoria_enum):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Seu nível não permite participar desta partida. Categoria: {get_descricao_categoria(categoria_enum)}. Seu nível: {usuario.tipo.value}"
+            )
+        if self.repository.get_pendente(partida.id, usuario.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Você já tem uma candidatura pendente para esta partida"
+            )
+        # Conflito de agenda já na candidatura; a decisão confere de novo, para todos os aprovados
+        termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+        conflito = self.partida_repo.get_conflito_agenda(usuario.id, partida.data_partida, termino, excluir_partida_id=partida.id)
+        if conflito:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Conflito de horário com a partida '{conflito.titulo}' "
+                       f"({conflito.data_partida.astimezone(FUSO_BRASIL).strftime('%d/%m/%Y %H:%M')})"
+            )
+        return self.repository.create({
+            "partida_id": partida.id,
+            "usuario_id": usuario.id,
+            "mensagem": candidatura_data.mensagem,
+            "status": StatusCandidatura.PENDENTE,
+        })
+
+    def cancelar(self, candidatura_id: int, usuario: Usuario) -> bool:
+        """Cancelar a própria candidatura pendente"""
+        candidatura = self.repository.get(candidatura_id)
+        if not candidatura or candidatura.usuario_id != usuario.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Candidatura não encontrada"
+            )
+        if candidatura.status != StatusCandidatura.PENDENTE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Apenas candidaturas pendentes podem ser canceladas"
+            )
+        return self.repository.delete(candidatura_id)
+
+    def get_minhas(self, usuario: Usuario, skip: int = 0, limit: int = 100) -> List[Candidatura]:
+        """Candidaturas do usuário"""
+        return self.repository.get_by_usuario(usuario.id, skip=skip, limit=limit)
+
+    def get_fila(
+        self, partida_id: int, current_user: Usuario,
+        status_candidatura: StatusCandidatura = StatusCandidatura.PENDENTE, skip: int = 0, limit: int = 100
+    ) -> List[Candidatura]:
+        """Fila de candidaturas da partida (apenas organizador)"""
+        partida = self._get_partida(partida_id)
+        self._verificar_organizador(partida, current_user)
+        return self.repository.get_fila(partida.id, status=status_candidatura, skip=skip, limit=limit)
+
+    def decidir(self, partida_id: int, decisao: DecisaoCandidaturas, current_user: Usuario) -> dict:
+        """
+        Aprovar e rejeitar candidaturas pendentes de uma vez (apenas organizador).
+        Uma única verificação de vagas e de agenda para todos os aprovados, com a
+        partida bloqueada; tudo ou nada
+        """
+        partida = self._get_partida(partida_id)
+        self._verificar_organizador(partida, current_user)
+        if partida.status not in STATUS_ABERTOS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Não é possível decidir candidaturas de uma partida {partida.status.value}"
+            )
+        aprovar, rejeitar = set(decisao.aprovar), set(decisao.rejeitar)
+        if aprovar & rejeitar:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Candidaturas em aprovar e rejeitar ao mesmo tempo: {sorted(aprovar & rejeitar)}"
+            )
+
+        try:
+            # Decisões simultâneas na mesma partida contam as vagas uma depois da outra
+            self.partida_repo.bloquear(partida.id)
+            candidaturas = {c.id: c for c in self.repository.get_pendentes_por_ids(partida.id, list(aprovar | rejeitar))}
+            invalidas = sorted((aprovar | rejeitar) - set(candidaturas))
+            if invalidas:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Candidaturas não pendentes ou de outra partida: {invalidas}"
+                )
+            aprovadas = sorted((candidaturas[i] for i in aprovar), key=lambda c: (c.created_at, c.id))
+            rejeitadas = [candidaturas[i] for i in sorted(rejeitar)]
+
+            # Quem entrou por convite depois de se candidatar só tem a candidatura aprovada
+            ja_participam = {participante.id for participante in partida.participantes}
+            novos = [c.usuario_id for c in aprovadas if c.usuario_id not in ja_participam]
+            vagas = partida.max_participantes - self.repository.contar_participantes(partida.id)
+            if len(novos) > vagas:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Vagas insuficientes: {max(vagas, 0)} vaga(s) para {len(novos)} aprovação(ões)"
+                )
+            # Quem entrou em outra partida no mesmo horário depois de se candidatar não pode ser aprovado
+            termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+            em_conflito = self.partida_repo.get_usuarios_em_conflito(novos, partida.data_partida, termino, excluir_partida_id=partida.id)
+            if em_conflito:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Conflito de horário para as candidaturas: {[c.id for c in aprovadas if c.usuario_id in em_conflito]}"
+                )
+            self.repository.decidir(aprovadas, rejeitadas)
+            self.repository.adicionar_participantes(partida.id, novos)
+            self.partida_repo.sair_listas_espera_sobrepostas(novos, partida.data_partida, termino)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.refresh(partida)
+        total = len(partida.participantes)
+        for candidatura in aprovadas:
+            if candidatura.usuario_id in ja_participam:
+                continue
+            publicar_apos_commit(
+                self.db, partida.id, "participante_entrou",
+                usuario_id=candidatura.usuario_id, nome=candidatura.usuario.nome,
+                candidatura_id=candidatura.id, total_participantes=total
+            )
+        if novos:
+            # Atualizar status da partida (pode mudar para MARCADA se todos confirmaram)
+            from app.utils.partida_status import atualizar_status_partida
+            atualizar_status_partida(partida, self.db)
+        return {
+            "partida_id": partida.id,
+            "aprovadas": [c.id for c in aprovadas],
+            "rejeitadas": [c.id for c in rejeitadas],
+            "total_participantes": total,
+        }
+
+    def _get_partida(self, partida_id: int) -> Partida:
+        partida = self.partida_repo.get_with_details(partida_id)
+        if not partida:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partida não encontrada"
+            )
+        return partida
+
+    @staticmethod
+    def _verificar_organizador(partida: Partida, current_user: Usuario):
+        if partida.organizador_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas o organizador pode gerenciar as candidaturas"
+            )
@@ -1,14 +1,17 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from datetime import datetime, timedelta
+from datetime import timedelta
+from app.core.clock import agora, para_utc, FUSO_BRASIL
+from app.core.eventos import publicar_apos_commit
 from app.repositories.convite_repository import ConviteRepository
 from app.repositories.usuario_repository import UsuarioRepository
 from app.repositories.partida_repository import PartidaRepository
 from app.schemas.schemas import ConviteCreate, ConviteUpdate, ConviteResponse
 from app.models.models import Convite
 from app.models.enums import StatusConvite, CategoriaPartida, StatusPartida
-from app.utils.categoria_utils import usuario_pode_participar, get_descricao_categoria
+from app.utils.agenda import calcular_termino
+from app.utils.categoria_utils import usuario_pode_participar, get_descricao_categoria, parse_categoria
 
 
 class ConviteService:
@@ -69,7 +72,7 @@ class ConviteService:
             )
         
         # Verificar se usuário pode participar da categoria da partida
-        categoria_enum = CategoriaPartida(partida.categoria) if isinstance(partida.categoria, str) else partida.categoria
+        categoria_enum = parse_categoria(partida.categoria)
         if not usuario_pode_participar(convidado.tipo, categoria_enum):
             categoria_desc = get_descricao_categoria(categoria_enum)
             raise HTTPException(
@@ -101,7 +104,7 @@ class ConviteService:
         # Criar o convite
         convite_data_dict = {
             "mensagem": convite_data.mensagem,
-            "data_expiracao": convite_data.data_expiracao or (datetime.now() + timedelta(days=7)),
+            "data_expiracao": para_utc(convite_data.data_expiracao, FUSO_BRASIL) or (agora() + timedelta(days=7)),
             "mandante_id": mandante_id,
             "convidado_id": convite_data.convidado_id,
             "partida_id": convite_data.partida_id,
@@ -135,7 +138,8 @@ class ConviteService:
     def aceitar_convite(self, convite_id: int, usuario_id: int) -> ConviteResponse:
         """Aceitar um convite e adicionar o usuário à partida com vínculo de quem convidou"""
         
-        # Aceitar o convite
+        # Aceitar o convite. Se alguma verificação abaixo falhar, a unidade de trabalho
+        # da requisição desfaz a aceitação junto com o resto (nada é gravado)
         convite = self.convite_repo.aceitar_convite(convite_id, usuario_id)
         if not convite:
             raise HTTPException(
@@ -150,9 +154,6 @@ class ConviteService:
         if partida and usuario:
             # Verificar se a partida está finalizada ou cancelada
             if partida.status in [StatusPartida.FINALIZADA, StatusPartida.CANCELADA]:
-                # Reverter o status do convite
-                convite.status = StatusConvite.PENDENTE
-                self.db.commit()
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Não é possível aceitar convite de partida {partida.status.value}"
@@ -160,9 +161,6 @@ class ConviteService:
             
             # Verificar se a partida já começou
             if partida.status == StatusPartida.EM_ANDAMENTO:
-                # Reverter o status do convite
-                convite.status = StatusConvite.PENDENTE
-                self.db.commit()
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Não é possível aceitar convite de partida que já está em andamento"
@@ -170,34 +168,48 @@ class ConviteService:
             
             # Verificar se não está lotada
             if len(partida.participantes) >= partida.max_participantes:
-                # Reverter o status do convite
-                convite.status = StatusConvite.PENDENTE
-                self.db.commit()
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="A partida já atingiu o número máximo de participantes"
                 )
             
+            # Verificar se o horário não conflita com outra partida do usuário
+            termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+            conflito = self.partida_repo.get_conflito_agenda(
+                usuario.id, partida.data_partida, termino, excluir_partida_id=partida.id
+            )
+            if conflito:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Conflito de horário com a partida '{conflito.titulo}' "
+                           f"({conflito.data_partida.astimezone(FUSO_BRASIL).strftime('%d/%m/%Y %H:%M')})"
+                )
+            
             # Adicionar à partida se ainda não estiver, registrando quem convidou
             # CONFIRMA AUTOMATICAMENTE ao aceitar convite
             if usuario not in partida.participantes:
                 # Inserir manualmente com o campo convidado_por_id
                 from app.models.models import partida_participantes
                 from sqlalchemy import insert
-                from app.utils.partida_status import get_horario_brasil, atualizar_status_partida
-                
-                agora = get_horario_brasil()
+                from app.utils.partida_status import atualizar_status_partida
                 
                 stmt = insert(partida_participantes).values(
                     partida_id=partida.id,
                     usuario_id=usuario.id,
                     convidado_por_id=convite.mandante_id,  # Registra quem convidou
                     confirmado=True,  # JÁ CONFIRMADO AUTOMATICAMENTE
-                    data_confirmacao=agora  # Data da confirmação
+                    data_confirmacao=agora()  # Data da confirmação
                 )
                 self.db.execute(stmt)
+                # Se estava na fila desta ou de outra partida no mesmo horário, sai dela
+                self.partida_repo.sair_listas_espera_sobrepostas([usuario.id], partida.data_partida, termino)
                 self.db.commit()
                 self.db.refresh(partida)
+                publicar_apos_commit(
+                    self.db, partida.id, "participante_entrou",
+                    usuario_id=usuario.id, nome=usuario.nome, convidado_por_id=convite.mandante_id,
+                    total_participantes=len(partida.participantes)
+                )
                 
                 # Atualizar status da partida (pode mudar para MARCADA se todos confirmaram)
                 atualizar_status_partida(partida, self.db)
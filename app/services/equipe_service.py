@@ -0,0 +1,106 @@
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.models import Equipe, Usuario
+from app.repositories import EquipeRepository, UsuarioRepository
+from app.schemas import EquipeCreate, EquipeUpdate
+
+
+class EquipeService:
+    """
+    Service para lógica de negócio das equipes
+    Os totais (partidas, vitórias, pontos e taxa de vitória) não são editáveis:
+    são somados ao finalizar cada partida em que membros jogaram
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = EquipeRepository(db)
+
+    def create_equipe(self, equipe_data: EquipeCreate, lider: Usuario) -> Equipe:
+        """Criar equipe com o usuário como líder e primeiro membro"""
+        equipe = self.repository.create({**equipe_data.model_dump(), "lider_id": lider.id})
+        self.repository.adicionar_membro(equipe.id, lider.id)
+        return self.get_equipe(equipe.id)
+
+    def get_equipe(self, equipe_id: int) -> Equipe:
+        """Buscar equipe com líder e membros"""
+        equipe = self.repository.get_with_members(equipe_id)
+        if not equipe:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Equipe não encontrada"
+            )
+        return equipe
+
+    def get_equipes(self, skip: int = 0, limit: int = 100) -> List[Equipe]:
+        """Listar equipes"""
+        return self.repository.get_multi(skip=skip, limit=limit)
+
+    def get_minhas_equipes(self, usuario: Usuario) -> List[Equipe]:
+        """Equipes lideradas pelo usuário"""
+        return self.repository.get_by_lider(usuario.id)
+
+    def get_ranking(self, limit: int = 10) -> List[Equipe]:
+        """Ranking por pontuação acumulada"""
+        return self.repository.get_ranking(limit=limit)
+
+    def get_melhores_equipes(self, limit: int = 10, min_partidas: int = 1) -> List[Equipe]:
+        """Melhores equipes por taxa de vitória"""
+        return self.repository.get_melhores_equipes(limit=limit, min_partidas=min_partidas)
+
+    def update_equipe(self, equipe_id: int, equipe_data: EquipeUpdate, current_user: Usuario) -> Equipe:
+        """Atualizar nome/descrição (apenas líder)"""
+        equipe = self._get_como_lider(equipe_id, current_user)
+        self.repository.update(equipe, equipe_data.model_dump(exclude_unset=True))
+        return self.get_equipe(equipe_id)
+
+    def delete_equipe(self, equipe_id: int, current_user: Usuario) -> bool:
+        """Excluir equipe (apenas líder)"""
+        self._get_como_lider(equipe_id, current_user)
+        return self.repository.delete(equipe_id)
+
+    def adicionar_membro(self, equipe_id: int, usuario_id: int, current_user: Usuario) -> Equipe:
+        """Adicionar membro (apenas líder)"""
+        equipe = self._get_como_lider(equipe_id, current_user)
+        if not UsuarioRepository(self.db).get(usuario_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        if any(membro.id == usuario_id for membro in equipe.membros):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Usuário já é membro da equipe"
+            )
+        self.repository.adicionar_membro(equipe_id, usuario_id)
+        return self.get_equipe(equipe_id)
+
+    def remover_membro(self, equipe_id: int, usuario_id: int, current_user: Usuario) -> Equipe:
+        """Remover membro (o líder remove qualquer um; o membro pode sair)"""
+        equipe = self.get_equipe(equipe_id)
+        if current_user.id not in (equipe.lider_id, usuario_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas o líder pode remover outros membros"
+            )
+        if usuario_id == equipe.lider_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O líder não pode sair da equipe"
+            )
+        if not self.repository.remover_membro(equipe_id, usuario_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Usuário não é membro da equipe"
+            )
+        return self.get_equipe(equipe_id)
+
+    def _get_como_lider(self, equipe_id: int, current_user: Usuario) -> Equipe:
+        equipe = self.get_equipe(equipe_id)
+        if equipe.lider_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas o líder pode alterar a equipe"
+            )
+        return equipe
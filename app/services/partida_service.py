@@ -1,13 +1,23 @@
+import heapq
+import math
 from datetime import datetime, timedelta
-from typing import List, Optional
+from itertools import islice
+from typing import List, Optional, Tuple, Union
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-import pytz  # type: ignore
-from app.models import Partida, Usuario
-from app.models.enums import StatusPartida, TipoPartida, TipoUsuario, CategoriaPartida
+from app.models import Partida, PartidaArquivada, Usuario
+from app.models.enums import StatusPartida, TipoPartida, TipoUsuario, CategoriaPartida, LadoEquipe
+from app.core.clock import agora, agora_brasil, para_utc, FUSO_BRASIL
+from app.core.eventos import publicar_apos_commit
 from app.repositories import PartidaRepository
+from app.repositories.arquivo_repository import ArquivoRepository
 from app.schemas import PartidaCreate, PartidaUpdate, StatusResponse
-from app.utils.categoria_utils import usuario_pode_participar, get_descricao_categoria
+from app.utils.agenda import calcular_termino, mesclar_agenda
+from app.utils.busca import interpretar_consulta, ranquear
+from app.utils.equipes import dividir_equipes
+from app.utils.geo import faixas_de_celulas, haversine_km
+from app.utils.rating import peso_partida, resultado_equipe_a, variacoes_partida
+from app.utils.categoria_utils import usuario_pode_participar, get_descricao_categoria, parse_categoria, filtrar_partidas_acessiveis
 from app.utils.partida_status import (
     atualizar_status_partida, 
     verificar_confirmacoes,
@@ -16,10 +26,13 @@ from app.utils.partida_status import (
 )
 
 
-def get_horario_brasil() -> datetime:
-    """Retorna o horário atual no timezone do Brasil (America/Sao_Paulo)"""
-    tz_brasil = pytz.timezone('America/Sao_Paulo')
-    return datetime.now(tz_brasil)
+def _finalizada_com_placar(partida: Partida) -> bool:
+    """Finalizada por finalizar_partida (placar sem empate), não só pelo horário (placar padrão 0 x 0)"""
+    return (
+        partida.status == StatusPartida.FINALIZADA
+        and partida.pontuacao_equipe_a is not None and partida.pontuacao_equipe_b is not None
+        and partida.pontuacao_equipe_a != partida.pontuacao_equipe_b
+    )
 
 
 class PartidaService:
@@ -31,32 +44,22 @@ class PartidaService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = PartidaRepository(db)
+        self.arquivo = ArquivoRepository(db)
     
     def create_partida(self, partida_data: PartidaCreate, organizador: Usuario) -> Partida:
         """Criar nova partida"""
         # Validar se organizador pode criar partida do tipo especificado
         self._validate_organizador_permissions(organizador, partida_data.tipo)
         
-        # Validar data da partida usando horário do Brasil
-        # Permite criar partida no mesmo dia, desde que seja pelo menos 1 minuto no futuro
-        agora_brasil = get_horario_brasil()
-        minimo_permitido = agora_brasil + timedelta(minutes=1)
-        
-        # Tornar data_partida aware se não for
-        data_partida = partida_data.data_partida
-        if data_partida.tzinfo is None:
-            # Se não tem timezone, assume que é horário do Brasil
-            tz_brasil = pytz.timezone('America/Sao_Paulo')
-            data_partida = tz_brasil.localize(data_partida)
-        
-        if data_partida < minimo_permitido:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Data da partida deve ser pelo menos 1 minuto no futuro. Horário atual (Brasil): {agora_brasil.strftime('%d/%m/%Y %H:%M')}"
-            )
+        # Validar data da partida (pelo menos 1 minuto no futuro)
+        # Datas sem fuso são interpretadas no horário do Brasil e gravadas em UTC
+        data_partida = self._validar_data_partida(partida_data.data_partida)
+        self._validar_coordenadas(partida_data.latitude, partida_data.longitude)
         
         # Criar partida
         partida_dict = partida_data.dict()
+        partida_dict['data_partida'] = data_partida
+        partida_dict['data_fim'] = para_utc(partida_data.data_fim, FUSO_BRASIL)
         partida_dict['organizador_id'] = organizador.id
         
         return self.repository.create(partida_dict)
@@ -76,27 +79,26 @@ class PartidaService:
         if partida_data.tipo:
             self._validate_organizador_permissions(current_user, partida_data.tipo)
         
-        # Validar nova data se especificada (horário do Brasil, pelo menos 1 minuto no futuro)
-        if partida_data.data_partida:
-            agora_brasil = get_horario_brasil()
-            minimo_permitido = agora_brasil + timedelta(minutes=1)
-            
-            # Tornar data_partida aware se não for
-            data_partida = partida_data.data_partida
-            if data_partida.tzinfo is None:
-                tz_brasil = pytz.timezone('America/Sao_Paulo')
-                data_partida = tz_brasil.localize(data_partida)
-            
-            if data_partida < minimo_permitido:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Data da partida deve ser pelo menos 1 minuto no futuro. Horário atual (Brasil): {agora_brasil.strftime('%d/%m/%Y %H:%M')}"
-                )
-        
         # Atualizar apenas campos não nulos
         update_data = {k: v for k, v in partida_data.dict().items() if v is not None}
         
-        return self.repository.update(partida, update_data)
+        # Validar nova data se especificada (pelo menos 1 minuto no futuro)
+        if partida_data.data_partida:
+            update_data['data_partida'] = self._validar_data_partida(partida_data.data_partida)
+        if partida_data.data_fim:
+            update_data['data_fim'] = para_utc(partida_data.data_fim, FUSO_BRASIL)
+        if partida_data.latitude is not None or partida_data.longitude is not None:
+            self._validar_coordenadas(partida_data.latitude, partida_data.longitude)
+        
+        partida = self.repository.update(partida, update_data)
+        if partida_data.max_participantes is not None:
+            # Vagas novas vão primeiro para a lista de espera
+            promovidos = self._promover_lista_espera(partida)
+            if promovidos:
+                self.db.commit()
+                self.db.refresh(partida)
+                self._publicar_promovidos(partida, promovidos)
+        return partida
     
     def get_partida(self, partida_id: int) -> Partida:
         """Buscar partida por ID e atualizar seu status automaticamente"""
@@ -106,7 +108,23 @@ class PartidaService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Partida não encontrada"
             )
-        
+        return self._completar_partida(partida)
+    
+    def get_partida_ou_arquivada(self, partida_id: int) -> Union[Partida, PartidaArquivada]:
+        """Buscar partida para leitura: nas tabelas quentes e, se não estiver lá, no arquivo"""
+        partida = self.repository.get_with_details(partida_id)
+        if partida is not None:
+            return self._completar_partida(partida)
+        arquivada = self.arquivo.get_partida(partida_id)
+        if arquivada is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partida não encontrada"
+            )
+        return arquivada
+    
+    def _completar_partida(self, partida: Partida) -> Partida:
+        """Atualizar o status pelo horário e anexar as informações de confirmação"""
         # Atualizar status automaticamente baseado no horário e confirmações
         atualizar_status_partida(partida, self.db)
         
@@ -119,48 +137,192 @@ class PartidaService:
     
     def get_partidas_ativas(self, skip: int = 0, limit: int = 100, categoria: Optional[str] = None, usuario: Optional[Usuario] = None) -> List[Partida]:
         """Listar TODAS as partidas (independente do status) com filtros opcionais"""
+        # Elegibilidade resolvida no banco pelo nível gravado no usuário (sem filtrar página em Python)
+        nivel = usuario.nivel if usuario else None
         if categoria:
-            partidas = self.repository.get_by_categoria_todas(categoria, skip=skip, limit=limit)
-        else:
-            partidas = self.repository.get_todas(skip=skip, limit=limit)
-        
-        # Filtrar partidas acessíveis ao usuário se solicitado
-        if usuario:
-            partidas_acessiveis = []
-            for partida in partidas:
-                # Verificar se a partida tem categoria definida
-                if hasattr(partida, 'categoria') and partida.categoria:
-                    try:
-                        categoria_enum = CategoriaPartida(partida.categoria) if isinstance(partida.categoria, str) else partida.categoria
-                        if usuario_pode_participar(usuario.tipo, categoria_enum):
-                            partidas_acessiveis.append(partida)
-                    except ValueError:
-                        # Se não conseguir converter, assume LIVRE para retrocompatibilidade
-                        if usuario_pode_participar(usuario.tipo, CategoriaPartida.LIVRE):
-                            partidas_acessiveis.append(partida)
-                else:
-                    # Se não tem categoria, assume LIVRE (para retrocompatibilidade)
-                    if usuario_pode_participar(usuario.tipo, CategoriaPartida.LIVRE):
-                        partidas_acessiveis.append(partida)
-            return partidas_acessiveis
-        
+            return self.repository.get_by_categoria_todas(categoria, skip=skip, limit=limit, nivel=nivel)
+        return self.repository.get_todas(skip=skip, limit=limit, nivel=nivel)
+    
+    def get_partidas_por_ids(
+        self, ids: List[int], usuario: Optional[Usuario] = None
+    ) -> Tuple[List[Union[Partida, PartidaArquivada]], List[int]]:
+        """
+        Resolver um lote de ids na ordem pedida: um IN nas tabelas quentes e, só para
+        os que faltarem, um IN no arquivo. Devolve (partidas, ids não encontrados).
+        O status fica como está gravado (como nas demais listagens); as confirmações
+        vêm de um único GROUP BY para o lote. Com usuário, o lote (quentes e
+        arquivadas) é filtrado em uma passada pelo nível dele; as omitidas não
+        contam como não encontradas
+        """
+        por_id = {partida.id: partida for partida in self.repository.get_por_ids(ids)}
+        confirmados = self.repository.contar_confirmados(list(por_id))
+        for partida in por_id.values():
+            partida.participantes_confirmados = confirmados.get(partida.id, 0)
+            partida.todos_confirmaram = bool(partida.participantes) and partida.participantes_confirmados == len(partida.participantes)
+        faltando = [partida_id for partida_id in ids if partida_id not in por_id]
+        por_id.update((partida.id, partida) for partida in self.arquivo.get_partidas_por_ids(faltando))
+        partidas = [por_id[partida_id] for partida_id in ids if partida_id in por_id]
+        if usuario is not None:
+            partidas = filtrar_partidas_acessiveis(usuario.nivel, partidas)
+        return partidas, [partida_id for partida_id in ids if partida_id not in por_id]
+    
+    # Correspondências mais recentes consideradas no ranqueamento
+    JANELA_BUSCA = 1000
+
+    def buscar_partidas(
+        self,
+        q: str,
+        status_partida: Optional[StatusPartida] = None,
+        categoria: Optional[str] = None,
+        usuario: Optional[Usuario] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Partida]:
+        """
+        Busca textual em título, descrição e local (sem acentos, termos em AND,
+        último termo como prefixo). Um dia da semana na consulta ("vôlei sábado")
+        vira filtro pela data da partida.
+
+        O banco devolve as correspondências mais recentes (janela) já filtradas;
+        a relevância (título > local > descrição) é calculada aqui.
+        """
+        consulta = interpretar_consulta(q)
+        if not consulta.termos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe ao menos um termo de busca"
+            )
+
+        candidatos = self.repository.buscar_candidatos(
+            consulta,
+            janela=self.JANELA_BUSCA,
+            status=status_partida,
+            categoria=categoria,
+            nivel=usuario.nivel if usuario else None
+        )
+        ids = ranquear(consulta.termos, candidatos)[skip:skip + limit]
+        return self.repository.get_por_ids(ids)
+    
+    # Raio da primeira rodada da busca por proximidade (cresce até o raio pedido)
+    RAIO_INICIAL_KM = 1.0
+
+    def get_partidas_proximas_de(
+        self,
+        latitude: float,
+        longitude: float,
+        raio_km: float,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Partida]:
+        """
+        Próximas partidas ativas com coordenadas dentro do raio, ordenadas por
+        distância e horário de início (cada partida recebe `distancia_km`).
+
+        As células da grade pré-filtram no índice e a distância haversine refina.
+        O raio começa pequeno e cresce (pela densidade observada) até o pedido:
+        quando um raio menor já tem partidas suficientes para a página, nenhuma
+        fora dele seria mais próxima.
+        """
+        necessarias = skip + limit
+        desde = agora()
+        raio = min(self.RAIO_INICIAL_KM, raio_km)
+        while True:
+            candidatas = self.repository.get_coordenadas_nas_celulas(
+                faixas_de_celulas(latitude, longitude, raio), desde
+            )
+            dentro = []
+            for partida_id, lat, lon, data_partida in candidatas:
+                distancia = haversine_km(latitude, longitude, lat, lon)
+                if distancia <= raio:
+                    dentro.append((distancia, data_partida, partida_id))
+            if len(dentro) >= necessarias or raio >= raio_km:
+                break
+            # Próximo raio pela densidade observada (área cresce com o quadrado do raio), com folga
+            if dentro:
+                fator = 1.2 * math.sqrt(necessarias / len(dentro))
+            else:
+                fator = 4.0
+            raio = min(raio * max(2.0, fator), raio_km)
+
+        pagina = sorted(dentro)[skip:skip + limit]
+        distancias = {partida_id: distancia for distancia, _, partida_id in pagina}
+        partidas = self.repository.get_por_ids(list(distancias))
+        for partida in partidas:
+            partida.distancia_km = round(distancias[partida.id], 3)
         return partidas
     
+    # Maior período aceito em uma consulta de agenda
+    PERIODO_MAXIMO_AGENDA = timedelta(days=180)
+
+    def get_agenda(self, usuario_id: int, desde: Optional[datetime] = None, ate: Optional[datetime] = None) -> List[dict]:
+        """
+        Linha do tempo do usuário no período (padrão: próximos 30 dias): partidas
+        em que participa e que organiza, em ordem de início. As duas listas vêm
+        ordenadas do banco (cada uma por índice) e são intercaladas em uma passada.
+        """
+        desde = para_utc(desde, FUSO_BRASIL) if desde else agora()
+        ate = para_utc(ate, FUSO_BRASIL) if ate else desde + timedelta(days=30)
+        if ate <= desde or ate - desde > self.PERIODO_MAXIMO_AGENDA:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Período inválido: 'ate' deve ser posterior a 'desde' e o intervalo de no máximo {self.PERIODO_MAXIMO_AGENDA.days} dias"
+            )
+
+        agenda = mesclar_agenda(
+            self.repository.get_agenda_participante(usuario_id, desde, ate),
+            self.repository.get_agenda_organizador(usuario_id, desde, ate)
+        )
+        return [
+            {
+                "partida_id": partida.id,
+                "titulo": partida.titulo,
+                "local": partida.local,
+                "inicio": partida.data_partida,
+                "fim": partida.data_termino,
+                "status": partida.status,
+                "papel": "organizador" if partida.organizador_id == usuario_id else "participante",
+                "conflito": conflito,
+            }
+            for partida, conflito in agenda
+        ]
+    
     def get_partidas_by_tipo(self, tipo: TipoPartida, skip: int = 0, limit: int = 100) -> List[Partida]:
         """Listar partidas por tipo"""
         return self.repository.get_by_tipo(tipo, skip=skip, limit=limit)
     
     def get_proximas_partidas(self, skip: int = 0, limit: int = 100) -> List[Partida]:
         """Listar próximas partidas"""
-        return self.repository.get_proximas(datetime.now(), skip=skip, limit=limit)
+        return self.repository.get_proximas(agora(), skip=skip, limit=limit)
     
     def get_minhas_partidas(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Partida]:
-        """Listar partidas organizadas pelo usuário"""
-        return self.repository.get_by_organizador(user_id, skip=skip, limit=limit)
+        """Listar partidas organizadas pelo usuário (inclui as arquivadas)"""
+        return self._mesclar_com_arquivo(
+            self.repository.get_by_organizador(user_id, skip=0, limit=skip + limit),
+            self.arquivo.get_by_organizador(user_id, limit=skip + limit),
+            chave=lambda p: (p.created_at, p.id),
+            skip=skip,
+            limit=limit
+        )
     
     def get_partidas_participando(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Partida]:
-        """Listar partidas onde usuário está participando"""
-        return self.repository.get_participando(user_id, skip=skip, limit=limit)
+        """Listar partidas onde usuário está participando (inclui as arquivadas)"""
+        return self._mesclar_com_arquivo(
+            self.repository.get_participando(user_id, skip=0, limit=skip + limit),
+            self.arquivo.get_participando(user_id, limit=skip + limit),
+            chave=lambda p: (p.data_partida, p.id),
+            skip=skip,
+            limit=limit
+        )
+    
+    @staticmethod
+    def _mesclar_com_arquivo(quentes: list, arquivadas: list, chave, skip: int, limit: int) -> list:
+        """
+        Página de um histórico que atravessa tabelas quentes e arquivo: as duas
+        listas vêm na mesma ordem (decrescente por `chave`) com skip + limit itens cada
+        """
+        if not arquivadas:
+            return quentes[skip:skip + limit]
+        return list(islice(heapq.merge(quentes, arquivadas, key=chave, reverse=True), skip, skip + limit))
     
     def ativar_partida(self, partida_id: int, current_user: Usuario) -> Partida:
         """Ativar partida"""
@@ -189,7 +351,56 @@ class PartidaService:
     def participar_partida(self, partida_id: int, usuario: Usuario) -> Partida:
         """Usuário se inscreve para participar de uma partida pública"""
         partida = self.get_partida(partida_id)
+        self._validar_entrada(partida, usuario)
+        
+        # Verificar se não está lotada
+        if len(partida.participantes) >= partida.max_participantes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Partida já atingiu o número máximo de participantes. Entre na lista de espera."
+            )
+        
+        # Verificar se usuário já está participando
+        if usuario in partida.participantes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Você já está participando desta partida"
+            )
+        
+        # Verificar se o horário não conflita com outra partida do usuário
+        self._verificar_conflito_agenda(usuario, partida)
+        
+        # Adicionar usuário à partida (sem convidado_por_id - entrada direta)
+        # CONFIRMA AUTOMATICAMENTE ao entrar
+        from app.models.models import partida_participantes
+        from sqlalchemy import insert
         
+        stmt = insert(partida_participantes).values(
+            partida_id=partida.id,
+            usuario_id=usuario.id,
+            convidado_por_id=None,  # Entrada direta, sem convite
+            confirmado=True,  # JÁ CONFIRMADO AUTOMATICAMENTE
+            data_confirmacao=agora()  # Data da confirmação
+        )
+        self.db.execute(stmt)
+        # Quem entra deixa de esperar por partidas no mesmo horário
+        termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+        self.repository.sair_listas_espera_sobrepostas([usuario.id], partida.data_partida, termino)
+        self.db.commit()
+        self.db.refresh(partida)
+        publicar_apos_commit(
+            self.db, partida.id, "participante_entrou",
+            usuario_id=usuario.id, nome=usuario.nome, total_participantes=len(partida.participantes)
+        )
+        
+        # Atualizar status da partida (pode mudar para MARCADA se todos confirmaram)
+        from app.utils.partida_status import atualizar_status_partida
+        atualizar_status_partida(partida, self.db)
+        
+        return partida
+    
+    def _validar_entrada(self, partida: Partida, usuario: Usuario):
+        """Regras para entrar na partida ou na lista de espera dela"""
         # Verificar se a partida está finalizada ou cancelada
         if partida.status in [StatusPartida.FINALIZADA, StatusPartida.CANCELADA]:
             raise HTTPException(
@@ -212,52 +423,92 @@ class PartidaService:
             )
         
         # Verificar se usuário pode participar da categoria
-        categoria_enum = CategoriaPartida(partida.categoria) if isinstance(partida.categoria, str) else partida.categoria
+        categoria_enum = parse_categoria(partida.categoria)
         if not usuario_pode_participar(usuario.tipo, categoria_enum):
             categoria_desc = get_descricao_categoria(categoria_enum)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Seu nível não permite participar desta partida. Categoria: {categoria_desc}. Seu nível: {usuario.tipo.value}"
             )
+    
+    def entrar_lista_espera(self, partida_id: int, usuario: Usuario) -> dict:
+        """Usuário entra no fim da lista de espera de uma partida lotada"""
+        partida = self.get_partida(partida_id)
+        self._validar_entrada(partida, usuario)
         
-        # Verificar se não está lotada
-        if len(partida.participantes) >= partida.max_participantes:
+        if usuario in partida.participantes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Partida já atingiu o número máximo de participantes"
+                detail="Você já está participando desta partida"
             )
-        
-        # Verificar se usuário já está participando
-        if usuario in partida.participantes:
+        if len(partida.participantes) < partida.max_participantes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Você já está participando desta partida"
+                detail="A partida tem vagas. Participe diretamente."
             )
+        if usuario in self.repository.get_lista_espera(partida.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Você já está na lista de espera desta partida"
+            )
+        self._verificar_conflito_agenda(usuario, partida)
         
-        # Adicionar usuário à partida (sem convidado_por_id - entrada direta)
-        # CONFIRMA AUTOMATICAMENTE ao entrar
-        from app.models.models import partida_participantes
-        from sqlalchemy import insert
-        from app.utils.partida_status import get_horario_brasil
-        
-        agora = get_horario_brasil()
-        
-        stmt = insert(partida_participantes).values(
-            partida_id=partida.id,
-            usuario_id=usuario.id,
-            convidado_por_id=None,  # Entrada direta, sem convite
-            confirmado=True,  # JÁ CONFIRMADO AUTOMATICAMENTE
-            data_confirmacao=agora  # Data da confirmação
-        )
-        self.db.execute(stmt)
+        self.repository.entrar_lista_espera(partida.id, usuario.id)
         self.db.commit()
-        self.db.refresh(partida)
+        return self.get_lista_espera(partida.id, usuario)
+    
+    def sair_lista_espera(self, partida_id: int, usuario: Usuario) -> dict:
+        """Usuário sai da lista de espera"""
+        partida = self.get_partida(partida_id)
+        if not self.repository.sair_lista_espera(partida.id, usuario.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Você não está na lista de espera desta partida"
+            )
+        self.db.commit()
+        return self.get_lista_espera(partida.id, usuario)
+    
+    def get_lista_espera(self, partida_id: int, usuario: Usuario) -> dict:
+        """Fila de espera da partida e a posição do usuário nela (null se não estiver)"""
+        fila = self.repository.get_lista_espera(partida_id)
+        posicoes = {espera.id: posicao for posicao, espera in enumerate(fila, start=1)}
+        return {
+            "partida_id": partida_id,
+            "total": len(fila),
+            "posicao": posicoes.get(usuario.id),
+            "fila": [
+                {"usuario_id": espera.id, "nome": espera.nome, "posicao": posicoes[espera.id]}
+                for espera in fila
+            ],
+        }
+    
+    def _promover_lista_espera(self, partida: Partida) -> List[int]:
+        """
+        Preencher as vagas abertas com os primeiros da lista de espera, na mesma
+        transação da saída/remoção (quem chama faz o commit e publica os eventos)
+        """
+        self.db.flush()
+        vagas = partida.max_participantes - len(partida.participantes)
+        if vagas <= 0:
+            return []
+        termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+        return self.repository.promover_lista_espera(partida.id, vagas, partida.data_partida, termino)
+    
+    def _publicar_promovidos(self, partida: Partida, promovidos: List[int]):
+        """Avisar o lobby de quem saiu da lista de espera e passou a participar"""
+        if not promovidos:
+            return
+        participantes = {participante.id: participante for participante in partida.participantes}
+        for usuario_id in promovidos:
+            publicar_apos_commit(
+                self.db, partida.id, "participante_promovido",
+                usuario_id=usuario_id, nome=participantes[usuario_id].nome,
+                total_participantes=len(partida.participantes)
+            )
         
         # Atualizar status da partida (pode mudar para MARCADA se todos confirmaram)
         from app.utils.partida_status import atualizar_status_partida
         atualizar_status_partida(partida, self.db)
-        
-        return partida
     
     def sair_partida(self, partida_id: int, usuario: Usuario) -> Partida:
         """Usuário sai de uma partida"""
@@ -277,10 +528,16 @@ class PartidaService:
                 detail="Você não está participando desta partida"
             )
         
-        # Remover usuário da partida
+        # Remover usuário da partida e passar o primeiro da lista de espera para a vaga
         partida.participantes.remove(usuario)
+        promovidos = self._promover_lista_espera(partida)
         self.db.commit()
         self.db.refresh(partida)
+        publicar_apos_commit(
+            self.db, partida.id, "participante_saiu",
+            usuario_id=usuario.id, nome=usuario.nome, total_participantes=len(partida.participantes)
+        )
+        self._publicar_promovidos(partida, promovidos)
         
         return partida
     
@@ -320,10 +577,16 @@ class PartidaService:
                 detail="Este usuário não está participando desta partida"
             )
         
-        # Remover usuário da partida
+        # Remover usuário da partida e passar o primeiro da lista de espera para a vaga
         partida.participantes.remove(usuario)
+        promovidos = self._promover_lista_espera(partida)
         self.db.commit()
         self.db.refresh(partida)
+        publicar_apos_commit(
+            self.db, partida.id, "participante_removido",
+            usuario_id=usuario.id, nome=usuario.nome, total_participantes=len(partida.participantes)
+        )
+        self._publicar_promovidos(partida, promovidos)
         
         return partida
     
@@ -336,6 +599,18 @@ class PartidaService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Apenas o organizador pode finalizar a partida"
             )
+        if _finalizada_com_placar(partida):
+            # Rating, estatísticas e totais das equipes já foram aplicados uma vez
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Partida já finalizada"
+            )
+        if pontos_a == pontos_b:
+            # Empate não finaliza: sem vencedor não há estatísticas, rating nem totais de equipe
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empate não finaliza a partida: informe um placar com vencedor"
+            )
         
         # Atualizar pontuação e status
         success = self.repository.atualizar_pontuacao(partida_id, pontos_a, pontos_b)
@@ -348,7 +623,43 @@ class PartidaService:
         # Atualizar estatísticas dos participantes
         self._update_participant_stats(partida, pontos_a, pontos_b)
         
-        return self.get_partida(partida_id)
+        partida = self.get_partida(partida_id)
+        publicar_apos_commit(
+            self.db, partida.id, "status",
+            status=partida.status.value, pontuacao_equipe_a=pontos_a, pontuacao_equipe_b=pontos_b
+        )
+        return partida
+    
+    def _validar_data_partida(self, data_partida: datetime) -> datetime:
+        """Normalizar a data para UTC (sem fuso = horário do Brasil) e exigir 1 minuto no futuro"""
+        data_partida = para_utc(data_partida, FUSO_BRASIL)
+        if data_partida < agora() + timedelta(minutes=1):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Data da partida deve ser pelo menos 1 minuto no futuro. Horário atual (Brasil): {agora_brasil().strftime('%d/%m/%Y %H:%M')}"
+            )
+        return data_partida
+    
+    def _verificar_conflito_agenda(self, usuario: Usuario, partida: Partida):
+        """Impedir participar de duas partidas com horários sobrepostos"""
+        termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+        conflito = self.repository.get_conflito_agenda(
+            usuario.id, partida.data_partida, termino, excluir_partida_id=partida.id
+        )
+        if conflito:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Conflito de horário com a partida '{conflito.titulo}' "
+                       f"({conflito.data_partida.astimezone(FUSO_BRASIL).strftime('%d/%m/%Y %H:%M')})"
+            )
+    
+    def _validar_coordenadas(self, latitude: Optional[float], longitude: Optional[float]):
+        """Latitude e longitude são opcionais, mas informadas juntas"""
+        if (latitude is None) != (longitude is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe latitude e longitude juntas"
+            )
     
     def _validate_organizador_permissions(self, organizador: Usuario, tipo_partida: TipoPartida):
         """Validar se organizador pode criar partida do tipo especificado"""
@@ -360,31 +671,117 @@ class PartidaService:
     
     def _update_participant_stats(self, partida: Partida, pontos_a: int, pontos_b: int):
         """Atualizar estatísticas dos participantes após finalizar partida"""
-        from app.repositories import UsuarioRepository
+        from app.repositories import EquipeRepository, UsuarioRepository
         
         user_repo = UsuarioRepository(self.db)
+        resultados = {}  # usuario_id -> (venceu, pontos), somados depois às equipes dos participantes
         
         # Determinar equipe vencedora
         vencedor_equipe_a = pontos_a > pontos_b
         
-        # Atualizar stats dos participantes (assumindo divisão meio a meio)
-        total_participantes = len(partida.participantes)
-        meio = total_participantes // 2
+        # Equipes gravadas na divisão equilibrada (divididas agora se ainda não foram)
+        equipe_a, equipe_b = self._garantir_equipes(partida)
+        variacoes_a, variacoes_b = variacoes_partida(
+            [(usuario.rating, usuario.partidas_ranqueadas) for usuario in equipe_a],
+            [(usuario.rating, usuario.partidas_ranqueadas) for usuario in equipe_b],
+            resultado_equipe_a(pontos_a, pontos_b),
+            peso_partida(partida.tipo)
+        )
+        # Só partidas finalizadas com placar (empate não finaliza) e com adversário entram no
+        # rating, o mesmo critério do recálculo (RatingRepository)
+        ranqueada = _finalizada_com_placar(partida) and bool(equipe_a) and bool(equipe_b)
+        
+        for eh_equipe_a, equipe, variacoes in ((True, equipe_a, variacoes_a), (False, equipe_b, variacoes_b)):
+            for participante, variacao in zip(equipe, variacoes):
+                venceu = eh_equipe_a == vencedor_equipe_a
+                
+                pontos_ganhos = 10 if venceu else 5  # Pontos base
+                if partida.tipo == TipoPartida.COMPETITIVA:
+                    pontos_ganhos *= 2  # Dobra pontos em partidas competitivas
+                
+                user_repo.update_stats(
+                    participante.id,
+                    partidas_jogadas=1,
+                    vitorias=1 if venceu else 0,
+                    pontos=pontos_ganhos,
+                    variacao_rating=variacao if ranqueada else None
+                )
+                resultados[participante.id] = (venceu, pontos_ganhos)
         
-        for i, participante in enumerate(partida.participantes):
-            eh_equipe_a = i < meio
-            venceu = (eh_equipe_a and vencedor_equipe_a) or (not eh_equipe_a and not vencedor_equipe_a)
-            
-            pontos_ganhos = 10 if venceu else 5  # Pontos base
-            if partida.tipo == TipoPartida.COMPETITIVA:
-                pontos_ganhos *= 2  # Dobra pontos em partidas competitivas
-            
-            user_repo.update_stats(
-                participante.id,
-                partidas_jogadas=1,
-                vitorias=1 if venceu else 0,
-                pontos=pontos_ganhos
+        EquipeRepository(self.db).registrar_resultados(resultados)
+    
+    def _garantir_equipes(self, partida: Partida) -> Tuple[List[Usuario], List[Usuario]]:
+        """
+        Equipes A e B gravadas em partida_participantes; se alguém ainda não tem
+        equipe (ou uma delas ficou vazia), refazer a divisão equilibrada e gravar
+        """
+        participantes = sorted(partida.participantes, key=lambda usuario: usuario.id)
+        if len(participantes) < 2:
+            return [], participantes
+        atribuicao = self.repository.get_equipes(partida.id)
+        equipe_a = [u for u in participantes if atribuicao.get(u.id) == LadoEquipe.A]
+        equipe_b = [u for u in participantes if atribuicao.get(u.id) == LadoEquipe.B]
+        if equipe_a and equipe_b and len(equipe_a) + len(equipe_b) == len(participantes):
+            return equipe_a, equipe_b
+        return self._dividir_e_gravar(partida, participantes)
+    
+    def _dividir_e_gravar(self, partida: Partida, participantes: List[Usuario]) -> Tuple[List[Usuario], List[Usuario]]:
+        """Dividir pelo rating (app/utils/equipes.py) e gravar a divisão"""
+        ids_a, ids_b = dividir_equipes([(usuario.id, usuario.rating) for usuario in participantes])
+        self.repository.salvar_equipes(partida.id, {LadoEquipe.A: ids_a, LadoEquipe.B: ids_b})
+        por_id = {usuario.id: usuario for usuario in participantes}
+        return [por_id[i] for i in ids_a], [por_id[i] for i in ids_b]
+    
+    def dividir_equipes_partida(self, partida_id: int, current_user: Usuario) -> dict:
+        """(Re)dividir os participantes em equipes equilibradas pelo rating (apenas organizador)"""
+        partida = self.get_partida(partida_id)
+        if partida.organizador_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Apenas o organizador pode dividir as equipes"
+            )
+        if partida.status in (StatusPartida.FINALIZADA, StatusPartida.CANCELADA):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Não é possível dividir as equipes de uma partida encerrada"
             )
+        participantes = sorted(partida.participantes, key=lambda usuario: usuario.id)
+        if len(participantes) < 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="São necessários pelo menos 2 participantes para dividir as equipes"
+            )
+        equipe_a, equipe_b = self._dividir_e_gravar(partida, participantes)
+        publicar_apos_commit(
+            self.db, partida.id, "equipes_divididas",
+            equipe_a=[u.id for u in equipe_a], equipe_b=[u.id for u in equipe_b]
+        )
+        return self._resumo_equipes(partida.id, equipe_a, equipe_b, [])
+    
+    def get_equipes_partida(self, partida_id: int) -> dict:
+        """Divisão atual das equipes (participantes que entraram depois ficam sem equipe)"""
+        partida = self.get_partida(partida_id)
+        atribuicao = self.repository.get_equipes(partida.id)
+        participantes = sorted(partida.participantes, key=lambda usuario: usuario.id)
+        return self._resumo_equipes(
+            partida.id,
+            [u for u in participantes if atribuicao.get(u.id) == LadoEquipe.A],
+            [u for u in participantes if atribuicao.get(u.id) == LadoEquipe.B],
+            [u for u in participantes if atribuicao.get(u.id) is None]
+        )
+    
+    @staticmethod
+    def _resumo_equipes(partida_id: int, equipe_a: List[Usuario], equipe_b: List[Usuario], sem_equipe: List[Usuario]) -> dict:
+        def media(equipe):
+            return round(sum(u.rating for u in equipe) / len(equipe), 1) if equipe else None
+        return {
+            "partida_id": partida_id,
+            "equipe_a": equipe_a,
+            "equipe_b": equipe_b,
+            "sem_equipe": sem_equipe,
+            "rating_medio_a": media(equipe_a),
+            "rating_medio_b": media(equipe_b),
+        }
     
     def confirmar_presenca_usuario(self, partida_id: int, usuario: Usuario) -> StatusResponse:
         """Confirmar presença do usuário na partida"""
@@ -399,8 +796,7 @@ class PartidaService:
             )
         
         # Verificar se partida ainda não começou
-        agora = get_horario_brasil()
-        if partida.data_partida <= agora:
+        if partida.data_partida <= agora():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Não é possível confirmar presença após o início da partida"
@@ -408,6 +804,8 @@ class PartidaService:
         
         # Confirmar presença
         if confirmar_presenca(partida_id, usuario.id, self.db):
+            publicar_apos_commit(self.db, partida.id, "presenca_confirmada", usuario_id=usuario.id, nome=usuario.nome)
+            
             # Atualizar status da partida (pode mudar para MARCADA)
             atualizar_status_partida(partida, self.db)
             
@@ -435,8 +833,7 @@ class PartidaService:
             )
         
         # Verificar se partida ainda não começou
-        agora = get_horario_brasil()
-        if partida.data_partida <= agora:
+        if partida.data_partida <= agora():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Não é possível cancelar confirmação após o início da partida"
@@ -444,6 +841,8 @@ class PartidaService:
         
         # Cancelar confirmação
         if cancelar_confirmacao(partida_id, usuario.id, self.db):
+            publicar_apos_commit(self.db, partida.id, "confirmacao_cancelada", usuario_id=usuario.id, nome=usuario.nome)
+            
             # Atualizar status da partida (pode voltar para ATIVA)
             atualizar_status_partida(partida, self.db)
             
@@ -1,8 +1,8 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from app.models import Usuario
-from app.models.enums import TipoUsuario
+from app.models.enums import CriterioRanking, TipoUsuario
 from app.repositories import UsuarioRepository
 from app.schemas import UsuarioCreate, UsuarioUpdate, UsuarioResponse, UsuarioRanking
 from app.core.security import security
@@ -85,13 +85,19 @@ class UsuarioService:
         """Listar usuários"""
         return self.repository.get_multi(skip=skip, limit=limit)
     
+    def get_usuarios_por_ids(self, ids: List[int]) -> Tuple[List[Usuario], List[int]]:
+        """Resolver um lote de ids na ordem pedida: (usuários, ids não encontrados)"""
+        usuarios = self.repository.get_por_ids(ids)
+        encontrados = {usuario.id for usuario in usuarios}
+        return usuarios, [usuario_id for usuario_id in ids if usuario_id not in encontrados]
+    
     def get_usuarios_by_tipo(self, tipo: TipoUsuario, skip: int = 0, limit: int = 100) -> List[Usuario]:
         """Listar usuários por tipo"""
         return self.repository.get_by_tipo(tipo, skip=skip, limit=limit)
     
-    def get_ranking(self, limit: int = 10) -> List[UsuarioRanking]:
+    def get_ranking(self, limit: int = 10, criterio: CriterioRanking = CriterioRanking.PONTUACAO) -> List[UsuarioRanking]:
         """Obter ranking de usuários"""
-        usuarios = self.repository.get_ranking(limit=limit)
+        usuarios = self.repository.get_ranking(limit=limit, criterio=criterio)
         
         ranking = []
         for usuario in usuarios:
@@ -104,7 +110,9 @@ class UsuarioService:
                 partidas_jogadas=usuario.partidas_jogadas,
                 vitorias=usuario.vitorias,
                 derrotas=usuario.derrotas,
-                taxa_vitoria=round(taxa_vitoria, 2)
+                taxa_vitoria=round(taxa_vitoria, 2),
+                rating=round(usuario.rating, 1),
+                partidas_ranqueadas=usuario.partidas_ranqueadas
             ))
         
         return ranking
@@ -124,7 +132,9 @@ class UsuarioService:
                 partidas_jogadas=usuario.partidas_jogadas,
                 vitorias=usuario.vitorias,
                 derrotas=usuario.derrotas,
-                taxa_vitoria=round(taxa_vitoria, 2)
+                taxa_vitoria=round(taxa_vitoria, 2),
+                rating=round(usuario.rating, 1),
+                partidas_ranqueadas=usuario.partidas_ranqueadas
             ))
         
         return atletas
@@ -0,0 +1,46 @@
+"""
+Utilitários de agenda: intervalo ocupado por uma partida e linha do tempo do usuário
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.models.enums import StatusPartida
+
+# Duração usada quando a partida não informa duracao_estimada nem data_fim
+DURACAO_PADRAO_MINUTOS = 120
+
+# Partidas que ainda ocupam a agenda de quem participa
+STATUS_EM_AGENDA = (StatusPartida.ATIVA, StatusPartida.MARCADA, StatusPartida.EM_ANDAMENTO)
+
+
+def calcular_termino(
+    data_partida: Optional[datetime],
+    data_fim: Optional[datetime] = None,
+    duracao_estimada: Optional[int] = None
+) -> Optional[datetime]:
+    """Fim do intervalo ocupado: data_fim, se houver, senão início + duração estimada"""
+    if data_fim is not None:
+        return data_fim
+    if data_partida is None:
+        return None
+    return data_partida + timedelta(minutes=duracao_estimada or DURACAO_PADRAO_MINUTOS)
+
+
+def mesclar_agenda(*listas: Iterable) -> Iterator[Tuple[object, bool]]:
+    """
+    Intercalar listas de partidas já ordenadas por (data_partida, id) em uma
+    única linha do tempo, sem repetir partidas, marcando as que começam antes
+    do fim de alguma anterior (conflito). Tudo em uma passada, O(n log k).
+    """
+    vistas = set()
+    maior_termino: Optional[datetime] = None
+    for partida in heapq.merge(*listas, key=lambda p: (p.data_partida, p.id)):
+        if partida.id in vistas:
+            continue
+        vistas.add(partida.id)
+        conflito = maior_termino is not None and partida.data_partida < maior_termino
+        termino = partida.data_termino or calcular_termino(partida.data_partida, partida.data_fim, partida.duracao_estimada)
+        if maior_termino is None or termino > maior_termino:
+            maior_termino = termino
+        yield partida, conflito
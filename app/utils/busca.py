@@ -0,0 +1,117 @@
+"""
+Utilitários da busca textual de partidas: interpretação da consulta e ranqueamento
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.core.metrics import observar_lru
+
+# Palavras sem valor de busca em português (comparadas já sem acento)
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de da do das dos e em no na nos nas ao aos para pra por
+com sem que se ou the of
+""".split())
+
+# Dias da semana no formato de strftime('%w') / extract(dow): domingo = 0
+DIAS_SEMANA = {
+    "domingo": 0, "segunda": 1, "terca": 2, "quarta": 3, "quinta": 4, "sexta": 5, "sabado": 6,
+}
+
+# Pesos por campo no ranqueamento
+PESO_TITULO = 3.0
+PESO_LOCAL = 2.0
+PESO_DESCRICAO = 1.0
+
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache(maxsize=4096)
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas e sem acentos ("Sábado" -> "sabado")"""
+    if not texto:
+        return ""
+    if texto.isascii():
+        return texto.lower()
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+observar_lru("normalizar", normalizar)
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+@dataclass
+class ConsultaBusca:
+    """Consulta interpretada: termos de texto e dia da semana opcional"""
+    termos: List[str] = field(default_factory=list)
+    dia_semana: Optional[int] = None
+
+    def fts5(self, prefixo: bool = True) -> str:
+        """Expressão MATCH do FTS5: todos os termos (AND), o último como prefixo"""
+        partes = [f'"{termo}"' for termo in self.termos]
+        if prefixo:
+            partes[-1] += "*"
+        return " ".join(partes)
+
+    def tsquery(self) -> str:
+        """Expressão para to_tsquery do PostgreSQL (AND, último termo como prefixo)"""
+        partes = list(self.termos)
+        partes[-1] += ":*"
+        return " & ".join(partes)
+
+
+def interpretar_consulta(q: str) -> ConsultaBusca:
+    """
+    Separar termos de texto de um dia da semana ("vôlei praia sábado").
+    Stopwords são descartadas; termos repetidos são considerados uma vez.
+    """
+    consulta = ConsultaBusca()
+    for token in tokenizar(q):
+        if token in DIAS_SEMANA and consulta.dia_semana is None:
+            consulta.dia_semana = DIAS_SEMANA[token]
+        elif token not in STOPWORDS and token not in consulta.termos:
+            consulta.termos.append(token)
+    return consulta
+
+
+def pontuar(termos: Sequence[str], titulo: Optional[str], descricao: Optional[str], local: Optional[str]) -> float:
+    """
+    Relevância de uma partida: ocorrências de cada termo ponderadas pelo campo
+    (título > local > descrição), com o último termo valendo também como prefixo.
+    """
+    campos = (
+        (tokenizar(titulo), PESO_TITULO),
+        (tokenizar(local), PESO_LOCAL),
+        (tokenizar(descricao), PESO_DESCRICAO),
+    )
+    ultimo = len(termos) - 1
+    pontuacao = 0.0
+    for indice, termo in enumerate(termos):
+        for tokens, peso in campos:
+            if indice == ultimo:
+                acertos = sum(1 for token in tokens if token.startswith(termo))
+            else:
+                acertos = tokens.count(termo)
+            if acertos:
+                # Saturação: repetir o termo ajuda pouco
+                pontuacao += peso * acertos / (acertos + 1.0)
+    return pontuacao
+
+
+def ranquear(termos: Sequence[str], candidatos: Iterable[Tuple[int, str, str, str]]) -> List[int]:
+    """
+    Ordenar candidatos (id, titulo, descricao, local) por relevância;
+    empates ficam com a partida mais recente (maior id)
+    """
+    pontuados = [
+        (pontuar(termos, titulo, descricao, local), partida_id)
+        for partida_id, titulo, descricao, local in candidatos
+    ]
+    pontuados.sort(key=lambda item: (-item[0], -item[1]))
+    return [partida_id for _, partida_id in pontuados]
@@ -1,10 +1,56 @@
 """
 Utilitários para validação de categorias e classificações
 """
+from typing import Iterable, List, Union
 from app.models.enums import TipoUsuario, CategoriaPartida
 
+# Nível numérico de cada tipo de usuário (ordem de declaração do enum)
+NIVEL_USUARIO = {tipo: nivel for nivel, tipo in enumerate(TipoUsuario)}
 
-def usuario_pode_participar(tipo_usuario: TipoUsuario, categoria_partida: CategoriaPartida) -> bool:
+# Tipos de usuário aceitos em cada categoria
+_TIPOS_POR_CATEGORIA = {
+    CategoriaPartida.LIVRE: tuple(TipoUsuario),
+    CategoriaPartida.INICIANTE: (TipoUsuario.INICIANTE,),
+    CategoriaPartida.INTERMEDIARIO: (TipoUsuario.INTERMEDIARIO, TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL),
+    CategoriaPartida.AVANCADO: (TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL),
+    CategoriaPartida.PROFISSIONAL: (TipoUsuario.PROFISSIONAL,),
+}
+
+# Máscara de bits por categoria: bit N ligado = usuário de nível N pode participar
+MASCARA_CATEGORIA = {
+    categoria: sum(1 << NIVEL_USUARIO[tipo] for tipo in tipos)
+    for categoria, tipos in _TIPOS_POR_CATEGORIA.items()
+}
+MASCARA_LIVRE = MASCARA_CATEGORIA[CategoriaPartida.LIVRE]
+
+# Tabela de elegibilidade (tipo, categoria) pré-calculada na importação
+_ELEGIBILIDADE = frozenset(
+    (tipo, categoria)
+    for categoria, tipos in _TIPOS_POR_CATEGORIA.items()
+    for tipo in tipos
+)
+
+# Conversão string -> enum sem exceções (partida.categoria é salva como texto)
+_CATEGORIA_POR_VALOR = {categoria.value: categoria for categoria in CategoriaPartida}
+_MASCARA_POR_VALOR = {valor: MASCARA_CATEGORIA[categoria] for valor, categoria in _CATEGORIA_POR_VALOR.items()}
+
+
+def parse_categoria(categoria: Union[str, CategoriaPartida, None]) -> CategoriaPartida:
+    """
+    Converte a categoria salva na partida para o enum.
+    Categorias ausentes ou desconhecidas são tratadas como LIVRE (retrocompatibilidade).
+    """
+    if isinstance(categoria, CategoriaPartida):
+        return categoria
+    return _CATEGORIA_POR_VALOR.get(categoria, CategoriaPartida.LIVRE)
+
+
+def mascara_categoria(categoria: Union[str, CategoriaPartida, None]) -> int:
+    """Máscara de níveis aceitos pela categoria"""
+    return MASCARA_CATEGORIA[parse_categoria(categoria)]
+
+
+def usuario_pode_participar(tipo_usuario: TipoUsuario, categoria_partida: Union[str, CategoriaPartida]) -> bool:
     """
     Verifica se um usuário pode participar de uma partida baseado na categoria.
     
@@ -15,23 +61,21 @@ def usuario_pode_participar(tipo_usuario: TipoUsuario, categoria_partida: Catego
     - AVANCADO: Avançados e profissionais
     - PROFISSIONAL: Apenas jogadores profissionais
     """
-    
-    if categoria_partida == CategoriaPartida.LIVRE:
-        return True
-    
-    if categoria_partida == CategoriaPartida.INICIANTE:
-        return tipo_usuario == TipoUsuario.INICIANTE
-    
-    if categoria_partida == CategoriaPartida.INTERMEDIARIO:
-        return tipo_usuario in [TipoUsuario.INTERMEDIARIO, TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL]
-    
-    if categoria_partida == CategoriaPartida.AVANCADO:
-        return tipo_usuario in [TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL]
-    
-    if categoria_partida == CategoriaPartida.PROFISSIONAL:
-        return tipo_usuario == TipoUsuario.PROFISSIONAL
-    
-    return False
+    return (tipo_usuario, parse_categoria(categoria_partida)) in _ELEGIBILIDADE
+
+
+def filtrar_partidas_acessiveis(nivel: int, partidas: Iterable) -> List:
+    """
+    Filtra, em uma única passada, as partidas em que o usuário do nível
+    (usuarios.nivel) pode participar: máscara da categoria (texto, vale também
+    para partidas arquivadas) contra o bit do nível, sem converter para o enum.
+    """
+    bit = 1 << nivel
+    mascaras = _MASCARA_POR_VALOR
+    return [
+        partida for partida in partidas
+        if mascaras.get(partida.categoria, MASCARA_LIVRE) & bit
+    ]
 
 
 def get_categorias_permitidas(tipo_usuario: TipoUsuario) -> list[CategoriaPartida]:
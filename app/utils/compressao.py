@@ -0,0 +1,55 @@
+"""
+Negociação de Content-Encoding e compressão (gzip e, se instalado, brotli)
+"""
+import gzip
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip
+    brotli = None
+
+# Em ordem de preferência do servidor
+CODIFICACOES = ("br", "gzip") if brotli is not None else ("gzip",)
+EXTENSOES = {"br": ".br", "gzip": ".gz"}
+
+
+def escolher_codificacao(accept_encoding: Optional[str], disponiveis: Iterable[str] = CODIFICACOES) -> Optional[str]:
+    """
+    Escolher a codificação a partir do Accept-Encoding do cliente: maior q
+    aceito (q=0 recusa), com empate decidido pela preferência do servidor
+    (ordem de `disponiveis`). None = enviar sem compressão.
+    """
+    if not accept_encoding:
+        return None
+
+    pesos = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        nome = nome.strip().lower()
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        if nome:
+            pesos[nome] = q
+
+    melhor, melhor_q = None, 0.0
+    for codificacao in disponiveis:
+        q = pesos.get(codificacao, pesos.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = codificacao, q
+    return melhor
+
+
+def comprimir(dados: bytes, codificacao: str, nivel: Optional[int] = None) -> bytes:
+    """Comprimir com a codificação negociada. `nivel` None = máximo (uso em build)"""
+    if codificacao == "br":
+        return brotli.compress(dados, quality=11 if nivel is None else nivel)
+    if codificacao == "gzip":
+        # mtime=0: mesma entrada gera os mesmos bytes (ETag/cache estáveis)
+        return gzip.compress(dados, compresslevel=9 if nivel is None else nivel, mtime=0)
+    raise ValueError(f"Codificação não suportada: {codificacao}")
@@ -0,0 +1,109 @@
+"""
+Divisão de um elenco em equipes equilibradas pelo rating
+
+Heurística em duas fases:
+1. Serpentina: jogadores do maior para o menor rating distribuídos em
+   A, B, B, A, A, B... (para k equipes: 1..k, k..1, ...). O tamanho das
+   equipes difere em no máximo 1.
+2. Busca local: enquanto houver ganho, troca um jogador da equipe de maior
+   média com um da equipe de menor média. A melhor troca para cada jogador é
+   achada por busca binária na lista ordenada da outra equipe, o que dá
+   O(n log n) por rodada. Quando nenhuma troca simples ajuda, tenta trocar
+   duas duplas (em equipes de até MAX_TROCA_EM_PARES jogadores).
+
+A força de uma equipe é a média dos ratings (a mesma do Elo em app/utils/rating.py).
+Escala para elencos grandes e pools de torneio (quantidade > 2). Em elencos
+pequenos fica muito perto do ótimo da busca exaustiva (benchmarks/bench_equipes.py).
+"""
+from bisect import bisect_left, insort
+from itertools import combinations
+from typing import List, Sequence, Tuple
+
+TOLERANCIA = 1e-9
+MAX_TROCA_EM_PARES = 64  # Equipes até esse tamanho também tentam trocas de 2 por 2
+
+
+def _serpentina(ordenados: Sequence[Tuple[int, float]], quantidade: int) -> List[List[Tuple[int, float]]]:
+    """Distribuir os jogadores já ordenados pelo rating em ida e volta entre as equipes"""
+    equipes = [[] for _ in range(quantidade)]
+    for posicao, jogador in enumerate(ordenados):
+        rodada, indice = divmod(posicao, quantidade)
+        equipes[indice if rodada % 2 == 0 else quantidade - 1 - indice].append(jogador)
+    return equipes
+
+
+def _melhor_troca(forte: List[Tuple[float, int]], fraca: List[Tuple[float, int]], diferenca: float, tamanho: int):
+    """
+    Melhor troca de `tamanho` jogadores da equipe forte por `tamanho` da fraca para
+    aproximar as médias. Trocar grupos de soma sf e sw muda a diferença de médias em
+    (sf - sw) * (1/|forte| + 1/|fraca|).
+    Retorna (nova diferença absoluta, índices na forte, índices na fraca) ou None
+    """
+    fator = 1.0 / len(forte) + 1.0 / len(fraca)
+    alvo = diferenca / fator  # sf - sw ideal
+    grupos_fraca = sorted(
+        (sum(fraca[i][0] for i in indices), indices) for indices in combinations(range(len(fraca)), tamanho)
+    )
+    somas_fraca = [soma for soma, _ in grupos_fraca]
+    melhor = None
+    for indices_forte in combinations(range(len(forte)), tamanho):
+        soma_forte = sum(forte[i][0] for i in indices_forte)
+        j = bisect_left(somas_fraca, soma_forte - alvo)
+        for candidato in (j - 1, j):
+            if 0 <= candidato < len(grupos_fraca):
+                nova = abs(diferenca - (soma_forte - somas_fraca[candidato]) * fator)
+                if melhor is None or nova < melhor[0]:
+                    melhor = (nova, indices_forte, grupos_fraca[candidato][1])
+    return melhor
+
+
+def dividir_equipes(
+    jogadores: Sequence[Tuple[int, float]],
+    quantidade: int = 2,
+    max_rodadas: int = 1000
+) -> List[List[int]]:
+    """
+    Dividir (id, rating) em `quantidade` equipes de médias próximas.
+    Retorna os ids de cada equipe; com 2 equipes, a primeira é a A.
+    """
+    if quantidade < 1:
+        raise ValueError("quantidade deve ser pelo menos 1")
+    ordenados = sorted(jogadores, key=lambda jogador: (-jogador[1], jogador[0]))
+    # Cada equipe como lista ordenada de (rating, id), para a busca binária
+    equipes = [sorted((rating, jogador_id) for jogador_id, rating in equipe) for equipe in _serpentina(ordenados, quantidade)]
+
+    if len(ordenados) > quantidade:
+        for _ in range(max_rodadas):
+            medias = [sum(rating for rating, _ in equipe) / len(equipe) if equipe else 0.0 for equipe in equipes]
+            forte = max(range(quantidade), key=medias.__getitem__)
+            fraca = min(range(quantidade), key=medias.__getitem__)
+            diferenca = medias[forte] - medias[fraca]
+            if diferenca <= TOLERANCIA or not equipes[fraca]:
+                break
+            # Trocas de 1 jogador; quando não há ganho, de 2 por 2 (só em equipes pequenas, O(m²))
+            troca = _melhor_troca(equipes[forte], equipes[fraca], diferenca, 1)
+            if (troca is None or troca[0] >= diferenca - TOLERANCIA) and \
+                    2 <= min(len(equipes[forte]), len(equipes[fraca])) and \
+                    max(len(equipes[forte]), len(equipes[fraca])) <= MAX_TROCA_EM_PARES:
+                troca = _melhor_troca(equipes[forte], equipes[fraca], diferenca, 2)
+            if troca is None or troca[0] >= diferenca - TOLERANCIA:
+                break
+            _, indices_forte, indices_fraca = troca
+            saem_forte = [equipes[forte][i] for i in indices_forte]
+            saem_fraca = [equipes[fraca][i] for i in indices_fraca]
+            for i in sorted(indices_forte, reverse=True):
+                equipes[forte].pop(i)
+            for i in sorted(indices_fraca, reverse=True):
+                equipes[fraca].pop(i)
+            for jogador in saem_fraca:
+                insort(equipes[forte], jogador)
+            for jogador in saem_forte:
+                insort(equipes[fraca], jogador)
+
+    return [sorted(jogador_id for _, jogador_id in equipe) for equipe in equipes]
+
+
+def diferenca_medias(equipes: Sequence[Sequence[float]]) -> float:
+    """Maior diferença entre as médias de rating das equipes (0 = perfeitamente equilibradas)"""
+    medias = [sum(equipe) / len(equipe) for equipe in equipes if equipe]
+    return max(medias) - min(medias) if medias else 0.0
@@ -0,0 +1,77 @@
+"""
+Utilitários geográficos: grade de células para pré-filtro e distância haversine
+
+A superfície é dividida em células de TAMANHO_CELULA graus. O id da célula
+(linha * COLUNAS + coluna) é gravado e indexado na partida; como células
+vizinhas na mesma linha têm ids consecutivos, a caixa que cobre um raio vira
+uma faixa BETWEEN por linha da grade, resolvida pelo índice.
+"""
+import math
+from typing import List, Optional, Tuple
+
+RAIO_TERRA_KM = 6371.0088
+
+# ~1,1 km de latitude por célula
+TAMANHO_CELULA = 0.01
+LINHAS = round(180 / TAMANHO_CELULA)
+COLUNAS = round(360 / TAMANHO_CELULA)
+
+KM_POR_GRAU_LATITUDE = math.pi * RAIO_TERRA_KM / 180
+
+
+def _linha(latitude: float) -> int:
+    return min(LINHAS - 1, max(0, math.floor((latitude + 90) / TAMANHO_CELULA)))
+
+
+def _coluna(longitude: float) -> int:
+    return math.floor((longitude + 180) / TAMANHO_CELULA) % COLUNAS
+
+
+def celula(latitude: Optional[float], longitude: Optional[float]) -> Optional[int]:
+    """Id da célula da grade que contém o ponto (None sem coordenadas)"""
+    if latitude is None or longitude is None:
+        return None
+    return _linha(latitude) * COLUNAS + _coluna(longitude)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distância em km entre dois pontos pela fórmula de haversine"""
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    dfi = fi2 - fi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dfi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def caixa(latitude: float, longitude: float, raio_km: float) -> Tuple[float, float, float, float]:
+    """
+    Caixa (lat_min, lat_max, lon_min, lon_max) que contém o círculo do raio.
+    Longitudes podem passar de ±180 perto do antimeridiano.
+    """
+    delta_lat = raio_km / KM_POR_GRAU_LATITUDE
+    lat_min, lat_max = max(-90.0, latitude - delta_lat), min(90.0, latitude + delta_lat)
+    # A longitude "encolhe" com o cosseno; usar a latitude mais próxima do polo da caixa
+    cosseno = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+    if cosseno < 1e-6:
+        return lat_min, lat_max, -180.0, 180.0
+    delta_lon = min(180.0, raio_km / (KM_POR_GRAU_LATITUDE * cosseno))
+    return lat_min, lat_max, longitude - delta_lon, longitude + delta_lon
+
+
+def faixas_de_celulas(latitude: float, longitude: float, raio_km: float) -> List[Tuple[int, int]]:
+    """
+    Faixas [inicio, fim] de ids de célula que cobrem o raio em torno do ponto:
+    uma por linha da grade (duas quando a caixa cruza o antimeridiano)
+    """
+    lat_min, lat_max, lon_min, lon_max = caixa(latitude, longitude, raio_km)
+    if lon_max - lon_min >= 360:
+        colunas = [(0, COLUNAS - 1)]
+    else:
+        inicio, fim = _coluna(lon_min), _coluna(lon_max)
+        colunas = [(inicio, fim)] if inicio <= fim else [(inicio, COLUNAS - 1), (0, fim)]
+
+    faixas = []
+    for linha in range(_linha(lat_min), _linha(lat_max) + 1):
+        base = linha * COLUNAS
+        faixas.extend((base + inicio, base + fim) for inicio, fim in colunas)
+    return faixas
@@ -0,0 +1,49 @@
+"""
+Consultas em lote por ids (?ids=3,1,2 ou ?ids=3&ids=1): o cliente resolve de uma
+vez as partidas e usuários referenciados em um feed, em vez de um GET por id
+"""
+from typing import Any, Iterable, List, Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.utils.serializacao import resposta_lista
+
+# Maior quantidade de ids aceita em uma consulta
+LIMITE_IDS = 200
+
+# Cabeçalho com os ids pedidos que não existem (separados por vírgula)
+CABECALHO_NAO_ENCONTRADOS = "X-Ids-Nao-Encontrados"
+
+
+def interpretar_ids(valores: Iterable[str]) -> List[int]:
+    """Ids do parâmetro, na ordem pedida e sem repetição"""
+    ids = []
+    try:
+        for valor in valores:
+            ids.extend(int(parte) for parte in valor.split(",") if parte.strip())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids deve ser uma lista de inteiros separados por vírgula"
+        )
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ao menos um id"
+        )
+    if len(ids) > LIMITE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No máximo {LIMITE_IDS} ids por consulta ({len(ids)} informados)"
+        )
+    return ids
+
+
+def resposta_lote(schema: Type[BaseModel], objetos: Iterable[Any], nao_encontrados: List[int]) -> Response:
+    """Lista serializada na ordem dos ids, com os ausentes no cabeçalho"""
+    resposta = resposta_lista(schema, objetos)
+    resposta.headers[CABECALHO_NAO_ENCONTRADOS] = ",".join(str(i) for i in nao_encontrados)
+    return resposta
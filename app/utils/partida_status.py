@@ -1,18 +1,26 @@
 """
 Utilitário para gerenciar status automático das partidas
 """
-from datetime import datetime, timedelta
-import pytz
+from datetime import timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import select, update, and_
 from app.models.models import Partida, partida_participantes
 from app.models.enums import StatusPartida
+from app.core.clock import agora as agora_utc, para_utc
+from app.core.eventos import publicar_apos_commit
 
 
-def get_horario_brasil() -> datetime:
-    """Retorna o horário atual no timezone do Brasil"""
-    tz_brasil = pytz.timezone('America/Sao_Paulo')
-    return datetime.now(tz_brasil)
+def _mudar_status(partida: Partida, novo_status: StatusPartida, db: Session) -> bool:
+    """Gravar a transição de status e notificar os assinantes da partida"""
+    anterior = partida.status
+    partida.status = novo_status
+    db.commit()
+    publicar_apos_commit(
+        db, partida.id, "status",
+        status=novo_status.value,
+        status_anterior=anterior.value if anterior else None
+    )
+    return True
 
 
 def atualizar_status_partida(partida: Partida, db: Session) -> bool:
@@ -24,39 +32,28 @@ def atualizar_status_partida(partida: Partida, db: Session) -> bool:
     
     Retorna True se o status foi alterado
     """
-    agora = get_horario_brasil()
+    agora = agora_utc()
     status_anterior = partida.status
     
     # Se já está finalizada ou cancelada, não muda
     if partida.status in [StatusPartida.FINALIZADA, StatusPartida.CANCELADA]:
         return False
     
-    # Calcular horário de fim baseado na duração
+    # Datas vêm do banco em UTC; calcular horário de fim baseado na duração
+    data_partida = para_utc(partida.data_partida)
     if partida.data_fim:
-        horario_fim = partida.data_fim
+        horario_fim = para_utc(partida.data_fim)
     else:
-        horario_fim = partida.data_partida + timedelta(minutes=partida.duracao_estimada)
-    
-    # Tornar datas aware se necessário
-    if partida.data_partida.tzinfo is None:
-        tz_brasil = pytz.timezone('America/Sao_Paulo')
-        data_partida = tz_brasil.localize(partida.data_partida)
-        horario_fim = tz_brasil.localize(horario_fim) if horario_fim.tzinfo is None else horario_fim
-    else:
-        data_partida = partida.data_partida
+        horario_fim = data_partida + timedelta(minutes=partida.duracao_estimada)
     
     # 1. Se passou do horário de fim -> FINALIZADA
     if agora > horario_fim:
-        partida.status = StatusPartida.FINALIZADA
-        db.commit()
-        return True
+        return _mudar_status(partida, StatusPartida.FINALIZADA, db)
     
     # 2. Se está no horário (início <= agora < fim) -> EM_ANDAMENTO
     if data_partida <= agora < horario_fim:
         if partida.status != StatusPartida.EM_ANDAMENTO:
-            partida.status = StatusPartida.EM_ANDAMENTO
-            db.commit()
-            return True
+            return _mudar_status(partida, StatusPartida.EM_ANDAMENTO, db)
         return False
     
     # 3. Se ainda não chegou o horário, verificar confirmações
@@ -75,14 +72,10 @@ def atualizar_status_partida(partida: Partida, db: Session) -> bool:
         # Se todos confirmaram e tem pelo menos 1 participante -> MARCADA
         if total_participantes > 0 and confirmados == total_participantes:
             if partida.status != StatusPartida.MARCADA:
-                partida.status = StatusPartida.MARCADA
-                db.commit()
-                return True
+                return _mudar_status(partida, StatusPartida.MARCADA, db)
         # Se não está marcada e tinha ficado marcada antes, volta para ATIVA
         elif partida.status == StatusPartida.MARCADA:
-            partida.status = StatusPartida.ATIVA
-            db.commit()
-            return True
+            return _mudar_status(partida, StatusPartida.ATIVA, db)
     
     return status_anterior != partida.status
 
@@ -113,8 +106,6 @@ def confirmar_presenca(partida_id: int, usuario_id: int, db: Session) -> bool:
     Confirma a presença de um participante na partida
     Retorna True se conseguiu confirmar
     """
-    agora = get_horario_brasil()
-    
     stmt = (
         update(partida_participantes)
         .where(
@@ -123,7 +114,7 @@ def confirmar_presenca(partida_id: int, usuario_id: int, db: Session) -> bool:
                 partida_participantes.c.usuario_id == usuario_id
             )
         )
-        .values(confirmado=True, data_confirmacao=agora)
+        .values(confirmado=True, data_confirmacao=agora_utc())
     )
     
     result = db.execute(stmt)
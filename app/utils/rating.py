@@ -0,0 +1,174 @@
+"""
+Rating de habilidade (Elo por equipes) calculado a partir das partidas finalizadas
+
+Cada equipe joga com a média dos ratings dos seus jogadores. Todos os jogadores
+de uma equipe recebem K * peso * (resultado - esperado), com resultado 1
+(vitória), 0 (derrota) ou 0,5 (empate). K é maior enquanto o jogador tem
+poucas partidas ranqueadas, para que o rating dele se ajuste rápido. Amistosas
+valem metade. As equipes são as gravadas em partida_participantes.equipe
+(divisão equilibrada, app/utils/equipes.py); partidas sem divisão gravada usam
+os participantes ordenados por id, com a primeira metade na equipe A.
+
+Há dois caminhos:
+- incremental (variacoes_partida): puro Python, aplicado a cada finalizar_partida;
+- recálculo completo (recalcular): NumPy vetorizado sobre todo o histórico, usado
+  pelo recalcular_ratings.py. O histórico é processado em períodos de rating
+  (um dia, como no Glicko). Todas as partidas do mesmo dia usam os ratings do
+  início do dia, então o resultado só difere do incremental para quem jogou mais
+  de uma partida no mesmo dia.
+"""
+from itertools import chain
+from typing import List, Sequence, Tuple
+
+RATING_INICIAL = 1500.0
+K_PADRAO = 20.0
+K_PROVISORIO = 40.0  # Enquanto o jogador tem menos de PARTIDAS_PROVISORIAS ranqueadas
+PARTIDAS_PROVISORIAS = 20
+PESO_AMISTOSA = 0.5
+ESCALA = 400.0
+
+
+def resultado_equipe_a(pontos_a: int, pontos_b: int) -> float:
+    """1 se a equipe A venceu, 0 se perdeu, 0,5 no empate"""
+    if pontos_a == pontos_b:
+        return 0.5
+    return 1.0 if pontos_a > pontos_b else 0.0
+
+
+def peso_partida(tipo) -> float:
+    """Amistosas contam metade (tipo: TipoPartida)"""
+    from app.models.enums import TipoPartida  # app.models importa este módulo
+    return PESO_AMISTOSA if tipo == TipoPartida.AMISTOSA else 1.0
+
+
+def esperado(media_a: float, media_b: float) -> float:
+    """Probabilidade de vitória da equipe A"""
+    return 1.0 / (1.0 + 10.0 ** ((media_b - media_a) / ESCALA))
+
+
+def fator_k(partidas_ranqueadas: int) -> float:
+    """K do jogador: provisório nas primeiras partidas ranqueadas"""
+    return K_PROVISORIO if partidas_ranqueadas < PARTIDAS_PROVISORIAS else K_PADRAO
+
+
+def variacoes_partida(
+    equipe_a: Sequence[Tuple[float, int]],
+    equipe_b: Sequence[Tuple[float, int]],
+    resultado_a: float,
+    peso: float = 1.0
+) -> Tuple[List[float], List[float]]:
+    """
+    Variação de rating de cada jogador das duas equipes, dadas como listas de
+    (rating, partidas_ranqueadas). Sem adversário, ninguém varia.
+    """
+    if not equipe_a or not equipe_b:
+        return [0.0] * len(equipe_a), [0.0] * len(equipe_b)
+    esperado_a = esperado(
+        sum(rating for rating, _ in equipe_a) / len(equipe_a),
+        sum(rating for rating, _ in equipe_b) / len(equipe_b)
+    )
+    return (
+        [fator_k(jogos) * peso * (resultado_a - esperado_a) for _, jogos in equipe_a],
+        [fator_k(jogos) * peso * (esperado_a - resultado_a) for _, jogos in equipe_b],
+    )
+
+
+def _matriz(linhas, colunas: int, tipo):
+    """Array (n, colunas) a partir de um array ou de linhas (tuplas ou Rows do SQLAlchemy)"""
+    import numpy as np
+
+    if isinstance(linhas, np.ndarray):
+        return linhas.astype(tipo, copy=False).reshape(-1, colunas)
+    # fromiter sobre os valores achatados: np.asarray em uma lista de Rows é ~100x mais lento
+    valores = np.fromiter(chain.from_iterable(linhas), dtype=tipo, count=len(linhas) * colunas)
+    return valores.reshape(-1, colunas)
+
+
+def _indexar(ids, consulta):
+    """Posição de cada id de `consulta` em `ids` (-1 se não estiver lá)"""
+    import numpy as np
+
+    tabela = np.full(int(max(ids.max(), 0)) + 1, -1, dtype=np.int64)
+    tabela[ids] = np.arange(len(ids))
+    dentro = (consulta >= 0) & (consulta < len(tabela))
+    return np.where(dentro, tabela[np.where(dentro, consulta, 0)], -1)
+
+
+def recalcular(partidas: Sequence[tuple], participacoes: Sequence[tuple], usuario_ids: Sequence[int]):
+    """
+    Recalcular os ratings de todos os usuários a partir do histórico.
+
+    partidas: (partida_id, periodo, resultado_a, peso) em ordem cronológica;
+    periodo é um inteiro crescente (o dia ordinal da partida).
+    participacoes: (partida_id, usuario_id, lado), em qualquer ordem; lado é 0 (equipe A),
+    1 (equipe B) ou -1 (sem divisão gravada: metade por id).
+    Ambos podem ser listas de tuplas ou arrays NumPy de 4 e 3 colunas.
+    usuario_ids: ids de todos os usuários, em ordem crescente.
+
+    Retorna (ratings, partidas_ranqueadas), arrays alinhados com usuario_ids.
+    """
+    import numpy as np  # Só o recálculo em lote precisa (mantém o import da API leve)
+
+    usuarios = np.asarray(usuario_ids, dtype=np.int64)
+    ratings = np.full(len(usuarios), RATING_INICIAL)
+    jogos = np.zeros(len(usuarios), dtype=np.int64)
+    if not len(partidas) or not len(participacoes) or not len(usuarios):
+        return ratings, jogos
+
+    tabela = _matriz(partidas, 4, np.float64)
+    partida_ids, periodos = tabela[:, 0].astype(np.int64), tabela[:, 1].astype(np.int64)
+    resultados, pesos = tabela[:, 2], tabela[:, 3]
+    linhas = _matriz(participacoes, 3, np.int64)
+    pid, uid, lado_gravado = linhas[:, 0], linhas[:, 1], linhas[:, 2]
+
+    # Posição cronológica da partida e índice do usuário de cada participação, por tabelas
+    # indexadas pelo id (ids de autoincremento são densos: mais rápido que searchsorted)
+    posicao = _indexar(partida_ids, pid)
+    indice_usuario = _indexar(usuarios, uid)
+    validas = (posicao >= 0) & (indice_usuario >= 0)
+
+    # Participações por partida e, dentro dela, por id de usuário (uma única ordenação de
+    # chaves inteiras, com o lado gravado no último dígito em base 3)
+    chaves = np.sort(
+        (posicao[validas] * len(usuarios) + indice_usuario[validas]) * 3 + np.clip(lado_gravado[validas], -1, 1) + 1
+    )
+    chaves, lado_gravado = np.divmod(chaves, 3)
+    lado_gravado -= 1
+    posicao, indice_usuario = np.divmod(chaves, len(usuarios))
+
+    # Sem divisão gravada, a primeira metade (por id) é a equipe A
+    tamanho = np.bincount(posicao, minlength=len(partida_ids))
+    inicio = np.cumsum(tamanho) - tamanho
+    metade_b = (np.arange(len(posicao)) - inicio[posicao]) >= (tamanho // 2)[posicao]
+    equipe_b = np.where(lado_gravado >= 0, lado_gravado == 1, metade_b)
+
+    # Partidas sem adversário (uma das equipes vazia) não contam
+    na_b = np.bincount(posicao, weights=equipe_b, minlength=len(partida_ids))
+    com_adversario = (na_b[posicao] > 0) & (na_b[posicao] < tamanho[posicao])
+    posicao, indice_usuario, equipe_b = posicao[com_adversario], indice_usuario[com_adversario], equipe_b[com_adversario]
+    if not len(posicao):
+        return ratings, jogos
+    resultado = np.where(equipe_b, 1.0 - resultados[posicao], resultados[posicao])
+
+    # Um bloco contíguo de participações por período (a posição já está em ordem cronológica)
+    periodo = periodos[posicao]
+    cortes = np.concatenate(([0], np.flatnonzero(np.diff(periodo)) + 1, [len(posicao)]))
+    for a, b in zip(cortes[:-1], cortes[1:]):
+        partida_local = posicao[a:b] - posicao[a]
+        quantidade = int(partida_local[-1]) + 1
+        jogadores = indice_usuario[a:b]
+        lado = equipe_b[a:b].astype(np.int64)
+
+        # Média de cada equipe com os ratings do início do período
+        chave = partida_local * 2 + lado
+        soma = np.bincount(chave, weights=ratings[jogadores], minlength=2 * quantidade)
+        contagem = np.bincount(chave, minlength=2 * quantidade)
+        medias = (soma / np.maximum(contagem, 1)).reshape(quantidade, 2)
+        esperado_a = 1.0 / (1.0 + 10.0 ** ((medias[:, 1] - medias[:, 0]) / ESCALA))
+        esperado_jogador = np.where(lado == 1, 1.0 - esperado_a[partida_local], esperado_a[partida_local])
+
+        k = np.where(jogos[jogadores] < PARTIDAS_PROVISORIAS, K_PROVISORIO, K_PADRAO) * pesos[posicao[a:b]]
+        np.add.at(ratings, jogadores, k * (resultado[a:b] - esperado_jogador))
+        np.add.at(jogos, jogadores, 1)
+
+    return ratings, jogos
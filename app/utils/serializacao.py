@@ -0,0 +1,43 @@
+"""
+Caminho rápido de serialização das respostas em lista
+
+Por padrão o FastAPI valida os objetos ORM no response_model (from_attributes),
+converte o resultado de volta para dicts/listas (jsonable_encoder) e só então
+gera o JSON com o json da stdlib. Aqui cada schema tem um TypeAdapter criado
+uma única vez, que valida os objetos e gera os bytes JSON direto no
+pydantic-core (Rust), sem a etapa intermediária. Como o endpoint devolve um
+Response pronto, o FastAPI não valida a resposta de novo; o response_model
+continua declarado na rota apenas para a documentação (OpenAPI).
+"""
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.metrics import observar_lru
+
+
+@lru_cache(maxsize=None)
+def adaptador_lista(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter de List[schema], criado uma vez por schema"""
+    return TypeAdapter(List[schema])
+
+
+observar_lru("adaptador_lista", adaptador_lista)
+
+
+def lista_json(schema: Type[BaseModel], objetos: Iterable[Any]) -> bytes:
+    """Validar objetos (ORM ou dicts) no schema e serializar direto para bytes JSON"""
+    adaptador = adaptador_lista(schema)
+    return adaptador.dump_json(adaptador.validate_python(list(objetos), from_attributes=True))
+
+
+def objeto_json(schema: Type[BaseModel], objeto: Any) -> bytes:
+    """Mesmo caminho para um único objeto"""
+    return schema.model_validate(objeto, from_attributes=True).model_dump_json().encode()
+
+
+def resposta_lista(schema: Type[BaseModel], objetos: Iterable[Any]) -> Response:
+    """Response JSON de uma lista, já serializada"""
+    return Response(content=lista_json(schema, objetos), media_type="application/json")
@@ -0,0 +1,66 @@
+"""
+Job de arquivamento das partidas encerradas antigas
+
+Move, em lotes (uma transação por lote), as partidas FINALIZADA/CANCELADA que
+começaram há mais de ARQUIVO_IDADE_DIAS para as tabelas *_arquivo, junto com
+participantes, convites, candidaturas e avaliações (ver app/models/arquivo.py).
+Pode rodar a qualquer momento e repetidamente (ex: agendado uma vez por dia).
+
+Uso:
+    python arquivar_partidas.py                  # Idade e lote das configurações
+    python arquivar_partidas.py --dias 365 --lote 500
+    python arquivar_partidas.py --simular        # Só contar o que seria arquivado
+"""
+import argparse
+import logging
+import sys
+from datetime import timedelta
+from time import perf_counter
+
+from app.core.clock import agora
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.arquivo_repository import ArquivoRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def arquivar_partidas(dias: int, lote: int, simular: bool = False) -> int:
+    """Arquivar tudo que passou da idade. Retorna quantas partidas foram (ou seriam) arquivadas"""
+    antes_de = agora() - timedelta(days=dias)
+    db = SessionLocal()
+    total = 0
+    inicio = perf_counter()
+    try:
+        repositorio = ArquivoRepository(db)
+        if simular:
+            total = repositorio.contar_arquivaveis(antes_de)
+        else:
+            while True:
+                ids = repositorio.get_ids_arquivaveis(antes_de, lote)
+                if not ids:
+                    break
+                total += repositorio.arquivar(ids)
+                logger.info(f" {total} partidas arquivadas até agora...")
+    finally:
+        db.close()
+
+    acao = "seriam arquivadas" if simular else "arquivadas"
+    logger.info(f" {total} partidas encerradas antes de {antes_de:%Y-%m-%d} {acao} em {perf_counter() - inicio:.1f}s")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivar partidas encerradas antigas")
+    parser.add_argument("--dias", type=int, default=settings.ARQUIVO_IDADE_DIAS, help="Idade mínima (dias desde o início)")
+    parser.add_argument("--lote", type=int, default=settings.ARQUIVO_LOTE, help="Partidas por transação")
+    parser.add_argument("--simular", action="store_true", help="Não mover nada, só contar")
+    args = parser.parse_args()
+
+    arquivar_partidas(args.dias, args.lote, simular=args.simular)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark do arquivamento: consultas quentes antes e depois de arquivar
+
+Mede as listagens do PartidaRepository que varrem o histórico (get_todas,
+get_by_status, get_participando) e o tamanho das tabelas quentes, roda o
+arquivamento (partidas encerradas há mais de --dias) e mede de novo. O seed
+distribui as partidas entre 365 dias atrás e 60 dias à frente.
+
+Atenção: o arquivamento é aplicado de verdade no banco do benchmark.
+
+Uso:
+    python benchmarks/bench_arquivo.py --popular --perfil medio
+    python benchmarks/bench_arquivo.py [--dias 180] [--repeticoes 30]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+from time import perf_counter
+
+from estatisticas import percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+BANCO_PADRAO = f"sqlite:///{os.path.join(RAIZ, 'bench_galera_volei.db')}"
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tempos), 2),
+        "p95_ms": round(percentil(tempos, 95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do arquivamento de partidas")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", BANCO_PADRAO))
+    parser.add_argument("--popular", action="store_true", help="Popular o banco antes de medir")
+    parser.add_argument("--perfil", default="medio", help="Perfil do seed usado com --popular")
+    parser.add_argument("--dias", type=int, default=180)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from init_db import PERFIS, gerar_dados
+    if args.popular:
+        gerar_dados(**PERFIS[args.perfil])
+
+    from sqlalchemy import func
+    from app.core.database import SessionLocal
+    from app.models import Partida, Usuario
+    from app.models.enums import StatusPartida
+    from app.models.models import partida_participantes
+    from app.repositories import PartidaRepository
+    from arquivar_partidas import arquivar_partidas
+
+    db = SessionLocal()
+    try:
+        repositorio = PartidaRepository(db)
+        usuarios = [u for (u,) in db.query(Usuario.id).order_by(func.random()).limit(50).all()]
+        rng = random.Random(7)
+
+        cenarios = {
+            "get_todas (página 1)": lambda: repositorio.get_todas(limit=20),
+            "get_todas (skip 2000)": lambda: repositorio.get_todas(skip=2000, limit=20),
+            "get_by_status ATIVA": lambda: repositorio.get_by_status(StatusPartida.ATIVA, limit=20),
+            "get_participando": lambda: repositorio.get_participando(rng.choice(usuarios), limit=20),
+        }
+
+        def tamanhos():
+            return (
+                db.query(func.count(Partida.id)).scalar(),
+                db.query(func.count()).select_from(partida_participantes).scalar(),
+            )
+
+        resultados = {}
+        for fase in ("antes", "depois"):
+            if fase == "depois":
+                arquivar_partidas(args.dias, lote=5000)
+                db.expire_all()
+            partidas, participacoes = tamanhos()
+            print(f"\n{fase.upper()}: {partidas} partidas e {participacoes} participações nas tabelas quentes")
+            for nome, funcao in cenarios.items():
+                resultados[(fase, nome)] = medir(funcao, args.repeticoes)
+                r = resultados[(fase, nome)]
+                print(f"  {nome:<24} p50={r['p50_ms']:>8} ms  p95={r['p95_ms']:>8} ms")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark da busca textual de partidas
+
+Mede o tempo de PartidaService.buscar_partidas (consulta ao índice + filtros +
+ranqueamento + carga da página) em consultas que casam com quase todas as
+partidas do seed ("vôlei"), e compara com ordenar por relevância no próprio
+banco (bm25 do FTS5), que precisa pontuar todas as correspondências.
+
+Uso:
+    python benchmarks/bench_busca.py --popular --perfil realista
+    python benchmarks/bench_busca.py --popular --perfil pequeno --partidas 1000000
+    python benchmarks/bench_busca.py [--repeticoes 50] [--limite-ms 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+from time import perf_counter
+
+from estatisticas import percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+BANCO_PADRAO = f"sqlite:///{os.path.join(RAIZ, 'bench_galera_volei.db')}"
+
+CONSULTAS = [
+    ("volei", {}),
+    ("vôlei de praia", {}),
+    ("volei copacabana", {}),
+    ("volei sábado", {}),
+    ("volei", {"categoria": "iniciante"}),
+    ("quadra central", {"status_partida": "ATIVA"}),
+]
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    funcao()  # aquecimento (cache de páginas do banco)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tempos), 2),
+        "p95_ms": round(percentil(tempos, 95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual de partidas")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", BANCO_PADRAO))
+    parser.add_argument("--popular", action="store_true", help="Popular o banco antes de medir")
+    parser.add_argument("--perfil", default="realista", help="Perfil do seed usado com --popular")
+    parser.add_argument("--partidas", type=int, help="Com --popular: gerar só N partidas (sem convites/avaliações)")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--limite-ms", type=float, default=20.0, help="Orçamento de p95 por consulta")
+    parser.add_argument("--sem-bm25", action="store_true", help="Não medir a ordenação por bm25 (lenta)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from init_db import PERFIS, gerar_dados
+    if args.popular:
+        volumes = dict(PERFIS[args.perfil])
+        if args.partidas:
+            volumes.update(partidas=args.partidas, participacoes=args.partidas, convites=0, avaliacoes=0)
+        gerar_dados(**volumes)
+
+    from sqlalchemy import text
+    from app.core.database import SessionLocal
+    from app.models.busca import TABELA_FTS
+    from app.models.enums import StatusPartida
+    from app.services import PartidaService
+    from app.utils.busca import interpretar_consulta
+    from update_db import instalar_indice_busca
+
+    instalar_indice_busca()
+    db = SessionLocal()
+    try:
+        service = PartidaService(db)
+        sqlite = db.get_bind().dialect.name == "sqlite"
+
+        if sqlite:
+            total = db.execute(
+                text(f"SELECT count(*) FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH :q"),
+                {"q": interpretar_consulta("volei").fts5()}
+            ).scalar()
+            print(f"Correspondências de 'volei': {total}")
+
+        print("BENCHMARK DA BUSCA TEXTUAL (janela de candidatos + ranqueamento)")
+        print("=" * 60)
+        estourou = False
+        for q, filtros in CONSULTAS:
+            descricao = q + "".join(f" [{chave}={valor}]" for chave, valor in filtros.items())
+            if "status_partida" in filtros:
+                filtros = {**filtros, "status_partida": StatusPartida[filtros["status_partida"]]}
+            resultado = medir(lambda: service.buscar_partidas(q, limit=20, **filtros), args.repeticoes)
+            estourou |= resultado["p95_ms"] > args.limite_ms
+            print(f"  {descricao:<45} p50={resultado['p50_ms']:>7} ms  p95={resultado['p95_ms']:>7} ms")
+
+        if sqlite and not args.sem_bm25:
+            consulta = interpretar_consulta("volei").fts5()
+            sql = text(
+                f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH :q "
+                f"ORDER BY bm25({TABELA_FTS}, 3.0, 1.0, 2.0) LIMIT 20"
+            )
+            resultado = medir(lambda: db.execute(sql, {"q": consulta}).all(), max(3, args.repeticoes // 10))
+            print(f"  {'[referência] ORDER BY bm25 (volei)':<45} p50={resultado['p50_ms']:>7} ms  p95={resultado['p95_ms']:>7} ms")
+    finally:
+        db.close()
+
+    print(f"\nOrçamento p95: {args.limite_ms} ms -> {'ESTOUROU' if estourou else 'OK'}")
+    return 1 if estourou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
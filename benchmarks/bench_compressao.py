@@ -0,0 +1,81 @@
+"""
+Benchmark de bytes trafegados: páginas de partidas (JSON) e arquivos estáticos
+
+Para uma página típica da listagem de partidas (20 partidas com 8 participantes,
+padrão da busca) e para a página cheia (100 x 12), mede o tamanho da resposta
+sem compressão e com cada codificação usada pelo CompressaoMiddleware, e o
+custo de comprimir (os dados sintéticos repetem nomes e textos, então a razão
+é otimista em relação a dados reais). Para /static, compara o tamanho original
+com as variantes pré-comprimidas servidas por app.core.estaticos.
+
+Uso:
+    python benchmarks/bench_compressao.py [--repeticoes 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+from time import perf_counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, "benchmarks"))
+
+from bench_serializacao import gerar_partidas  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.estaticos import ArquivosEstaticos  # noqa: E402
+from app.schemas import PartidaResponse  # noqa: E402
+from app.utils.compressao import CODIFICACOES, comprimir  # noqa: E402
+from app.utils.serializacao import lista_json  # noqa: E402
+
+PAGINAS = [("típica (20 x 8)", 20, 8), ("cheia (100 x 12)", 100, 12)]
+NIVEIS = {"gzip": settings.COMPRESSAO_NIVEL_GZIP, "br": settings.COMPRESSAO_NIVEL_BROTLI}
+
+
+def medir_ms(funcao, repeticoes: int) -> float:
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bytes trafegados com compressão")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"PÁGINAS DE PARTIDAS (JSON) - codificações disponíveis: {', '.join(CODIFICACOES)}")
+    print("=" * 72)
+    for descricao, partidas, participantes in PAGINAS:
+        corpo = lista_json(PartidaResponse, gerar_partidas(partidas, participantes))
+        print(f"  {descricao:<18} sem compressão: {len(corpo):>8} B")
+        for codificacao in CODIFICACOES:
+            nivel = NIVEIS[codificacao]
+            comprimido = comprimir(corpo, codificacao, nivel)
+            custo = medir_ms(lambda: comprimir(corpo, codificacao, nivel), args.repeticoes)
+            print(
+                f"  {'':<18} {codificacao:<4} nível {nivel}: {len(comprimido):>8} B"
+                f" ({len(comprimido) / len(corpo):.1%}) em {custo} ms"
+            )
+
+    print()
+    print("ARQUIVOS ESTÁTICOS (variantes pré-comprimidas, sem custo por requisição)")
+    print("=" * 72)
+    estaticos = ArquivosEstaticos(os.path.join(RAIZ, "static"))
+    total_original = total_comprimido = 0
+    for nome, arquivo in sorted(estaticos._indexar().items()):
+        menor = min(arquivo.variantes.values(), key=len, default=arquivo.conteudo)
+        total_original += len(arquivo.conteudo)
+        total_comprimido += len(menor)
+        variantes = ", ".join(f"{c} {len(v)} B" for c, v in arquivo.variantes.items())
+        print(f"  {nome:<24} {len(arquivo.conteudo):>7} B -> {variantes}")
+    print(f"  {'total':<24} {total_original:>7} B -> {total_comprimido} B ({total_comprimido / total_original:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
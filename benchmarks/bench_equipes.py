@@ -0,0 +1,89 @@
+"""
+Benchmark da divisão equilibrada de equipes (app/utils/equipes.py)
+
+Elencos pequenos: compara a heurística (serpentina + trocas) com a busca
+exaustiva, em tempo e na diferença entre as médias de rating das equipes.
+Elencos grandes/pools de torneio: só a heurística (a exaustiva é inviável).
+
+Uso:
+    python benchmarks/bench_equipes.py [--amostras 200] [--semente 42]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+from itertools import combinations
+from time import perf_counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+from app.utils.equipes import dividir_equipes, diferenca_medias
+
+
+def dividir_exaustivo(jogadores):
+    """Melhor divisão em 2 equipes (tamanhos n//2 e n - n//2) testando todas as combinações"""
+    ratings = dict(jogadores)
+    ids = sorted(ratings)
+    melhor = None
+    for grupo in combinations(ids, len(ids) // 2):
+        outros = [i for i in ids if i not in set(grupo)]
+        diferenca = diferenca_medias([[ratings[i] for i in grupo], [ratings[i] for i in outros]])
+        if melhor is None or diferenca < melhor[0]:
+            melhor = (diferenca, list(grupo), outros)
+    return melhor[1], melhor[2]
+
+
+def gerar_elenco(rng, tamanho):
+    return [(i, rng.gauss(1500, 150)) for i in range(tamanho)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da divisão equilibrada de equipes")
+    parser.add_argument("--amostras", type=int, default=200, help="Elencos por tamanho (elencos pequenos)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.semente)
+
+    print("ELENCOS PEQUENOS: heurística x busca exaustiva (diferença entre médias, pontos de rating)")
+    print("=" * 96)
+    for tamanho in (6, 8, 10, 12, 14, 16):
+        amostras = max(1, args.amostras if tamanho <= 12 else args.amostras // 10)
+        excessos, otimas, tempo_heuristica, tempo_exaustiva = [], 0, 0.0, 0.0
+        for _ in range(amostras):
+            jogadores = gerar_elenco(rng, tamanho)
+            ratings = dict(jogadores)
+
+            inicio = perf_counter()
+            heuristica = dividir_equipes(jogadores)
+            tempo_heuristica += perf_counter() - inicio
+            inicio = perf_counter()
+            exaustiva = dividir_exaustivo(jogadores)
+            tempo_exaustiva += perf_counter() - inicio
+
+            obtida = diferenca_medias([[ratings[i] for i in equipe] for equipe in heuristica])
+            otima = diferenca_medias([[ratings[i] for i in equipe] for equipe in exaustiva])
+            excessos.append(obtida - otima)
+            otimas += obtida - otima < 1e-6
+        print(
+            f"  {tamanho:>2} jogadores ({amostras:>3} elencos): ótima em {otimas / amostras:>4.0%}  "
+            f"excesso médio={statistics.mean(excessos):>5.2f}  máx={max(excessos):>6.2f}  "
+            f"tempo {tempo_heuristica / amostras * 1000:>6.3f} ms x {tempo_exaustiva / amostras * 1000:>8.2f} ms"
+        )
+
+    print("\nELENCOS GRANDES / POOLS DE TORNEIO (só heurística)")
+    print("=" * 96)
+    for tamanho, quantidade in ((100, 2), (1000, 8), (10000, 16), (100000, 64)):
+        jogadores = gerar_elenco(rng, tamanho)
+        ratings = dict(jogadores)
+        inicio = perf_counter()
+        equipes = dividir_equipes(jogadores, quantidade=quantidade)
+        duracao = perf_counter() - inicio
+        diferenca = diferenca_medias([[ratings[i] for i in equipe] for equipe in equipes])
+        print(f"  {tamanho:>6} jogadores em {quantidade:>2} equipes: {duracao * 1000:>8.1f} ms  diferença máx={diferenca:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark do hub de eventos com muitos assinantes ociosos
+
+Abre N streams SSE (fluxo_sse) sobre o hub em um único event loop, publica
+eventos a partir de uma thread (como fazem os services no threadpool) e mede
+memória por assinante e latência de fan-out até o último cliente.
+
+Uso:
+    python benchmarks/bench_eventos.py [--assinantes 5000] [--canais 100] [--eventos 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.eventos import HubEventos, fluxo_sse  # noqa: E402
+
+
+async def consumir(fluxo, contagem: dict, pronto: asyncio.Event):
+    async for trecho in fluxo:
+        if "event: teste" in trecho:
+            contagem["recebidos"] += 1
+            if contagem["recebidos"] >= contagem["esperado"]:
+                pronto.set()
+
+
+async def executar(args) -> int:
+    hub = HubEventos()
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    tarefas = []
+    contagem = {"recebidos": 0, "esperado": 0}
+    pronto = asyncio.Event()
+    for i in range(args.assinantes):
+        canal = i % args.canais
+        fluxo = fluxo_sse(hub.assinar(canal, tamanho=32), heartbeat=args.heartbeat)
+        tarefas.append(asyncio.create_task(consumir(fluxo, contagem, pronto)))
+    await asyncio.sleep(0.1)  # todos os streams aguardando (ociosos)
+    memoria = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    print("BENCHMARK DO HUB DE EVENTOS")
+    print("=" * 50)
+    print(f"  Assinantes: {hub.assinantes():,} em {args.canais} canais")
+    print(f"  Memória por assinante ocioso: {memoria / args.assinantes / 1024:.2f} KiB")
+
+    latencias = []
+    por_canal = args.assinantes // args.canais
+    for canal in range(min(args.eventos, args.canais)):
+        pronto.clear()
+        contagem["esperado"] = contagem["recebidos"] + por_canal
+        inicio = perf_counter()
+        await asyncio.to_thread(hub.publicar, canal, "teste")
+        await asyncio.wait_for(pronto.wait(), 10)
+        latencias.append(perf_counter() - inicio)
+
+    latencias.sort()
+    print(f"  Fan-out para {por_canal} assinantes: p50 {latencias[len(latencias) // 2] * 1000:.2f} ms"
+          f" | max {latencias[-1] * 1000:.2f} ms")
+
+    inicio = perf_counter()
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    print(f"  Encerramento de {len(tarefas):,} streams: {(perf_counter() - inicio) * 1000:.0f} ms"
+          f" (restantes: {hub.assinantes()})")
+    return 0 if hub.assinantes() == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do hub de eventos")
+    parser.add_argument("--assinantes", type=int, default=5000)
+    parser.add_argument("--canais", type=int, default=100)
+    parser.add_argument("--eventos", type=int, default=20)
+    parser.add_argument("--heartbeat", type=float, default=15.0)
+    args = parser.parse_args()
+    return asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Benchmark da busca por proximidade (GET /partidas/proximas-de-mim)
+
+Compara PartidaService.get_partidas_proximas_de (pré-filtro por células da
+grade no índice + haversine + raio crescente) com a varredura completa: ler as
+coordenadas de todas as próximas partidas ativas, calcular a distância de cada
+uma e ordenar. O seed espalha as partidas em ~65 km em torno de Teresina.
+
+Uso:
+    python benchmarks/bench_geo.py --popular --perfil pequeno --partidas 1000000
+    python benchmarks/bench_geo.py [--repeticoes 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+from time import perf_counter
+
+from estatisticas import percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+BANCO_PADRAO = f"sqlite:///{os.path.join(RAIZ, 'bench_galera_volei.db')}"
+
+# (descrição, deslocamento do centro em graus, raio_km, skip)
+CENARIOS = [
+    ("centro, 5 km", 0.0, 5, 0),
+    ("centro, 50 km", 0.0, 50, 0),
+    ("centro, 50 km, skip 2000", 0.0, 50, 2000),
+    ("borda da região, 20 km", 0.35, 20, 0),
+]
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tempos), 2),
+        "p95_ms": round(percentil(tempos, 95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca por proximidade")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", BANCO_PADRAO))
+    parser.add_argument("--popular", action="store_true", help="Popular o banco antes de medir")
+    parser.add_argument("--perfil", default="realista", help="Perfil do seed usado com --popular")
+    parser.add_argument("--partidas", type=int, help="Com --popular: gerar só N partidas (sem convites/avaliações)")
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from init_db import CENTRO_SEED, PERFIS, gerar_dados
+    if args.popular:
+        volumes = dict(PERFIS[args.perfil])
+        if args.partidas:
+            volumes.update(partidas=args.partidas, participacoes=args.partidas, convites=0, avaliacoes=0)
+        gerar_dados(**volumes)
+
+    from app.core.clock import agora
+    from app.core.database import SessionLocal
+    from app.models import Partida
+    from app.models.enums import StatusPartida
+    from app.services import PartidaService
+    from app.utils.geo import haversine_km
+
+    db = SessionLocal()
+    try:
+        service = PartidaService(db)
+        total = db.query(Partida).filter(Partida.geo_celula.isnot(None)).count()
+        print(f"Partidas com coordenadas: {total}")
+
+        def varredura(latitude, longitude, raio_km, skip, limit=20):
+            """Referência sem índice geográfico: distância de todas as próximas partidas"""
+            linhas = (
+                db.query(Partida.id, Partida.latitude, Partida.longitude, Partida.data_partida)
+                .filter(Partida.status == StatusPartida.ATIVA)
+                .filter(Partida.data_partida >= agora())
+                .filter(Partida.latitude.isnot(None))
+                .all()
+            )
+            dentro = []
+            for partida_id, lat, lon, data_partida in linhas:
+                distancia = haversine_km(latitude, longitude, lat, lon)
+                if distancia <= raio_km:
+                    dentro.append((distancia, data_partida, partida_id))
+            return [partida_id for _, _, partida_id in sorted(dentro)[skip:skip + limit]]
+
+        print("BENCHMARK DA BUSCA POR PROXIMIDADE (página de 20)")
+        print("=" * 72)
+        for descricao, deslocamento, raio_km, skip in CENARIOS:
+            latitude, longitude = CENTRO_SEED[0] + deslocamento, CENTRO_SEED[1] + deslocamento
+            grade = lambda: service.get_partidas_proximas_de(latitude, longitude, raio_km, skip=skip, limit=20)
+            completa = lambda: varredura(latitude, longitude, raio_km, skip)
+
+            assert [p.id for p in grade()] == completa(), f"Resultados divergentes em '{descricao}'"
+            com_grade = medir(grade, args.repeticoes)
+            sem_grade = medir(completa, max(3, args.repeticoes // 10))
+            print(
+                f"  {descricao:<28} grade p50={com_grade['p50_ms']:>8} ms p95={com_grade['p95_ms']:>8} ms"
+                f" | varredura p50={sem_grade['p50_ms']:>8} ms"
+            )
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark do cold start do worker (import de api.py)
+
+Cada rodada importa `api` em um processo Python novo, com o banco apontando
+para um diretório inexistente: o import não pode tocar o banco (o schema é
+papel da migração) e jose/passlib só devem ser carregados no primeiro uso.
+Falha (código 1) se a mediana passar do orçamento.
+
+Uso:
+    python benchmarks/bench_inicializacao.py [--rodadas 7] [--orcamento-ms 1200] [--top 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em cada processo novo: mede o import e verifica efeitos colaterais
+SONDA = """
+import json, sys
+from time import perf_counter
+inicio = perf_counter()
+import api
+duracao = perf_counter() - inicio
+print(json.dumps({
+    "import_ms": duracao * 1000,
+    "carregados": [m for m in ("jose", "passlib", "bcrypt") if m in sys.modules],
+}))
+"""
+
+ORCAMENTO_PADRAO_MS = 1200
+
+
+def rodar_sonda(ambiente: dict) -> dict:
+    saida = subprocess.run(
+        [sys.executable, "-c", SONDA], cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def maiores_imports(ambiente: dict, top: int) -> list:
+    """Módulos com maior tempo próprio de import (python -X importtime)"""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api"], cwd=RAIZ, env=ambiente,
+        capture_output=True, text=True, check=True
+    )
+    linhas = []
+    for linha in saida.stderr.splitlines():
+        partes = linha.split("|")
+        if len(partes) == 3 and partes[0].strip().startswith("import time:") and partes[1].strip().isdigit():
+            linhas.append((int(partes[0].split(":")[1]), int(partes[1]), partes[2].strip()))
+    return sorted(linhas, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de import de api.py")
+    parser.add_argument("--rodadas", type=int, default=7)
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    parser.add_argument("--top", type=int, default=10, help="Listar os N imports mais caros")
+    args = parser.parse_args()
+
+    ambiente = dict(os.environ, DATABASE_URL="sqlite:////diretorio-inexistente/galera_volei.db")
+    resultados = [rodar_sonda(ambiente) for _ in range(args.rodadas)]
+    tempos = sorted(r["import_ms"] for r in resultados)
+    mediana = statistics.median(tempos)
+
+    print("COLD START DO WORKER (import api, processo novo)")
+    print("=" * 64)
+    print(f"  p50={mediana:.0f} ms  min={tempos[0]:.0f} ms  max={tempos[-1]:.0f} ms  (orçamento {args.orcamento_ms:.0f} ms)")
+    carregados = sorted({m for r in resultados for m in r["carregados"]})
+    print(f"  Banco: não acessado (URL inválida)  |  jose/passlib carregados: {', '.join(carregados) or 'nenhum'}")
+
+    if args.top:
+        print(f"\n  {args.top} imports mais caros (tempo próprio):")
+        for proprio, acumulado, modulo in maiores_imports(ambiente, args.top):
+            print(f"    {proprio / 1000:>7.1f} ms  (acumulado {acumulado / 1000:>7.1f} ms)  {modulo}")
+
+    if carregados or mediana > args.orcamento_ms:
+        print("\n  FALHOU: orçamento excedido ou módulos pesados carregados no import")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
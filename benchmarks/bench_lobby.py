@@ -0,0 +1,190 @@
+"""
+Benchmark do lobby WebSocket com milhares de conexões simultâneas
+
+Sobe um worker uvicorn (subprocesso) apontando para o banco de benchmark,
+abre N WebSockets distribuídos entre várias partidas, mede tempo de conexão,
+memória do worker por socket e latência de fan-out de uma mensagem até o
+último membro de cada lobby.
+
+Uso:
+    python benchmarks/bench_lobby.py --popular
+    python benchmarks/bench_lobby.py --conexoes 10000 --partidas 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+from time import perf_counter, sleep
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+BANCO_PADRAO = f"sqlite:///{os.path.join(RAIZ, 'bench_galera_volei.db')}"
+
+
+def memoria_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def aguardar_servidor(porta: int, timeout: float = 30.0) -> None:
+    inicio = perf_counter()
+    while perf_counter() - inicio < timeout:
+        try:
+            with socket.create_connection(("127.0.0.1", porta), timeout=1):
+                return
+        except OSError:
+            sleep(0.2)
+    raise RuntimeError("Servidor não respondeu")
+
+
+class Cliente:
+    """Conexão de benchmark: lê continuamente e registra quando a mensagem de teste chega"""
+
+    def __init__(self, partida_id: int):
+        self.partida_id = partida_id
+        self.ws = None
+        self.recebida = asyncio.Event()
+        self.fechamento = None
+
+    async def conectar(self, url: str):
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(url, max_queue=None, ping_interval=None, open_timeout=60)
+        assert json.loads(await self.ws.recv())["tipo"] == "lobby"
+        self.leitura = asyncio.create_task(self.ler())
+
+    async def ler(self):
+        try:
+            async for texto in self.ws:
+                if '"tipo": "mensagem"' in texto:
+                    self.recebida.set()
+                elif texto == '{"tipo": "ping"}':
+                    # Heartbeat da aplicação: sem resposta o servidor encerra a conexão
+                    await self.ws.send('{"tipo": "pong"}')
+        except Exception:
+            pass
+        self.fechamento = self.ws.close_code
+
+
+async def executar(args, porta: int, tokens: list, partidas: list, pid: int) -> dict:
+    clientes = [Cliente(partidas[i % len(partidas)]) for i in range(args.conexoes)]
+    memoria_inicial = memoria_rss_mb(pid)
+
+    inicio = perf_counter()
+    limite = asyncio.Semaphore(args.concorrencia)
+
+    async def conectar(indice: int, cliente: Cliente):
+        async with limite:
+            token = tokens[indice % len(tokens)]
+            await cliente.conectar(f"ws://127.0.0.1:{porta}/ws/partidas/{cliente.partida_id}?token={token}")
+
+    resultados = await asyncio.gather(*(conectar(i, c) for i, c in enumerate(clientes)), return_exceptions=True)
+    tempo_conexao = perf_counter() - inicio
+    falhas = sum(1 for r in resultados if isinstance(r, Exception))
+    conectados = [c for c, r in zip(clientes, resultados) if not isinstance(r, Exception)]
+
+    await asyncio.sleep(args.assentamento)  # rajada de "lobby_entrou" drenada
+    memoria_final = memoria_rss_mb(pid)
+
+    # Fan-out: um membro de cada lobby envia uma mensagem; medir até o último receber
+    latencias = []
+    por_partida = {}
+    for cliente in conectados:
+        por_partida.setdefault(cliente.partida_id, []).append(cliente)
+    for membros in list(por_partida.values())[:args.amostras]:
+        inicio = perf_counter()
+        await membros[0].ws.send(json.dumps({"tipo": "mensagem", "texto": "bench"}))
+        await asyncio.wait_for(asyncio.gather(*(m.recebida.wait() for m in membros)), 30)
+        latencias.append(perf_counter() - inicio)
+
+    desconectados = sum(1 for c in conectados if c.fechamento is not None)
+    await asyncio.gather(*(c.ws.close() for c in conectados), return_exceptions=True)
+
+    latencias.sort()
+    return {
+        "conexoes": args.conexoes,
+        "falhas": falhas,
+        "desconectados_durante_teste": desconectados,
+        "tempo_conexao_s": round(tempo_conexao, 2),
+        "conexoes_por_s": round(len(conectados) / tempo_conexao, 1),
+        "rss_mb_inicial": round(memoria_inicial, 1),
+        "rss_mb_final": round(memoria_final, 1),
+        "kib_por_conexao": round((memoria_final - memoria_inicial) * 1024 / max(1, len(conectados)), 1),
+        "membros_por_lobby": args.conexoes // len(partidas),
+        "fanout_p50_ms": round(latencias[len(latencias) // 2] * 1000, 2) if latencias else None,
+        "fanout_max_ms": round(latencias[-1] * 1000, 2) if latencias else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do lobby WebSocket")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", BANCO_PADRAO))
+    parser.add_argument("--popular", action="store_true", help="Popular o banco (perfil pequeno) antes")
+    parser.add_argument("--conexoes", type=int, default=10000)
+    parser.add_argument("--partidas", type=int, default=100, help="Número de lobbies")
+    parser.add_argument("--concorrencia", type=int, default=200, help="Handshakes simultâneos")
+    parser.add_argument("--amostras", type=int, default=20, help="Lobbies usados na medição de fan-out")
+    parser.add_argument("--assentamento", type=float, default=3.0)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    # Cliente e servidor precisam de um descritor por socket
+    _, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (maximo, maximo))
+
+    from init_db import PERFIS, gerar_dados
+    if args.popular:
+        gerar_dados(**PERFIS["pequeno"])
+
+    from sqlalchemy import select
+    from app.core.database import engine
+    from app.core.security import security
+    from app.models import Usuario, Partida
+
+    with engine.connect() as conn:
+        usuarios = [linha[0] for linha in conn.execute(select(Usuario.id).limit(1000))]
+        partidas = [linha[0] for linha in conn.execute(select(Partida.id).limit(args.partidas))]
+    if not usuarios or not partidas:
+        print("Banco vazio: rode com --popular")
+        return 1
+    tokens = [security.create_access_token(subject=usuario_id) for usuario_id in usuarios]
+
+    porta = porta_livre()
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(porta),
+         "--log-level", "warning", "--ws", "websockets", "--backlog", "4096",
+         # Mesmo ajuste do Procfile: compressão por mensagem custa ~95 KiB de zlib por socket
+         "--ws-per-message-deflate", "false"],
+        cwd=RAIZ, env=dict(os.environ)
+    )
+    try:
+        aguardar_servidor(porta)
+        resultado = asyncio.run(executar(args, porta, tokens, partidas, servidor.pid))
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+    print("BENCHMARK DO LOBBY WEBSOCKET (1 worker)")
+    print("=" * 50)
+    for chave, valor in resultado.items():
+        print(f"  {chave}: {valor}")
+    return 0 if resultado["falhas"] == 0 and resultado["desconectados_durante_teste"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark do custo da instrumentação de métricas
+
+Compara a pilha completa de middlewares da API atendendo GET /health com e
+sem o MetricsMiddleware, chamando a aplicação ASGI diretamente (sem rede),
+e mede o custo unitário de cada tipo de métrica.
+
+Uso:
+    python benchmarks/bench_metrics.py [--requisicoes 5000] [--rodadas 7] [--limite 2.0]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import app  # noqa: E402
+from app.core.metrics import Counter, Histogram  # noqa: E402
+from app.middlewares.metrics import MetricsMiddleware  # noqa: E402
+
+MIDDLEWARES_ORIGINAIS = list(app.user_middleware)
+
+
+def montar_pilha(com_metricas: bool):
+    """Reconstruir a pilha de middlewares com ou sem métricas"""
+    app.user_middleware = [
+        m for m in MIDDLEWARES_ORIGINAIS if com_metricas or m.cls is not MetricsMiddleware
+    ]
+    app.middleware_stack = app.build_middleware_stack()
+    return app
+
+
+async def disparar(aplicacao, requisicoes: int) -> float:
+    """Executar N requisições GET /health e retornar o tempo total"""
+    scope_base = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def send(message):
+        pass
+
+    def criar_receive():
+        mensagens = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            # Depois do corpo, o cliente "desconecta" (como o servidor ASGI faz ao fim da resposta)
+            return mensagens.pop() if mensagens else {"type": "http.disconnect"}
+        return receive
+
+    inicio = perf_counter()
+    for _ in range(requisicoes):
+        await aplicacao(dict(scope_base), criar_receive(), send)
+    return perf_counter() - inicio
+
+
+def micro_benchmark(iteracoes: int = 200_000):
+    """Custo por operação de cada métrica, em nanossegundos"""
+    contador = Counter("bench_counter", "bench", ("method", "route", "status"))
+    histograma = Histogram("bench_histogram", "bench", ("method", "route"))
+
+    inicio = perf_counter()
+    for _ in range(iteracoes):
+        contador.inc("GET", "/api/v1/partidas/", "200")
+    custo_counter = (perf_counter() - inicio) / iteracoes * 1e9
+
+    inicio = perf_counter()
+    for _ in range(iteracoes):
+        histograma.observe("GET", "/api/v1/partidas/", valor=0.0042)
+    custo_histogram = (perf_counter() - inicio) / iteracoes * 1e9
+
+    return custo_counter, custo_histogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead da instrumentação de métricas")
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--rodadas", type=int, default=7)
+    parser.add_argument("--limite", type=float, default=2.0, help="Overhead máximo aceito (%%)")
+    args = parser.parse_args()
+
+    # Aquecimento de ambas as pilhas
+    sem_pilha = montar_pilha(False).middleware_stack
+    com_pilha = montar_pilha(True).middleware_stack
+    asyncio.run(disparar(sem_pilha, 200))
+    asyncio.run(disparar(com_pilha, 200))
+
+    tempos_sem, tempos_com = [], []
+    for _ in range(args.rodadas):
+        # Rodadas intercaladas para diluir ruído de CPU
+        tempos_sem.append(asyncio.run(disparar(sem_pilha, args.requisicoes)))
+        tempos_com.append(asyncio.run(disparar(com_pilha, args.requisicoes)))
+
+    mediana_sem = statistics.median(tempos_sem)
+    mediana_com = statistics.median(tempos_com)
+    overhead = (mediana_com - mediana_sem) / mediana_sem * 100
+
+    custo_counter, custo_histogram = micro_benchmark()
+
+    print("BENCHMARK DE MÉTRICAS")
+    print("=" * 50)
+    print(f"  Requisições por rodada: {args.requisicoes} x {args.rodadas} rodadas")
+    print(f"  Sem métricas: {args.requisicoes / mediana_sem:,.0f} req/s ({mediana_sem / args.requisicoes * 1e6:.1f} us/req)")
+    print(f"  Com métricas: {args.requisicoes / mediana_com:,.0f} req/s ({mediana_com / args.requisicoes * 1e6:.1f} us/req)")
+    print(f"  Overhead: {overhead:+.2f}% (limite: {args.limite:.1f}%)")
+    print(f"  Counter.inc: {custo_counter:.0f} ns/op | Histogram.observe: {custo_histogram:.0f} ns/op")
+
+    # Restaurar a pilha original
+    app.user_middleware = MIDDLEWARES_ORIGINAIS
+    app.middleware_stack = None
+
+    return 0 if overhead <= args.limite else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
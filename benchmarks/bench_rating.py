@@ -0,0 +1,71 @@
+"""
+Benchmark do recálculo completo dos ratings (motor vetorizado de app/utils/rating.py)
+
+Gera em memória um histórico sintético (partidas de 12 jogadores espalhadas
+por --dias períodos) e mede só o cálculo, sem a leitura do banco. Para medir a
+leitura também, use recalcular_ratings.py --simular num banco populado
+(python init_db.py seed --perfil realista).
+
+Uso:
+    python benchmarks/bench_rating.py [--partidas 1000000] [--usuarios 100000] [--dias 425]
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+import numpy as np
+
+from app.utils.rating import recalcular
+
+
+def gerar_historico(partidas: int, usuarios: int, dias: int, por_partida: int, semente: int = 42):
+    """(partidas, participacoes, usuario_ids) no formato aceito por recalcular"""
+    rng = np.random.default_rng(semente)
+    periodos = np.sort(rng.integers(0, dias, partidas)) + 738000
+    tabela = np.column_stack((
+        np.arange(1, partidas + 1),
+        periodos,
+        rng.integers(0, 2, partidas),  # Vitória da equipe A ou B
+        np.where(rng.random(partidas) < 0.3, 1.0, 0.5),  # 30% competitivas
+    )).astype(np.float64)
+    participacoes = np.column_stack((
+        np.repeat(np.arange(1, partidas + 1), por_partida),
+        rng.integers(1, usuarios + 1, partidas * por_partida),  # Repetições dentro da partida são raras e inofensivas
+        np.tile(np.arange(por_partida) % 2, partidas),  # Divisão gravada: lados alternados
+    ))
+    return tabela, participacoes, np.arange(1, usuarios + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do recálculo vetorizado de ratings")
+    parser.add_argument("--partidas", type=int, default=1_000_000)
+    parser.add_argument("--usuarios", type=int, default=100_000)
+    parser.add_argument("--dias", type=int, default=425, help="Períodos de rating (dias distintos)")
+    parser.add_argument("--por-partida", type=int, default=12)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    inicio = perf_counter()
+    partidas, participacoes, usuario_ids = gerar_historico(args.partidas, args.usuarios, args.dias, args.por_partida)
+    print(f"Histórico sintético: {args.partidas} partidas, {len(participacoes)} participações, "
+          f"{args.usuarios} usuários, {args.dias} dias (gerado em {perf_counter() - inicio:.1f}s)")
+
+    tempos = []
+    for _ in range(args.repeticoes):
+        inicio = perf_counter()
+        ratings, jogos = recalcular(partidas, participacoes, usuario_ids)
+        tempos.append(perf_counter() - inicio)
+    tempos.sort()
+
+    print(f"  recalcular: melhor={tempos[0]:.2f}s  mediana={tempos[len(tempos) // 2]:.2f}s")
+    print(f"  ratings: min={ratings.min():.0f}  média={ratings.mean():.1f}  max={ratings.max():.0f}  "
+          f"partidas ranqueadas por usuário (média)={jogos.mean():.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
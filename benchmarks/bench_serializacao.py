@@ -0,0 +1,119 @@
+"""
+Microbenchmark da serialização de listas de partidas
+
+Serializa 100 partidas com 12 participantes cada (objetos ORM em memória, sem
+banco) de duas formas e compara o tempo até os bytes da resposta:
+
+- padrão do FastAPI: serialize_response com response_model=List[PartidaResponse]
+  (validação from_attributes + dicts intermediários) e JSONResponse (json da stdlib);
+- caminho rápido (app.utils.serializacao): TypeAdapter em cache, validação única
+  e JSON gerado direto pelo pydantic-core.
+
+Uso:
+    python benchmarks/bench_serializacao.py [--partidas 100] [--participantes 12] [--repeticoes 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+from datetime import timedelta
+from time import perf_counter
+from typing import List
+
+from estatisticas import percentil
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.clock import agora  # noqa: E402
+from app.models import Partida, Usuario  # noqa: E402
+from app.models.enums import StatusPartida, TipoPartida, TipoUsuario  # noqa: E402
+from app.schemas import PartidaResponse  # noqa: E402
+from app.utils.serializacao import lista_json  # noqa: E402
+
+
+def gerar_partidas(total: int, participantes: int) -> List[Partida]:
+    """Partidas e usuários transitórios (nunca adicionados a uma sessão)"""
+    instante = agora()
+    usuarios = [
+        Usuario(
+            id=i, nome=f"Atleta {i}", email=f"atleta{i}@galeravolei.com", tipo=TipoUsuario.INTERMEDIARIO,
+            ativo=True, pontuacao_total=i * 10, partidas_jogadas=i, vitorias=i // 2, derrotas=i - i // 2,
+            rating=1500.0 + i, partidas_ranqueadas=i,
+            created_at=instante, updated_at=None
+        )
+        for i in range(1, total + participantes + 1)
+    ]
+    partidas = []
+    for i in range(total):
+        partida = Partida(
+            id=i + 1, titulo=f"Vôlei de quinta {i}", descricao="Partida amistosa no fim da tarde",
+            tipo=TipoPartida.AMISTOSA, categoria="livre", data_partida=instante + timedelta(days=i),
+            duracao_estimada=120, local="Arena Teresina", latitude=-5.09, longitude=-42.8,
+            max_participantes=participantes, publica=True, status=StatusPartida.ATIVA,
+            pontuacao_equipe_a=0, pontuacao_equipe_b=0, organizador_id=usuarios[i].id,
+            created_at=instante, updated_at=None
+        )
+        partida.organizador = usuarios[i]
+        partida.participantes = usuarios[i + 1:i + 1 + participantes]
+        partidas.append(partida)
+    return partidas
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tempos), 3),
+        "p95_ms": round(percentil(tempos, 95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark da serialização de listas")
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--participantes", type=int, default=12)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    partidas = gerar_partidas(args.partidas, args.participantes)
+    campo = create_response_field(name="Response", type_=List[PartidaResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def padrao_fastapi() -> bytes:
+        conteudo = loop.run_until_complete(
+            serialize_response(field=campo, response_content=partidas, is_coroutine=False)
+        )
+        return JSONResponse(conteudo).body
+
+    def caminho_rapido() -> bytes:
+        return lista_json(PartidaResponse, partidas)
+
+    assert json.loads(padrao_fastapi()) == json.loads(caminho_rapido()), "Serializações divergentes"
+
+    print(f"SERIALIZAÇÃO DE {args.partidas} PARTIDAS x {args.participantes} PARTICIPANTES")
+    print("=" * 64)
+    resultados = {
+        "padrão FastAPI": medir(padrao_fastapi, args.repeticoes),
+        "caminho rápido": medir(caminho_rapido, args.repeticoes),
+    }
+    for nome, r in resultados.items():
+        print(f"  {nome:<16} p50={r['p50_ms']:>8} ms  p95={r['p95_ms']:>8} ms")
+    ganho = resultados["padrão FastAPI"]["p50_ms"] / resultados["caminho rápido"]["p50_ms"]
+    print(f"  Ganho (p50): {ganho:.1f}x  |  {len(caminho_rapido()) / 1024:.0f} KB por resposta")
+    loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
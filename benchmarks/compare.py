@@ -0,0 +1,63 @@
+"""
+Comparar dois resultados do teste de carga (benchmarks/loadtest.py)
+
+Uso:
+    python benchmarks/compare.py antes.json depois.json [--tolerancia 10]
+
+Retorna código 1 se algum p95 piorar além da tolerância (em %).
+"""
+import argparse
+import json
+import sys
+
+METRICAS = ("vazao_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def variacao(antes: float, depois: float) -> float:
+    if not antes:
+        return 0.0
+    return (depois - antes) / antes * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar resultados de teste de carga")
+    parser.add_argument("antes")
+    parser.add_argument("depois")
+    parser.add_argument("--tolerancia", type=float, default=10.0, help="Piora máxima aceita no p95 (%%)")
+    args = parser.parse_args()
+
+    with open(args.antes, encoding="utf-8") as arquivo:
+        antes = json.load(arquivo)
+    with open(args.depois, encoding="utf-8") as arquivo:
+        depois = json.load(arquivo)
+
+    print(f"Comparando {antes['meta']['commit']} -> {depois['meta']['commit']}")
+    print("=" * 100)
+    print(f"{'endpoint':40} " + " ".join(f"{m:>14}" for m in METRICAS))
+
+    regressoes = []
+    endpoints = sorted(set(antes["endpoints"]) | set(depois["endpoints"]))
+    for endpoint in endpoints:
+        a = antes["endpoints"].get(endpoint)
+        d = depois["endpoints"].get(endpoint)
+        if not a or not d:
+            print(f"{endpoint:40} {'(apenas em ' + ('depois' if d else 'antes') + ')':>14}")
+            continue
+
+        colunas = []
+        for metrica in METRICAS:
+            delta = variacao(a[metrica], d[metrica])
+            colunas.append(f"{d[metrica]:>8.1f} {delta:+5.0f}%")
+        print(f"{endpoint:40} " + " ".join(colunas))
+
+        if variacao(a["p95_ms"], d["p95_ms"]) > args.tolerancia:
+            regressoes.append(endpoint)
+
+    if regressoes:
+        print(f"\nRegressão de p95 acima de {args.tolerancia:.0f}% em: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
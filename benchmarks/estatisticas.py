@@ -0,0 +1,12 @@
+"""
+Estatísticas compartilhadas pelos benchmarks
+"""
+import math
+
+
+def percentil(valores_ordenados, p: float) -> float:
+    """Percentil pelo método nearest-rank: o menor valor com ao menos p% dos valores até ele"""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, math.ceil(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
@@ -0,0 +1,261 @@
+"""
+Teste de carga da API Galera Vôlei
+
+Gerador de carga assíncrono que simula usuários executando os fluxos
+principais (login, listagem, entrar, confirmar, convidar e finalizar) e grava
+vazão e latências p50/p95/p99 por endpoint em um arquivo JSON que pode ser
+comparado entre commits com benchmarks/compare.py.
+
+Por padrão a API roda no mesmo processo (httpx + ASGITransport) sobre um banco
+SQLite dedicado; com --base-url a carga é enviada para um servidor já em
+execução (que deve apontar para um banco populado com o mesmo perfil).
+Os usuários virtuais entram com os usuários do seed, cujos ids são lidos de
+--database-url: aponte-o para o mesmo banco do servidor.
+
+Uso:
+    python benchmarks/loadtest.py --popular --perfil pequeno
+    python benchmarks/loadtest.py --usuarios-virtuais 50 --duracao 60 --saida bench_output.json
+    python benchmarks/compare.py antes.json depois.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from estatisticas import percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+BANCO_PADRAO = f"sqlite:///{os.path.join(RAIZ, 'bench_galera_volei.db')}"
+API = "/api/v1"
+
+
+class Coletor:
+    """Acumula latências e status por endpoint"""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.erros = defaultdict(int)
+
+    def registrar(self, endpoint: str, duracao: float, status_code: int):
+        self.latencias[endpoint].append(duracao)
+        self.status[endpoint][str(status_code)] += 1
+        if status_code >= 500 or status_code == 0:
+            self.erros[endpoint] += 1
+
+    def resumo(self, duracao_total: float) -> dict:
+        endpoints = {}
+        for endpoint, latencias in sorted(self.latencias.items()):
+            ordenadas = sorted(latencias)
+            endpoints[endpoint] = {
+                "requisicoes": len(ordenadas),
+                "erros": self.erros[endpoint],
+                "status": dict(self.status[endpoint]),
+                "vazao_rps": round(len(ordenadas) / duracao_total, 2),
+                "media_ms": round(sum(ordenadas) / len(ordenadas) * 1000, 3),
+                "p50_ms": round(percentil(ordenadas, 50) * 1000, 3),
+                "p95_ms": round(percentil(ordenadas, 95) * 1000, 3),
+                "p99_ms": round(percentil(ordenadas, 99) * 1000, 3),
+            }
+        return endpoints
+
+
+class UsuarioVirtual:
+    """Usuário simulado executando os fluxos principais em loop"""
+
+    def __init__(self, client, coletor: Coletor, usuario_id: int, rng: random.Random):
+        self.client = client
+        self.coletor = coletor
+        self.usuario_id = usuario_id
+        self.rng = rng
+        self.headers = {}
+
+    async def requisitar(self, endpoint: str, metodo: str, url: str, **kwargs):
+        inicio = perf_counter()
+        try:
+            response = await self.client.request(metodo, url, headers=self.headers, **kwargs)
+            status_code = response.status_code
+        except Exception:
+            response, status_code = None, 0
+        self.coletor.registrar(endpoint, perf_counter() - inicio, status_code)
+        return response
+
+    async def login(self):
+        from init_db import SENHA_SEED, email_seed
+
+        response = await self.requisitar(
+            "POST /auth/login", "POST", f"{API}/auth/login",
+            json={"email": email_seed(self.usuario_id), "senha": SENHA_SEED}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            return True
+        return False
+
+    async def ciclo(self, ids_usuarios: list):
+        # Listar partidas e escolher uma para entrar
+        response = await self.requisitar(
+            "GET /partidas/", "GET", f"{API}/partidas/", params={"limit": 20}
+        )
+        partidas = response.json() if response is not None and response.status_code == 200 else []
+        abertas = [p for p in partidas if p["publica"] and p["status"] == "ativa"]
+
+        if abertas:
+            partida = self.rng.choice(abertas)
+            await self.requisitar(
+                "POST /partidas/{id}/participar", "POST", f"{API}/partidas/{partida['id']}/participar"
+            )
+            await self.requisitar(
+                "POST /partidas/{id}/confirmar", "POST", f"{API}/partidas/{partida['id']}/confirmar"
+            )
+
+        # Fluxos do organizador: convidar e finalizar as próprias partidas
+        response = await self.requisitar(
+            "GET /partidas/minhas", "GET", f"{API}/partidas/minhas", params={"limit": 10}
+        )
+        minhas = response.json() if response is not None and response.status_code == 200 else []
+        if not minhas:
+            # Sem partidas próprias: criar uma para os próximos ciclos
+            inicio = datetime.now(timezone.utc) + timedelta(days=self.rng.randint(1, 30))
+            await self.requisitar(
+                "POST /partidas/", "POST", f"{API}/partidas/",
+                json={
+                    "titulo": f"Partida bench {self.usuario_id}",
+                    "tipo": "amistosa",
+                    "data_partida": inicio.isoformat(),
+                    "local": "Quadra bench",
+                }
+            )
+            return
+
+        partida = self.rng.choice(minhas)
+        convidado = self.rng.choice(ids_usuarios)
+        await self.requisitar(
+            "POST /convites/", "POST", f"{API}/convites/",
+            json={"convidado_id": convidado, "partida_id": partida["id"]}
+        )
+        if self.rng.random() < 0.1:
+            await self.requisitar(
+                "PATCH /partidas/{id}/finalizar", "PATCH", f"{API}/partidas/{partida['id']}/finalizar",
+                params={"pontos_a": self.rng.randint(15, 25), "pontos_b": self.rng.randint(10, 25)}
+            )
+
+    async def executar(self, fim: float, ids_usuarios: list):
+        if not await self.login():
+            return
+        while perf_counter() < fim:
+            await self.ciclo(ids_usuarios)
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "desconhecido"
+
+
+async def executar_carga(args, ids_usuarios: list) -> dict:
+    import httpx
+
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        from api import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    coletor = Coletor()
+    rng = random.Random(args.semente)
+    limites = httpx.Limits(max_connections=args.usuarios_virtuais, max_keepalive_connections=args.usuarios_virtuais)
+
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limites, timeout=60) as client:
+        usuarios = [
+            UsuarioVirtual(client, coletor, rng.choice(ids_usuarios), random.Random(rng.random()))
+            for _ in range(args.usuarios_virtuais)
+        ]
+        inicio = perf_counter()
+        fim = inicio + args.duracao
+        await asyncio.gather(*(u.executar(fim, ids_usuarios) for u in usuarios))
+        duracao_total = perf_counter() - inicio
+
+    endpoints = coletor.resumo(duracao_total)
+    total = sum(e["requisicoes"] for e in endpoints.values())
+    return {
+        "meta": {
+            "commit": commit_atual(),
+            "data": datetime.now(timezone.utc).isoformat(),
+            "perfil": args.perfil,
+            "usuarios_virtuais": args.usuarios_virtuais,
+            "duracao_s": round(duracao_total, 3),
+            "semente": args.semente,
+            "alvo": args.base_url or "in-process",
+        },
+        "total": {
+            "requisicoes": total,
+            "vazao_rps": round(total / duracao_total, 2) if duracao_total else 0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API Galera Vôlei")
+    parser.add_argument("--base-url", help="URL de um servidor em execução (padrão: API no mesmo processo)")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", BANCO_PADRAO))
+    parser.add_argument("--perfil", default="pequeno", choices=["pequeno", "medio", "realista"])
+    parser.add_argument("--popular", action="store_true", help="Popular o banco antes de rodar a carga")
+    parser.add_argument("--apenas-popular", action="store_true", help="Apenas popular o banco e sair")
+    parser.add_argument("--usuarios-virtuais", type=int, default=20)
+    parser.add_argument("--duracao", type=float, default=30.0, help="Duração da carga em segundos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="bench_output.json")
+    args = parser.parse_args()
+
+    # Configuração precisa estar no ambiente antes de importar a aplicação
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("RATE_LIMIT_MAX_REQUESTS", "1000000000")
+
+    from init_db import PERFIS, gerar_dados, ids_usuarios_seed
+
+    if args.popular or args.apenas_popular:
+        inicio = perf_counter()
+        volumes = gerar_dados(**PERFIS[args.perfil], semente=args.semente)
+        print(f"Banco populado em {perf_counter() - inicio:.1f}s: {volumes}")
+        if args.apenas_popular:
+            return 0
+
+    ids_usuarios = ids_usuarios_seed()
+    if not ids_usuarios:
+        print("Nenhum usuário do seed no banco: rode com --popular (ou aponte --database-url para o banco do servidor)")
+        return 1
+    resultado = asyncio.run(executar_carga(args, ids_usuarios))
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False, sort_keys=True)
+
+    print(f"TESTE DE CARGA ({resultado['meta']['commit']})")
+    print("=" * 90)
+    print(f"{'endpoint':40} {'req':>7} {'erros':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for endpoint, dados in resultado["endpoints"].items():
+        print(
+            f"{endpoint:40} {dados['requisicoes']:>7} {dados['erros']:>6} {dados['vazao_rps']:>8.1f} "
+            f"{dados['p50_ms']:>8.1f} {dados['p95_ms']:>8.1f} {dados['p99_ms']:>8.1f}"
+        )
+    print(f"\nTotal: {resultado['total']['requisicoes']} requisições, {resultado['total']['vazao_rps']} req/s")
+    print(f"Resultado salvo em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Script de build dos arquivos estáticos
+
+1. Versiona as referências locais dos HTML (src/href="logo.svg" -> "logo.svg?v=<hash>"),
+   para que esses arquivos possam ser servidos com cache imutável.
+2. Gera as variantes .gz (e .br, se o pacote brotli estiver instalado) de cada
+   arquivo, com compressão máxima, servidas por app.core.estaticos.
+
+Uso:
+    python comprimir_estaticos.py [--diretorio static]
+"""
+import argparse
+import os
+import re
+import sys
+
+from app.core.estaticos import versao_do_conteudo
+from app.utils.compressao import CODIFICACOES, EXTENSOES, comprimir
+
+# Referências relativas a arquivos do próprio diretório (sem esquema, âncora ou caminho absoluto)
+REFERENCIA = re.compile(r'(?P<attr>(?:src|href)=")(?P<arquivo>[^"?#:/][^"?#:]*)(?:\?v=[0-9a-f]*)?"')
+
+
+def versionar_referencias(caminho_html: str, diretorio: str) -> int:
+    """Atualizar ?v= das referências locais de um HTML. Retorna quantas foram versionadas"""
+    with open(caminho_html, encoding="utf-8") as f:
+        html = f.read()
+    base = os.path.dirname(caminho_html)
+    versionadas = 0
+
+    def substituir(match):
+        nonlocal versionadas
+        alvo = os.path.normpath(os.path.join(base, match.group("arquivo")))
+        if not alvo.startswith(diretorio) or not os.path.isfile(alvo) or alvo.endswith(".html"):
+            return match.group(0)
+        with open(alvo, "rb") as f:
+            versao = versao_do_conteudo(f.read())
+        versionadas += 1
+        return f'{match.group("attr")}{match.group("arquivo")}?v={versao}"'
+
+    novo = REFERENCIA.sub(substituir, html)
+    if novo != html:
+        with open(caminho_html, "w", encoding="utf-8") as f:
+            f.write(novo)
+    return versionadas
+
+
+def comprimir_diretorio(diretorio: str) -> None:
+    diretorio = os.path.realpath(diretorio)
+    arquivos = []
+    for raiz, _, nomes in os.walk(diretorio):
+        arquivos += [os.path.join(raiz, nome) for nome in nomes if not nome.endswith(tuple(EXTENSOES.values()))]
+
+    # HTML primeiro: o conteúdo muda ao versionar, e as variantes devem refletir a versão final
+    for caminho in arquivos:
+        if caminho.endswith(".html"):
+            print(f"  {os.path.relpath(caminho, diretorio)}: {versionar_referencias(caminho, diretorio)} referências versionadas")
+
+    for caminho in sorted(arquivos):
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+        tamanhos = []
+        for codificacao in CODIFICACOES:
+            comprimido = comprimir(conteudo, codificacao)
+            variante = caminho + EXTENSOES[codificacao]
+            if len(comprimido) >= len(conteudo):
+                if os.path.exists(variante):
+                    os.remove(variante)
+                continue
+            with open(variante, "wb") as f:
+                f.write(comprimido)
+            tamanhos.append(f"{codificacao} {len(comprimido)} B")
+        print(f"  {os.path.relpath(caminho, diretorio)}: {len(conteudo)} B -> {', '.join(tamanhos) or 'sem compressão'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-comprimir e versionar os arquivos estáticos")
+    parser.add_argument("--diretorio", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"))
+    args = parser.parse_args()
+
+    print(f"Comprimindo {args.diretorio} ({', '.join(CODIFICACOES)})")
+    comprimir_diretorio(args.diretorio)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
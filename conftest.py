@@ -0,0 +1,91 @@
+"""
+Configuração compartilhada dos testes
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema_do_banco():
+    """
+    Importar a aplicação não cria tabelas (isso é papel da migração): criar as
+    que faltarem no banco de testes uma vez por sessão
+    """
+    from app.core.database import Base, engine
+    import app.models  # noqa: F401 - registra todos os modelos no metadata
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def proibir_carga_preguicosa():
+    """
+    Nas listagens, relação fora das opções de carga declaradas levanta erro
+    (raiseload) em vez de disparar um SELECT por linha sem ninguém perceber
+    """
+    from app.core.config import settings
+    settings.PROIBIR_CARGA_PREGUICOSA = True
+    yield
+    settings.PROIBIR_CARGA_PREGUICOSA = False
+
+
+@pytest.fixture(autouse=True)
+def limpar_rate_limit():
+    """
+    Todas as requisições do TestClient vêm do mesmo "IP": zerar a janela do
+    rate limit a cada teste para que a suíte inteira não estoure o limite
+    (dentro de um teste o limite continua valendo)
+    """
+    from app.middlewares.security import request_counts
+    request_counts.clear()
+    yield
+
+
+@lru_cache(maxsize=None)
+def _cliente():
+    from fastapi.testclient import TestClient
+    from api import app
+    return TestClient(app)
+
+
+def criar_usuario(nome="Teste", tipo="intermediario", rating=None):
+    """
+    Registra um usuário com email único e devolve (id, headers de autenticação);
+    `rating` grava direto no banco, sem passar por partidas ranqueadas
+    """
+    registro = _cliente().post("/api/v1/auth/register", json={
+        "nome": nome, "email": f"teste_{uuid.uuid4().hex[:12]}@galeravolei.com", "senha": "123456", "tipo": tipo
+    }).json()
+    usuario_id = registro["user"]["id"]
+    if rating is not None:
+        from app.core.database import SessionLocal
+        from app.models import Usuario
+        db = SessionLocal()
+        try:
+            db.get(Usuario, usuario_id).rating = rating
+            db.commit()
+        finally:
+            db.close()
+    return usuario_id, {"Authorization": f"Bearer {registro['access_token']}"}
+
+
+def criar_partida(headers, dias=2, **campos):
+    """
+    Cria uma partida amistosa daqui a `dias` dias e devolve o id; `campos`
+    sobrescreve o corpo (data_partida aceita datetime)
+    """
+    corpo = {
+        "titulo": f"Partida {uuid.uuid4().hex[:6]}",
+        "tipo": "amistosa",
+        "data_partida": datetime.now(timezone.utc) + timedelta(days=dias),
+        "local": "Quadra",
+        **campos,
+    }
+    if isinstance(corpo["data_partida"], datetime):
+        corpo["data_partida"] = corpo["data_partida"].isoformat()
+    response = _cliente().post("/api/v1/partidas/", headers=headers, json=corpo)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
@@ -1,11 +1,48 @@
 """
 Script para inicializar o banco de dados e criar dados de exemplo
+
+Uso:
+    python init_db.py                      # Usuários de exemplo
+    python init_db.py seed --perfil medio  # Massa de dados para benchmarks
+    python init_db.py seed --usuarios 5000 --partidas 20000 --semente 7
 """
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from sqlalchemy import insert, func, select
 from sqlalchemy.orm import Session
 from app.core.database import engine, SessionLocal, Base
-from app.models import Usuario
-from app.models.enums import TipoUsuario
+from app.models import Usuario, Partida, Convite, Avaliacao
+from app.models.models import partida_participantes
+from app.models.enums import TipoUsuario, TipoPartida, StatusPartida, StatusConvite
 from app.core.security import security
+from app.utils.categoria_utils import NIVEL_USUARIO, mascara_categoria
+from app.utils.geo import celula
+from app.utils.rating import RATING_INICIAL
+from recalcular_avaliacoes import recalcular_avaliacoes
+from recalcular_ratings import recalcular_ratings
+
+# Senha comum a todos os usuários gerados pelo seed (hash calculado uma única vez)
+SENHA_SEED = "bench123"
+
+# Volumes por perfil
+PERFIS = {
+    "pequeno": {"usuarios": 1_000, "partidas": 10_000, "participacoes": 100_000, "convites": 20_000, "avaliacoes": 20_000},
+    "medio": {"usuarios": 10_000, "partidas": 100_000, "participacoes": 1_000_000, "convites": 200_000, "avaliacoes": 200_000},
+    "realista": {"usuarios": 100_000, "partidas": 1_000_000, "participacoes": 10_000_000, "convites": 2_000_000, "avaliacoes": 2_000_000},
+}
+
+CATEGORIAS = ["livre", "iniciante", "intermediario", "avancado", "profissional"]
+# Coordenadas das partidas geradas: quadrado de ~0,6° (~65 km) em torno de Teresina
+CENTRO_SEED = (-5.0892, -42.8019)
+ESPALHAMENTO_SEED = 0.3
+
+LOCAIS = [
+    "Quadra Central", "Arena de Praia Copacabana", "Ginásio Municipal",
+    "Clube Atlético", "Parque da Cidade", "Quadra do IFPI"
+]
 
 
 def init_db():
@@ -92,5 +129,254 @@ def init_db():
         db.close()
 
 
+def email_seed(indice: int) -> str:
+    """Email do usuário gerado pelo seed com o índice informado"""
+    return f"usuario{indice}@bench.galeravolei.com"
+
+
+def ids_usuarios_seed() -> list:
+    """
+    Ids dos usuários gerados pelo seed (o índice do email é o id). Os ids
+    começam depois dos que já existiam no banco, então não vão de 1 a N
+    """
+    with engine.connect() as conn:
+        return list(conn.execute(
+            select(Usuario.id).where(Usuario.email.like(email_seed("%"))).order_by(Usuario.id)
+        ).scalars())
+
+
+def _inserir_em_lotes(conn, tabela, linhas, lote: int) -> int:
+    """
+    Inserir linhas em lotes com um único insert() compilado (executemany).
+
+    O insert(tabela).values([...]) multi-linha é recompilado a cada lote e fica
+    cerca de 10x mais lento; com executemany o SQLAlchemy reaproveita o
+    statement compilado e o driver agrupa as linhas.
+    """
+    stmt = insert(tabela)
+    total = 0
+    buffer = []
+    for linha in linhas:
+        buffer.append(linha)
+        if len(buffer) >= lote:
+            conn.execute(stmt, buffer)
+            total += len(buffer)
+            buffer = []
+    if buffer:
+        conn.execute(stmt, buffer)
+        total += len(buffer)
+    return total
+
+
+def _proximo_id(conn, tabela) -> int:
+    return (conn.execute(select(func.max(tabela.c.id))).scalar() or 0) + 1
+
+
+def gerar_dados(
+    usuarios: int,
+    partidas: int,
+    participacoes: int,
+    convites: int,
+    avaliacoes: int,
+    semente: int = 42,
+    data_base: datetime = None,
+    lote: int = 5000
+) -> dict:
+    """
+    Gerar massa de dados determinística (mesma semente e data base = mesmos dados).
+
+    Usuários, partidas, participantes, convites e avaliações são inseridos via
+    SQLAlchemy Core em lotes, em uma única transação. Partidas
+    anteriores à data base são geradas finalizadas, com placar; as demais
+    ficam ativas. Cada avaliação tem avaliador e avaliado distintos e não se
+    repete (sorteios repetidos são descartados). Depois dessa transação, os
+    agregados de avaliações e os ratings são recalculados em transações
+    próprias (recalcular_avaliacoes e recalcular_ratings). Todos os usuários
+    usam SENHA_SEED.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(semente)
+    # Gerador separado: coordenadas não alteram a sequência dos demais dados
+    rng_geo = random.Random(semente + 1)
+    if data_base is None:
+        data_base = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    senha_hash = security.get_password_hash(SENHA_SEED)
+    tipos = list(TipoUsuario)
+    por_partida = max(1, min(12, participacoes // max(1, partidas)))
+    volumes = {}
+
+    with engine.begin() as conn:
+        primeiro_usuario = _proximo_id(conn, Usuario.__table__)
+        primeira_partida = _proximo_id(conn, Partida.__table__)
+        ids_usuarios = range(primeiro_usuario, primeiro_usuario + usuarios)
+        ids_partidas = range(primeira_partida, primeira_partida + partidas)
+
+        volumes["usuarios"] = _inserir_em_lotes(conn, Usuario.__table__, (
+            {
+                "id": usuario_id,
+                "nome": f"Usuário {usuario_id}",
+                "email": email_seed(usuario_id),
+                "senha_hash": senha_hash,
+                "tipo": tipos[usuario_id % len(tipos)],
+                "nivel": NIVEL_USUARIO[tipos[usuario_id % len(tipos)]],
+                "ativo": True,
+                "pontuacao_total": 0,
+                "partidas_jogadas": 0,
+                "vitorias": 0,
+                "derrotas": 0,
+                "rating": RATING_INICIAL,
+                "partidas_ranqueadas": 0,
+            }
+            for usuario_id in ids_usuarios
+        ), lote)
+
+        # Datas e placares são sorteados uma única vez e reaproveitados pelas avaliações
+        datas = {}
+
+        def gerar_partidas():
+            for partida_id in ids_partidas:
+                data_partida = data_base + timedelta(
+                    days=rng.randint(-365, 60), minutes=rng.randrange(0, 1440, 15)
+                )
+                passada = data_partida < data_base
+                datas[partida_id] = passada
+                yield {
+                    "id": partida_id,
+                    "titulo": f"Vôlei {rng.choice(['de praia', 'de quadra', 'misto'])} #{partida_id}",
+                    "descricao": "Partida gerada pelo seed",
+                    "tipo": TipoPartida.COMPETITIVA if rng.random() < 0.3 else TipoPartida.AMISTOSA,
+                    "categoria": (categoria := rng.choice(CATEGORIAS)),
+                    "categoria_mascara": mascara_categoria(categoria),
+                    "status": StatusPartida.FINALIZADA if passada else StatusPartida.ATIVA,
+                    "data_partida": data_partida,
+                    "data_fim": None,
+                    "duracao_estimada": 120,
+                    "data_termino": data_partida + timedelta(minutes=120),
+                    "local": rng.choice(LOCAIS),
+                    "latitude": (latitude := CENTRO_SEED[0] + rng_geo.uniform(-ESPALHAMENTO_SEED, ESPALHAMENTO_SEED)),
+                    "longitude": (longitude := CENTRO_SEED[1] + rng_geo.uniform(-ESPALHAMENTO_SEED, ESPALHAMENTO_SEED)),
+                    "geo_celula": celula(latitude, longitude),
+                    "max_participantes": 12,
+                    "publica": rng.random() < 0.8,
+                    "pontuacao_equipe_a": rng.randint(15, 25) if passada else 0,
+                    "pontuacao_equipe_b": rng.randint(10, 25) if passada else 0,
+                    "organizador_id": rng.choice(ids_usuarios),
+                    "created_at": data_base,
+                    "updated_at": None,
+                }
+
+        volumes["partidas"] = _inserir_em_lotes(conn, Partida.__table__, gerar_partidas(), lote)
+
+        # Participantes distintos por partida; guardamos alguns para as avaliações
+        amostra_participantes = {}
+
+        def gerar_participacoes():
+            for partida_id in ids_partidas:
+                escolhidos = rng.sample(ids_usuarios, min(por_partida, usuarios))
+                if datas[partida_id] and len(escolhidos) >= 2:
+                    amostra_participantes[partida_id] = escolhidos[:4]
+                for usuario_id in escolhidos:
+                    yield {
+                        "partida_id": partida_id,
+                        "usuario_id": usuario_id,
+                        "convidado_por_id": None,
+                        "data_entrada": data_base,
+                        "confirmado": True,
+                        "data_confirmacao": data_base,
+                    }
+
+        volumes["participacoes"] = _inserir_em_lotes(
+            conn, partida_participantes, gerar_participacoes(), lote
+        )
+
+        status_convite = list(StatusConvite)
+        volumes["convites"] = _inserir_em_lotes(conn, Convite.__table__, (
+            {
+                "mensagem": None,
+                "status": rng.choice(status_convite),
+                "data_expiracao": data_base + timedelta(days=7),
+                "mandante_id": rng.choice(ids_usuarios),
+                "convidado_id": rng.choice(ids_usuarios),
+                "partida_id": rng.choice(ids_partidas),
+                "created_at": data_base,
+                "updated_at": None,
+            }
+            for _ in range(convites)
+        ), lote)
+
+        finalizadas = sorted(amostra_participantes)
+
+        def gerar_avaliacoes():
+            if not finalizadas:
+                return
+            sorteadas = set()
+            for _ in range(avaliacoes):
+                partida_id = rng.choice(finalizadas)
+                avaliador_id, avaliado_id = rng.sample(amostra_participantes[partida_id], 2)
+                if (partida_id, avaliador_id, avaliado_id) in sorteadas:
+                    continue  # ux_avaliacoes_unica: sorteio repetido fica de fora
+                sorteadas.add((partida_id, avaliador_id, avaliado_id))
+                yield {
+                    "nota": rng.randint(1, 5),
+                    "comentario": None,
+                    "tipo_avaliacao": "jogador",
+                    "avaliador_id": avaliador_id,
+                    "avaliado_id": avaliado_id,
+                    "partida_id": partida_id,
+                    "created_at": data_base,
+                }
+
+        volumes["avaliacoes"] = _inserir_em_lotes(conn, Avaliacao.__table__, gerar_avaliacoes(), lote)
+
+    # Médias de usuários e partidas lidas dos agregados, como nas avaliações registradas pela API
+    if volumes["avaliacoes"]:
+        recalcular_avaliacoes()
+    # Rating e ranking refletem as partidas finalizadas geradas, como se tivessem passado por finalizar_partida
+    if finalizadas:
+        recalcular_ratings(top=0)
+    return volumes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inicializar o banco de dados do Galera Vôlei")
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    seed = subcomandos.add_parser("seed", help="Gerar massa de dados para benchmarks")
+    seed.add_argument("--perfil", choices=sorted(PERFIS), default="pequeno")
+    seed.add_argument("--usuarios", type=int)
+    seed.add_argument("--partidas", type=int)
+    seed.add_argument("--participacoes", type=int)
+    seed.add_argument("--convites", type=int)
+    seed.add_argument("--avaliacoes", type=int)
+    seed.add_argument("--semente", type=int, default=42)
+    seed.add_argument("--data-base", type=datetime.fromisoformat,
+                      help="Data de referência (AAAA-MM-DD); padrão: hoje")
+    seed.add_argument("--lote", type=int, default=5000, help="Linhas por INSERT")
+
+    args = parser.parse_args(argv)
+
+    if args.comando != "seed":
+        init_db()
+        return 0
+
+    volumes = dict(PERFIS[args.perfil])
+    for chave in volumes:
+        if getattr(args, chave) is not None:
+            volumes[chave] = getattr(args, chave)
+
+    inicio = perf_counter()
+    gerados = gerar_dados(**volumes, semente=args.semente, data_base=args.data_base, lote=args.lote)
+    duracao = perf_counter() - inicio
+
+    total = sum(gerados.values())
+    print(f"Seed concluído em {duracao:.1f}s ({total / duracao:,.0f} linhas/s)")
+    for tabela, quantidade in gerados.items():
+        print(f"  {tabela}: {quantidade:,}")
+    print(f"Senha de todos os usuários gerados: {SENHA_SEED}")
+    return 0
+
+
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Recálculo dos agregados de avaliações a partir das avaliações gravadas
+
+As médias de usuários (como organizador e como jogador) e de partidas são
+lidas de somas e quantidades mantidas a cada avaliação registrada. Este
+script refaz esses agregados com um GROUP BY sobre todas as avaliações,
+inclusive as arquivadas: serve para preencher bancos antigos e para reparar
+os agregados depois de correções manuais nas avaliações. Avaliações feitas
+durante o recálculo podem ser sobrescritas; rode fora do horário de pico.
+
+Uso:
+    python recalcular_avaliacoes.py
+    python recalcular_avaliacoes.py --simular   # Só calcular e mostrar os totais
+"""
+import argparse
+import logging
+import sys
+from time import perf_counter
+
+from app.core.database import SessionLocal
+from app.repositories import AvaliacaoRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def recalcular_avaliacoes(simular: bool = False) -> tuple:
+    """Recalcular e gravar os agregados. Retorna (usuários, partidas) com avaliações"""
+    db = SessionLocal()
+    try:
+        repositorio = AvaliacaoRepository(db)
+        inicio = perf_counter()
+        por_usuario, por_partida = repositorio.get_totais()
+        avaliacoes = sum(quantidade for *_, quantidade in por_usuario) + sum(quantidade for *_, quantidade in por_partida)
+        logger.info(f" {avaliacoes} avaliações agregadas em {perf_counter() - inicio:.1f}s")
+
+        if simular:
+            usuarios = len({avaliado_id for avaliado_id, *_ in por_usuario})
+            logger.info(f" {usuarios} usuários e {len(por_partida)} partidas com avaliações")
+            return usuarios, len(por_partida)
+        inicio = perf_counter()
+        usuarios, partidas = repositorio.salvar_totais(por_usuario, por_partida)
+        logger.info(f" Agregados de {usuarios} usuários e {partidas} partidas gravados em {perf_counter() - inicio:.1f}s")
+        return usuarios, partidas
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcular os agregados de avaliações")
+    parser.add_argument("--simular", action="store_true", help="Não gravar, só calcular")
+    args = parser.parse_args()
+
+    recalcular_avaliacoes(simular=args.simular)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Recálculo completo dos ratings de habilidade a partir do histórico
+
+Lê todas as partidas finalizadas com placar (inclusive as arquivadas) e recalcula
+usuarios.rating e usuarios.partidas_ranqueadas com o motor vetorizado de
+app/utils/rating.py. O dia a dia é coberto pela atualização incremental de
+finalizar_partida; o recálculo serve para preencher o rating em bancos
+antigos e para aplicar mudanças de fórmula (K, pesos). Rode fora do horário
+de pico: partidas finalizadas durante o recálculo são sobrescritas.
+
+Uso:
+    python recalcular_ratings.py
+    python recalcular_ratings.py --simular   # Só calcular e mostrar o topo
+"""
+import argparse
+import logging
+import sys
+from time import perf_counter
+
+from app.core.database import SessionLocal
+from app.repositories.rating_repository import RatingRepository
+from app.utils.rating import peso_partida, recalcular, resultado_equipe_a
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def recalcular_ratings(simular: bool = False, top: int = 5) -> int:
+    """Recalcular e gravar os ratings. Retorna quantos usuários têm partidas ranqueadas"""
+    db = SessionLocal()
+    try:
+        repositorio = RatingRepository(db)
+        inicio = perf_counter()
+        partidas = [
+            (partida_id, data_partida.toordinal(), resultado_equipe_a(pontos_a, pontos_b), peso_partida(tipo))
+            for partida_id, data_partida, pontos_a, pontos_b, tipo in repositorio.get_partidas_finalizadas()
+        ]
+        participacoes = repositorio.get_participacoes_finalizadas()
+        usuario_ids = repositorio.get_usuario_ids()
+        leitura = perf_counter() - inicio
+        logger.info(f" {len(partidas)} partidas e {len(participacoes)} participações lidas em {leitura:.1f}s")
+
+        inicio = perf_counter()
+        ratings, jogos = recalcular(partidas, participacoes, usuario_ids)
+        logger.info(f" Ratings de {len(usuario_ids)} usuários calculados em {perf_counter() - inicio:.2f}s")
+
+        for posicao in ratings.argsort()[::-1][:top]:
+            logger.info(f"   usuário {usuario_ids[posicao]}: {ratings[posicao]:.1f} ({jogos[posicao]} partidas)")
+
+        if simular:
+            return int((jogos > 0).sum())
+        inicio = perf_counter()
+        total = repositorio.salvar(usuario_ids, ratings, jogos)
+        logger.info(f" {total} usuários com rating gravados em {perf_counter() - inicio:.1f}s")
+        return total
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcular os ratings de habilidade a partir do histórico")
+    parser.add_argument("--simular", action="store_true", help="Não gravar, só calcular")
+    parser.add_argument("--top", type=int, default=5, help="Mostrar os N maiores ratings")
+    args = parser.parse_args()
+
+    recalcular_ratings(simular=args.simular, top=args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Testes de conflito de horário (participar/aceitar convite) e da agenda GET /usuarios/me/agenda
+"""
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def base():
+    # Cada teste em um dia diferente e distante, para não cruzar com outros testes
+    return (datetime.now(timezone.utc) + timedelta(days=3 + uuid.uuid4().int % 300)).replace(microsecond=0)
+
+
+def test_participar_com_horario_sobreposto():
+    _, organizador = criar_usuario()
+    _, jogador = criar_usuario()
+    inicio = base()
+    primeira = criar_partida(organizador, data_partida=inicio)
+    sobreposta = criar_partida(organizador, data_partida=inicio + timedelta(hours=1), duracao_estimada=60)
+    em_seguida = criar_partida(organizador, data_partida=inicio + timedelta(hours=2))  # começa quando a primeira termina
+
+    assert client.post(f"/api/v1/partidas/{primeira}/participar", headers=jogador).status_code == 200
+    response = client.post(f"/api/v1/partidas/{sobreposta}/participar", headers=jogador)
+    assert response.status_code == 409
+    assert "Conflito de horário" in response.json()["detail"]
+    assert client.post(f"/api/v1/partidas/{em_seguida}/participar", headers=jogador).status_code == 200
+
+    # Depois de sair, o horário fica livre
+    assert client.delete(f"/api/v1/partidas/{primeira}/participar", headers=jogador).status_code == 200
+    assert client.post(f"/api/v1/partidas/{sobreposta}/participar", headers=jogador).status_code == 200
+
+
+def test_aceitar_convite_com_horario_sobreposto():
+    _, organizador = criar_usuario()
+    convidado_id, convidado = criar_usuario()
+    inicio = base()
+    publica = criar_partida(organizador, data_partida=inicio)
+    privada = criar_partida(organizador, data_partida=inicio + timedelta(minutes=30), publica=False)
+    assert client.post(f"/api/v1/partidas/{publica}/participar", headers=convidado).status_code == 200
+
+    convite = client.post("/api/v1/convites/", headers=organizador, json={
+        "convidado_id": convidado_id, "partida_id": privada
+    }).json()
+    response = client.put(f"/api/v1/convites/{convite['id']}/aceitar", headers=convidado)
+    assert response.status_code == 409
+    # O convite volta a ficar pendente
+    assert client.get(f"/api/v1/convites/{convite['id']}", headers=convidado).json()["status"] == "pendente"
+
+
+def test_agenda_mescla_participacoes_e_organizadas():
+    usuario_id, usuario = criar_usuario()
+    _, outro = criar_usuario()
+    inicio = base()
+    participando = criar_partida(outro, data_partida=inicio)
+    organizada = criar_partida(usuario, data_partida=inicio + timedelta(hours=1))  # sobrepõe a anterior
+    depois = criar_partida(usuario, data_partida=inicio + timedelta(hours=5))
+    criar_partida(outro, data_partida=inicio + timedelta(hours=3))  # de outro usuário, fora da agenda
+    assert client.post(f"/api/v1/partidas/{participando}/participar", headers=usuario).status_code == 200
+
+    response = client.get("/api/v1/usuarios/me/agenda", headers=usuario, params={
+        "desde": (inicio - timedelta(hours=1)).isoformat(),
+        "ate": (inicio + timedelta(days=1)).isoformat(),
+    })
+    assert response.status_code == 200
+    agenda = response.json()
+    assert [item["partida_id"] for item in agenda] == [participando, organizada, depois]
+    assert [item["papel"] for item in agenda] == ["participante", "organizador", "organizador"]
+    assert [item["conflito"] for item in agenda] == [False, True, False]
+    assert datetime.fromisoformat(agenda[0]["fim"]) - datetime.fromisoformat(agenda[0]["inicio"]) == timedelta(hours=2)
+
+
+def test_agenda_periodo_invalido():
+    _, usuario = criar_usuario()
+    agora = datetime.now(timezone.utc)
+    response = client.get("/api/v1/usuarios/me/agenda", headers=usuario, params={
+        "desde": agora.isoformat(), "ate": (agora - timedelta(days=1)).isoformat()
+    })
+    assert response.status_code == 400
@@ -0,0 +1,100 @@
+"""
+Testes do arquivamento de partidas encerradas e das leituras que consultam o arquivo
+"""
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.database import SessionLocal
+from app.models import Convite, Partida, PartidaArquivada
+from app.models.arquivo import convites_arquivo, partida_participantes_arquivo
+from app.models.enums import StatusPartida
+from app.repositories.arquivo_repository import ArquivoRepository
+from arquivar_partidas import arquivar_partidas
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def envelhecer(partida_id, dias=400, status=StatusPartida.FINALIZADA):
+    """Simular uma partida encerrada há muito tempo"""
+    db = SessionLocal()
+    try:
+        partida = db.get(Partida, partida_id)
+        partida.data_partida = datetime.now(timezone.utc) - timedelta(days=dias)
+        partida.status = status
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_arquivar_move_partida_e_dependentes():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    antiga = criar_partida(organizador)
+    recente = criar_partida(organizador, dias=6)
+    assert client.post(f"/api/v1/partidas/{antiga}/participar", headers=jogador).status_code == 200
+    assert client.post(f"/api/v1/partidas/{recente}/participar", headers=jogador).status_code == 200
+    convidado_id, _ = criar_usuario()
+    assert client.post("/api/v1/convites/", headers=organizador, json={
+        "convidado_id": convidado_id, "partida_id": antiga
+    }).status_code in (200, 201)
+    criar_partida(organizador, dias=7)  # mantém `antiga` longe do maior id
+    envelhecer(antiga)
+
+    assert arquivar_partidas(dias=180, lote=2) >= 1
+
+    db = SessionLocal()
+    try:
+        assert db.get(Partida, antiga) is None
+        assert db.get(Partida, recente) is not None
+        assert db.get(PartidaArquivada, antiga).organizador_id == organizador_id
+        assert db.execute(
+            partida_participantes_arquivo.select().where(partida_participantes_arquivo.c.partida_id == antiga)
+        ).fetchall()
+        assert db.query(Convite).filter(Convite.partida_id == antiga).count() == 0
+        assert db.execute(convites_arquivo.select().where(convites_arquivo.c.partida_id == antiga)).fetchall()
+    finally:
+        db.close()
+
+    # Leitura por id continua funcionando, a partir do arquivo
+    response = client.get(f"/api/v1/partidas/{antiga}", headers=jogador)
+    assert response.status_code == 200
+    assert response.json()["status"] == "finalizada"
+    assert [p["id"] for p in response.json()["participantes"]] == [jogador_id]
+
+    # Históricos atravessam tabelas quentes e arquivo, na ordem de cada endpoint
+    participando = client.get("/api/v1/partidas/participando", headers=jogador).json()
+    assert [p["id"] for p in participando] == [recente, antiga]
+    assert [p["id"] for p in client.get("/api/v1/partidas/participando", headers=jogador, params={"skip": 1}).json()] == [antiga]
+    minhas = client.get("/api/v1/partidas/minhas", headers=organizador).json()
+    assert minhas[-1]["id"] == antiga and len(minhas) == 3
+
+
+def test_nao_arquiva_ativas_recentes_nem_maior_id():
+    _, organizador = criar_usuario()
+    ativa_antiga = criar_partida(organizador)
+    recente_finalizada = criar_partida(organizador)
+    ultima = criar_partida(organizador)
+    envelhecer(ativa_antiga, status=StatusPartida.ATIVA)
+    envelhecer(recente_finalizada, dias=10)
+    envelhecer(ultima)
+
+    db = SessionLocal()
+    try:
+        ids = ArquivoRepository(db).get_ids_arquivaveis(datetime.now(timezone.utc) - timedelta(days=180), 10_000)
+        assert ativa_antiga not in ids and recente_finalizada not in ids
+        maior_id = db.query(Partida.id).order_by(Partida.id.desc()).first()[0]
+        assert maior_id not in ids
+    finally:
+        db.close()
+
+
+def test_partida_inexistente():
+    _, headers = criar_usuario()
+    assert client.get("/api/v1/partidas/987654321", headers=headers).status_code == 404
@@ -0,0 +1,131 @@
+"""
+Testes das avaliações pós-jogo: regras de quem avalia quem, agregados mantidos
+a cada avaliação e recálculo completo (inclusive de partidas arquivadas)
+"""
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.database import SessionLocal
+from app.models import Avaliacao, Partida, Usuario
+from app.repositories import AvaliacaoRepository
+from arquivar_partidas import arquivar_partidas
+from recalcular_avaliacoes import recalcular_avaliacoes
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def avaliar(headers, partida_id, tipo, nota, avaliado_id=None):
+    return client.post("/api/v1/avaliacoes/", headers=headers, json={
+        "partida_id": partida_id, "tipo_avaliacao": tipo, "nota": nota, "avaliado_id": avaliado_id
+    })
+
+
+def test_avaliar_e_ler_medias():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    outro_id, outro = criar_usuario()
+    _, estranho = criar_usuario()
+    partida_id = criar_partida(organizador)
+    for headers in (organizador, jogador, outro):
+        assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+
+    assert avaliar(jogador, partida_id, "partida", 4).status_code == 400  # Ainda não finalizada
+    assert client.patch(
+        f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=21", headers=organizador
+    ).status_code == 200
+
+    assert avaliar(estranho, partida_id, "partida", 4).status_code == 403
+    assert avaliar(jogador, partida_id, "partida", 6).status_code == 422
+    assert avaliar(jogador, partida_id, "partida", 4, avaliado_id=outro_id).status_code == 400
+    assert avaliar(jogador, partida_id, "jogador", 4, avaliado_id=jogador_id).status_code == 400  # A si mesmo
+    assert avaliar(organizador, partida_id, "organizador", 5).status_code == 400  # Organizador a si mesmo
+
+    response = avaliar(jogador, partida_id, "partida", 4)
+    assert response.status_code == 201, response.text
+    assert response.json()["tipo_avaliacao"] == "partida" and response.json()["avaliado_id"] is None
+    assert avaliar(jogador, partida_id, "partida", 5).status_code == 400  # Repetida
+    assert avaliar(outro, partida_id, "partida", 5).status_code == 201
+    assert avaliar(jogador, partida_id, "organizador", 5).json()["avaliado_id"] == organizador_id
+    assert avaliar(outro, partida_id, "organizador", 2).status_code == 201
+    assert avaliar(jogador, partida_id, "jogador", 3, avaliado_id=outro_id).status_code == 201
+    assert avaliar(organizador, partida_id, "jogador", 4, avaliado_id=outro_id).status_code == 201
+
+    resumo = client.get(f"/api/v1/avaliacoes/partidas/{partida_id}/resumo", headers=estranho).json()
+    assert resumo == {"partida_id": partida_id, "total": 2, "media": 4.5}
+    resumo = client.get(f"/api/v1/avaliacoes/usuarios/{organizador_id}/resumo", headers=estranho).json()
+    assert resumo["organizador"] == {"total": 2, "media": 3.5}
+    assert resumo["jogador"] == {"total": 0, "media": None}
+    resumo = client.get(f"/api/v1/avaliacoes/usuarios/{outro_id}/resumo", headers=estranho).json()
+    assert resumo["jogador"] == {"total": 2, "media": 3.5}
+
+    avaliacoes = client.get(f"/api/v1/avaliacoes/partidas/{partida_id}", headers=estranho).json()
+    assert len(avaliacoes) == 6
+    assert client.get("/api/v1/avaliacoes/usuarios/999999999/resumo", headers=estranho).status_code == 404
+
+
+def test_avaliacao_simultanea_barrada_pelo_indice_unico(monkeypatch):
+    """Duas requisições que passam juntas pela verificação: o índice único barra a segunda"""
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    partida_id = criar_partida(organizador, dias=7)
+    for headers in (organizador, jogador):
+        assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+    assert client.patch(
+        f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=21", headers=organizador
+    ).status_code == 200
+
+    monkeypatch.setattr(AvaliacaoRepository, "existe", lambda *args: False)
+    assert avaliar(jogador, partida_id, "partida", 4).status_code == 201
+    assert avaliar(jogador, partida_id, "partida", 5).status_code == 400
+    assert avaliar(jogador, partida_id, "organizador", 5).status_code == 201
+    assert avaliar(jogador, partida_id, "organizador", 1).status_code == 400
+    assert avaliar(organizador, partida_id, "jogador", 3, avaliado_id=jogador_id).status_code == 201
+    assert avaliar(organizador, partida_id, "jogador", 3, avaliado_id=jogador_id).status_code == 400
+
+    db = SessionLocal()
+    try:
+        assert db.query(Avaliacao).filter(Avaliacao.partida_id == partida_id).count() == 3
+        partida = db.get(Partida, partida_id)
+        assert (partida.soma_notas, partida.total_avaliacoes) == (4, 1)  # O agregado não somou a repetida
+        assert db.get(Usuario, organizador_id).avaliacoes_organizador == 1
+    finally:
+        db.close()
+
+
+def test_recalculo_repara_agregados_inclusive_arquivados():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    partida_id = criar_partida(organizador, dias=8)
+    for headers in (organizador, jogador):
+        assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+    assert client.patch(
+        f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=19", headers=organizador
+    ).status_code == 200
+    assert avaliar(jogador, partida_id, "partida", 3).status_code == 201
+    assert avaliar(jogador, partida_id, "organizador", 4).status_code == 201
+
+    criar_partida(organizador, dias=9)  # mantém a partida longe do maior id
+    db = SessionLocal()
+    try:
+        partida = db.get(Partida, partida_id)
+        partida.data_partida = datetime.now(timezone.utc) - timedelta(days=400)
+        usuario = db.get(Usuario, organizador_id)
+        usuario.soma_notas_organizador, usuario.avaliacoes_organizador = 999, 7  # Agregado corrompido
+        db.commit()
+    finally:
+        db.close()
+    assert arquivar_partidas(dias=180, lote=100) >= 1
+
+    usuarios, partidas = recalcular_avaliacoes()
+    assert usuarios >= 1 and partidas >= 1
+    resumo = client.get(f"/api/v1/avaliacoes/usuarios/{organizador_id}/resumo", headers=jogador).json()
+    assert resumo["organizador"] == {"total": 1, "media": 4.0}
+    resumo = client.get(f"/api/v1/avaliacoes/partidas/{partida_id}/resumo", headers=jogador).json()
+    assert resumo == {"partida_id": partida_id, "total": 1, "media": 3.0}
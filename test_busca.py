@@ -0,0 +1,99 @@
+"""
+Testes da busca textual GET /partidas/busca
+"""
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.clock import FUSO_BRASIL
+from app.utils.busca import interpretar_consulta, ranquear
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def buscar(headers, q, **params):
+    response = client.get("/api/v1/partidas/busca", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return [partida["id"] for partida in response.json()]
+
+
+def test_interpretar_consulta():
+    consulta = interpretar_consulta("Vôlei de PRAIA no Sábado")
+    assert consulta.termos == ["volei", "praia"]
+    assert consulta.dia_semana == 6
+    assert consulta.fts5() == '"volei" "praia"*'
+    assert consulta.tsquery() == "volei & praia:*"
+
+
+def test_ranquear_prioriza_titulo():
+    candidatos = [
+        (3, "Treino", "vôlei na areia", "Clube"),
+        (2, "Vôlei da tarde", None, "Clube"),
+        (1, "Treino", None, "Arena do Vôlei"),
+    ]
+    assert ranquear(["volei"], candidatos) == [2, 1, 3]
+
+
+def test_busca_sem_acento_e_prefixo():
+    _, headers = criar_usuario()
+    marcador = uuid.uuid4().hex[:10]
+    partida_id = criar_partida(headers, titulo=f"Vôlei Açaí {marcador}", local="Praça São João")
+
+    assert partida_id in buscar(headers, f"acai {marcador}")
+    assert partida_id in buscar(headers, f"{marcador} PRACA sao")
+    assert partida_id in buscar(headers, f"{marcador} joa")  # último termo como prefixo
+    assert partida_id not in buscar(headers, f"{marcador} futebol")
+
+
+def test_busca_filtros():
+    _, headers = criar_usuario()
+    marcador = uuid.uuid4().hex[:10]
+    livre = criar_partida(headers, titulo=f"Rachão {marcador}", categoria="livre")
+    iniciante = criar_partida(headers, titulo=f"Rachão {marcador}", categoria="iniciante")
+
+    assert buscar(headers, marcador, categoria="iniciante") == [iniciante]
+    assert set(buscar(headers, marcador, status="ativa")) == {livre, iniciante}
+    assert buscar(headers, marcador, status="finalizada") == []
+    # Intermediário não entra em partida de iniciantes
+    assert buscar(headers, marcador, apenas_acessiveis=True) == [livre]
+
+
+def test_busca_dia_da_semana():
+    _, headers = criar_usuario()
+    marcador = uuid.uuid4().hex[:10]
+    data = datetime.now(timezone.utc) + timedelta(days=3)
+    partida_id = criar_partida(headers, titulo=f"Treino {marcador}", data_partida=data)
+    data = data.astimezone(FUSO_BRASIL)
+    dias = ["segunda", "terça", "quarta", "quinta", "sexta", "sábado", "domingo"]
+
+    assert buscar(headers, f"{marcador} {dias[data.weekday()]}") == [partida_id]
+    assert buscar(headers, f"{marcador} {dias[(data.weekday() + 1) % 7]}") == []
+
+
+def test_busca_acompanha_edicao_e_ordena_por_relevancia():
+    _, headers = criar_usuario()
+    marcador = uuid.uuid4().hex[:10]
+    na_descricao = criar_partida(headers, titulo="Jogo", descricao=f"Traga garrafa {marcador}")
+    no_titulo = criar_partida(headers, titulo=f"Jogo {marcador}")
+
+    assert buscar(headers, marcador) == [no_titulo, na_descricao]
+
+    # Atualização sai do índice antigo e entra no novo
+    novo = uuid.uuid4().hex[:10]
+    response = client.put(f"/api/v1/partidas/{no_titulo}", headers=headers, json={"titulo": f"Jogo {novo}"})
+    assert response.status_code == 200
+    assert buscar(headers, marcador) == [na_descricao]
+    assert buscar(headers, novo) == [no_titulo]
+
+
+def test_busca_sem_termos_validos():
+    _, headers = criar_usuario()
+    response = client.get("/api/v1/partidas/busca", headers=headers, params={"q": "de da sábado"})
+    assert response.status_code == 400
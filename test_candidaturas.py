@@ -0,0 +1,98 @@
+"""
+Testes das candidaturas a partidas privadas: fila do organizador e decisão em lote
+"""
+import sys
+import os
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from api import app
+from app.core.database import SessionLocal
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def candidatar(headers, partida_id):
+    return client.post("/api/v1/candidaturas/", headers=headers, json={"partida_id": partida_id, "mensagem": "Posso jogar?"})
+
+
+def test_fila_e_decisao_em_lote():
+    _, organizador = criar_usuario()
+    candidatos = [criar_usuario() for _ in range(4)]
+    partida_id = criar_partida(organizador, publica=False, max_participantes=2)
+
+    assert candidatar(candidatos[0][1], criar_partida(organizador, max_participantes=3)).status_code == 400
+    assert candidatar(organizador, partida_id).status_code == 400
+    ids = []
+    for _, headers in candidatos:
+        response = candidatar(headers, partida_id)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    assert candidatar(candidatos[0][1], partida_id).status_code == 400  # Já pendente
+
+    assert client.get(f"/api/v1/candidaturas/partidas/{partida_id}", headers=candidatos[0][1]).status_code == 403
+    fila = client.get(f"/api/v1/candidaturas/partidas/{partida_id}", headers=organizador).json()
+    assert [c["id"] for c in fila] == ids
+    assert fila[0]["usuario"]["id"] == candidatos[0][0]
+
+    url = f"/api/v1/candidaturas/partidas/{partida_id}/decisao"
+    # Três aprovações para duas vagas: nada é gravado
+    assert client.post(url, headers=organizador, json={"aprovar": ids[:3]}).status_code == 400
+    assert client.post(url, headers=organizador, json={"aprovar": [ids[0]], "rejeitar": [ids[0]]}).status_code == 400
+    assert client.post(url, headers=organizador, json={"aprovar": [999999999]}).status_code == 400
+    assert len(client.get(f"/api/v1/candidaturas/partidas/{partida_id}", headers=organizador).json()) == 4
+
+    response = client.post(url, headers=organizador, json={"aprovar": ids[:2], "rejeitar": [ids[2]]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"partida_id": partida_id, "aprovadas": ids[:2], "rejeitadas": [ids[2]], "total_participantes": 2}
+    participantes = client.get(f"/api/v1/partidas/{partida_id}", headers=organizador).json()["participantes"]
+    assert {p["id"] for p in participantes} == {candidatos[0][0], candidatos[1][0]}
+
+    assert client.post(url, headers=organizador, json={"aprovar": [ids[0]]}).status_code == 400  # Não está mais pendente
+    aprovadas = client.get(f"/api/v1/candidaturas/partidas/{partida_id}?status=aprovada", headers=organizador).json()
+    assert [c["id"] for c in aprovadas] == ids[:2]
+    minhas = client.get("/api/v1/candidaturas/minhas", headers=candidatos[2][1]).json()
+    assert minhas[0]["id"] == ids[2] and minhas[0]["status"] == "rejeitada"
+
+    # Cancelar a própria candidatura pendente
+    assert client.delete(f"/api/v1/candidaturas/{ids[3]}", headers=candidatos[0][1]).status_code == 404
+    assert client.delete(f"/api/v1/candidaturas/{ids[3]}", headers=candidatos[3][1]).status_code == 204
+    assert client.get(f"/api/v1/candidaturas/partidas/{partida_id}", headers=organizador).json() == []
+
+
+def test_decisao_confere_conflito_de_agenda():
+    _, organizador = criar_usuario()
+    (u1, h1), (u2, h2) = criar_usuario(), criar_usuario()
+    partida_id = criar_partida(organizador, publica=False, max_participantes=3)
+    ids = [candidatar(headers, partida_id).json()["id"] for headers in (h1, h2)]
+
+    # Depois da candidatura, u2 entra em outra partida no mesmo horário
+    outra = criar_partida(organizador, max_participantes=3)
+    assert client.post(f"/api/v1/partidas/{outra}/participar", headers=h2).status_code == 200
+
+    url = f"/api/v1/candidaturas/partidas/{partida_id}/decisao"
+    response = client.post(url, headers=organizador, json={"aprovar": ids})
+    assert response.status_code == 409
+    assert str(ids[1]) in response.json()["detail"]
+    assert len(client.get(f"/api/v1/candidaturas/partidas/{partida_id}", headers=organizador).json()) == 2
+
+    response = client.post(url, headers=organizador, json={"aprovar": [ids[0]], "rejeitar": [ids[1]]})
+    assert response.status_code == 200, response.text
+    participantes = client.get(f"/api/v1/partidas/{partida_id}", headers=organizador).json()["participantes"]
+    assert [p["id"] for p in participantes] == [u1]
+
+
+def test_fila_lida_pelo_indice():
+    db = SessionLocal()
+    try:
+        plano = " ".join(str(linha[-1]) for linha in db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM candidaturas "
+            "WHERE partida_id = 1 AND status = 'PENDENTE' ORDER BY created_at LIMIT 100"
+        )))
+        assert "ix_candidaturas_partida_status_data" in plano and "TEMP B-TREE" not in plano, plano
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+"""
+Testes das opções de carga: listagens com número fixo de SELECTs (coleções via
+selectinload) e relações fora das opções bloqueadas nos testes (raiseload)
+"""
+import sys
+import os
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from api import app
+from app.core.database import SessionLocal, engine
+from app.repositories import PartidaRepository
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def contar_selects(url, headers):
+    consultas = []
+    contar = lambda conn, cursor, sql, *args: consultas.append(sql) if sql.lstrip().upper().startswith("SELECT") else None
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    assert response.status_code == 200, response.text
+    return response.json(), len(consultas)
+
+
+def test_listagens_com_numero_fixo_de_consultas():
+    _, organizador = criar_usuario("Teste Carga")
+    convidados = [criar_usuario() for _ in range(2)]
+
+    def popular(quantidade):
+        for _ in range(quantidade):
+            partida_id = criar_partida(organizador)
+            for convidado_id, headers in convidados:
+                client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers)
+                client.post("/api/v1/convites/", headers=organizador, json={
+                    "convidado_id": convidado_id, "partida_id": criar_partida(organizador)
+                })
+
+    medidas = []
+    for quantidade in (1, 3):
+        popular(quantidade)
+        minhas, selects_minhas = contar_selects("/api/v1/partidas/minhas", organizador)
+        enviados, selects_convites = contar_selects("/api/v1/convites/enviados", organizador)
+        assert all(p["organizador"]["nome"] == "Teste Carga" for p in minhas)
+        assert enviados and all(c["partida"]["organizador"] for c in enviados)
+        medidas.append((selects_minhas, selects_convites))
+
+    # Mais partidas e convites na página não mudam a quantidade de SELECTs
+    assert medidas[0] == medidas[1], medidas
+
+
+def test_relacao_fora_das_opcoes_levanta_erro():
+    _, organizador = criar_usuario()
+    criar_partida(organizador)
+    db = SessionLocal()
+    try:
+        partida = PartidaRepository(db).get_todas(limit=1)[0]
+        assert partida.participantes is not None  # Declarada em CARGA_RESPOSTA
+        with pytest.raises(InvalidRequestError):
+            partida.candidaturas
+    finally:
+        db.close()
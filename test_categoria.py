@@ -0,0 +1,87 @@
+"""
+Testes da elegibilidade por categoria pré-computada (tabela, máscaras e filtro em SQL)
+"""
+import sys
+import os
+from datetime import datetime
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Usuario, Partida
+from app.models.enums import TipoUsuario, TipoPartida, CategoriaPartida
+from app.repositories.partida_repository import PartidaRepository
+from app.services.partida_service import PartidaService
+from app.utils.categoria_utils import (
+    NIVEL_USUARIO, usuario_pode_participar, filtrar_partidas_acessiveis, mascara_categoria
+)
+
+# Regras originais, escritas por extenso, como referência
+REGRAS = {
+    CategoriaPartida.LIVRE: set(TipoUsuario),
+    CategoriaPartida.INICIANTE: {TipoUsuario.INICIANTE},
+    CategoriaPartida.INTERMEDIARIO: {TipoUsuario.INTERMEDIARIO, TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL},
+    CategoriaPartida.AVANCADO: {TipoUsuario.AVANCADO, TipoUsuario.PROFISSIONAL},
+    CategoriaPartida.PROFISSIONAL: {TipoUsuario.PROFISSIONAL},
+}
+
+
+def test_tabela_de_elegibilidade():
+    for categoria, tipos in REGRAS.items():
+        for tipo in TipoUsuario:
+            assert usuario_pode_participar(tipo, categoria) == (tipo in tipos)
+            assert usuario_pode_participar(tipo, categoria.value) == (tipo in tipos)
+    # Categorias desconhecidas ou ausentes contam como LIVRE
+    assert usuario_pode_participar(TipoUsuario.INICIANTE, "inexistente")
+    assert mascara_categoria(None) == mascara_categoria(CategoriaPartida.LIVRE)
+
+
+def test_filtro_em_lote():
+    partidas = [Partida(titulo=c.value, categoria=c.value) for c in CategoriaPartida]
+    for tipo in TipoUsuario:
+        acessiveis = {p.categoria for p in filtrar_partidas_acessiveis(NIVEL_USUARIO[tipo], partidas)}
+        assert acessiveis == {c.value for c, tipos in REGRAS.items() if tipo in tipos}
+
+
+def test_colunas_sincronizadas_e_filtro_sql():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        organizador = Usuario(nome="Org", email="org@galeravolei.com", senha_hash="x", tipo=TipoUsuario.AVANCADO)
+        db.add(organizador)
+        db.flush()
+        assert organizador.nivel == NIVEL_USUARIO[TipoUsuario.AVANCADO]
+
+        # Inserção pelo ORM (validates) e pelo Core (default calculado por linha)
+        db.add(Partida(
+            titulo="orm", tipo=TipoPartida.AMISTOSA, categoria="profissional",
+            data_partida=datetime(2030, 1, 1), organizador_id=organizador.id
+        ))
+        db.execute(insert(Partida.__table__), [
+            {"titulo": c.value, "tipo": TipoPartida.AMISTOSA, "categoria": c.value,
+             "data_partida": datetime(2030, 1, 1), "organizador_id": organizador.id}
+            for c in CategoriaPartida
+        ])
+        db.commit()
+
+        for partida in db.query(Partida):
+            assert partida.categoria_mascara == mascara_categoria(partida.categoria)
+
+        repositorio = PartidaRepository(db)
+        for tipo in TipoUsuario:
+            categorias = {p.categoria for p in repositorio.get_todas(nivel=NIVEL_USUARIO[tipo])}
+            assert categorias == {c.value for c, tipos in REGRAS.items() if tipo in tipos}
+
+        organizador.tipo = TipoUsuario.INICIANTE
+        assert organizador.nivel == NIVEL_USUARIO[TipoUsuario.INICIANTE]
+
+        # A listagem filtra pelo nível gravado no usuário
+        db.flush()
+        categorias = {p.categoria for p in PartidaService(db).get_partidas_ativas(usuario=organizador)}
+        assert categorias == {CategoriaPartida.LIVRE.value, CategoriaPartida.INICIANTE.value}
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+"""
+Testes do relógio da aplicação e do motor de status com relógio fixo
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.clock import UTC, FUSO_BRASIL, RelogioFixo, agora, instante_da_requisicao, para_utc, usar_relogio
+from app.core.database import Base
+from app.models import Usuario, Partida
+from app.models.enums import TipoUsuario, TipoPartida, StatusPartida
+from app.utils.partida_status import atualizar_status_partida
+
+INICIO = datetime(2030, 3, 10, 18, 0, tzinfo=UTC)
+
+
+def test_para_utc():
+    # Sem fuso: UTC por padrão (como o banco devolve) ou horário do Brasil se indicado
+    assert para_utc(datetime(2030, 1, 1, 12, 0)) == datetime(2030, 1, 1, 12, 0, tzinfo=UTC)
+    assert para_utc(datetime(2030, 1, 1, 12, 0), FUSO_BRASIL) == datetime(2030, 1, 1, 15, 0, tzinfo=UTC)
+    assert para_utc(None) is None
+
+
+def test_agora_fixo_durante_a_requisicao():
+    relogio = RelogioFixo(INICIO)
+    with usar_relogio(relogio):
+        with instante_da_requisicao() as instante:
+            relogio.avancar(minutes=5)
+            assert agora() == instante == INICIO
+        assert agora() == INICIO + timedelta(minutes=5)
+
+
+def test_motor_de_status_com_relogio_fixo():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        organizador = Usuario(nome="Org", email="org@galeravolei.com", senha_hash="x", tipo=TipoUsuario.AVANCADO)
+        db.add(organizador)
+        db.flush()
+        partida = Partida(
+            titulo="Relógio", tipo=TipoPartida.AMISTOSA, data_partida=INICIO,
+            duracao_estimada=60, organizador_id=organizador.id
+        )
+        db.add(partida)
+        db.commit()
+        db.refresh(partida)
+
+        # Lida do banco sempre em UTC
+        assert partida.data_partida == INICIO
+        assert partida.data_partida.tzinfo is not None
+
+        relogio = RelogioFixo(INICIO - timedelta(hours=1))
+        with usar_relogio(relogio):
+            assert not atualizar_status_partida(partida, db)
+            assert partida.status == StatusPartida.ATIVA
+
+            relogio.avancar(minutes=61)
+            assert atualizar_status_partida(partida, db)
+            assert partida.status == StatusPartida.EM_ANDAMENTO
+
+            relogio.avancar(hours=1)
+            assert atualizar_status_partida(partida, db)
+            assert partida.status == StatusPartida.FINALIZADA
+    finally:
+        db.close()
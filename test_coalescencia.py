@@ -0,0 +1,94 @@
+"""
+Testes da coalescência de requisições idênticas simultâneas (single-flight)
+"""
+import sys
+import os
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from api import app
+from app.core.coalescencia import Coalescedor
+from app.core.metrics import COALESCENCIA_REQUISICOES
+
+client = TestClient(app)
+
+
+def test_chamadas_simultaneas_compartilham_um_calculo():
+    coalescedor = Coalescedor("teste")
+    liberar = threading.Event()
+    chamadas = []
+
+    def calcular(valor):
+        chamadas.append(valor)
+        liberar.wait(5)
+        return valor * 2
+
+    async def cenario():
+        iguais = [asyncio.ensure_future(coalescedor.executar(("a", 1), calcular, 1)) for _ in range(20)]
+        outra = asyncio.ensure_future(coalescedor.executar(("a", 2), calcular, 2))
+        await asyncio.sleep(0.05)
+        assert coalescedor.em_andamento() == 2
+        liberar.set()
+        return await asyncio.gather(*iguais), await outra
+
+    agregadas_antes = COALESCENCIA_REQUISICOES.valor("teste", "agregada")
+    iguais, outra = asyncio.run(cenario())
+    assert iguais == [2] * 20 and outra == 4
+    assert sorted(chamadas) == [1, 2]
+    assert COALESCENCIA_REQUISICOES.valor("teste", "agregada") - agregadas_antes == 19
+    # Terminado o cálculo, nada fica guardado: a próxima chamada calcula de novo
+    assert coalescedor.em_andamento() == 0
+    assert asyncio.run(coalescedor.executar(("a", 1), lambda: 3)) == 3
+
+
+def test_erro_do_lider_chega_a_todos():
+    coalescedor = Coalescedor("teste_erro")
+    liberar = threading.Event()
+
+    def falhar():
+        liberar.wait(5)
+        raise HTTPException(status_code=404, detail="Partida não encontrada")
+
+    async def cenario():
+        tarefas = [asyncio.ensure_future(coalescedor.executar("x", falhar)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        liberar.set()
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+    resultados = asyncio.run(cenario())
+    assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in resultados)
+
+
+def test_endpoints_coalescidos_respondem_normalmente():
+    email = f"coal_{uuid.uuid4().hex[:8]}@galeravolei.com"
+    token = client.post("/api/v1/auth/register", json={
+        "nome": "Teste Coalescência", "email": email, "senha": "123456", "tipo": "intermediario"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    partida = client.post("/api/v1/partidas/", headers=headers, json={
+        "titulo": "Compartilhada",
+        "tipo": "amistosa",
+        "data_partida": (datetime.now(timezone.utc) + timedelta(days=2)).isoformat(),
+        "local": "Quadra",
+    }).json()
+
+    response = client.get(f"/api/v1/partidas/{partida['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["id"] == partida["id"]
+    assert response.json()["organizador"]["email"] == email
+
+    assert client.get("/api/v1/partidas/999999999", headers=headers).status_code == 404
+    assert client.get(f"/api/v1/partidas/{partida['id']}").status_code in (401, 403)
+
+    proximas = client.get("/api/v1/partidas/proximas", headers=headers, params={"limit": 5})
+    assert proximas.status_code == 200
+    assert isinstance(proximas.json(), list) and len(proximas.json()) <= 5
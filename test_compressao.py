@@ -0,0 +1,81 @@
+"""
+Testes da compressão de respostas JSON e dos arquivos estáticos pré-comprimidos
+"""
+import sys
+import os
+import gzip
+import uuid
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from api import app
+from app.core.estaticos import ArquivosEstaticos, CACHE_IMUTAVEL, versao_do_conteudo
+from app.utils.compressao import escolher_codificacao
+
+client = TestClient(app)
+
+
+def test_escolher_codificacao():
+    assert escolher_codificacao("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert escolher_codificacao("gzip;q=1.0, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert escolher_codificacao("br;q=0, gzip;q=0", ("br", "gzip")) is None
+    assert escolher_codificacao("*", ("gzip",)) == "gzip"
+    assert escolher_codificacao("identity", ("br", "gzip")) is None
+    assert escolher_codificacao(None) is None
+
+
+def test_json_grande_comprimido_e_pequeno_nao():
+    email = f"gz_{uuid.uuid4().hex[:8]}@galeravolei.com"
+    token = client.post("/api/v1/auth/register", json={
+        "nome": "Teste Compressão", "email": email, "senha": "123456", "tipo": "intermediario"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+
+    lista = client.get("/api/v1/usuarios/", headers=headers, params={"limit": 100})
+    assert lista.status_code == 200
+    assert lista.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in lista.headers["vary"]
+    assert isinstance(lista.json(), list)  # httpx descomprime
+
+    pequena = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pequena.headers
+
+    sem_compressao = client.get("/api/v1/usuarios/", headers={**headers, "Accept-Encoding": "identity"}, params={"limit": 100})
+    assert "content-encoding" not in sem_compressao.headers
+    assert sem_compressao.json() == lista.json()
+
+
+def test_estaticos_precomprimidos_com_etag(tmp_path):
+    conteudo = b"<svg xmlns='http://www.w3.org/2000/svg'>" + b"<rect/>" * 500 + b"</svg>"
+    (tmp_path / "logo.svg").write_bytes(conteudo)
+    precomprimido = gzip.compress(conteudo, mtime=0)
+    (tmp_path / "logo.svg.gz").write_bytes(precomprimido)
+    cliente = TestClient(Starlette(routes=[Mount("/static", ArquivosEstaticos(str(tmp_path)))]))
+    versao = versao_do_conteudo(conteudo)
+
+    response = cliente.get("/static/logo.svg", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == str(len(precomprimido))
+    assert response.headers["content-type"].startswith("image/svg+xml")
+    assert response.headers["etag"] == f'"{versao}"'
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.content == conteudo
+
+    assert cliente.get(f"/static/logo.svg?v={versao}").headers["cache-control"] == CACHE_IMUTAVEL
+    assert cliente.get("/static/logo.svg", headers={"If-None-Match": f'"{versao}"'}).status_code == 304
+    assert "content-encoding" not in cliente.get("/static/logo.svg", headers={"Accept-Encoding": "identity"}).headers
+    assert cliente.get("/static/logo.svg.gz").status_code == 404
+    assert cliente.get("/static/../api.py").status_code == 404
+
+
+def test_estaticos_da_aplicacao():
+    response = client.get("/static/index.html", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "etag" in response.headers
+    assert b"IFPI" in response.content
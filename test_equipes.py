@@ -0,0 +1,96 @@
+"""
+Testes da divisão equilibrada de equipes e do uso dela ao finalizar a partida
+"""
+import sys
+import os
+import random
+from itertools import combinations
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from api import app
+from app.core.database import SessionLocal
+from app.models import Usuario
+from app.utils.equipes import dividir_equipes, diferenca_medias
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def test_divisao_proxima_do_otimo_exaustivo():
+    rng = random.Random(11)
+    for _ in range(100):
+        n = rng.randint(4, 12)
+        jogadores = [(i, rng.gauss(1500, 150)) for i in range(n)]
+        ratings = dict(jogadores)
+        equipe_a, equipe_b = dividir_equipes(jogadores)
+
+        assert sorted(equipe_a + equipe_b) == list(range(n))
+        assert abs(len(equipe_a) - len(equipe_b)) <= 1
+        obtida = diferenca_medias([[ratings[i] for i in equipe_a], [ratings[i] for i in equipe_b]])
+        otima = min(
+            diferenca_medias([[ratings[i] for i in grupo], [ratings[i] for i in set(ratings) - set(grupo)]])
+            for grupo in combinations(ratings, n // 2)
+        )
+        assert obtida <= otima + 15
+
+
+def test_divisao_em_varias_equipes():
+    rng = random.Random(5)
+    jogadores = [(i, rng.gauss(1500, 200)) for i in range(2000)]
+    ratings = dict(jogadores)
+    equipes = dividir_equipes(jogadores, quantidade=8)
+
+    assert sorted(i for equipe in equipes for i in equipe) == list(range(2000))
+    assert {len(equipe) for equipe in equipes} == {250}
+    assert diferenca_medias([[ratings[i] for i in equipe] for equipe in equipes]) < 1
+    with pytest.raises(ValueError):
+        dividir_equipes(jogadores, quantidade=0)
+
+
+def test_dividir_gravar_e_finalizar_com_as_equipes():
+    organizador_id, organizador = criar_usuario(rating=1800)
+    jogadores = [criar_usuario(rating=rating) for rating in (1700, 1300, 1200)]
+    partida_id = criar_partida(organizador, dias=3, tipo="competitiva")
+    assert client.post(f"/api/v1/partidas/{partida_id}/equipes", headers=organizador).status_code == 400  # Sem participantes
+    for _, headers in [(organizador_id, organizador)] + jogadores:
+        assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+
+    assert client.post(f"/api/v1/partidas/{partida_id}/equipes", headers=jogadores[0][1]).status_code == 403
+    response = client.post(f"/api/v1/partidas/{partida_id}/equipes", headers=organizador)
+    assert response.status_code == 200, response.text
+    divisao = response.json()
+    # 1800 + 1200 contra 1700 + 1300: médias iguais
+    equipe_do_organizador = "equipe_a" if organizador_id in [j["id"] for j in divisao["equipe_a"]] else "equipe_b"
+    assert {j["id"] for j in divisao[equipe_do_organizador]} == {organizador_id, jogadores[2][0]}
+    assert divisao["rating_medio_a"] == divisao["rating_medio_b"] == 1500.0
+
+    lido = client.get(f"/api/v1/partidas/{partida_id}/equipes", headers=jogadores[1][1]).json()
+    assert lido["equipe_a"] == divisao["equipe_a"] and lido["sem_equipe"] == []
+
+    # Quem entra depois fica sem equipe até a próxima divisão (feita ao finalizar)
+    atrasado_id, atrasado = criar_usuario(rating=1500)
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=atrasado).status_code == 200
+    assert [j["id"] for j in client.get(f"/api/v1/partidas/{partida_id}/equipes", headers=atrasado).json()["sem_equipe"]] == [atrasado_id]
+
+    assert client.patch(
+        f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=18", headers=organizador
+    ).status_code == 200
+    final = client.get(f"/api/v1/partidas/{partida_id}/equipes", headers=organizador).json()
+    assert final["sem_equipe"] == []
+    vencedores = {j["id"] for j in final["equipe_a"]}
+    iniciais = dict(zip([organizador_id] + [j for j, _ in jogadores] + [atrasado_id], (1800, 1700, 1300, 1200, 1500)))
+    assert set(iniciais) == {j["id"] for j in final["equipe_a"] + final["equipe_b"]}
+    db = SessionLocal()
+    try:
+        for usuario_id, rating_inicial in iniciais.items():
+            usuario = db.get(Usuario, usuario_id)
+            venceu = usuario_id in vencedores
+            assert usuario.vitorias == (1 if venceu else 0)
+            assert (usuario.rating > rating_inicial) == venceu
+    finally:
+        db.close()
+    assert client.post(f"/api/v1/partidas/{partida_id}/equipes", headers=organizador).status_code == 400  # Encerrada
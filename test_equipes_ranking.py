@@ -0,0 +1,111 @@
+"""
+Testes das equipes: gestão de membros e rankings mantidos ao finalizar partidas
+"""
+import sys
+import os
+import uuid
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from api import app
+from app.core.database import SessionLocal
+from app.models import Usuario
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def definir_rating(usuario_id, rating):
+    db = SessionLocal()
+    try:
+        db.get(Usuario, usuario_id).rating = rating
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_gestao_de_membros():
+    lider_id, lider = criar_usuario()
+    membro_id, membro = criar_usuario()
+
+    response = client.post("/api/v1/equipes/", headers=lider, json={"nome": f"Equipe {uuid.uuid4().hex[:6]}"})
+    assert response.status_code == 201, response.text
+    equipe = response.json()
+    assert equipe["lider_id"] == lider_id and [m["id"] for m in equipe["membros"]] == [lider_id]
+    assert equipe["taxa_vitoria"] == 0.0
+    equipe_id = equipe["id"]
+
+    assert client.post(f"/api/v1/equipes/{equipe_id}/membros/{membro_id}", headers=membro).status_code == 403
+    assert client.post(f"/api/v1/equipes/{equipe_id}/membros/999999999", headers=lider).status_code == 404
+    response = client.post(f"/api/v1/equipes/{equipe_id}/membros/{membro_id}", headers=lider)
+    assert {m["id"] for m in response.json()["membros"]} == {lider_id, membro_id}
+    assert client.post(f"/api/v1/equipes/{equipe_id}/membros/{membro_id}", headers=lider).status_code == 400
+
+    assert client.put(f"/api/v1/equipes/{equipe_id}", headers=membro, json={"nome": "Outra"}).status_code == 403
+    assert client.put(f"/api/v1/equipes/{equipe_id}", headers=lider, json={"descricao": "Quarta à noite"}).json()["descricao"] == "Quarta à noite"
+    assert equipe_id in [e["id"] for e in client.get("/api/v1/equipes/minhas", headers=lider).json()]
+
+    assert client.delete(f"/api/v1/equipes/{equipe_id}/membros/{lider_id}", headers=lider).status_code == 400
+    response = client.delete(f"/api/v1/equipes/{equipe_id}/membros/{membro_id}", headers=membro)  # Membro sai
+    assert [m["id"] for m in response.json()["membros"]] == [lider_id]
+
+    assert client.delete(f"/api/v1/equipes/{equipe_id}", headers=membro).status_code == 403
+    assert client.delete(f"/api/v1/equipes/{equipe_id}", headers=lider).status_code == 204
+    assert client.get(f"/api/v1/equipes/{equipe_id}", headers=lider).status_code == 404
+
+
+def test_finalizar_partida_atualiza_equipes_e_rankings():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    equipe_id = client.post("/api/v1/equipes/", headers=organizador, json={"nome": f"Equipe {uuid.uuid4().hex[:6]}"}).json()["id"]
+    client.post(f"/api/v1/equipes/{equipe_id}/membros/{jogador_id}", headers=organizador)
+
+    def jogar(participantes, dias):
+        partida_id = criar_partida(organizador, dias=dias, tipo="competitiva")
+        for headers in participantes:
+            assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+        assert client.patch(
+            f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=20", headers=organizador
+        ).status_code == 200
+        return client.get(f"/api/v1/partidas/{partida_id}/equipes", headers=organizador).json()
+
+    # Os dois membros jogaram um em cada lado: a partida não conta para a equipe
+    jogar((organizador, jogador), dias=4)
+    equipe = client.get(f"/api/v1/equipes/{equipe_id}", headers=jogador).json()
+    assert (equipe["partidas_jogadas"], equipe["vitorias"], equipe["pontuacao_total"]) == (0, 0, 0)
+
+    # Os dois no mesmo lado (1800 + 1200 contra 1700 + 1300): uma partida, com o resultado desse lado
+    (a1, h1), (a2, h2) = criar_usuario(), criar_usuario()
+    for usuario_id, rating in ((organizador_id, 1800), (jogador_id, 1200), (a1, 1700), (a2, 1300)):
+        definir_rating(usuario_id, rating)
+    divisao = jogar((organizador, jogador, h1, h2), dias=5)
+    lado = "equipe_a" if organizador_id in [j["id"] for j in divisao["equipe_a"]] else "equipe_b"
+    assert jogador_id in [j["id"] for j in divisao[lado]]
+    venceu = lado == "equipe_a"
+    equipe = client.get(f"/api/v1/equipes/{equipe_id}", headers=jogador).json()
+    assert (equipe["partidas_jogadas"], equipe["vitorias"], equipe["derrotas"]) == (1, int(venceu), int(not venceu))
+    assert equipe["pontuacao_total"] == (20 if venceu else 10)  # Competitiva: pontos em dobro
+
+    ranking = client.get("/api/v1/equipes/ranking?limit=50", headers=jogador).json()
+    assert [e["pontuacao_total"] for e in ranking] == sorted((e["pontuacao_total"] for e in ranking), reverse=True)
+    melhores = client.get("/api/v1/equipes/melhores?limit=50&min_partidas=1", headers=jogador).json()
+    assert melhores  # Ao menos a equipe deste teste (outras execuções podem empatar com ela)
+    assert all(e["partidas_jogadas"] >= 1 for e in melhores)
+    chaves = [(e["taxa_vitoria"], e["partidas_jogadas"]) for e in melhores]
+    assert chaves == sorted(chaves, reverse=True)
+
+
+def test_rankings_lidos_pelo_indice():
+    db = SessionLocal()
+    try:
+        for consulta in (
+            "SELECT id FROM equipes ORDER BY pontuacao_total DESC LIMIT 10",
+            "SELECT id FROM equipes WHERE partidas_jogadas >= 1 ORDER BY taxa_vitoria DESC, partidas_jogadas DESC LIMIT 10",
+        ):
+            plano = " ".join(str(linha[-1]) for linha in db.execute(text(f"EXPLAIN QUERY PLAN {consulta}")))
+            assert "TEMP B-TREE" not in plano, plano
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+"""
+Testes do hub de eventos e do stream SSE GET /partidas/{id}/eventos
+"""
+import asyncio
+import sys
+import os
+import threading
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.eventos import HubEventos, fluxo_sse, hub
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def criar_usuario_e_partida():
+    _, headers = criar_usuario("Teste Eventos")
+    return headers["Authorization"].removeprefix("Bearer "), headers, criar_partida(headers)
+
+
+def test_hub_entrega_e_transbordo():
+    async def cenario():
+        hub_teste = HubEventos()
+        rapida = hub_teste.assinar(1, tamanho=4)
+        lenta = hub_teste.assinar(1, tamanho=2)
+
+        # Publicação a partir de outra thread, como fazem os services
+        thread = threading.Thread(target=lambda: [hub_teste.publicar(1, "teste", n=n) for n in range(3)])
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0)
+
+        assert [(await rapida.proximo(timeout=1)).dados["n"] for _ in range(3)] == [0, 1, 2]
+        # A fila de 2 transbordou no terceiro evento: assinatura encerrada
+        assert await lenta.proximo(timeout=1) is None
+        assert hub_teste.assinantes(1) == 1
+
+        rapida.cancelar()
+        assert hub_teste.assinantes() == 0
+
+    asyncio.run(cenario())
+
+
+def test_fluxo_sse_heartbeat():
+    async def cenario():
+        hub_teste = HubEventos()
+        fluxo = fluxo_sse(hub_teste.assinar(7), heartbeat=0.01)
+        assert (await fluxo.__anext__()).startswith("retry:")
+        assert await fluxo.__anext__() == ": ping\n\n"
+        hub_teste.publicar(7, "status", status="marcada")
+        assert "event: status" in await fluxo.__anext__()
+        await fluxo.aclose()
+        assert hub_teste.assinantes() == 0
+
+    asyncio.run(cenario())
+
+
+def test_eventos_exige_token():
+    _, _, partida_id = criar_usuario_e_partida()
+    assert client.get(f"/api/v1/partidas/{partida_id}/eventos").status_code == 401
+    assert client.get(f"/api/v1/partidas/{partida_id}/eventos?token=invalido").status_code == 401
+
+
+def test_stream_recebe_entrada():
+    token, headers, partida_id = criar_usuario_e_partida()
+
+    async def cenario():
+        corpo = []
+        desconectar = asyncio.Event()
+        recebido = asyncio.Event()
+
+        async def receive():
+            await desconectar.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(mensagem):
+            if mensagem["type"] == "http.response.start":
+                assert mensagem["status"] == 200
+            elif mensagem.get("body"):
+                corpo.append(mensagem["body"].decode())
+                recebido.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/v1/partidas/{partida_id}/eventos", "root_path": "",
+            "raw_path": f"/api/v1/partidas/{partida_id}/eventos".encode(),
+            "query_string": f"token={token}".encode(), "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        }
+        tarefa = asyncio.create_task(app(scope, receive, send))
+        await asyncio.wait_for(recebido.wait(), 5)
+        assert hub.assinantes(partida_id) == 1
+
+        # Entrar na partida publica "participante_entrou" para quem está assinando
+        recebido.clear()
+        await asyncio.to_thread(client.post, f"/api/v1/partidas/{partida_id}/participar", headers=headers)
+        await asyncio.wait_for(recebido.wait(), 5)
+
+        desconectar.set()
+        await asyncio.wait_for(tarefa, 5)
+        return "".join(corpo)
+
+    corpo = asyncio.run(cenario())
+    assert "event: participante_entrou" in corpo
+    assert hub.assinantes(partida_id) == 0
@@ -0,0 +1,99 @@
+"""
+Testes da busca por proximidade GET /partidas/proximas-de-mim
+"""
+import sys
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.utils.geo import COLUNAS, celula, faixas_de_celulas, haversine_km
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def ponto_isolado():
+    """Ponto sorteado longe de partidas criadas por outros testes"""
+    return random.uniform(-50, 50), random.uniform(-170, 170)
+
+
+def test_haversine():
+    # São Paulo -> Rio de Janeiro: ~361 km
+    assert abs(haversine_km(-23.5505, -46.6333, -22.9068, -43.1729) - 361) < 2
+    assert haversine_km(10, 20, 10, 20) == 0
+
+
+def test_faixas_cobrem_o_raio():
+    lat, lon = -5.0892, -42.8019
+    faixas = faixas_de_celulas(lat, lon, 5)
+    cobertas = lambda c: any(inicio <= c <= fim for inicio, fim in faixas)
+    for dlat, dlon in [(0.04, 0.04), (-0.04, 0.0), (0.0, -0.044)]:
+        assert haversine_km(lat, lon, lat + dlat, lon + dlon) <= 6.5
+        assert cobertas(celula(lat + dlat, lon + dlon))
+    assert not cobertas(celula(lat + 0.2, lon))
+
+
+def test_faixas_no_antimeridiano():
+    faixas = faixas_de_celulas(0, 179.999, 3)
+    assert any(inicio % COLUNAS == 0 for inicio, _ in faixas)  # lado -180
+    assert any(fim % COLUNAS == COLUNAS - 1 for _, fim in faixas)  # lado +180
+    assert any(inicio <= celula(0.0, -179.99) <= fim for inicio, fim in faixas)
+
+
+def test_proximas_ordenadas_por_distancia_e_horario():
+    _, headers = criar_usuario()
+    lat, lon = ponto_isolado()
+    longe = criar_partida(headers, latitude=lat + 0.05, longitude=lon)  # ~5,6 km
+    perto_tarde = criar_partida(headers, latitude=lat + 0.01, longitude=lon, dias=3)  # ~1,1 km
+    perto_cedo = criar_partida(headers, latitude=lat + 0.01, longitude=lon, dias=1)
+    fora = criar_partida(headers, latitude=lat + 0.2, longitude=lon)  # ~22 km
+
+    response = client.get("/api/v1/partidas/proximas-de-mim", headers=headers,
+                          params={"lat": lat, "lon": lon, "raio_km": 10})
+    assert response.status_code == 200
+    resultado = response.json()
+    assert [p["id"] for p in resultado] == [perto_cedo, perto_tarde, longe]
+    assert abs(resultado[0]["distancia_km"] - 1.11) < 0.05
+    assert fora not in [p["id"] for p in resultado]
+
+    # Paginação sobre a mesma ordem
+    response = client.get("/api/v1/partidas/proximas-de-mim", headers=headers,
+                          params={"lat": lat, "lon": lon, "raio_km": 10, "skip": 1, "limit": 1})
+    assert [p["id"] for p in response.json()] == [perto_tarde]
+
+
+def test_atualizar_coordenadas_move_partida():
+    _, headers = criar_usuario()
+    lat, lon = ponto_isolado()
+    partida_id = criar_partida(headers, latitude=lat, longitude=lon)
+
+    novo_lat, novo_lon = lat + 1, lon
+    response = client.put(f"/api/v1/partidas/{partida_id}", headers=headers,
+                          json={"latitude": novo_lat, "longitude": novo_lon})
+    assert response.status_code == 200
+    assert response.json()["latitude"] == novo_lat
+
+    ids = lambda la, lo: [p["id"] for p in client.get(
+        "/api/v1/partidas/proximas-de-mim", headers=headers, params={"lat": la, "lon": lo, "raio_km": 2}
+    ).json()]
+    assert partida_id not in ids(lat, lon)
+    assert partida_id in ids(novo_lat, novo_lon)
+
+
+def test_coordenadas_devem_vir_juntas():
+    _, headers = criar_usuario()
+    response = client.post("/api/v1/partidas/", headers=headers, json={
+        "titulo": "Sem longitude",
+        "tipo": "amistosa",
+        "data_partida": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "latitude": -5.0,
+    })
+    assert response.status_code == 400
+    response = client.get("/api/v1/partidas/proximas-de-mim", headers=headers,
+                          params={"lat": 0, "lon": 0, "raio_km": 500})
+    assert response.status_code == 422
@@ -0,0 +1,149 @@
+"""
+Testes do cabeçalho Idempotency-Key (IdempotenciaMiddleware)
+"""
+import sys
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.middlewares.security import request_counts
+from app.models import ChaveIdempotencia, Partida
+from app.repositories.idempotencia_repository import IdempotenciaRepository
+from conftest import criar_usuario
+
+client = TestClient(app)
+
+
+def dados_partida(titulo):
+    return {
+        "titulo": titulo,
+        "tipo": "amistosa",
+        "data_partida": (datetime.now(timezone.utc) + timedelta(days=400 + uuid.uuid4().int % 300)).isoformat(),
+        "local": "Quadra Idempotente",
+    }
+
+
+def test_repeticao_reproduz_a_primeira_resposta():
+    headers = {**criar_usuario()[1], "Idempotency-Key": uuid.uuid4().hex}
+    titulo = f"Idem {uuid.uuid4().hex[:8]}"
+    corpo = dados_partida(titulo)
+
+    primeira = client.post("/api/v1/partidas/", headers=headers, json=corpo)
+    assert primeira.status_code == 201
+    assert "idempotent-replayed" not in primeira.headers
+
+    repetida = client.post("/api/v1/partidas/", headers=headers, json=corpo)
+    assert repetida.status_code == 201
+    assert repetida.headers["idempotent-replayed"] == "true"
+    assert repetida.json() == primeira.json()
+
+    db = SessionLocal()
+    try:
+        assert db.query(Partida).filter(Partida.titulo == titulo).count() == 1
+    finally:
+        db.close()
+
+
+def test_mesma_chave_com_outro_corpo():
+    headers = {**criar_usuario()[1], "Idempotency-Key": uuid.uuid4().hex}
+    assert client.post("/api/v1/partidas/", headers=headers, json=dados_partida("Primeira")).status_code == 201
+    response = client.post("/api/v1/partidas/", headers=headers, json=dados_partida("Outra"))
+    assert response.status_code == 422
+
+
+def test_chave_isolada_por_usuario():
+    chave = uuid.uuid4().hex
+    a = client.post("/api/v1/partidas/", headers={**criar_usuario()[1], "Idempotency-Key": chave}, json=dados_partida("A"))
+    b = client.post("/api/v1/partidas/", headers={**criar_usuario()[1], "Idempotency-Key": chave}, json=dados_partida("B"))
+    assert a.status_code == b.status_code == 201
+    assert a.json()["id"] != b.json()["id"]
+    assert "idempotent-replayed" not in b.headers
+
+
+def test_sem_credencial_chave_ignorada():
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    for _ in range(2):
+        response = client.post("/api/v1/partidas/", headers=headers, json=dados_partida("Anônimo"))
+        assert response.status_code in (401, 403)
+        assert "idempotent-replayed" not in response.headers
+    db = SessionLocal()
+    try:
+        assert db.query(ChaveIdempotencia).filter(ChaveIdempotencia.chave == headers["Idempotency-Key"]).count() == 0
+    finally:
+        db.close()
+
+
+def test_participar_repetido():
+    _, organizador = criar_usuario()
+    partida_id = client.post("/api/v1/partidas/", headers=organizador, json=dados_partida("Participar")).json()["id"]
+    headers = {**criar_usuario()[1], "Idempotency-Key": uuid.uuid4().hex}
+
+    primeira = client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers)
+    assert primeira.status_code == 200
+    # Sem a chave, a segunda chamada seria "já participando" (400)
+    repetida = client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers)
+    assert repetida.status_code == 200
+    assert repetida.headers["idempotent-replayed"] == "true"
+
+
+def test_rate_limit_nao_grava_a_chave(monkeypatch):
+    headers = {**criar_usuario()[1], "Idempotency-Key": uuid.uuid4().hex}
+    corpo = dados_partida(f"Idem {uuid.uuid4().hex[:8]}")
+
+    # Requisição barrada pelo rate limit não chega a reservar a chave
+    monkeypatch.setitem(request_counts, "testclient", [time.time()] * settings.RATE_LIMIT_MAX_REQUESTS)
+    assert client.post("/api/v1/partidas/", headers=headers, json=corpo).status_code == 429
+
+    request_counts["testclient"] = []
+    nova = client.post("/api/v1/partidas/", headers=headers, json=corpo)
+    assert nova.status_code == 201
+    assert "idempotent-replayed" not in nova.headers
+
+
+def test_chave_em_processamento():
+    headers = {**criar_usuario()[1], "Idempotency-Key": uuid.uuid4().hex}
+    corpo = dados_partida("Em processamento")
+    assert client.post("/api/v1/partidas/", headers=headers, json=corpo).status_code == 201
+    # Simula a primeira requisição ainda em processamento (resposta não gravada)
+    db = SessionLocal()
+    try:
+        registro = db.query(ChaveIdempotencia).filter(ChaveIdempotencia.chave == headers["Idempotency-Key"]).one()
+        registro.status_code = None
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post("/api/v1/partidas/", headers=headers, json=corpo)
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_limpeza_de_chaves_expiradas():
+    agora = datetime.now(timezone.utc)
+    escopo = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        repo = IdempotenciaRepository(db)
+        assert repo.reservar(escopo, "expirada", "x", agora - timedelta(days=2), agora - timedelta(days=1)) is None
+        assert repo.reservar(escopo, "valida", "x", agora, agora + timedelta(days=1)) is None
+        # Chave expirada pode ser reutilizada mesmo antes da limpeza
+        assert repo.reservar(escopo, "expirada", "y", agora, agora + timedelta(days=1)) is None
+        assert repo.reservar(escopo, "expirada", "z", agora, agora + timedelta(days=1)).impressao == "y"
+
+        repo.limpar(agora + timedelta(days=2), max_chaves=100_000)
+        assert db.query(ChaveIdempotencia).filter(ChaveIdempotencia.escopo == escopo).count() == 0
+    finally:
+        db.close()
+
+
+def test_chave_invalida():
+    headers = {**criar_usuario()[1], "Idempotency-Key": "x" * 300}
+    assert client.post("/api/v1/partidas/", headers=headers, json=dados_partida("Chave longa")).status_code == 400
@@ -0,0 +1,29 @@
+"""
+Testes da inicialização sem efeitos colaterais (import de api.py)
+"""
+import sys
+import os
+import subprocess
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_import_nao_toca_o_banco_nem_carrega_jose_passlib():
+    # Banco em diretório inexistente: qualquer acesso durante o import falharia
+    ambiente = dict(os.environ, DATABASE_URL="sqlite:////diretorio-inexistente/galera_volei.db")
+    saida = subprocess.run(
+        [sys.executable, "-c", "import sys, api; print(sorted(m for m in ('jose', 'passlib') if m in sys.modules))"],
+        cwd=RAIZ, env=ambiente, capture_output=True, text=True
+    )
+    assert saida.returncode == 0, saida.stderr
+    assert saida.stdout.strip() == "[]"
+
+
+def test_jose_e_passlib_funcionam_no_primeiro_uso():
+    from app.core.security import security
+    token = security.create_access_token(42)
+    assert security.verify_token(token) == "42"
+    assert security.verify_token("token-invalido") is None
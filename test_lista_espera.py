@@ -0,0 +1,94 @@
+"""
+Testes da lista de espera: fila FIFO das partidas lotadas e promoção automática
+quando uma vaga abre (saída, remoção pelo organizador ou aumento do limite)
+"""
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.eventos import hub
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def participantes(partida_id, headers):
+    return {p["id"] for p in client.get(f"/api/v1/partidas/{partida_id}", headers=headers).json()["participantes"]}
+
+
+def test_fila_fifo_e_promocao_automatica(monkeypatch):
+    eventos = []
+    publicar = hub.publicar
+    monkeypatch.setattr(hub, "publicar", lambda canal, tipo, **dados: eventos.append((tipo, dados)) or publicar(canal, tipo, **dados))
+
+    _, organizador = criar_usuario()
+    (j1, h1), (j2, h2), (j3, h3), (j4, h4), (j5, h5) = (criar_usuario() for _ in range(5))
+    partida_id = criar_partida(organizador, dias=5, max_participantes=2)
+
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h1).status_code == 400  # Tem vagas
+    for headers in (h1, h2):
+        assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers).status_code == 200
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=h3).status_code == 400  # Lotada
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h1).status_code == 400  # Já participa
+
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h3).json()["posicao"] == 1
+    fila = client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h4).json()
+    assert (fila["total"], fila["posicao"]) == (2, 2)
+    assert [item["usuario_id"] for item in fila["fila"]] == [j3, j4]
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h3).status_code == 400  # Já na fila
+
+    # Saída: o primeiro da fila entra na mesma transação
+    assert client.delete(f"/api/v1/partidas/{partida_id}/participar", headers=h1).status_code == 200
+    assert participantes(partida_id, h1) == {j2, j3}
+    assert ("participante_promovido", j3) in [(tipo, dados.get("usuario_id")) for tipo, dados in eventos]
+    fila = client.get(f"/api/v1/partidas/{partida_id}/espera", headers=h4).json()
+    assert (fila["total"], fila["posicao"]) == (1, 1)
+
+    # Remoção pelo organizador também promove
+    assert client.delete(f"/api/v1/partidas/{partida_id}/participantes/{j2}", headers=organizador).status_code == 200
+    assert participantes(partida_id, h1) == {j3, j4}
+    assert client.get(f"/api/v1/partidas/{partida_id}/espera", headers=h4).json()["posicao"] is None
+
+    # Sair da fila
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h5).status_code == 200
+    assert client.delete(f"/api/v1/partidas/{partida_id}/espera", headers=h5).json()["total"] == 0
+    assert client.delete(f"/api/v1/partidas/{partida_id}/espera", headers=h5).status_code == 400
+
+    # Aumentar o limite preenche as vagas novas com a fila
+    assert client.post(f"/api/v1/partidas/{partida_id}/espera", headers=h1).status_code == 200
+    assert client.put(f"/api/v1/partidas/{partida_id}", headers=organizador, json={"max_participantes": 4}).status_code == 200
+    assert participantes(partida_id, h1) == {j1, j3, j4}
+    assert client.get(f"/api/v1/partidas/{partida_id}/espera", headers=h1).json()["total"] == 0
+
+
+def test_promocao_respeita_conflito_de_agenda():
+    _, organizador = criar_usuario()
+    (j1, h1), (j2, h2), (j3, h3) = (criar_usuario() for _ in range(3))
+    inicio = datetime.now(timezone.utc) + timedelta(days=7)
+
+    lotada = criar_partida(organizador, data_partida=inicio, max_participantes=1)
+    mesmo_horario = criar_partida(organizador, data_partida=inicio + timedelta(minutes=30), max_participantes=2)
+    outro_dia = criar_partida(organizador, data_partida=inicio + timedelta(days=1), max_participantes=2)
+    assert client.post(f"/api/v1/partidas/{lotada}/participar", headers=h1).status_code == 200
+    for headers in (h2, h3):
+        assert client.post(f"/api/v1/partidas/{lotada}/espera", headers=headers).status_code == 200
+
+    # Entrar em outra partida no mesmo horário tira da fila
+    assert client.post(f"/api/v1/partidas/{mesmo_horario}/participar", headers=h2).status_code == 200
+    fila = client.get(f"/api/v1/partidas/{lotada}/espera", headers=h2).json()
+    assert [item["usuario_id"] for item in fila["fila"]] == [j3]
+
+    # A outra partida passa para o mesmo horário depois: na promoção o conflito é pulado
+    assert client.post(f"/api/v1/partidas/{outro_dia}/participar", headers=h3).status_code == 200
+    assert client.post(f"/api/v1/partidas/{lotada}/espera", headers=h2).status_code == 409
+    assert client.put(f"/api/v1/partidas/{outro_dia}", headers=organizador, json={
+        "data_partida": (inicio + timedelta(minutes=15)).isoformat()
+    }).status_code == 200
+    assert client.delete(f"/api/v1/partidas/{lotada}/participar", headers=h1).status_code == 200
+    assert participantes(lotada, h1) == set()
+    assert client.get(f"/api/v1/partidas/{lotada}/espera", headers=h1).json()["total"] == 0
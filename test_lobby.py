@@ -0,0 +1,101 @@
+"""
+Testes do lobby WebSocket /ws/partidas/{id}
+"""
+import sys
+import os
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from api import app
+from app.controllers.lobby_controller import FECHAMENTO_NAO_AUTORIZADO, FECHAMENTO_PARTIDA_NAO_ENCONTRADA, FECHAMENTO_PROIBIDO
+from app.core.lobby import PresencaLobby
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def entrar(nome: str):
+    """Token (vai na query string do WebSocket) e headers de um usuário novo"""
+    _, headers = criar_usuario(nome)
+    return headers["Authorization"].removeprefix("Bearer "), headers
+
+
+def test_presenca_conta_conexoes_por_usuario():
+    presenca = PresencaLobby()
+    assert presenca.entrar(1, 10, "Ana")
+    assert not presenca.entrar(1, 10, "Ana")  # segunda aba
+    assert not presenca.sair(1, 10)
+    assert presenca.sair(1, 10)
+    assert presenca.presentes(1) == []
+
+
+def test_lobby_recusa_token_invalido_e_partida_inexistente():
+    token, headers = entrar("Org")
+    partida_id = criar_partida(headers)
+
+    with client.websocket_connect(f"/ws/partidas/{partida_id}?token=invalido") as ws:
+        with pytest.raises(WebSocketDisconnect) as erro:
+            ws.receive_json()
+    assert erro.value.code == FECHAMENTO_NAO_AUTORIZADO
+
+    with client.websocket_connect(f"/ws/partidas/999999?token={token}") as ws:
+        with pytest.raises(WebSocketDisconnect) as erro:
+            ws.receive_json()
+    assert erro.value.code == FECHAMENTO_PARTIDA_NAO_ENCONTRADA
+
+
+def test_lobby_de_partida_privada_so_para_quem_participa():
+    token_org, headers_org = entrar("Org")
+    token_outro, _ = entrar("Outro")
+    partida_id = criar_partida(headers_org, publica=False)
+
+    with client.websocket_connect(f"/ws/partidas/{partida_id}?token={token_outro}") as ws:
+        with pytest.raises(WebSocketDisconnect) as erro:
+            ws.receive_json()
+    assert erro.value.code == FECHAMENTO_PROIBIDO
+    assert client.get(f"/api/v1/partidas/{partida_id}/eventos?token={token_outro}").status_code == 403
+
+    with client.websocket_connect(f"/ws/partidas/{partida_id}?token={token_org}") as org:
+        assert org.receive_json()["tipo"] == "lobby"
+
+
+def test_lobby_presenca_mensagens_e_eventos():
+    token_org, headers_org = entrar("Organizador")
+    token_jog, headers_jog = entrar("Jogador")
+    partida_id = criar_partida(headers_org)
+
+    with client.websocket_connect(f"/ws/partidas/{partida_id}?token={token_org}") as org:
+        inicial = org.receive_json()
+        assert inicial["tipo"] == "lobby"
+        assert [p["nome"] for p in inicial["presentes"]] == ["Organizador"]
+        assert org.receive_json()["tipo"] == "lobby_entrou"
+
+        with client.websocket_connect(
+            f"/ws/partidas/{partida_id}", headers={"Authorization": f"Bearer {token_jog}"}
+        ) as jogador:
+            assert len(jogador.receive_json()["presentes"]) == 2
+            assert jogador.receive_json()["tipo"] == "lobby_entrou"  # a própria entrada
+            entrou = org.receive_json()
+            assert entrou["tipo"] == "lobby_entrou" and entrou["nome"] == "Jogador"
+
+            jogador.send_json({"tipo": "ping"})
+            assert jogador.receive_json() == {"tipo": "pong"}
+
+            jogador.send_json({"tipo": "mensagem", "texto": "Bora!"})
+            mensagem = org.receive_json()
+            assert mensagem["tipo"] == "mensagem" and mensagem["texto"] == "Bora!"
+
+            # Ações pela API REST chegam ao lobby pelo hub de eventos
+            client.post(f"/api/v1/partidas/{partida_id}/participar", headers=headers_jog)
+            tipos = set()
+            while "participante_entrou" not in tipos:
+                tipos.add(org.receive_json()["tipo"])
+
+        saiu = org.receive_json()
+        while saiu["tipo"] != "lobby_saiu":
+            saiu = org.receive_json()
+        assert saiu["nome"] == "Jogador"
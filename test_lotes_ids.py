@@ -0,0 +1,66 @@
+"""
+Testes das consultas em lote por ids (GET /partidas/?ids=... e GET /usuarios/?ids=...)
+"""
+import sys
+import os
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from api import app
+from app.core.database import engine
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def test_partidas_e_usuarios_por_ids():
+    (u1, h1), (u2, h2) = criar_usuario(), criar_usuario()
+    p1, p2 = criar_partida(h1), criar_partida(h2)
+    assert client.post(f"/api/v1/partidas/{p1}/participar", headers=h2).status_code == 200
+
+    response = client.get(f"/api/v1/partidas/?ids={p2},999999999,{p1},{p2}", headers=h1)
+    assert response.status_code == 200, response.text
+    assert [p["id"] for p in response.json()] == [p2, p1]
+    assert response.headers["X-Ids-Nao-Encontrados"] == "999999999"
+    assert [u["id"] for u in response.json()[1]["participantes"]] == [u2]
+
+    # Parâmetro repetido também vale
+    response = client.get(f"/api/v1/usuarios/?ids={u2}&ids={u1}", headers=h1)
+    assert [u["id"] for u in response.json()] == [u2, u1]
+    assert response.headers["X-Ids-Nao-Encontrados"] == ""
+
+    limite = ",".join(str(i) for i in range(1, 202))
+    assert client.get(f"/api/v1/usuarios/?ids={limite}", headers=h1).status_code == 400
+    assert client.get("/api/v1/partidas/?ids=1,x", headers=h1).status_code == 400
+
+
+def test_lote_apenas_acessiveis():
+    _, headers = criar_usuario()  # Intermediário
+    livre, iniciante = criar_partida(headers), criar_partida(headers, categoria="iniciante")
+
+    response = client.get(f"/api/v1/partidas/?ids={iniciante},{livre}&apenas_acessiveis=true", headers=headers)
+    assert [p["id"] for p in response.json()] == [livre]
+    assert response.headers["X-Ids-Nao-Encontrados"] == ""
+    assert len(client.get(f"/api/v1/partidas/?ids={iniciante},{livre}", headers=headers).json()) == 2
+
+
+def test_lote_em_numero_fixo_de_consultas():
+    usuario_id, headers = criar_usuario()
+    ids = [criar_partida(headers) for _ in range(5)]
+    for partida_id in ids[1:]:
+        _, convidado = criar_usuario()
+        client.post(f"/api/v1/partidas/{partida_id}/participar", headers=convidado)
+
+    consultas = []
+    contar = lambda conn, cursor, sql, *args: consultas.append(sql) if sql.lstrip().upper().startswith("SELECT") else None
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        response = client.get(f"/api/v1/partidas/?ids={','.join(map(str, ids))}", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    assert response.status_code == 200
+    # Usuário autenticado + partidas (IN) + participantes (selectin) + confirmações (GROUP BY)
+    assert len(consultas) <= 4, consultas
@@ -0,0 +1,68 @@
+"""
+Testes do endpoint de métricas (/metrics) e dos tipos de métrica
+"""
+import sys
+import os
+import uuid
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from api import app
+from app.core.metrics import CACHE_HITS, CACHE_MISSES, Counter, Histogram
+from app.utils.busca import normalizar
+
+client = TestClient(app)
+
+
+def test_metrics_endpoint():
+    """Requisições devem aparecer agregadas pelo template da rota"""
+    client.get("/health")
+    client.get("/api/v1/partidas/123")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    corpo = response.text
+    assert 'galera_http_requests_total{method="GET",route="/health",status="200"}' in corpo
+    assert 'route="/api/v1/partidas/{partida_id}"' in corpo
+    assert "galera_http_requests_in_flight" in corpo
+    assert "galera_db_pool_checkout_wait_seconds" in corpo
+
+
+def test_histogram_buckets_acumulados():
+    """Buckets do histograma são cumulativos e terminam em +Inf"""
+    histograma = Histogram("teste_latencia", "teste", ("rota",), buckets=(0.1, 1.0))
+    histograma.observe("/x", valor=0.05)
+    histograma.observe("/x", valor=0.5)
+    histograma.observe("/x", valor=3.0)
+
+    linhas = histograma.amostras()
+    assert 'teste_latencia_bucket{rota="/x",le="0.1"} 1' in linhas
+    assert 'teste_latencia_bucket{rota="/x",le="1"} 2' in linhas
+    assert 'teste_latencia_bucket{rota="/x",le="+Inf"} 3' in linhas
+    assert 'teste_latencia_count{rota="/x"} 3' in linhas
+
+
+def test_counter_labels():
+    contador = Counter("teste_total", "teste", ("cache",))
+    contador.inc("partidas")
+    contador.inc("partidas", valor=2)
+    assert contador.valor("partidas") == 3
+    assert contador.amostras() == ['teste_total{cache="partidas"} 3']
+
+
+def test_caches_lru_expostos():
+    """Acertos e faltas das funções com lru_cache aparecem em /metrics"""
+    client.get("/metrics")
+    hits, misses = CACHE_HITS.valor("normalizar"), CACHE_MISSES.valor("normalizar")
+    texto = f"Sábado {uuid.uuid4().hex}"
+    normalizar(texto)
+    normalizar(texto)
+
+    corpo = client.get("/metrics").text
+    assert (CACHE_HITS.valor("normalizar"), CACHE_MISSES.valor("normalizar")) == (hits + 1, misses + 1)
+    assert 'galera_cache_hit_ratio{cache="normalizar"}' in corpo
+    assert 'galera_cache_misses_total{cache="adaptador_lista"}' in corpo
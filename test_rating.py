@@ -0,0 +1,150 @@
+"""
+Testes do rating de habilidade: motor vetorizado, atualização incremental e ranking
+"""
+import sys
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from api import app
+from app.core.database import SessionLocal
+from app.models import Partida, Usuario
+from app.models.enums import StatusPartida
+from app.utils.rating import RATING_INICIAL, recalcular, variacoes_partida
+from arquivar_partidas import arquivar_partidas
+from recalcular_ratings import recalcular_ratings
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def ratings(*usuario_ids):
+    db = SessionLocal()
+    try:
+        return {u.id: (u.rating, u.partidas_ranqueadas) for u in db.query(Usuario).filter(Usuario.id.in_(usuario_ids))}
+    finally:
+        db.close()
+
+
+def test_recalculo_vetorizado_igual_ao_incremental():
+    """Quem joga no máximo uma partida por dia recebe exatamente o rating da aplicação sequencial"""
+    rng = random.Random(3)
+    usuario_ids = list(range(1, 41))
+    partidas, participacoes = [], []
+    esperado = {usuario_id: [RATING_INICIAL, 0] for usuario_id in usuario_ids}
+    partida_id = 1000
+    for dia in range(60):
+        livres = usuario_ids[:]
+        rng.shuffle(livres)
+        while len(livres) >= 4:
+            jogadores = sorted(livres[:rng.randint(3, 12)])
+            del livres[:len(jogadores)]
+            resultado = rng.choice((0.0, 1.0))
+            peso = rng.choice((0.5, 1.0))
+            partida_id += rng.randint(1, 3)
+            partidas.append((partida_id, 738000 + dia, resultado, peso))
+            participacoes.extend((partida_id, usuario_id, -1) for usuario_id in jogadores)
+
+            meio = len(jogadores) // 2
+            variacoes_a, variacoes_b = variacoes_partida(
+                [tuple(esperado[u]) for u in jogadores[:meio]],
+                [tuple(esperado[u]) for u in jogadores[meio:]],
+                resultado, peso
+            )
+            for usuario_id, variacao in zip(jogadores, variacoes_a + variacoes_b):
+                esperado[usuario_id][0] += variacao
+                esperado[usuario_id][1] += 1
+
+    rng.shuffle(participacoes)
+    participacoes.append((999999, 1, 0))  # Partida fora do histórico é ignorada
+    calculados, jogos = recalcular(partidas, participacoes, usuario_ids)
+    for posicao, usuario_id in enumerate(usuario_ids):
+        assert calculados[posicao] == pytest.approx(esperado[usuario_id][0])
+        assert jogos[posicao] == esperado[usuario_id][1]
+
+
+def test_finalizar_atualiza_rating_e_ranking():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    partida_id = criar_partida(organizador, tipo="competitiva")
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=organizador).status_code == 200
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=jogador).status_code == 200
+
+    # Empate não finaliza nem mexe em rating ou estatísticas
+    response = client.patch(f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=20&pontos_b=20", headers=organizador)
+    assert response.status_code == 400
+    assert ratings(organizador_id, jogador_id) == {organizador_id: (RATING_INICIAL, 0), jogador_id: (RATING_INICIAL, 0)}
+
+    # Ratings iguais: a divisão põe o menor id (organizador) na equipe A
+    response = client.patch(f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=20", headers=organizador)
+    assert response.status_code == 200, response.text
+
+    valores = ratings(organizador_id, jogador_id)
+    assert valores[organizador_id] == (pytest.approx(RATING_INICIAL + 20), 1)  # K provisório 40 x (1 - 0,5)
+    assert valores[jogador_id] == (pytest.approx(RATING_INICIAL - 20), 1)
+
+    # Finalizar de novo não aplica o resultado outra vez
+    assert client.patch(f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=25&pontos_b=10", headers=organizador).status_code == 400
+    assert ratings(organizador_id, jogador_id) == valores
+
+    ranking = client.get("/api/v1/usuarios/ranking?criterio=rating&limit=50", headers=jogador).json()
+    assert [r["rating"] for r in ranking] == sorted((r["rating"] for r in ranking), reverse=True)
+    assert organizador_id in [r["id"] for r in ranking]
+    assert client.get("/api/v1/usuarios/ranking?criterio=altura", headers=jogador).status_code == 422
+
+
+def test_recalculo_inclui_partidas_arquivadas():
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    partida_id = criar_partida(organizador, dias=9, tipo="amistosa")
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=organizador).status_code == 200
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=jogador).status_code == 200
+    assert client.patch(
+        f"/api/v1/partidas/{partida_id}/finalizar?pontos_a=15&pontos_b=25", headers=organizador
+    ).status_code == 200
+    incremental = ratings(organizador_id, jogador_id)
+    assert incremental[jogador_id][0] == pytest.approx(RATING_INICIAL + 10)  # Amistosa vale metade
+
+    criar_partida(organizador, dias=10)  # mantém a partida longe do maior id
+    db = SessionLocal()
+    try:
+        partida = db.get(Partida, partida_id)
+        partida.data_partida = datetime.now(timezone.utc) - timedelta(days=400)
+        assert partida.status == StatusPartida.FINALIZADA
+        db.commit()
+    finally:
+        db.close()
+    assert arquivar_partidas(dias=180, lote=100) >= 1
+
+    recalcular_ratings()
+    recalculados = ratings(organizador_id, jogador_id)
+    assert recalculados[organizador_id] == (pytest.approx(incremental[organizador_id][0]), 1)
+    assert recalculados[jogador_id] == (pytest.approx(incremental[jogador_id][0]), 1)
+
+
+def test_partida_finalizada_sem_placar_nao_e_ranqueada():
+    """O motor de status finaliza partidas vencidas sem placar: nem o incremental nem o recálculo as contam"""
+    organizador_id, organizador = criar_usuario()
+    jogador_id, jogador = criar_usuario()
+    partida_id = criar_partida(organizador, dias=11, tipo="competitiva")
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=organizador).status_code == 200
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=jogador).status_code == 200
+
+    db = SessionLocal()
+    try:
+        partida = db.get(Partida, partida_id)
+        partida.data_partida = datetime.now(timezone.utc) - timedelta(days=2)
+        db.commit()
+    finally:
+        db.close()
+    assert client.get(f"/api/v1/partidas/{partida_id}", headers=jogador).json()["status"] == "finalizada"
+
+    recalcular_ratings()
+    assert ratings(organizador_id, jogador_id) == {
+        organizador_id: (RATING_INICIAL, 0), jogador_id: (RATING_INICIAL, 0)
+    }
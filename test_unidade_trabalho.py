@@ -0,0 +1,79 @@
+"""
+Testes da unidade de trabalho por requisição: um único commit no fim da
+requisição, rollback completo nas respostas de erro e eventos só após o commit
+"""
+import sys
+import os
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from api import app
+from app.core.database import SessaoRequisicaoLocal, engine
+from app.core.eventos import hub, publicar_apos_commit
+from conftest import criar_partida, criar_usuario
+
+client = TestClient(app)
+
+
+def contar_commits(metodo, url, headers):
+    commits = []
+    contar = lambda conn: commits.append(conn)
+    event.listen(engine, "commit", contar)
+    try:
+        response = client.request(metodo, url, headers=headers)
+    finally:
+        event.remove(engine, "commit", contar)
+    return response, len(commits)
+
+
+def test_um_commit_por_requisicao_e_rollback_no_erro(monkeypatch):
+    eventos = []
+    monkeypatch.setattr(hub, "publicar", lambda canal, tipo, **dados: eventos.append(tipo))
+
+    _, organizador = criar_usuario()
+    (convidado_id, convidado), (_, h1), (_, h2) = (criar_usuario() for _ in range(3))
+    partida_id = criar_partida(organizador, dias=6, max_participantes=2)
+    convite = client.post("/api/v1/convites/", headers=organizador, json={
+        "convidado_id": convidado_id, "partida_id": partida_id
+    }).json()
+
+    # Entrada + atualização de status + evento: uma gravação só
+    response, commits = contar_commits("POST", f"/api/v1/partidas/{partida_id}/participar", h1)
+    assert response.status_code == 200, response.text
+    assert commits == 1
+    assert "participante_entrou" in eventos
+    assert client.post(f"/api/v1/partidas/{partida_id}/participar", headers=h2).status_code == 200
+
+    # Partida lotada: a aceitação já marcada é desfeita inteira, sem compensação manual
+    eventos.clear()
+    response, commits = contar_commits("PUT", f"/api/v1/convites/{convite['id']}/aceitar", convidado)
+    assert response.status_code == 400
+    assert commits == 0 and eventos == []
+    assert client.get(f"/api/v1/convites/{convite['id']}", headers=convidado).json()["status"] == "pendente"
+
+
+def test_eventos_aguardam_o_commit(monkeypatch):
+    eventos = []
+    monkeypatch.setattr(hub, "publicar", lambda canal, tipo, **dados: eventos.append(tipo))
+
+    db = SessaoRequisicaoLocal()
+    try:
+        db.iniciar_unidade()
+        publicar_apos_commit(db, 1, "descartado")
+        db.commit()  # Adiado: só flush
+        assert eventos == []
+        db.descartar()
+
+        db.iniciar_unidade()
+        publicar_apos_commit(db, 1, "gravado")
+        db.concluir()
+        assert eventos == ["gravado"]
+
+        # Fora da unidade de trabalho o evento sai na hora
+        publicar_apos_commit(db, 1, "imediato")
+        assert eventos == ["gravado", "imediato"]
+    finally:
+        db.close()
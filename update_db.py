@@ -2,15 +2,285 @@
 Script para atualizar estrutura do banco sem remover dados existentes
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, inspect
 from app.core.database import engine, SessionLocal, Base
 from app.models import Convite
+from app.models.busca import instalar_busca, busca_instalada
+from app.utils.agenda import DURACAO_PADRAO_MINUTOS
+from app.utils.categoria_utils import NIVEL_USUARIO, MASCARA_CATEGORIA, MASCARA_LIVRE
+from app.utils.rating import RATING_INICIAL
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def adicionar_colunas_nivel(db: Session):
+    """Adicionar e preencher usuarios.nivel e partidas.categoria_mascara (elegibilidade pré-computada)"""
+    inspector = inspect(db.get_bind())
+    colunas = {
+        "usuarios": (
+            "nivel",
+            "UPDATE usuarios SET nivel = CASE tipo "
+            + " ".join(f"WHEN '{tipo.name}' THEN {nivel}" for tipo, nivel in NIVEL_USUARIO.items())
+            + " ELSE 0 END",
+        ),
+        "partidas": (
+            "categoria_mascara",
+            "UPDATE partidas SET categoria_mascara = CASE categoria "
+            + " ".join(f"WHEN '{categoria.value}' THEN {mascara}" for categoria, mascara in MASCARA_CATEGORIA.items())
+            + f" ELSE {MASCARA_LIVRE} END",
+        ),
+    }
+    
+    for tabela, (coluna, preenchimento) in colunas.items():
+        existentes = [col["name"] for col in inspector.get_columns(tabela)]
+        if coluna in existentes:
+            logger.info(f" Coluna '{coluna}' existe na tabela {tabela}")
+            continue
+        
+        logger.info(f" Adicionando coluna '{coluna}' na tabela {tabela}...")
+        try:
+            db.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER NOT NULL DEFAULT 0;"))
+            db.execute(text(preenchimento))
+            db.commit()
+            logger.info(f" Coluna '{coluna}' adicionada e preenchida com sucesso")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna '{coluna}': {e}")
+
+
+def adicionar_colunas_geo(db: Session):
+    """Adicionar partidas.latitude/longitude/geo_celula e o índice da grade (partidas antigas ficam sem coordenadas)"""
+    inspector = inspect(db.get_bind())
+    existentes = [col["name"] for col in inspector.get_columns("partidas")]
+    for coluna, tipo in (("latitude", "FLOAT"), ("longitude", "FLOAT"), ("geo_celula", "INTEGER")):
+        if coluna in existentes:
+            logger.info(f" Coluna '{coluna}' existe na tabela partidas")
+            continue
+        logger.info(f" Adicionando coluna '{coluna}' na tabela partidas...")
+        try:
+            db.execute(text(f"ALTER TABLE partidas ADD COLUMN {coluna} {tipo};"))
+            db.commit()
+            logger.info(f" Coluna '{coluna}' adicionada com sucesso")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna '{coluna}': {e}")
+    
+    try:
+        db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_partidas_geo_celula_data ON partidas (geo_celula, data_partida);"
+        ))
+        db.commit()
+        logger.info(" Índice ix_partidas_geo_celula_data verificado")
+    except Exception as e:
+        db.rollback()
+        logger.error(f" Erro ao criar índice ix_partidas_geo_celula_data: {e}")
+
+
+def adicionar_termino_partidas(db: Session):
+    """Adicionar e preencher partidas.data_termino e os índices da checagem de conflito e da agenda"""
+    inspector = inspect(db.get_bind())
+    existentes = [col["name"] for col in inspector.get_columns("partidas")]
+    if "data_termino" in existentes:
+        logger.info(" Coluna 'data_termino' existe na tabela partidas")
+    else:
+        logger.info(" Adicionando coluna 'data_termino' na tabela partidas...")
+        if db.get_bind().dialect.name == "sqlite":
+            # Mesmo formato de texto que o SQLAlchemy grava, para as comparações funcionarem
+            termino = (
+                "strftime('%Y-%m-%d %H:%M:%S', data_partida, "
+                f"'+' || COALESCE(duracao_estimada, {DURACAO_PADRAO_MINUTOS}) || ' minutes') "
+                "|| COALESCE(NULLIF(substr(data_partida, 20), ''), '.000000')"
+            )
+            tipo = "DATETIME"
+        else:
+            termino = f"data_partida + make_interval(mins => COALESCE(duracao_estimada, {DURACAO_PADRAO_MINUTOS}))"
+            tipo = "TIMESTAMP WITH TIME ZONE"
+        try:
+            db.execute(text(f"ALTER TABLE partidas ADD COLUMN data_termino {tipo};"))
+            db.execute(text(f"UPDATE partidas SET data_termino = COALESCE(data_fim, {termino});"))
+            db.commit()
+            logger.info(" Coluna 'data_termino' adicionada e preenchida com sucesso")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna 'data_termino': {e}")
+    
+    indices = {
+        "ix_partida_participantes_usuario": "partida_participantes (usuario_id, partida_id)",
+        "ix_partidas_organizador_data": "partidas (organizador_id, data_partida)",
+    }
+    for nome, definicao in indices.items():
+        try:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao};"))
+            db.commit()
+            logger.info(f" Índice {nome} verificado")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao criar índice {nome}: {e}")
+
+
+def adicionar_colunas_rating(db: Session):
+    """Adicionar usuarios.rating/partidas_ranqueadas e o índice do ranking (preencher com recalcular_ratings.py)"""
+    inspector = inspect(db.get_bind())
+    existentes = [col["name"] for col in inspector.get_columns("usuarios")]
+    colunas = {
+        "rating": f"FLOAT NOT NULL DEFAULT {RATING_INICIAL}",
+        "partidas_ranqueadas": "INTEGER NOT NULL DEFAULT 0",
+    }
+    adicionadas = False
+    for coluna, tipo in colunas.items():
+        if coluna in existentes:
+            logger.info(f" Coluna '{coluna}' existe na tabela usuarios")
+            continue
+        logger.info(f" Adicionando coluna '{coluna}' na tabela usuarios...")
+        try:
+            db.execute(text(f"ALTER TABLE usuarios ADD COLUMN {coluna} {tipo};"))
+            db.commit()
+            adicionadas = True
+            logger.info(f" Coluna '{coluna}' adicionada com sucesso")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna '{coluna}': {e}")
+    if adicionadas:
+        logger.info(" Rode python recalcular_ratings.py para calcular os ratings a partir do histórico")
+    
+    try:
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_usuarios_ativo_rating ON usuarios (ativo, rating);"))
+        db.commit()
+        logger.info(" Índice ix_usuarios_ativo_rating verificado")
+    except Exception as e:
+        db.rollback()
+        logger.error(f" Erro ao criar índice ix_usuarios_ativo_rating: {e}")
+
+
+def adicionar_coluna_equipe(db: Session):
+    """Adicionar a equipe (A/B) em partida_participantes e no espelho do arquivo (participações antigas ficam sem divisão)"""
+    inspector = inspect(db.get_bind())
+    for tabela in ("partida_participantes", "partida_participantes_arquivo"):
+        existentes = [col["name"] for col in inspector.get_columns(tabela)]
+        if "equipe" in existentes:
+            logger.info(f" Coluna 'equipe' existe na tabela {tabela}")
+            continue
+        logger.info(f" Adicionando coluna 'equipe' na tabela {tabela}...")
+        try:
+            db.execute(text(f"ALTER TABLE {tabela} ADD COLUMN equipe VARCHAR(1);"))
+            db.commit()
+            logger.info(f" Coluna 'equipe' adicionada com sucesso em {tabela}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna 'equipe' em {tabela}: {e}")
+
+
+def adicionar_taxa_vitoria_equipes(db: Session):
+    """Adicionar equipes.taxa_vitoria (preenchida a partir dos totais) e os índices dos rankings de equipes"""
+    inspector = inspect(db.get_bind())
+    existentes = [col["name"] for col in inspector.get_columns("equipes")]
+    if "taxa_vitoria" in existentes:
+        logger.info(" Coluna 'taxa_vitoria' existe na tabela equipes")
+    else:
+        logger.info(" Adicionando coluna 'taxa_vitoria' na tabela equipes...")
+        try:
+            db.execute(text("ALTER TABLE equipes ADD COLUMN taxa_vitoria FLOAT NOT NULL DEFAULT 0;"))
+            db.execute(text(
+                "UPDATE equipes SET taxa_vitoria = CASE WHEN partidas_jogadas > 0 "
+                "THEN 100.0 * vitorias / partidas_jogadas ELSE 0 END;"
+            ))
+            db.commit()
+            logger.info(" Coluna 'taxa_vitoria' adicionada e preenchida com sucesso")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao adicionar coluna 'taxa_vitoria': {e}")
+    
+    indices = {
+        "ix_equipes_pontuacao_total": "equipes (pontuacao_total)",
+        "ix_equipes_taxa_vitoria": "equipes (taxa_vitoria, partidas_jogadas)",
+        "ix_equipe_membros_usuario": "equipe_membros (usuario_id, equipe_id)",
+    }
+    for nome, definicao in indices.items():
+        try:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao};"))
+            db.commit()
+            logger.info(f" Índice {nome} verificado")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao criar índice {nome}: {e}")
+
+
+def adicionar_agregados_avaliacoes(db: Session):
+    """Adicionar as somas/quantidades de avaliações em usuarios e partidas (e no arquivo) e os índices das avaliações"""
+    inspector = inspect(db.get_bind())
+    colunas_por_tabela = {
+        "usuarios": ("soma_notas_organizador", "avaliacoes_organizador", "soma_notas_jogador", "avaliacoes_jogador"),
+        "partidas": ("soma_notas", "total_avaliacoes"),
+        "partidas_arquivo": ("soma_notas", "total_avaliacoes"),
+    }
+    adicionadas = False
+    for tabela, colunas in colunas_por_tabela.items():
+        existentes = [col["name"] for col in inspector.get_columns(tabela)]
+        for coluna in colunas:
+            if coluna in existentes:
+                logger.info(f" Coluna '{coluna}' existe na tabela {tabela}")
+                continue
+            logger.info(f" Adicionando coluna '{coluna}' na tabela {tabela}...")
+            try:
+                db.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER NOT NULL DEFAULT 0;"))
+                db.commit()
+                adicionadas = True
+                logger.info(f" Coluna '{coluna}' adicionada com sucesso em {tabela}")
+            except Exception as e:
+                db.rollback()
+                logger.error(f" Erro ao adicionar coluna '{coluna}' em {tabela}: {e}")
+    if adicionadas:
+        logger.info(" Rode python recalcular_avaliacoes.py para preencher os agregados a partir das avaliações")
+    
+    try:
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_avaliacoes_partida_avaliador ON avaliacoes (partida_id, avaliador_id);"))
+        db.commit()
+        logger.info(" Índice ix_avaliacoes_partida_avaliador verificado")
+    except Exception as e:
+        db.rollback()
+        logger.error(f" Erro ao criar índice ix_avaliacoes_partida_avaliador: {e}")
+    
+    try:
+        db.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_avaliacoes_unica "
+            "ON avaliacoes (partida_id, avaliador_id, tipo_avaliacao, COALESCE(avaliado_id, 0));"
+        ))
+        db.commit()
+        logger.info(" Índice único ux_avaliacoes_unica verificado")
+    except Exception as e:
+        db.rollback()
+        logger.error(f" Erro ao criar índice ux_avaliacoes_unica (remova as avaliações repetidas e rode de novo): {e}")
+
+
+def adicionar_indices_candidaturas(db: Session):
+    """Índices da fila de candidaturas do organizador e das candidaturas de cada usuário"""
+    indices = {
+        "ix_candidaturas_partida_status_data": "candidaturas (partida_id, status, created_at)",
+        "ix_candidaturas_usuario_data": "candidaturas (usuario_id, created_at)",
+    }
+    for nome, definicao in indices.items():
+        try:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao};"))
+            db.commit()
+            logger.info(f" Índice {nome} verificado")
+        except Exception as e:
+            db.rollback()
+            logger.error(f" Erro ao criar índice {nome}: {e}")
+
+
+def instalar_indice_busca():
+    """Criar o índice de busca textual em bancos anteriores a ele e indexar as partidas existentes"""
+    with engine.begin() as conn:
+        if busca_instalada(conn):
+            logger.info(" Índice de busca textual existe")
+            return
+        logger.info(" Criando índice de busca textual de partidas...")
+        instalar_busca(conn, reconstruir=True)
+        logger.info(" Índice de busca textual criado e preenchido")
+
+
 def update_db():
     """Atualizar estrutura do banco de dados"""
     logger.info(" Atualizando estrutura do banco de dados...")
@@ -23,19 +293,15 @@ def update_db():
         # Verificar se a tabela de convites existe
         db = SessionLocal()
         try:
-            # Tentar fazer uma query simples na tabela convites
-            result = db.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='convites';"))
-            tables = result.fetchall()
-            
-            if tables:
+            # Inspeção pelo SQLAlchemy: funciona em SQLite e em Postgres (fase release)
+            inspector = inspect(engine)
+            if "convites" in inspector.get_table_names():
                 logger.info(" Tabela 'convites' existe")
             else:
                 logger.warning(" Tabela 'convites' não encontrada")
             
             # Verificar se a coluna 'publica' existe na tabela partidas
-            result = db.execute(text("PRAGMA table_info(partidas);"))
-            columns = result.fetchall()
-            column_names = [col[1] for col in columns]
+            column_names = [col["name"] for col in inspector.get_columns("partidas")]
             
             if 'publica' in column_names:
                 logger.info(" Coluna 'publica' existe na tabela partidas")
@@ -47,12 +313,32 @@ def update_db():
                     db.commit()
                     logger.info(" Coluna 'publica' adicionada com sucesso")
                 except Exception as e:
+                    db.rollback()
                     logger.error(f" Erro ao adicionar coluna 'publica': {e}")
             
+            adicionar_colunas_nivel(db)
+            adicionar_colunas_geo(db)
+            adicionar_termino_partidas(db)
+            adicionar_colunas_rating(db)
+            adicionar_coluna_equipe(db)
+            adicionar_taxa_vitoria_equipes(db)
+            adicionar_agregados_avaliacoes(db)
+            adicionar_indices_candidaturas(db)
+            instalar_indice_busca()
+            
             logger.info("\n Verificação da estrutura do banco concluída!")
             logger.info(" Tabelas verificadas:")
             logger.info("   - Tabela convites")
             logger.info("   - Coluna partidas.publica")
+            logger.info("   - Colunas usuarios.nivel e partidas.categoria_mascara")
+            logger.info("   - Índice de busca textual de partidas")
+            logger.info("   - Colunas de coordenadas e índice da grade em partidas")
+            logger.info("   - Coluna partidas.data_termino e índices de agenda")
+            logger.info("   - Colunas usuarios.rating/partidas_ranqueadas e índice do ranking")
+            logger.info("   - Coluna partida_participantes.equipe (e no arquivo)")
+            logger.info("   - Coluna equipes.taxa_vitoria e índices dos rankings de equipes")
+            logger.info("   - Agregados de avaliações em usuarios e partidas (e no arquivo)")
+            logger.info("   - Índices da fila de candidaturas")
             
         finally:
             db.close()